@@ -0,0 +1,291 @@
+"""
+Synthetic Benchmark Datasets for SQLite MCP Server
+
+This module generates the reproducible databases the benchmark suite runs
+against. Every table is filled from a seeded random generator, so the same
+scale and seed always produce the same rows, and a generated file is reused
+until the generator version, scale or seed changes.
+
+Tables:
+    text_docs       Titles, bodies with e-mail addresses and phone numbers,
+                    categories and authors; indexed by text_docs_fts (FTS5)
+    measurements    Correlated numeric columns for the statistics tools
+    readings        Per-sensor time series at one-minute intervals
+    embeddings      Normalized vectors in the create_embeddings_table layout
+    places          Points and small polygons as WKT with an R*Tree index
+                    (places_rtree), so no SpatiaLite build is needed
+    bench_writes    Empty target for the write and import benchmarks
+"""
+
+import csv
+import json
+import logging
+import math
+import os
+import random
+import sqlite3
+import time
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+GENERATOR_VERSION = 1
+DEFAULT_SEED = 42
+EMBEDDING_DIM = 64
+CATEGORIES = ('news', 'sports', 'science', 'finance', 'travel', 'health', 'culture', 'technology')
+CHUNK_ROWS = 50000
+
+# Rows per table at each scale. Embeddings are stored as JSON text and searched
+# in Python, so they are kept at a tenth of the other tables.
+SCALES = {
+    'small': 10_000,
+    'medium': 1_000_000,
+    'large': 10_000_000,
+}
+
+_SYLLABLES = ('ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ba', 'de', 'fi', 'go', 'ha', 'ju', 'pe', 'zu')
+
+
+def table_rows(scale):
+    """Return the row count of each generated table at a scale"""
+    if scale not in SCALES:
+        raise ValueError(f"scale must be one of: {', '.join(SCALES)}")
+    rows = SCALES[scale]
+    return {
+        'text_docs': rows,
+        'measurements': rows,
+        'readings': rows,
+        'embeddings': max(1000, rows // 10),
+        'places': rows,
+    }
+
+
+def vocabulary(size=2000, seed=DEFAULT_SEED):
+    """Return a fixed list of pronounceable pseudo-words"""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _chunks(rows, size=CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _text_rows(count, rng, words):
+    authors = [f"{rng.choice(words).title()} {rng.choice(words).title()}" for _ in range(500)]
+    # Skew word choice so a few terms are common and most are rare, like real text
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    for i in range(1, count + 1):
+        body = rng.choices(words, weights, k=rng.randint(12, 40))
+        if i % 7 == 0:
+            body.insert(rng.randrange(len(body)), f"{rng.choice(words)}.{rng.choice(words)}@example.com")
+        if i % 11 == 0:
+            body.insert(rng.randrange(len(body)), f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}")
+        title = ' '.join(rng.choices(words, weights, k=rng.randint(2, 6))).capitalize()
+        yield i, title, ' '.join(body), CATEGORIES[i % len(CATEGORIES)], rng.choice(authors)
+
+
+def _measurement_rows(count, rng):
+    for i in range(1, count + 1):
+        x = rng.gauss(50, 15)
+        y = 0.8 * x + rng.gauss(0, 8)
+        # A heavy right tail gives the outlier and distribution tools something to find
+        z = rng.lognormvariate(3, 0.75)
+        yield i, rng.randint(1, 100), CATEGORIES[i % len(CATEGORIES)], x, y, z, rng.randint(0, 1000)
+
+
+def _reading_rows(count, rng, sensors=100):
+    start = time.mktime((2024, 1, 1, 0, 0, 0, 0, 0, -1))
+    per_sensor = max(1, count // sensors)
+    for i in range(count):
+        sensor = i // per_sensor % sensors + 1
+        step = i % per_sensor
+        ts = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start + step * 60))
+        value = 20 + 5 * math.sin(step / 1440 * 2 * math.pi) + rng.gauss(0, 1) + sensor / 10
+        yield i + 1, sensor, ts, round(value, 4)
+
+
+def random_embedding(rng, dim=EMBEDDING_DIM):
+    """Return a unit-length vector of dim components"""
+    vector = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [round(v / norm, 6) for v in vector]
+
+
+def _embedding_rows(count, rng, words):
+    for i in range(1, count + 1):
+        content = ' '.join(rng.choices(words, k=8))
+        yield i, content, json.dumps(random_embedding(rng)), EMBEDDING_DIM
+
+
+def _place_rows(count, rng, words):
+    for i in range(1, count + 1):
+        lon = rng.uniform(-180, 180)
+        lat = rng.uniform(-85, 85)
+        if i % 4:
+            wkt = f"POINT({lon:.6f} {lat:.6f})"
+            bounds = (lon, lon, lat, lat)
+        else:
+            half = rng.uniform(0.001, 0.05)
+            wkt = (f"POLYGON(({lon - half:.6f} {lat - half:.6f}, {lon + half:.6f} {lat - half:.6f}, "
+                   f"{lon + half:.6f} {lat + half:.6f}, {lon - half:.6f} {lat + half:.6f}, "
+                   f"{lon - half:.6f} {lat - half:.6f}))")
+            bounds = (lon - half, lon + half, lat - half, lat + half)
+        yield (i, rng.choice(words).title(), wkt, lon, lat) + bounds
+
+
+SCHEMA = """
+CREATE TABLE bench_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE text_docs (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    category TEXT NOT NULL,
+    author TEXT NOT NULL
+);
+CREATE TABLE measurements (
+    id INTEGER PRIMARY KEY,
+    sensor_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    x REAL NOT NULL,
+    y REAL NOT NULL,
+    z REAL NOT NULL,
+    amount INTEGER NOT NULL
+);
+CREATE TABLE readings (
+    id INTEGER PRIMARY KEY,
+    sensor_id INTEGER NOT NULL,
+    ts TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE TABLE embeddings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content TEXT NOT NULL,
+    embedding TEXT NOT NULL,
+    embedding_dim INTEGER NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE places (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    wkt TEXT NOT NULL,
+    lon REAL NOT NULL,
+    lat REAL NOT NULL
+);
+CREATE VIRTUAL TABLE places_rtree USING rtree(id, min0, max0, min1, max1);
+CREATE TABLE bench_writes (id INTEGER PRIMARY KEY, payload TEXT, amount INTEGER);
+"""
+
+INDEXES = """
+CREATE INDEX idx_readings_sensor_ts ON readings(sensor_id, ts);
+CREATE INDEX idx_embeddings_embedding_dim ON embeddings(embedding_dim);
+CREATE VIRTUAL TABLE text_docs_fts USING fts5(title, body, content='text_docs', content_rowid='id');
+INSERT INTO text_docs_fts(text_docs_fts) VALUES ('rebuild');
+ANALYZE;
+"""
+
+
+def _read_meta(path):
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return dict(conn.execute("SELECT key, value FROM bench_meta").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+
+
+def generate(path, scale='small', seed=DEFAULT_SEED, force=False):
+    """
+    Create the benchmark database at path, or reuse a matching one.
+
+    Args:
+        path (str): Database file to create
+        scale (str): One of SCALES
+        seed (int): Seed of the random generator
+        force (bool): Regenerate even if a matching file exists
+
+    Returns:
+        dict: Scale, seed, per-table row counts, file size, the seconds the
+            file took to generate and whether an existing file was reused
+    """
+    rows = table_rows(scale)
+    expected = {'generator_version': str(GENERATOR_VERSION), 'scale': scale, 'seed': str(seed)}
+    info = {'scale': scale, 'seed': seed, 'tables': rows, 'path': path}
+    meta = _read_meta(path) if os.path.exists(path) and not force else {}
+    if meta and all(meta.get(key) == value for key, value in expected.items()):
+        logger.info(f"Reusing benchmark dataset {path}")
+        return dict(info, reused=True, generate_seconds=float(meta.get('generate_seconds', 0)),
+                    size_bytes=os.path.getsize(path))
+
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    words = vocabulary(seed=seed)
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        # Durability does not matter for a file that is regenerated on failure
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(SCHEMA)
+        inserts = [
+            ('text_docs', "INSERT INTO text_docs VALUES (?, ?, ?, ?, ?)", _text_rows(rows['text_docs'], rng, words)),
+            ('measurements', "INSERT INTO measurements VALUES (?, ?, ?, ?, ?, ?, ?)",
+             _measurement_rows(rows['measurements'], rng)),
+            ('readings', "INSERT INTO readings VALUES (?, ?, ?, ?)", _reading_rows(rows['readings'], rng)),
+            ('embeddings', "INSERT INTO embeddings (id, content, embedding, embedding_dim) VALUES (?, ?, ?, ?)",
+             _embedding_rows(rows['embeddings'], rng, words)),
+        ]
+        for table, sql, table_rows_iter in inserts:
+            logger.info(f"Generating {rows[table]} rows of {table}")
+            conn.execute("BEGIN")
+            for chunk in _chunks(table_rows_iter):
+                conn.executemany(sql, chunk)
+            conn.execute("COMMIT")
+
+        logger.info(f"Generating {rows['places']} rows of places")
+        conn.execute("BEGIN")
+        for chunk in _chunks(_place_rows(rows['places'], rng, words)):
+            conn.executemany("INSERT INTO places VALUES (?, ?, ?, ?, ?)", [row[:5] for row in chunk])
+            conn.executemany("INSERT INTO places_rtree VALUES (?, ?, ?, ?, ?)",
+                             [(row[0],) + row[5:] for row in chunk])
+        conn.execute("COMMIT")
+
+        logger.info("Building indexes")
+        conn.executescript(INDEXES)
+        elapsed = time.perf_counter() - started
+        conn.executemany("INSERT INTO bench_meta VALUES (?, ?)",
+                         list(expected.items()) + [('generate_seconds', f"{elapsed:.3f}")])
+        conn.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        conn.close()
+
+    return dict(info, reused=False, generate_seconds=round(elapsed, 3), size_bytes=os.path.getsize(path))
+
+
+def write_csv(path, rows, seed=DEFAULT_SEED):
+    """Write a CSV file of rows records for the import benchmarks"""
+    rng = random.Random(seed)
+    words = vocabulary(seed=seed)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'name', 'category', 'score', 'amount', 'created'])
+        for i in range(1, rows + 1):
+            writer.writerow([i, rng.choice(words), CATEGORIES[i % len(CATEGORIES)],
+                             f"{rng.uniform(0, 100):.3f}", rng.randint(0, 1000),
+                             f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}"])
+    return path
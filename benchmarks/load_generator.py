@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+MCP stdio Load Generator for SQLite MCP Server
+
+Spawns the real server over stdio and replays a weighted mix of call_tool
+and read_resource requests at a target concurrency, then reports
+end-to-end latency percentiles and requests per second. Unlike
+run_benchmarks.py, every request pays for JSON-RPC framing, pydantic
+validation and TextContent serialization on both ends, which is where
+small calls spend most of their time.
+
+Concurrency is closed-loop: each worker sends its next request as soon as
+the previous one is answered. Workers are spread over --sessions server
+processes that share one database file, so --sessions 1 measures a single
+client pipelining requests and higher values measure competing clients.
+
+Usage:
+    python benchmarks/load_generator.py --concurrency 8 --requests 2000
+    python benchmarks/load_generator.py --sessions 4 --concurrency 16 --duration 30
+    python benchmarks/load_generator.py --mix mix.json --db-path ./database.db
+    python benchmarks/load_generator.py --concurrency 8 -- --wal --pool-size 8
+
+Arguments after -- are passed to the server (see start_sqlite_mcp.py --help).
+
+A mix file is a JSON list of operations; "{n}" in an argument is replaced
+by a random integer between 1 and the operation's "max_n" (default 10000):
+    [{"name": "lookup", "weight": 80, "tool": "read_query",
+      "arguments": {"query": "SELECT * FROM measurements WHERE id = ?", "params": ["{n}"]}},
+     {"name": "schema", "weight": 20, "resource": "database://schema"}]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCHMARK_DIR.parent
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from datasets import SCALES, generate  # noqa: E402
+from run_benchmarks import ERROR_TEXT  # noqa: E402
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_SESSIONS = 1
+DEFAULT_REQUESTS = 1000
+DEFAULT_WARMUP = 20
+DEFAULT_MAX_N = 10000
+PERCENTILES = (50, 90, 95, 99)
+
+# Small, frequent calls typical of an agent session against the benchmark dataset
+DEFAULT_MIX = [
+    {"name": "point_lookup", "weight": 35, "tool": "read_query",
+     "arguments": {"query": "SELECT * FROM measurements WHERE id = ?", "params": ["{n}"]}},
+    {"name": "indexed_range", "weight": 15, "tool": "read_query",
+     "arguments": {"query": "SELECT ts, value FROM readings WHERE sensor_id = ? ORDER BY ts DESC LIMIT 100",
+                   "params": ["{n}"]}, "max_n": 100},
+    {"name": "fts_search", "weight": 15, "tool": "fts_search",
+     "arguments": {"table_name": "text_docs_fts", "query": "kalo", "limit": 10}},
+    {"name": "describe_table", "weight": 10, "tool": "describe_table", "arguments": {"table_name": "measurements"}},
+    {"name": "list_tables", "weight": 10, "tool": "list_tables", "arguments": {}},
+    {"name": "insert", "weight": 5, "tool": "write_query",
+     "arguments": {"query": "INSERT INTO bench_writes (payload, amount) VALUES ('load', {n})"}},
+    {"name": "performance_resource", "weight": 5, "resource": "database://performance"},
+    {"name": "schema_resource", "weight": 5, "resource": "database://schema"},
+]
+
+
+def percentile(ordered, p):
+    """Return the nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def latency_summary(samples_ms):
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {}
+    summary = {f"p{p}": round(percentile(ordered, p), 3) for p in PERCENTILES}
+    summary['mean'] = round(sum(ordered) / len(ordered), 3)
+    summary['max'] = round(ordered[-1], 3)
+    return summary
+
+
+def _fill(value, rng, max_n):
+    if value == "{n}":
+        return rng.randint(1, max_n)
+    if isinstance(value, str):
+        return value.replace("{n}", str(rng.randint(1, max_n))) if "{n}" in value else value
+    if isinstance(value, list):
+        return [_fill(item, rng, max_n) for item in value]
+    if isinstance(value, dict):
+        return {key: _fill(item, rng, max_n) for key, item in value.items()}
+    return value
+
+
+def load_mix(path=None):
+    """Read and check a mix file, or return the default mix"""
+    if path is None:
+        return DEFAULT_MIX
+    with open(path, encoding='utf-8') as f:
+        mix = json.load(f)
+    if not isinstance(mix, list) or not mix:
+        raise ValueError("The mix must be a non-empty JSON list of operations")
+    for i, op in enumerate(mix):
+        if ('tool' in op) == ('resource' in op):
+            raise ValueError(f"Operation {i} needs exactly one of 'tool' or 'resource'")
+        if op.get('weight', 1) <= 0:
+            raise ValueError(f"Operation {i} needs a positive weight")
+        op.setdefault('name', op.get('tool') or op.get('resource'))
+    return mix
+
+
+def _is_error(op, result):
+    """Return the error text of a failed call, or None"""
+    if 'resource' in op:
+        return None
+    text = ' '.join(getattr(item, 'text', '') for item in result.content)
+    if result.isError or ERROR_TEXT.match(text):
+        return text[:200]
+    return None
+
+
+class LoadGenerator:
+    """Closed-loop request replay against stdio server processes"""
+
+    def __init__(self, db_path, mix, concurrency=DEFAULT_CONCURRENCY, sessions=DEFAULT_SESSIONS,
+                 server_args=None, seed=0, server_log=None):
+        """
+        Args:
+            db_path (str): Database the servers open
+            mix (list): Weighted operations to replay
+            concurrency (int): Requests in flight across all sessions
+            sessions (int): Server processes, each with one client session
+            server_args (list, optional): Extra command-line options for the server
+            seed (int): Seed for operation choice and {n} values
+            server_log (str, optional): File receiving the servers' stderr
+        """
+        self.db_path = db_path
+        self.mix = mix
+        self.concurrency = max(1, int(concurrency))
+        self.sessions = max(1, min(int(sessions), self.concurrency))
+        self.server_args = list(server_args or [])
+        self.rng = random.Random(seed)
+        self.server_log = server_log
+        self._weights = [op.get('weight', 1) for op in mix]
+        self.samples = {op['name']: [] for op in mix}
+        self.errors = {op['name']: 0 for op in mix}
+        self.error_examples = {}
+        self.startup_ms = []
+
+    def _server_parameters(self):
+        return StdioServerParameters(
+            command=sys.executable,
+            args=[str(REPO_ROOT / "start_sqlite_mcp.py"), "--db-path", self.db_path] + self.server_args,
+            env={**os.environ, "PYTHONPATH": str(REPO_ROOT / "src")},
+        )
+
+    async def _request(self, session, op):
+        arguments = _fill(op.get('arguments', {}), self.rng, op.get('max_n', DEFAULT_MAX_N))
+        if 'resource' in op:
+            return await session.read_resource(op['resource'])
+        return await session.call_tool(op['tool'], arguments)
+
+    async def _worker(self, session, budget, deadline, record):
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if budget is not None:
+                if budget[0] <= 0:
+                    return
+                budget[0] -= 1
+            op = self.rng.choices(self.mix, self._weights)[0]
+            started = time.perf_counter()
+            try:
+                result = await self._request(session, op)
+                error = _is_error(op, result)
+            except Exception as e:
+                error = str(e)[:200] or type(e).__name__
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if record:
+                if error:
+                    self.errors[op['name']] += 1
+                    self.error_examples.setdefault(op['name'], error)
+                else:
+                    self.samples[op['name']].append(elapsed_ms)
+
+    async def _session(self, workers, warmup, budget, deadline, ready, go):
+        errlog = open(self.server_log or os.devnull, 'a', encoding='utf-8')
+        try:
+            async with stdio_client(self._server_parameters(), errlog=errlog) as (read, write):
+                async with ClientSession(read, write) as session:
+                    started = time.perf_counter()
+                    await session.initialize()
+                    self.startup_ms.append((time.perf_counter() - started) * 1000)
+                    if warmup:
+                        await self._worker(session, [warmup], None, record=False)
+                    ready.release()
+                    await go.wait()
+                    await asyncio.gather(*(self._worker(session, budget, deadline(), record=True)
+                                           for _ in range(workers)))
+        finally:
+            errlog.close()
+
+    async def run(self, requests=DEFAULT_REQUESTS, duration=None, warmup=DEFAULT_WARMUP):
+        """
+        Replay the mix until the request budget or the duration is used up.
+
+        Args:
+            requests (int): Measured requests across all workers (ignored
+                when duration is given)
+            duration (float, optional): Seconds to keep sending requests
+            warmup (int): Unmeasured requests per session before the clock starts
+
+        Returns:
+            dict: Overall and per-operation latency percentiles, request and
+                error counts and requests per second
+        """
+        budget = None if duration else [int(requests)]
+        ready = asyncio.Semaphore(0)
+        go = asyncio.Event()
+        window = {}
+        per_session = [self.concurrency // self.sessions + (i < self.concurrency % self.sessions)
+                       for i in range(self.sessions)]
+        tasks = [asyncio.create_task(self._session(workers, warmup, budget,
+                                                   lambda: window.get('deadline'), ready, go))
+                 for workers in per_session]
+        # Start measuring once every server is up and warmed, so startup is not counted
+        for _ in tasks:
+            waiter = asyncio.create_task(ready.acquire())
+            done, _pending = await asyncio.wait([waiter, *tasks], return_when=asyncio.FIRST_COMPLETED)
+            if waiter not in done:
+                waiter.cancel()
+                for task in tasks:
+                    task.cancel()
+                # A session ended before it was ready; surface its error
+                for task in done:
+                    task.result()
+                raise RuntimeError("A server session ended before the load started")
+        window['started'] = time.perf_counter()
+        if duration:
+            window['deadline'] = window['started'] + duration
+        go.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - window['started']
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        all_samples = [ms for samples in self.samples.values() for ms in samples]
+        errors = sum(self.errors.values())
+        operations = {}
+        for op in self.mix:
+            name = op['name']
+            operations[name] = {
+                'kind': 'resource' if 'resource' in op else 'tool',
+                'target': op.get('resource') or op['tool'],
+                'requests': len(self.samples[name]),
+                'errors': self.errors[name],
+                'latency_ms': latency_summary(self.samples[name]),
+            }
+            if name in self.error_examples:
+                operations[name]['first_error'] = self.error_examples[name]
+        return {
+            'concurrency': self.concurrency,
+            'sessions': self.sessions,
+            'elapsed_seconds': round(elapsed, 3),
+            'requests': len(all_samples),
+            'errors': errors,
+            'requests_per_second': round(len(all_samples) / elapsed, 1) if elapsed else None,
+            'latency_ms': latency_summary(all_samples),
+            'server_startup_ms': latency_summary(self.startup_ms),
+            'operations': operations,
+        }
+
+
+def print_report(report):
+    print(f"\n{report['requests']} requests in {report['elapsed_seconds']:.2f}s "
+          f"({report['requests_per_second']} req/s) at concurrency {report['concurrency']} "
+          f"over {report['sessions']} session(s), {report['errors']} errors")
+    header = ''.join(f"{f'p{p} ms':>10}" for p in PERCENTILES)
+    print(f"{'operation':<24}{'requests':>10}{header}{'max ms':>10}{'errors':>8}")
+    rows = list(report['operations'].items()) + [('all', {'requests': report['requests'],
+                                                          'errors': report['errors'],
+                                                          'latency_ms': report['latency_ms']})]
+    for name, stats in rows:
+        latency = stats['latency_ms']
+        cells = ''.join(f"{latency.get(f'p{p}') or 0:>10.2f}" for p in PERCENTILES)
+        print(f"{name:<24}{stats['requests']:>10}{cells}{latency.get('max') or 0:>10.2f}{stats['errors']:>8}")
+    for name, stats in report['operations'].items():
+        if 'first_error' in stats:
+            print(f"  {name} failed: {stats['first_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Drive the SQLite MCP Server over stdio with concurrent requests')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Requests in flight across all sessions (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--sessions', type=int, default=DEFAULT_SESSIONS,
+                        help=f'Server processes, one client session each (default: {DEFAULT_SESSIONS})')
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS,
+                        help=f'Measured requests in total (default: {DEFAULT_REQUESTS})')
+    parser.add_argument('--duration', type=float, default=None,
+                        help='Send requests for this many seconds instead of a fixed count')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP,
+                        help=f'Unmeasured requests per session before measuring (default: {DEFAULT_WARMUP})')
+    parser.add_argument('--mix', default=None,
+                        help='JSON file with the operation mix (default: a read-heavy mix on the benchmark dataset)')
+    parser.add_argument('--db-path', default=None,
+                        help='Database to load (default: a copy of the generated benchmark dataset)')
+    parser.add_argument('--scale', choices=list(SCALES), default='small',
+                        help='Benchmark dataset scale when --db-path is not given (default: small)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the request sequence (default: 0)')
+    parser.add_argument('--server-log', default=None, help='Append the servers\' stderr to this file')
+    parser.add_argument('--output', default=None, help='Write the report as JSON to this file')
+    parser.add_argument('server_args', nargs=argparse.REMAINDER,
+                        help='Options after -- are passed to the server')
+    args = parser.parse_args()
+    server_args = args.server_args[1:] if args.server_args[:1] == ['--'] else args.server_args
+
+    mix = load_mix(args.mix)
+    work_dir = None
+    db_path = args.db_path
+    if db_path is None:
+        dataset_path = str(BENCHMARK_DIR / 'data' / f"{args.scale}.db")
+        generate(dataset_path, args.scale)
+        # The default mix writes, so load a copy and keep the cached dataset pristine
+        work_dir = tempfile.mkdtemp(prefix='sqlite-mcp-load-', dir=BENCHMARK_DIR / 'data')
+        db_path = os.path.join(work_dir, 'load.db')
+        shutil.copyfile(dataset_path, db_path)
+
+    try:
+        generator = LoadGenerator(db_path, mix, args.concurrency, args.sessions, server_args,
+                                  seed=args.seed, server_log=args.server_log)
+        report = asyncio.run(generator.run(args.requests, args.duration, args.warmup))
+    except Exception as e:
+        print(f"Load run failed: {e!r}. Rerun with --server-log to see the server's output", file=sys.stderr)
+        return 2
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report['server_args'] = server_args
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
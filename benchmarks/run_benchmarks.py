@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for SQLite MCP Server
+
+Runs MCP tool calls against a synthetic dataset and reports latency,
+throughput and peak memory per case, as machine-readable JSON that can be
+compared against a stored baseline.
+
+Tool calls go through the same request handler the stdio transport uses
+(input validation, the worker executor, deadlines and metrics included),
+but in-process, so the numbers exclude JSON-RPC framing. Every case runs in
+its own subprocess so its peak RSS is not inflated by earlier cases.
+
+Usage:
+    python benchmarks/run_benchmarks.py                          # small scale, all categories
+    python benchmarks/run_benchmarks.py --scale medium --repeat 10
+    python benchmarks/run_benchmarks.py --categories core,fts --output results.json
+    python benchmarks/run_benchmarks.py --save-baseline           # store results as the baseline
+    python benchmarks/run_benchmarks.py --fail-on-regression      # exit 1 if slower than the baseline
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import re
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent / "src"))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from datasets import DEFAULT_SEED, EMBEDDING_DIM, SCALES, generate, random_embedding, write_csv  # noqa: E402
+from mcp_server_sqlite.cli import add_server_arguments, server_options  # noqa: E402
+
+RESULTS_VERSION = 1
+DEFAULT_REPEAT = 5
+DEFAULT_WARMUP = 1
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_CASE_TIMEOUT = 900
+# Latency changes smaller than this are noise, whatever the ratio
+NOISE_FLOOR_MS = 2.0
+# Rows in the CSV file and batch written by the import cases
+IMPORT_ROWS = {'small': 10_000, 'medium': 100_000, 'large': 1_000_000}
+BATCH_ROWS = 1000
+# Tools report most failures as text rather than as MCP errors
+ERROR_TEXT = re.compile(r"^(Error|Database error|Failed|Statement interrupted|Invalid|[\w -]+ failed: )")
+
+Case = namedtuple('Case', 'category name tool arguments rows_per_call')
+Case.__new__.__defaults__ = (None,)
+
+CATEGORIES = ('core', 'statistics', 'text', 'fts', 'vector', 'spatial', 'import', 'backup', 'catalog')
+# Catalog cases call these instead of a tool; their arguments go to create_server
+CREATE_SERVER = 'create_server'
+LIST_REQUESTS = ('tools/list', 'resources/list')
+
+
+def benchmark_cases(context):
+    """
+    Return the benchmark cases.
+
+    Args:
+        context (dict): work_dir, scale and csv_path of the run
+
+    Returns:
+        list: Case tuples; arguments is a dict or a function of the
+            iteration number for cases that must not repeat themselves
+    """
+    work_dir = context['work_dir']
+    import_rows = IMPORT_ROWS[context['scale']]
+    query_vector = random_embedding(random.Random(DEFAULT_SEED + 1), EMBEDDING_DIM)
+    window = "r.min0 <= 10 AND r.max0 >= 0 AND r.min1 <= 10 AND r.max1 >= 0"
+
+    def batch(i):
+        return {"query": "INSERT INTO bench_writes (payload, amount) VALUES (?, ?)",
+                "param_rows": [[f"batch {i} row {n}", n] for n in range(BATCH_ROWS)]}
+
+    return [
+        Case('core', 'point_lookup', 'read_query',
+             {"query": "SELECT * FROM measurements WHERE id = 4242"}),
+        Case('core', 'indexed_range', 'read_query',
+             {"query": "SELECT ts, value FROM readings WHERE sensor_id = 7 ORDER BY ts DESC LIMIT 500"}),
+        Case('core', 'group_by_scan', 'read_query',
+             {"query": "SELECT category, COUNT(*) AS n, AVG(x) AS mean_x, MAX(amount) AS max_amount "
+                       "FROM measurements GROUP BY category"}),
+        Case('core', 'top_n_sort', 'read_query',
+             {"query": "SELECT id, x, y FROM measurements ORDER BY z DESC LIMIT 100"}),
+        Case('core', 'join_aggregate', 'read_query',
+             {"query": "SELECT d.category, COUNT(*) AS n FROM text_docs d "
+                       "JOIN measurements m ON m.id = d.id WHERE m.amount > 900 GROUP BY d.category"}),
+        Case('core', 'single_insert', 'write_query',
+             lambda i: {"query": f"INSERT INTO bench_writes (payload, amount) VALUES ('single {i}', {i})"}),
+        Case('core', 'describe_table', 'describe_table', {"table_name": "measurements"}),
+        Case('statistics', 'descriptive_statistics', 'descriptive_statistics',
+             {"table_name": "measurements", "column_name": "x"}),
+        Case('statistics', 'percentile_analysis', 'percentile_analysis',
+             {"table_name": "measurements", "column_name": "y"}),
+        Case('statistics', 'correlation_analysis', 'correlation_analysis',
+             {"table_name": "measurements", "column_x": "x", "column_y": "y"}),
+        Case('statistics', 'correlation_matrix', 'correlation_matrix',
+             {"table_name": "measurements", "columns": ["x", "y", "z", "amount"]}),
+        Case('statistics', 'distribution_analysis', 'distribution_analysis',
+             {"table_name": "measurements", "column_name": "z"}),
+        Case('statistics', 'outlier_detection', 'outlier_detection',
+             {"table_name": "measurements", "column_name": "z"}),
+        Case('statistics', 'moving_averages', 'moving_averages',
+             {"table_name": "readings", "value_column": "value", "time_column": "ts",
+              "where_clause": "sensor_id = 3"}),
+        Case('text', 'regex_extract', 'regex_extract',
+             {"table_name": "text_docs", "column_name": "body", "pattern": r"[\w.]+@example\.com"}),
+        Case('text', 'fuzzy_match', 'fuzzy_match',
+             {"table_name": "text_docs", "column_name": "author", "search_term": "Kalo Minesa"}),
+        Case('text', 'phonetic_match', 'phonetic_match',
+             {"table_name": "text_docs", "column_name": "author", "search_term": "Kalomi"}),
+        Case('text', 'text_similarity', 'text_similarity',
+             {"table_name": "text_docs", "column_name": "title", "reference_text": "kalo mine ruti"}),
+        Case('text', 'text_normalize_preview', 'text_normalize',
+             {"table_name": "text_docs", "column_name": "title", "operations": ["lowercase", "trim"]}),
+        Case('fts', 'term', 'fts_search', {"table_name": "text_docs_fts", "query": "kalo"}),
+        Case('fts', 'boolean', 'fts_search', {"table_name": "text_docs_fts", "query": "kalo OR mine NOT ruti"}),
+        Case('fts', 'phrase', 'fts_search', {"table_name": "text_docs_fts", "query": '"kalo mine"'}),
+        Case('fts', 'prefix', 'fts_search', {"table_name": "text_docs_fts", "query": "ka*", "limit": 50}),
+        Case('fts', 'rebuild_index', 'rebuild_fts_index', {"table_name": "text_docs_fts"}),
+        Case('vector', 'semantic_search', 'semantic_search',
+             {"table_name": "embeddings", "query_embedding": query_vector, "limit": 10}),
+        Case('vector', 'store_embedding', 'store_embedding',
+             lambda i: {"table_name": "embeddings", "embedding": query_vector, "content": f"benchmark vector {i}"}),
+        Case('spatial', 'rtree_window', 'read_query',
+             {"query": f"SELECT p.id, p.name, p.wkt FROM places_rtree r JOIN places p ON p.id = r.id WHERE {window}"}),
+        Case('spatial', 'scan_window', 'read_query',
+             {"query": "SELECT id, name, wkt FROM places WHERE lon BETWEEN 0 AND 10 AND lat BETWEEN 0 AND 10"}),
+        Case('import', 'batch_write', 'batch_write', batch, BATCH_ROWS),
+        Case('import', 'csv_import', 'create_enhanced_csv_table',
+             lambda i: {"table_name": f"csv_import_{i}", "csv_file_path": context['csv_path']}, import_rows),
+        Case('backup', 'backup_database', 'backup_database',
+             {"backup_path": os.path.join(work_dir, 'backup.db'), "overwrite": True}),
+        Case('backup', 'integrity_check', 'integrity_check', {}),
+        Case('catalog', 'build', CREATE_SERVER, {}),
+        Case('catalog', 'list_tools', 'tools/list', {}),
+        Case('catalog', 'list_tools_vector', 'tools/list', {"tool_categories": ["vector"]}),
+        Case('catalog', 'list_resources', 'resources/list', {}),
+    ]
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB, or None where unsupported"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def latency_summary(samples_ms):
+    ordered = sorted(samples_ms)
+    p95 = ordered[min(len(ordered) - 1, max(0, round(0.95 * len(ordered)) - 1))]
+    return {
+        'median': round(statistics.median(ordered), 3),
+        'p95': round(p95, 3),
+        'mean': round(statistics.fmean(ordered), 3),
+        'min': round(ordered[0], 3),
+        'max': round(ordered[-1], 3),
+    }
+
+
+def _error_text(result):
+    """Return the error a tool reported, or None"""
+    if result.isError:
+        return ' '.join(item.text for item in result.content if hasattr(item, 'text'))[:500]
+    for item in result.content:
+        text = getattr(item, 'text', '')
+        if ERROR_TEXT.match(text):
+            return text[:500]
+    return None
+
+
+async def _measure(case, db_path, repeat, warmup, options):
+    from mcp import types
+    from mcp_server_sqlite.server import EnhancedSqliteDatabase, create_server
+
+    rss_before = peak_rss_mb()
+    db = EnhancedSqliteDatabase(db_path, **options)
+    try:
+        if case.tool == CREATE_SERVER:
+            async def call(i):
+                started = time.perf_counter()
+                create_server(db, **case.arguments)
+                return (time.perf_counter() - started) * 1000, None
+        elif case.tool in LIST_REQUESTS:
+            request_type = types.ListToolsRequest if case.tool == 'tools/list' else types.ListResourcesRequest
+            handler = create_server(db, **case.arguments).request_handlers[request_type]
+
+            async def call(i):
+                started = time.perf_counter()
+                # The transport serializes the result, so that is part of serving it
+                (await handler(request_type(method=case.tool))).model_dump_json(by_alias=True, exclude_none=True)
+                return (time.perf_counter() - started) * 1000, None
+        else:
+            handler = create_server(db).request_handlers[types.CallToolRequest]
+
+            async def call(i):
+                arguments = case.arguments(i) if callable(case.arguments) else case.arguments
+                request = types.CallToolRequest(method="tools/call",
+                                                params=types.CallToolRequestParams(name=case.tool, arguments=arguments))
+                started = time.perf_counter()
+                result = (await handler(request)).root
+                return (time.perf_counter() - started) * 1000, _error_text(result)
+
+        for i in range(warmup):
+            _, error = await call(i)
+            if error:
+                return {'error': error}
+        samples = []
+        for i in range(warmup, warmup + repeat):
+            elapsed_ms, error = await call(i)
+            if error:
+                return {'error': error}
+            samples.append(elapsed_ms)
+    finally:
+        db.close()
+
+    total_seconds = sum(samples) / 1000
+    measurement = {
+        'runs': repeat,
+        'latency_ms': latency_summary(samples),
+        'calls_per_second': round(repeat / total_seconds, 3) if total_seconds else None,
+        'rss_before_mb': rss_before,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    if case.rows_per_call and total_seconds:
+        measurement['rows_per_second'] = round(case.rows_per_call * repeat / total_seconds, 1)
+    return measurement
+
+
+def run_case_worker(args):
+    """Measure one case in this process and print the result as JSON"""
+    context = json.loads(args.context)
+    case = next(c for c in benchmark_cases(context) if f"{c.category}.{c.name}" == args.run_case)
+    options = json.loads(args.options)
+    measurement = asyncio.run(_measure(case, context['database'], args.repeat, args.warmup, options))
+    print(json.dumps(measurement))
+
+
+def run_case(case, context, repeat, warmup, options, timeout):
+    """Measure one case in a fresh subprocess"""
+    command = [sys.executable, __file__, '--run-case', f"{case.category}.{case.name}",
+               '--context', json.dumps(context), '--options', json.dumps(options),
+               '--repeat', str(repeat), '--warmup', str(warmup)]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'error': f"did not finish within {timeout}s"}
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        return {'error': (completed.stderr.strip().splitlines() or ['worker failed'])[-1][:500]}
+    return json.loads(lines[-1])
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare the median latency and peak RSS of each case with a baseline.
+
+    Args:
+        results (dict): Output of this run
+        baseline (dict): Output of an earlier run at the same scale
+        threshold (float): Relative slowdown or growth counted as a regression
+
+    Returns:
+        list: One dict per case found in both runs, with the ratios and a
+            'regression' flag
+    """
+    previous = {(c['category'], c['name']): c for c in baseline.get('cases', [])}
+    comparison = []
+    for case in results['cases']:
+        before = previous.get((case['category'], case['name']))
+        if not before or 'latency_ms' not in before or 'latency_ms' not in case:
+            continue
+        old_ms = before['latency_ms']['median']
+        new_ms = case['latency_ms']['median']
+        ratio = new_ms / old_ms if old_ms else None
+        regression = ratio is not None and ratio > 1 + threshold and new_ms - old_ms > NOISE_FLOOR_MS
+        entry = {'category': case['category'], 'name': case['name'],
+                 'baseline_median_ms': old_ms, 'median_ms': new_ms,
+                 'latency_ratio': round(ratio, 3) if ratio is not None else None}
+        if before.get('peak_rss_mb') and case.get('peak_rss_mb'):
+            rss_ratio = case['peak_rss_mb'] / before['peak_rss_mb']
+            entry['rss_ratio'] = round(rss_ratio, 3)
+            regression = regression or rss_ratio > 1 + threshold
+        entry['regression'] = regression
+        comparison.append(entry)
+    return comparison
+
+
+def print_report(results, comparison):
+    by_case = {(c['category'], c['name']): c for c in comparison}
+    print(f"\nScale {results['scale']} ({results['dataset']['tables']['measurements']} rows), "
+          f"{results['repeat']} runs per case")
+    print(f"{'case':<36}{'median ms':>12}{'p95 ms':>12}{'calls/s':>10}{'peak MB':>10}{'vs base':>10}")
+    for case in results['cases']:
+        label = f"{case['category']}.{case['name']}"
+        if 'error' in case:
+            print(f"{label:<36}  ERROR: {case['error'][:80]}")
+            continue
+        diff = by_case.get((case['category'], case['name']))
+        versus = ''
+        if diff and diff['latency_ratio'] is not None:
+            versus = f"{diff['latency_ratio']:.2f}x" + (' !' if diff['regression'] else '')
+        print(f"{label:<36}{case['latency_ms']['median']:>12.2f}{case['latency_ms']['p95']:>12.2f}"
+              f"{case['calls_per_second'] or 0:>10.1f}{case['peak_rss_mb'] or 0:>10.1f}{versus:>10}")
+
+
+def run(args):
+    categories = args.categories.split(',') if args.categories else list(CATEGORIES)
+    unknown = set(categories) - set(CATEGORIES)
+    if unknown:
+        raise SystemExit(f"Unknown categories: {', '.join(sorted(unknown))} (choose from {', '.join(CATEGORIES)})")
+
+    data_dir = Path(args.data_dir)
+    dataset_path = str(data_dir / f"{args.scale}.db")
+    print(f"Preparing {args.scale} dataset at {dataset_path}")
+    dataset = generate(dataset_path, args.scale, seed=args.seed, force=args.regenerate)
+    print(f"Dataset ready ({dataset['size_bytes'] / 1e6:.1f} MB, generated in {dataset['generate_seconds']:.1f}s)")
+
+    options = server_options(args)
+    for key in ('metrics_file', 'metrics_port', 'metrics_interval', 'tool_categories', 'profile_startup'):
+        options.pop(key)
+
+    work_dir = tempfile.mkdtemp(prefix='sqlite-mcp-bench-', dir=data_dir)
+    try:
+        # Cases that write work on a copy so the cached dataset stays pristine
+        work_db = os.path.join(work_dir, 'bench.db')
+        shutil.copyfile(dataset_path, work_db)
+        context = {'scale': args.scale, 'database': work_db, 'work_dir': work_dir,
+                   'csv_path': write_csv(os.path.join(work_dir, 'import.csv'), IMPORT_ROWS[args.scale], args.seed)}
+        cases = []
+        for case in benchmark_cases(context):
+            if case.category not in categories:
+                continue
+            print(f"  {case.category}.{case.name} ...", flush=True)
+            measurement = run_case(case, context, args.repeat, args.warmup, options, args.case_timeout)
+            cases.append({'category': case.category, 'name': case.name, 'tool': case.tool, **measurement})
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    dataset.pop('path')
+    results = {
+        'version': RESULTS_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'scale': args.scale,
+        'repeat': args.repeat,
+        'warmup': args.warmup,
+        'server_options': options,
+        'environment': environment(),
+        'dataset': dataset,
+        'cases': cases,
+    }
+
+    baseline_path = Path(args.baseline or BENCHMARK_DIR / 'baselines' / f"{args.scale}.json")
+    comparison = []
+    if baseline_path.exists() and not args.save_baseline:
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('scale') != args.scale:
+            print(f"Baseline {baseline_path} is for scale {baseline.get('scale')}; not comparing")
+        else:
+            comparison = compare(results, baseline, args.threshold)
+            results['baseline'] = {'path': str(baseline_path), 'created': baseline.get('created'),
+                                   'threshold': args.threshold, 'cases': comparison}
+
+    print_report(results, comparison)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+
+    failed = [c for c in cases if 'error' in c]
+    regressions = [c for c in comparison if c['regression']]
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}: "
+              + ', '.join(f"{c['category']}.{c['name']}" for c in regressions))
+    if failed:
+        print(f"{len(failed)} case(s) failed")
+    return 1 if failed or (regressions and args.fail_on_regression) else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Benchmark the SQLite MCP Server tools on synthetic data')
+    parser.add_argument('--scale', choices=list(SCALES), default='small',
+                        help='Dataset size: small=10k, medium=1M, large=10M rows per table (default: small)')
+    parser.add_argument('--categories', default=None,
+                        help=f"Comma-separated categories to run (default: all of {','.join(CATEGORIES)})")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'Measured calls per case (default: {DEFAULT_REPEAT})')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP,
+                        help=f'Unmeasured calls before each case (default: {DEFAULT_WARMUP})')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help=f'Seed of the dataset generator (default: {DEFAULT_SEED})')
+    parser.add_argument('--data-dir', default=str(BENCHMARK_DIR / 'data'),
+                        help='Directory for generated datasets (default: benchmarks/data)')
+    parser.add_argument('--regenerate', action='store_true',
+                        help='Regenerate the dataset even if a matching one exists')
+    parser.add_argument('--output', default=None,
+                        help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', default=None,
+                        help='Baseline results to compare with (default: benchmarks/baselines/<scale>.json)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store this run as the baseline instead of comparing with it')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Relative slowdown counted as a regression (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with status 1 when any case regressed')
+    parser.add_argument('--case-timeout', type=float, default=DEFAULT_CASE_TIMEOUT,
+                        help=f'Seconds before a case is abandoned (default: {DEFAULT_CASE_TIMEOUT})')
+    # Internal: measure a single case in a worker subprocess
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    parser.add_argument('--context', help=argparse.SUPPRESS)
+    parser.add_argument('--options', help=argparse.SUPPRESS)
+    return add_server_arguments(parser)
+
+
+def main():
+    args = build_parser().parse_args()
+    if args.run_case:
+        # Server logs go to stderr so stdout carries only the measurement
+        logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+        run_case_worker(args)
+        return 0
+    logging.basicConfig(level=logging.INFO if args.scale != 'small' else logging.WARNING,
+                        format='%(asctime)s %(message)s')
+    return run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,5 @@
 from . import server
+from .cli import add_server_arguments, server_options
 import asyncio
 import argparse
 
@@ -9,8 +10,9 @@ def main():
     parser.add_argument('--db-path',
                         default="./sqlite_mcp_server.db",
                         help='Path to SQLite database file')
+    add_server_arguments(parser)
     args = parser.parse_args()
-    asyncio.run(server.main(args.db_path))
+    asyncio.run(server.main(args.db_path, **server_options(args)))
 
 
 # Optionally expose other important items at package level
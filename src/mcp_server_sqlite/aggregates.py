@@ -0,0 +1,367 @@
+"""
+SQL Aggregates Module for SQLite MCP Server
+
+This module defines the statistical aggregate functions the server
+registers on every pooled connection, so the statistics tools can compute
+in one table scan what would otherwise take several nested subqueries.
+
+moments(x) keeps running central moments with Welford's update, extended
+to the third and fourth moments (Terriberry), and returns a JSON object
+with count, mean, min, max, variance, skewness and kurtosis. Unlike the
+textbook SUM(x*x) - SUM(x)^2 formula it does not lose precision when the
+values are large relative to their spread. Partial states combine with
+Chan's parallel formula through merge().
+
+percentiles(x, spec, method) is an ordered-set aggregate: it collects the
+values, sorts them once and reads every requested percentile from the
+sorted list, so the cost does not grow with the number of percentiles.
+
+kll_sketch(x, k) builds a mergeable KLL quantile sketch in bounded memory,
+kll_merge(sketch) combines sketches, and kll_quantile(sketch, fraction)
+reads a quantile from one. hll_sketch(x, precision), hll_merge(sketch)
+and hll_count(sketch) do the same for HyperLogLog distinct counts.
+
+Doing the update arithmetic in Python for every row costs about four
+times the sqlite3 callback itself, so the aggregate collects values in
+chunks of CHUNK_SIZE, takes exact two-pass moments of each chunk with
+builtins and merges the chunk into the running state.
+"""
+
+import json
+import math
+from array import array
+
+from .sketches import HllSketch, KllSketch
+
+# Values an aggregate collects before folding them into its running state
+CHUNK_SIZE = 4096
+
+
+class Moments:
+    """Running count, mean, min, max and central moments of a sequence"""
+
+    __slots__ = ('count', 'mean', 'm2', 'm3', 'm4', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, x):
+        """Add one value"""
+        n1 = self.count
+        self.count = n = n1 + 1
+        delta = x - self.mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term1 = delta * delta_n * n1
+        self.mean += delta_n
+        self.m4 += term1 * delta_n2 * (n * n - 3 * n + 3) + 6 * delta_n2 * self.m2 - 4 * delta_n * self.m3
+        self.m3 += term1 * delta_n * (n - 2) - 3 * delta_n * self.m2
+        self.m2 += term1
+        if self.min is None or x < self.min:
+            self.min = x
+        if self.max is None or x > self.max:
+            self.max = x
+
+    def add_many(self, values):
+        """Add a list of values: exact two-pass moments of the list, merged in"""
+        if not values:
+            return
+        chunk = Moments()
+        chunk.count = len(values)
+        chunk.mean = mean = math.fsum(values) / chunk.count
+        deviations = [x - mean for x in values]
+        squares = [d * d for d in deviations]
+        chunk.m2 = math.fsum(squares)
+        chunk.m3 = math.fsum([d * q for d, q in zip(deviations, squares)])
+        chunk.m4 = math.fsum([q * q for q in squares])
+        chunk.min = min(values)
+        chunk.max = max(values)
+        self.merge(chunk)
+
+    def merge(self, other):
+        """Combine another Moments into this one, as if its values had been added here"""
+        if not other.count:
+            return
+        if not self.count:
+            for name in Moments.__slots__:
+                setattr(self, name, getattr(other, name))
+            return
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        delta2 = delta * delta
+        m2 = self.m2 + other.m2 + delta2 * na * nb / n
+        m3 = (self.m3 + other.m3 + delta * delta2 * na * nb * (na - nb) / (n * n)
+              + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+        m4 = (self.m4 + other.m4 + delta2 * delta2 * na * nb * (na * na - na * nb + nb * nb) / (n ** 3)
+              + 6 * delta2 * (na * na * other.m2 + nb * nb * self.m2) / (n * n)
+              + 4 * delta * (na * other.m3 - nb * self.m3) / n)
+        self.count = n
+        self.mean += delta * nb / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def summary(self):
+        """
+        Return the statistics as a dict, or None when no values were added.
+
+        variance is the population variance (divided by count) and
+        sample_variance divides by count - 1. kurtosis is the excess
+        kurtosis, 0 for a normal distribution. skewness and kurtosis are
+        None when all values are equal.
+        """
+        if not self.count:
+            return None
+        n = self.count
+        variance = self.m2 / n
+        shape_defined = self.m2 > 0
+        return {
+            'count': n,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'variance': variance,
+            'sample_variance': self.m2 / (n - 1) if n > 1 else None,
+            'std_dev': math.sqrt(variance),
+            'skewness': math.sqrt(n) * self.m3 / self.m2 ** 1.5 if shape_defined else None,
+            'kurtosis': n * self.m4 / (self.m2 * self.m2) - 3 if shape_defined else None,
+        }
+
+
+class MomentsAggregate(Moments):
+    """moments(x): SQLite aggregate over Moments; NULL and non-numeric values are skipped"""
+
+    __slots__ = ('chunk',)
+
+    def __init__(self):
+        super().__init__()
+        self.chunk = []
+
+    def step(self, value):
+        if isinstance(value, (int, float)):
+            self.chunk.append(float(value))
+            if len(self.chunk) >= CHUNK_SIZE:
+                self.add_many(self.chunk)
+                self.chunk = []
+
+    def finalize(self):
+        self.add_many(self.chunk)
+        summary = self.summary()
+        return json.dumps(summary) if summary is not None else None
+
+
+# Interpolation between the two closest ranks, named as in numpy.percentile
+PERCENTILE_METHODS = ('linear', 'lower', 'higher', 'nearest', 'midpoint')
+
+
+def percentile_values(ordered, percentiles, method='linear'):
+    """
+    Read percentiles from sorted values.
+
+    Args:
+        ordered (list): Values in ascending order
+        percentiles (list): Percentiles between 0 and 100
+        method (str): One of PERCENTILE_METHODS, for a percentile that
+            falls between two ranks
+
+    Returns:
+        list: The value of each percentile, or None for each when there
+            are no values
+    """
+    if method not in PERCENTILE_METHODS:
+        raise ValueError(f"Unknown percentile method '{method}' (choose from {', '.join(PERCENTILE_METHODS)})")
+    if not ordered:
+        return [None] * len(percentiles)
+    last = len(ordered) - 1
+    values = []
+    for p in percentiles:
+        if not 0 <= p <= 100:
+            raise ValueError(f"Percentile {p} is outside 0-100")
+        position = p / 100 * last
+        below = math.floor(position)
+        above = min(below + 1, last)
+        fraction = position - below
+        if method == 'lower' or fraction == 0:
+            value = ordered[below]
+        elif method == 'higher':
+            value = ordered[above]
+        elif method == 'nearest':
+            # Ties go to the even rank, as in numpy
+            value = ordered[round(position)]
+        elif method == 'midpoint':
+            value = (ordered[below] + ordered[above]) / 2
+        else:
+            value = ordered[below] + (ordered[above] - ordered[below]) * fraction
+        values.append(value)
+    return values
+
+
+class PercentilesAggregate:
+    """
+    percentiles(x, spec, method): the requested percentiles of x from one sort.
+
+    spec is a JSON array of percentiles (0-100) and method one of
+    PERCENTILE_METHODS. The result is a JSON object with the count and a
+    list of [percentile, value] pairs. NULL and non-numeric values are
+    skipped. The values are held as doubles until the group ends, 8 bytes
+    each.
+    """
+
+    __slots__ = ('values', 'spec', 'method')
+
+    def __init__(self):
+        self.values = array('d')
+        self.spec = None
+        self.method = None
+
+    def step(self, value, spec, method):
+        if self.spec is None:
+            self.spec, self.method = spec, method
+        if isinstance(value, (int, float)):
+            self.values.append(value)
+
+    def finalize(self):
+        if self.spec is None:
+            return None
+        percentiles = json.loads(self.spec)
+        values = percentile_values(sorted(self.values), percentiles, self.method)
+        return json.dumps({'count': len(self.values), 'method': self.method,
+                           'percentiles': [[p, v] for p, v in zip(percentiles, values)]})
+
+
+class KllSketchAggregate:
+    """kll_sketch(x, k): KLL sketch of x with capacity k, as JSON; NULL and non-numeric values are skipped"""
+
+    __slots__ = ('sketch', 'chunk')
+
+    def __init__(self):
+        self.sketch = None
+        self.chunk = []
+
+    def step(self, value, k):
+        if self.sketch is None:
+            self.sketch = KllSketch(int(k))
+        if isinstance(value, (int, float)):
+            self.chunk.append(float(value))
+            if len(self.chunk) >= CHUNK_SIZE:
+                self.sketch.update_many(self.chunk)
+                self.chunk = []
+
+    def finalize(self):
+        if self.sketch is None:
+            return None
+        self.sketch.update_many(self.chunk)
+        return self.sketch.to_json()
+
+
+class KllMergeAggregate:
+    """kll_merge(sketch): merge of the non-NULL KLL sketches in a group, as JSON"""
+
+    __slots__ = ('sketch',)
+
+    def __init__(self):
+        self.sketch = None
+
+    def step(self, text):
+        if text is None:
+            return
+        sketch = KllSketch.from_json(text)
+        if self.sketch is None:
+            self.sketch = sketch
+        else:
+            self.sketch.merge(sketch)
+
+    def finalize(self):
+        return self.sketch.to_json() if self.sketch is not None else None
+
+
+def kll_quantile(text, fraction):
+    """kll_quantile(sketch, fraction): approximate quantile of a KLL sketch"""
+    if text is None or fraction is None:
+        return None
+    return KllSketch.from_json(text).quantiles([fraction])[0]
+
+
+class HllSketchAggregate:
+    """hll_sketch(x, precision): HyperLogLog sketch of the distinct non-NULL values of x, as JSON"""
+
+    __slots__ = ('sketch', 'chunk')
+
+    def __init__(self):
+        self.sketch = None
+        self.chunk = []
+
+    def step(self, value, precision):
+        if self.sketch is None:
+            self.sketch = HllSketch(int(precision))
+        if value is not None:
+            self.chunk.append(value)
+            if len(self.chunk) >= CHUNK_SIZE:
+                self.sketch.update_many(self.chunk)
+                self.chunk = []
+
+    def finalize(self):
+        if self.sketch is None:
+            return None
+        self.sketch.update_many(self.chunk)
+        return self.sketch.to_json()
+
+
+class HllMergeAggregate:
+    """hll_merge(sketch): union of the non-NULL HyperLogLog sketches in a group, as JSON"""
+
+    __slots__ = ('sketch',)
+
+    def __init__(self):
+        self.sketch = None
+
+    def step(self, text):
+        if text is None:
+            return
+        sketch = HllSketch.from_json(text)
+        if self.sketch is None:
+            self.sketch = sketch
+        else:
+            self.sketch.merge(sketch)
+
+    def finalize(self):
+        return self.sketch.to_json() if self.sketch is not None else None
+
+
+def hll_count(text):
+    """hll_count(sketch): estimated distinct count of a HyperLogLog sketch"""
+    if text is None:
+        return None
+    return HllSketch.from_json(text).count()
+
+
+# SQL name -> (aggregate class, number of arguments)
+AGGREGATES = {
+    'moments': (MomentsAggregate, 1),
+    'percentiles': (PercentilesAggregate, 3),
+    'kll_sketch': (KllSketchAggregate, 2),
+    'kll_merge': (KllMergeAggregate, 1),
+    'hll_sketch': (HllSketchAggregate, 2),
+    'hll_merge': (HllMergeAggregate, 1),
+}
+
+# SQL name -> (scalar function, number of arguments)
+FUNCTIONS = {
+    'kll_quantile': (kll_quantile, 2),
+    'hll_count': (hll_count, 1),
+}
+
+
+def register_aggregates(conn):
+    """Register every aggregate in AGGREGATES and function in FUNCTIONS on a connection; a pool session step"""
+    for name, (aggregate, n_args) in AGGREGATES.items():
+        conn.create_aggregate(name, n_args, aggregate)
+    for name, (function, n_args) in FUNCTIONS.items():
+        conn.create_function(name, n_args, function, deterministic=True)
@@ -0,0 +1,122 @@
+"""Command-line options shared by the server entry points"""
+import argparse
+
+from .connection_pool import DEFAULT_POOL_SIZE, DEFAULT_CACHED_STATEMENTS
+from .executor import DEFAULT_WORKER_THREADS
+from .write_coalescer import DEFAULT_WRITE_WINDOW_MS, DEFAULT_WRITE_BATCH_MAX
+from .metrics_exporter import DEFAULT_EXPORT_INTERVAL
+from .query_stats import DEFAULT_SLOW_QUERY_MS
+from .deadlines import DEFAULT_STATEMENT_TIMEOUT, MAINTENANCE_TOOL_TIMEOUTS
+from .tool_catalog import CATEGORIES, parse_categories
+
+
+def _tool_timeout(value):
+    """Parse a TOOL=SECONDS option value"""
+    tool, sep, seconds = value.partition('=')
+    try:
+        if not sep or not tool.strip():
+            raise ValueError
+        return tool.strip(), float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected TOOL=SECONDS, got '{value}'")
+
+
+def _tool_categories(value):
+    """Parse a comma-separated list of tool categories"""
+    try:
+        return parse_categories(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def add_server_arguments(parser):
+    """Register the server tuning options on an argparse parser"""
+    parser.add_argument('--pool-size',
+                        type=int,
+                        default=DEFAULT_POOL_SIZE,
+                        help=f'Number of pooled reader connections (default: {DEFAULT_POOL_SIZE})')
+    parser.add_argument('--wal',
+                        action='store_true',
+                        help='Run the database in WAL journal mode so reads continue during writes')
+    parser.add_argument('--worker-threads',
+                        type=int,
+                        default=DEFAULT_WORKER_THREADS,
+                        help=f'Threads that run tool calls off the event loop (default: {DEFAULT_WORKER_THREADS})')
+    parser.add_argument('--process-workers',
+                        type=int,
+                        default=0,
+                        help='Processes for CPU-heavy text scoring such as fuzzy_match (default: 0, disabled)')
+    parser.add_argument('--statement-cache-size',
+                        type=int,
+                        default=DEFAULT_CACHED_STATEMENTS,
+                        help=f'Prepared statements cached per pooled connection (default: {DEFAULT_CACHED_STATEMENTS})')
+    parser.add_argument('--write-window-ms',
+                        type=float,
+                        default=DEFAULT_WRITE_WINDOW_MS,
+                        help=f'Milliseconds to collect concurrent writes into one commit (default: {DEFAULT_WRITE_WINDOW_MS})')
+    parser.add_argument('--write-batch-max',
+                        type=int,
+                        default=DEFAULT_WRITE_BATCH_MAX,
+                        help=f'Maximum writes committed together; 1 commits every write separately (default: {DEFAULT_WRITE_BATCH_MAX})')
+    parser.add_argument('--result-cache-mb',
+                        type=float,
+                        default=0,
+                        help='Memory budget in MB for caching read query results (default: 0, disabled)')
+    parser.add_argument('--slow-query-ms',
+                        type=float,
+                        default=DEFAULT_SLOW_QUERY_MS,
+                        help=f'Statements at least this slow are logged and counted as slow (default: {DEFAULT_SLOW_QUERY_MS})')
+    parser.add_argument('--statement-timeout',
+                        type=float,
+                        default=DEFAULT_STATEMENT_TIMEOUT,
+                        help=f'Seconds a tool call\'s SQL may run before it is interrupted; 0 disables. '
+                             f'Maintenance tools ({", ".join(MAINTENANCE_TOOL_TIMEOUTS)}) are exempt '
+                             f'unless given a --tool-timeout (default: {DEFAULT_STATEMENT_TIMEOUT})')
+    parser.add_argument('--tool-timeout',
+                        action='append',
+                        type=_tool_timeout,
+                        default=[],
+                        metavar='TOOL=SECONDS',
+                        help='Override the statement timeout for one tool, e.g. read_query=10 (repeatable)')
+    parser.add_argument('--metrics-file',
+                        default=None,
+                        help='Write OpenMetrics text to this file periodically (default: disabled)')
+    parser.add_argument('--metrics-port',
+                        type=int,
+                        default=None,
+                        help='Serve OpenMetrics text on this local port at /metrics (default: disabled)')
+    parser.add_argument('--metrics-interval',
+                        type=float,
+                        default=DEFAULT_EXPORT_INTERVAL,
+                        help=f'Seconds between metrics file updates (default: {DEFAULT_EXPORT_INTERVAL})')
+    parser.add_argument('--tool-categories',
+                        type=_tool_categories,
+                        default=None,
+                        metavar='CATEGORY,...',
+                        help=f'Only offer tools in these categories: {", ".join(CATEGORIES)} (default: all)')
+    parser.add_argument('--profile-startup',
+                        action='store_true',
+                        help='Print how long each startup step took to stderr once the server is ready')
+    return parser
+
+
+def server_options(args):
+    """Collect the parsed tuning options as keyword arguments for server.main()"""
+    return {
+        'pool_size': args.pool_size,
+        'wal': args.wal,
+        'worker_threads': args.worker_threads,
+        'process_workers': args.process_workers,
+        'cached_statements': args.statement_cache_size,
+        'write_window_ms': args.write_window_ms,
+        'write_batch_max': args.write_batch_max,
+        'result_cache_mb': args.result_cache_mb,
+        'slow_query_ms': args.slow_query_ms,
+        'statement_timeout': args.statement_timeout,
+        'tool_timeouts': dict(args.tool_timeout),
+        'metrics_file': args.metrics_file,
+        'metrics_port': args.metrics_port,
+        'metrics_interval': args.metrics_interval,
+        'tool_categories': args.tool_categories,
+        'profile_startup': args.profile_startup,
+    }
@@ -0,0 +1,504 @@
+"""
+Connection Pool Module for SQLite MCP Server
+
+This module keeps a set of persistent SQLite connections open for the
+lifetime of the server: several reader connections that serve SELECT and
+PRAGMA lookups concurrently, and one dedicated writer connection that
+serializes every write.
+"""
+
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_POOL_TIMEOUT = 30.0
+HEALTH_CHECK_INTERVAL = 30.0
+DEFAULT_CACHED_STATEMENTS = 128
+# SQLite VM instructions between progress callbacks on pooled connections
+PROGRESS_INTERVAL = 1000
+
+# PRAGMA assignments that change the database file rather than the
+# connection, so they only need to run once on the writer
+PERSISTENT_PRAGMAS = {'user_version', 'application_id', 'journal_mode', 'page_size', 'auto_vacuum'}
+
+CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+_PRAGMA_ASSIGNMENT = re.compile(r"^\s*PRAGMA\s+(?:\w+\.)?(\w+)\s*=", re.IGNORECASE)
+
+
+def pragma_assignment_name(query):
+    """Return the pragma name if the query is a `PRAGMA name = value` statement"""
+    match = _PRAGMA_ASSIGNMENT.match(query)
+    return match.group(1).lower() if match else None
+
+
+class ConnectionPool:
+    """Pool of persistent SQLite connections: several readers and one writer"""
+
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT, wal=False,
+                 cached_statements=DEFAULT_CACHED_STATEMENTS):
+        """
+        Create the pool and open all of its connections up front.
+
+        Args:
+            db_path (str): Path to the SQLite database (or :memory:)
+            size (int): Number of reader connections
+            timeout (float): Seconds to wait for a free connection or a lock
+            wal (bool): Switch the database to WAL journal mode so readers
+                keep running while the writer commits
+            cached_statements (int): Size of each connection's prepared
+                statement cache
+        """
+        self.db_path = db_path
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.cached_statements = max(0, int(cached_statements))
+        # Every plain :memory: connection is a separate database, so an
+        # in-memory pool shares its single writer connection for reads too
+        self.shared_connection = db_path == ":memory:"
+
+        self._readers = queue.LifoQueue()
+        self._writer_lock = threading.RLock()
+        self._lock = threading.Lock()
+        self._info = {}
+        self._statement_caches = {}
+        self._session_steps = []
+        # Latest `PRAGMA name = value` per pragma, replayed on every connection
+        self._session_pragmas = {}
+        self._session_pragmas_version = 0
+        self._progress_observers = []
+        self.wait_observer = None
+        self._closed = False
+        # Bumped each time the writer is released so caches can tell that
+        # this process may have changed the database
+        self.write_generation = 0
+        self._stats = {
+            'reader_checkouts': 0,
+            'writer_checkouts': 0,
+            'wait_time_ms': 0.0,
+            'replaced_connections': 0,
+            'statement_cache_hits': 0,
+            'statement_cache_misses': 0,
+        }
+
+        self._writer = self._create_connection('writer')
+        self.journal_mode = self._writer.execute("PRAGMA journal_mode").fetchone()[0].lower()
+        if wal:
+            self.journal_mode = self._enable_wal()
+        if not self.shared_connection:
+            for _ in range(self.size):
+                self._readers.put(self._create_connection('reader'))
+
+        logger.info(
+            f"Connection pool ready: {0 if self.shared_connection else self.size} readers, "
+            f"1 writer, journal_mode={self.journal_mode}"
+        )
+
+    def _enable_wal(self):
+        """Put the database in WAL mode; the setting is stored in the database file"""
+        mode = self._writer.execute("PRAGMA journal_mode = WAL").fetchone()[0].lower()
+        if mode != 'wal':
+            logger.warning(f"WAL mode requested but database reported journal_mode={mode}")
+        return mode
+
+    def _create_connection(self, role):
+        """Open and configure a new pooled connection"""
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        self._info[id(conn)] = {
+            'role': role,
+            'created_at': time.time(),
+            'last_used': time.monotonic(),
+            'session_steps': 0,
+            'session_pragmas_version': 0,
+        }
+        self._statement_caches[id(conn)] = OrderedDict()
+        self._apply_session_steps(conn)
+        return conn
+
+    def _apply_session_steps(self, conn):
+        """Run any session steps and pragma changes this connection has not seen yet"""
+        info = self._info[id(conn)]
+        steps = self._session_steps
+        for step in steps[info['session_steps']:]:
+            state = step(conn)
+            if isinstance(state, dict):
+                info.update(state)
+        info['session_steps'] = len(steps)
+        version = self._session_pragmas_version
+        if info['session_pragmas_version'] != version:
+            for query in list(self._session_pragmas.values()):
+                conn.execute(query)
+            info['session_pragmas_version'] = version
+
+    def _is_healthy(self, conn):
+        """Run a trivial statement to confirm the connection still works"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"Pooled connection failed health check: {e}")
+            return False
+
+    def _replace(self, conn):
+        """Close a broken connection and open a fresh one in its place"""
+        role = self._info.get(id(conn), {}).get('role', 'reader')
+        self._discard(conn)
+        with self._lock:
+            self._stats['replaced_connections'] += 1
+        return self._create_connection(role)
+
+    def _reopen_reader(self, conn):
+        """
+        Replace a broken reader, keeping its slot even if that fails.
+
+        Returns:
+            sqlite3.Connection: A fresh connection, or None as a marker that
+                reader() reopens on its next checkout
+        """
+        try:
+            return self._replace(conn) if conn is not None else self._create_connection('reader')
+        except Exception as e:
+            logger.warning(f"Could not reopen a pooled reader, retrying on next checkout: {e}")
+            return None
+
+    def _discard(self, conn):
+        self._info.pop(id(conn), None)
+        self._statement_caches.pop(id(conn), None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _prepare(self, conn):
+        """Health-check an idle connection and bring its session setup up to date"""
+        if time.monotonic() - self._info[id(conn)]['last_used'] > HEALTH_CHECK_INTERVAL:
+            if not self._is_healthy(conn):
+                conn = self._replace(conn)
+        self._apply_session_steps(conn)
+        return conn
+
+    def _release(self, conn):
+        """
+        Leave a connection clean before it goes back to the pool.
+
+        Returns:
+            sqlite3.Connection: The connection, or a replacement if it broke
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.warning(f"Pooled connection unusable on release, replacing it: {e}")
+            return self._replace(conn)
+        self._info[id(conn)]['last_used'] = time.monotonic()
+        return conn
+
+    def _record_wait(self, key, started):
+        waited = time.monotonic() - started
+        with self._lock:
+            self._stats[key] += 1
+            self._stats['wait_time_ms'] += waited * 1000
+        if self.wait_observer is not None:
+            self.wait_observer(waited)
+
+    @contextmanager
+    def reader(self):
+        """Check out a reader connection for the duration of the block"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        if self.shared_connection:
+            with self.writer() as conn:
+                yield conn
+            return
+
+        started = time.monotonic()
+        try:
+            conn = self._readers.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Timed out after {self.timeout}s waiting for a pooled connection")
+        self._record_wait('reader_checkouts', started)
+
+        try:
+            conn = self._prepare(conn) if conn is not None else self._create_connection('reader')
+        except Exception:
+            self._readers.put(self._reopen_reader(conn))
+            raise
+        try:
+            yield conn
+        finally:
+            try:
+                conn = self._release(conn)
+            except Exception:
+                # _release discarded the broken connection before failing to reopen it
+                conn = self._reopen_reader(None)
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Hold the single writer connection for the duration of the block"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        started = time.monotonic()
+        if not self._writer_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Timed out after {self.timeout}s waiting for the writer connection")
+        try:
+            self._record_wait('writer_checkouts', started)
+            self._writer = self._prepare(self._writer)
+            try:
+                yield self._writer
+            finally:
+                self._writer = self._release(self._writer)
+                self.write_generation += 1
+        finally:
+            self._writer_lock.release()
+
+    def connection_for(self, query):
+        """Pick the writer for write statements and a reader for everything else"""
+        if query.strip().upper().startswith(("SELECT", "PRAGMA", "WITH", "EXPLAIN", "VALUES")):
+            return self.reader()
+        return self.writer()
+
+    def record_statement(self, conn, sql):
+        """
+        Count a statement against the connection's prepared statement cache.
+
+        sqlite3 keeps an LRU cache of prepared statements keyed by SQL text
+        but does not report its hits, so the pool mirrors that cache per
+        connection. Callers record each statement just before executing it.
+
+        Args:
+            conn (sqlite3.Connection): Pooled connection about to run sql
+            sql (str): Statement text exactly as passed to execute()
+
+        Returns:
+            bool: True if the statement was already prepared
+        """
+        with self._lock:
+            cache = self._statement_caches.get(id(conn))
+            hit = cache is not None and sql in cache
+            if hit:
+                cache.move_to_end(sql)
+                self._stats['statement_cache_hits'] += 1
+            else:
+                self._stats['statement_cache_misses'] += 1
+                if cache is not None and self.cached_statements:
+                    cache[sql] = True
+                    if len(cache) > self.cached_statements:
+                        cache.popitem(last=False)
+        return hit
+
+    def open_dedicated(self, role='cursor'):
+        """
+        Open a connection outside the reader queue for long-lived work,
+        such as a result cursor that spans several tool calls.
+
+        The connection gets the same setup and session steps as pooled ones
+        and is listed in connection_info() until close_dedicated() is called.
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        if self.shared_connection:
+            raise ValueError("In-memory databases cannot open dedicated connections")
+        return self._create_connection(role)
+
+    def close_dedicated(self, conn):
+        """Close a connection returned by open_dedicated()"""
+        self._discard(conn)
+
+    def add_session_step(self, step):
+        """
+        Register setup that every pooled connection must run once.
+
+        The step runs on new connections as they are opened and on existing
+        ones the next time they are checked out, so it never runs per query.
+        If it returns a dict, the entries are recorded as that connection's
+        state in connection_info().
+
+        Args:
+            step: Callable taking a sqlite3.Connection
+        """
+        self._session_steps.append(step)
+
+    def add_progress_observer(self, observer):
+        """
+        Call an observer every PROGRESS_INTERVAL VM instructions on every
+        pooled connection while a statement runs.
+
+        SQLite allows one progress handler per connection, so the pool
+        installs a single handler (as a session step) that fans out to all
+        observers. An observer that returns True interrupts the statement.
+
+        Args:
+            observer: Callable taking no arguments
+        """
+        install = not self._progress_observers
+        self._progress_observers.append(observer)
+        if install:
+            self.add_session_step(self._install_progress_handler)
+
+    def _install_progress_handler(self, conn):
+        conn.set_progress_handler(self._on_progress, PROGRESS_INTERVAL)
+
+    def _on_progress(self):
+        for observer in self._progress_observers:
+            if observer():
+                return 1
+        return 0
+
+    def set_pragma(self, query):
+        """
+        Apply a `PRAGMA name = value` statement to the whole pool.
+
+        Per-connection pragmas are replayed on every pooled connection the
+        next time it is checked out, so the setting behaves like a server-wide
+        session option instead of sticking to whichever connection ran it.
+        Only the latest value of each pragma is kept and replayed.
+
+        Returns:
+            list: Rows returned by the pragma on the writer connection
+        """
+        name = pragma_assignment_name(query)
+        with self.writer() as conn:
+            rows = [dict(row) for row in conn.execute(query).fetchall()]
+            if name == 'journal_mode' and rows:
+                self.journal_mode = str(list(rows[0].values())[0]).lower()
+            if name not in PERSISTENT_PRAGMAS:
+                with self._lock:
+                    self._session_pragmas[name or query] = query
+                    self._session_pragmas_version += 1
+                self._info[id(conn)]['session_pragmas_version'] = self._session_pragmas_version
+        return rows
+
+    def wal_size_bytes(self):
+        """Return the size of the -wal file, or 0 when there is none"""
+        if self.shared_connection:
+            return 0
+        try:
+            return os.path.getsize(f"{self.db_path}-wal")
+        except OSError:
+            return 0
+
+    def checkpoint(self, mode='PASSIVE'):
+        """
+        Run a WAL checkpoint on the writer connection.
+
+        PASSIVE copies as many frames as possible without waiting on readers,
+        FULL waits for readers to finish and then copies every frame, RESTART
+        additionally makes the next writer start at the beginning of the WAL,
+        and TRUNCATE also truncates the WAL file to zero bytes.
+
+        Args:
+            mode (str): One of PASSIVE, FULL, RESTART or TRUNCATE
+
+        Returns:
+            dict: Checkpoint outcome with WAL sizes before and after
+        """
+        mode = mode.upper()
+        if mode not in CHECKPOINT_MODES:
+            raise ValueError(f"Invalid checkpoint mode: {mode}. Use one of {', '.join(CHECKPOINT_MODES)}")
+        size_before = self.wal_size_bytes()
+        with self.writer() as conn:
+            busy, log_frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        return {
+            'mode': mode,
+            'journal_mode': self.journal_mode,
+            'busy': bool(busy),
+            'wal_frames': log_frames,
+            'checkpointed_frames': checkpointed,
+            'wal_size_before_bytes': size_before,
+            'wal_size_after_bytes': self.wal_size_bytes(),
+        }
+
+    def health_check(self):
+        """
+        Check every idle connection and replace any that fail.
+
+        Returns:
+            dict: Number of connections checked and replaced
+        """
+        checked = replaced = 0
+        idle = []
+        while True:
+            try:
+                idle.append(self._readers.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            for i, conn in enumerate(idle):
+                checked += 1
+                if conn is None or not self._is_healthy(conn):
+                    idle[i] = self._reopen_reader(conn)
+                    replaced += 1
+        finally:
+            for conn in idle:
+                self._readers.put(conn)
+
+        with self.writer() as conn:
+            checked += 1
+            if not self._is_healthy(conn):
+                self._writer = self._replace(conn)
+                replaced += 1
+        return {'checked': checked, 'replaced': replaced}
+
+    def connection_info(self):
+        """
+        Describe every pooled connection and its per-connection state.
+
+        Returns:
+            list: One dict per connection (role, age, idle time, state)
+        """
+        now = time.monotonic()
+        described = []
+        for info in list(self._info.values()):
+            entry = {k: v for k, v in info.items() if k not in ('last_used', 'created_at')}
+            entry['age_seconds'] = round(time.time() - info['created_at'], 1)
+            entry['idle_seconds'] = round(now - info['last_used'], 1)
+            entry['session_steps_pending'] = len(self._session_steps) - info['session_steps']
+            entry['session_pragmas_pending'] = info['session_pragmas_version'] != self._session_pragmas_version
+            described.append(entry)
+        return sorted(described, key=lambda entry: entry['role'] != 'writer')
+
+    def stats(self):
+        """Return pool usage counters"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            'readers': 0 if self.shared_connection else self.size,
+            'idle_readers': self._readers.qsize(),
+            'writers': 1,
+            'shared_connection': self.shared_connection,
+            'journal_mode': self.journal_mode,
+            'wait_time_ms': round(stats['wait_time_ms'], 3),
+            'statement_cache_size': self.cached_statements,
+        })
+        lookups = stats['statement_cache_hits'] + stats['statement_cache_misses']
+        stats['statement_cache_hit_rate'] = round(stats['statement_cache_hits'] / lookups, 4) if lookups else None
+        return stats
+
+    def close(self):
+        """Close every pooled connection"""
+        if self._closed:
+            return
+        self._closed = True
+        while True:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                break
+            if conn is not None:
+                self._discard(conn)
+        with self._writer_lock:
+            self._discard(self._writer)
+        logger.info("Connection pool closed")
@@ -0,0 +1,278 @@
+"""
+Correlation Module for SQLite MCP Server
+
+This module computes a correlation matrix over many columns from one
+streaming pass, instead of one table scan per pair of columns. For every
+pair it accumulates the sufficient statistics of the rows where both
+values are present (pairwise-complete): the count, the sums, the sums of
+squares and the cross-products. Pearson's r follows from them for every
+pair at the end. Spearman's rho is Pearson's r of the ranks, which are
+only known once every value has been seen, so the values are kept and
+ranked after the pass.
+
+Values are shifted by a reference value per column (its first value, or
+the mean of the first chunk) before they are summed, so the textbook
+sum-of-squares formulas do not lose precision when the values are large
+relative to their spread.
+
+Rows are processed in chunks. When NumPy is installed a chunk is reduced
+with a few matrix products; otherwise a pure Python loop over the present
+pairs of each row gives the same statistics. NumPy is imported on first
+use, not at server start.
+"""
+
+import math
+from array import array
+
+# Rows fetched and reduced at a time
+CHUNK_ROWS = 4096
+
+_numpy = None
+
+
+def load_numpy():
+    """Return the numpy module, or None when it is not installed"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+class CorrelationAccumulator:
+    """
+    Pairwise-complete sums, sums of squares and cross-products of k columns.
+
+    Statistics are kept as flat k*k lists indexed i*k + j: count and cross
+    are symmetric, while sums[i*k + j] and squares[i*k + j] hold the sum
+    and sum of squares of column i over the rows where column j is present.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.rows = 0
+        self.shifts = [None] * k
+        size = k * k
+        self.counts = [0] * size
+        self.sums = [0.0] * size
+        self.squares = [0.0] * size
+        self.cross = [0.0] * size
+
+    def add_rows(self, rows):
+        """Add rows of k numbers or None, in pure Python"""
+        k = self.k
+        shifts = self.shifts
+        counts, sums, squares, cross = self.counts, self.sums, self.squares, self.cross
+        for row in rows:
+            present = []
+            for i, value in enumerate(row):
+                if value is not None:
+                    if shifts[i] is None:
+                        shifts[i] = value
+                    present.append((i, value - shifts[i]))
+            for a, (i, x) in enumerate(present):
+                row_base = i * k
+                for j, y in present[a:]:
+                    ij = row_base + j
+                    ji = j * k + i
+                    counts[ij] += 1
+                    cross[ij] += x * y
+                    sums[ij] += x
+                    squares[ij] += x * x
+                    if ij != ji:
+                        counts[ji] += 1
+                        cross[ji] += x * y
+                        sums[ji] += y
+                        squares[ji] += y * y
+        self.rows += len(rows)
+
+    def add_array(self, values):
+        """Add a NumPy array of shape (rows, k) with NaN for missing values"""
+        np = load_numpy()
+        present = ~np.isnan(values)
+        for i in range(self.k):
+            if self.shifts[i] is None and present[:, i].any():
+                self.shifts[i] = float(values[present[:, i], i].mean())
+        shifts = np.array([s if s is not None else 0.0 for s in self.shifts])
+        centered = np.where(present, values - shifts, 0.0)
+        weights = present.astype(float)
+        for name, update in (('counts', weights.T @ weights),
+                             ('sums', centered.T @ weights),
+                             ('squares', (centered * centered).T @ weights),
+                             ('cross', centered.T @ centered)):
+            totals = getattr(self, name)
+            for index, value in enumerate(update.ravel().tolist()):
+                totals[index] += value
+        self.rows += len(values)
+
+    def pearson(self, i, j):
+        """Pearson's r of columns i and j over their complete rows, or None when undefined"""
+        k = self.k
+        n = self.counts[i * k + j]
+        if n < 2:
+            return None
+        sx, sy = self.sums[i * k + j], self.sums[j * k + i]
+        sxx, syy = self.squares[i * k + j], self.squares[j * k + i]
+        covariance = self.cross[i * k + j] - sx * sy / n
+        variance_x = sxx - sx * sx / n
+        variance_y = syy - sy * sy / n
+        if variance_x <= 0 or variance_y <= 0:
+            return None
+        return max(-1.0, min(1.0, covariance / math.sqrt(variance_x * variance_y)))
+
+    def matrix(self):
+        """Return the k x k matrix of Pearson's r, None where undefined"""
+        return [[self.pearson(i, j) for j in range(self.k)] for i in range(self.k)]
+
+    def count_matrix(self):
+        """Return the k x k matrix of pairwise-complete row counts"""
+        return [[int(self.counts[i * self.k + j]) for j in range(self.k)] for i in range(self.k)]
+
+
+def _average_ranks(values):
+    """Ranks from 1, tied values sharing the average of their ranks"""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    start = 0
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        for position in range(start, end + 1):
+            ranks[order[position]] = (start + end) / 2 + 1
+        start = end + 1
+    return ranks
+
+
+def _pearson(xs, ys):
+    """Pearson's r of two equally long lists, or None when undefined"""
+    n = len(xs)
+    if n < 2:
+        return None
+    mean_x, mean_y = math.fsum(xs) / n, math.fsum(ys) / n
+    dx = [x - mean_x for x in xs]
+    dy = [y - mean_y for y in ys]
+    denominator = math.sqrt(math.fsum(d * d for d in dx) * math.fsum(d * d for d in dy))
+    if denominator == 0:
+        return None
+    return max(-1.0, min(1.0, math.fsum(a * b for a, b in zip(dx, dy)) / denominator))
+
+
+def _average_ranks_numpy(np, values):
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    starts = np.cumsum(counts) - counts
+    return (starts + (counts + 1) / 2)[inverse]
+
+
+def _pearson_numpy(np, xs, ys):
+    if len(xs) < 2:
+        return None
+    dx, dy = xs - xs.mean(), ys - ys.mean()
+    denominator = math.sqrt(float(dx @ dx) * float(dy @ dy))
+    if denominator == 0:
+        return None
+    return max(-1.0, min(1.0, float(dx @ dy) / denominator))
+
+
+def _spearman_matrix(k, complete, column, pair, rank, pearson):
+    """
+    Spearman's rho of every pair: Pearson's r of the pair's ranks.
+
+    A column without missing values is ranked once and reused; a pair
+    involving one with missing values is ranked over its complete rows.
+    """
+    ranked = {}
+    matrix = [[None] * k for _ in range(k)]
+    for i in range(k):
+        for j in range(i, k):
+            if complete[i] and complete[j]:
+                for index in (i, j):
+                    if index not in ranked:
+                        ranked[index] = rank(column(index))
+                x, y = ranked[i], ranked[j]
+            else:
+                xs, ys = pair(i, j)
+                x, y = rank(xs), rank(ys)
+            matrix[i][j] = matrix[j][i] = pearson(x, y)
+    return matrix
+
+
+def correlation_matrix(conn, table_name, columns, where_clause='', spearman=True, use_numpy=True):
+    """
+    Compute Pearson (and Spearman) correlation matrices in one pass over a table.
+
+    Only integer and real values take part; NULL, text and blobs count as
+    missing. Each pair is computed over the rows where both of its
+    columns have a value. Pearson's r is accumulated as the rows stream
+    by. Spearman's rho needs every value's rank, so the values of the
+    columns are also kept, 8 bytes each, and ranked after the pass; ties
+    take their average rank.
+
+    Args:
+        conn (sqlite3.Connection): Connection to read from
+        table_name (str): Table to scan
+        columns (list): Column names, at least two
+        where_clause (str): Optional filter
+        spearman (bool): Also compute Spearman's rho
+        use_numpy (bool): Reduce chunks with NumPy when it is installed
+
+    Returns:
+        dict: rows scanned, 'numpy' or 'python' engine, the 'pearson' and
+            'spearman' (or None) matrices and the pairwise 'counts'
+    """
+    k = len(columns)
+    numeric = [f"CASE WHEN typeof({column}) IN ('integer', 'real') THEN {column} END"
+               for column in columns]
+    query = (f"SELECT {', '.join(numeric)} FROM {table_name}"
+             f"{f' WHERE {where_clause}' if where_clause else ''}")
+
+    np = load_numpy() if use_numpy else None
+    accumulator = CorrelationAccumulator(k)
+    kept = [] if np is not None else [array('d') for _ in range(k)]
+    cursor = conn.execute(query)
+    while True:
+        rows = cursor.fetchmany(CHUNK_ROWS)
+        if not rows:
+            break
+        if np is not None:
+            # None becomes NaN in a float array
+            chunk = np.array([tuple(row) for row in rows], dtype=float).reshape(len(rows), k)
+            accumulator.add_array(chunk)
+            if spearman:
+                kept.append(chunk)
+        else:
+            rows = [tuple(row) for row in rows]
+            accumulator.add_rows(rows)
+            if spearman:
+                for i, values in enumerate(kept):
+                    values.extend(math.nan if row[i] is None else row[i] for row in rows)
+
+    spearman_matrix = None
+    if spearman and np is not None:
+        data = np.concatenate(kept) if kept else np.empty((0, k))
+        present = ~np.isnan(data)
+        spearman_matrix = _spearman_matrix(
+            k, present.all(axis=0).tolist(),
+            lambda i: data[:, i],
+            lambda i, j: (data[present[:, i] & present[:, j], i], data[present[:, i] & present[:, j], j]),
+            lambda values: _average_ranks_numpy(np, values),
+            lambda xs, ys: _pearson_numpy(np, xs, ys))
+    elif spearman:
+        complete = [not any(math.isnan(value) for value in values) for values in kept]
+        spearman_matrix = _spearman_matrix(
+            k, complete,
+            lambda i: kept[i],
+            lambda i, j: tuple(map(list, zip(*[(x, y) for x, y in zip(kept[i], kept[j])
+                                               if not (math.isnan(x) or math.isnan(y))]))) or ([], []),
+            _average_ranks, _pearson)
+
+    return {
+        'rows': accumulator.rows,
+        'engine': 'numpy' if np is not None else 'python',
+        'pearson': accumulator.matrix(),
+        'spearman': spearman_matrix,
+        'counts': accumulator.count_matrix(),
+    }
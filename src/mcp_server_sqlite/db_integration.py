@@ -6,6 +6,7 @@ main database class, providing a consistent interface for safe operations.
 """
 
 import logging
+import time
 from .transaction_safety import safe_execute_query
 
 logger = logging.getLogger('mcp_sqlite_server')
@@ -13,6 +14,15 @@ logger = logging.getLogger('mcp_sqlite_server')
 
 class DatabaseIntegration:
     """Integration class for enhanced database operations"""
+    @staticmethod
+    def result_rows(results):
+        """Return the rows a statement returned or affected"""
+        if not isinstance(results, list):
+            return 0
+        if len(results) == 1 and isinstance(results[0], dict) and 'affected_rows' in results[0]:
+            return max(0, results[0]['affected_rows'] or 0)
+        return len(results)
+
     @staticmethod
     def enhance_database(db_instance):
         """
@@ -21,10 +31,13 @@ class DatabaseIntegration:
             db_instance: The EnhancedSqliteDatabase instance to enhance
         Returns:
             Enhanced database instance"""
+        # Wrapping twice would run and record every statement through two layers
+        if getattr(db_instance, 'transaction_safety_enabled', False):
+            return db_instance
         # Store the original _execute_query method
         original_execute_query = db_instance._execute_query
         # Define a new execute query method that uses transaction safety
-        def safe_execute_query_wrapper(query, params=None):
+        def dispatch_query(query, params=None):
             """
             Wrapper that adds transaction safety to database operations.
             For write operations, this uses explicit transactions with proper rollback.
@@ -38,8 +51,26 @@ class DatabaseIntegration:
             # Use the original method for read operations and non-transactional operations
             if query.strip().upper().startswith(("SELECT", "PRAGMA")):
                 return original_execute_query(query, params)
+            # Concurrent INSERT/UPDATE/DELETE calls share one group-commit transaction
+            coalescer = getattr(db_instance, 'write_coalescer', None)
+            if coalescer is not None and coalescer.accepts(query):
+                return coalescer.submit(query, params)
             # For write operations (INSERT, UPDATE, DELETE, etc.), use transaction safety
-            return safe_execute_query(db_instance.db_path, query, params)
+            return safe_execute_query(db_instance.db_path, query, params,
+                                      pool=getattr(db_instance, 'pool', None))
+        def safe_execute_query_wrapper(query, params=None):
+            """Run a statement and add its timing to the per-fingerprint query statistics"""
+            query_stats = getattr(db_instance, 'query_stats', None)
+            if query_stats is None:
+                return dispatch_query(query, params)
+            started = time.perf_counter()
+            results = None
+            try:
+                results = dispatch_query(query, params)
+                return results
+            finally:
+                query_stats.record(query, (time.perf_counter() - started) * 1000,
+                                   rows=DatabaseIntegration.result_rows(results), error=results is None)
         # Replace the execute query method
         db_instance._execute_query = safe_execute_query_wrapper
         # Add a flag indicating transaction safety is enabled
@@ -0,0 +1,163 @@
+"""
+Statement Deadlines Module for SQLite MCP Server
+
+This module stops runaway SQL. Every tool call runs under a deadline, the
+global statement timeout or a per-tool override. The connection pool's
+progress handler checks the deadline of the calling thread every
+PROGRESS_INTERVAL VM instructions and interrupts the running statement once
+it has passed or once the client cancelled the request. SQLite then fails
+the statement with "interrupted", and the pool rolls back and reuses the
+connection as usual. Work handed to another thread, such as a coalesced
+write, carries the caller's Deadline along and runs under it there.
+Connections a tool opens outside the pool, such as the index advisor's
+in-memory copy, are put under the same checks with watch() and
+backup_progress().
+
+Only work inside the SQLite VM can be interrupted; Python-side processing
+in a tool keeps running until it next executes a statement.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from .connection_pool import PROGRESS_INTERVAL
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_STATEMENT_TIMEOUT = 60.0
+
+# Maintenance tools legitimately run for as long as the database is large,
+# so they run without a timeout unless one is configured for them by name
+MAINTENANCE_TOOL_TIMEOUTS = {
+    'vacuum_database': 0,
+    'analyze_database': 0,
+    'integrity_check': 0,
+    'wal_checkpoint': 0,
+    'rebuild_fts_index': 0,
+    'rebuild_vector_index': 0,
+    'backup_database': 0,
+    'restore_database': 0,
+    'verify_backup': 0,
+}
+
+
+class Deadline:
+    """Deadline and cancellation state of one tool call"""
+
+    def __init__(self, tool, timeout, cancel_event=None):
+        self.tool = tool
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout if timeout else None
+        self.cancel_event = cancel_event
+        self.reason = None
+
+    def expired(self):
+        """Return True once the call should stop, remembering why"""
+        if self.reason is None:
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                self.reason = 'cancelled'
+            elif self.expires_at is not None and time.monotonic() >= self.expires_at:
+                self.reason = 'timeout'
+        return self.reason is not None
+
+    def message(self):
+        if self.reason == 'cancelled':
+            return f"Statement interrupted: the client cancelled the {self.tool} request"
+        return (f"Statement interrupted: {self.tool} exceeded its {self.timeout:g}s timeout. "
+                f"Narrow the query (add WHERE conditions or LIMIT) or raise the timeout")
+
+
+class StatementDeadlines:
+    """Per-tool statement timeouts and client cancellation"""
+
+    def __init__(self, pool, timeout=DEFAULT_STATEMENT_TIMEOUT, tool_timeouts=None):
+        """
+        Args:
+            pool (ConnectionPool): Pool whose statements are interrupted
+            timeout (float): Seconds a tool call may spend; 0 disables it
+            tool_timeouts (dict, optional): Per-tool overrides in seconds,
+                on top of MAINTENANCE_TOOL_TIMEOUTS
+        """
+        self.timeout = max(0.0, float(timeout or 0))
+        self.tool_timeouts = {**MAINTENANCE_TOOL_TIMEOUTS, **(tool_timeouts or {})}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {'timeouts': 0, 'cancellations': 0}
+        pool.add_progress_observer(self._check)
+
+    def timeout_for(self, tool):
+        """Return the timeout in seconds that applies to a tool (0 = none)"""
+        return max(0.0, float(self.tool_timeouts.get(tool, self.timeout)))
+
+    @contextmanager
+    def deadline(self, tool, cancel_event=None):
+        """
+        Run the block under the tool's deadline.
+
+        Args:
+            tool (str): Tool name used to pick the timeout
+            cancel_event (threading.Event, optional): Set to interrupt the
+                call when the client cancels the request
+
+        Yields:
+            Deadline: reason is 'timeout' or 'cancelled' after an interrupt
+        """
+        deadline = Deadline(tool, self.timeout_for(tool), cancel_event)
+        try:
+            with self.applied(deadline):
+                yield deadline
+        finally:
+            if deadline.reason is not None:
+                with self._lock:
+                    self._stats['timeouts' if deadline.reason == 'timeout' else 'cancellations'] += 1
+                logger.warning(deadline.message())
+
+    def current(self):
+        """Return the deadline of the calling thread's tool call, or None"""
+        return getattr(self._local, 'deadline', None)
+
+    @contextmanager
+    def applied(self, deadline):
+        """
+        Run the block on this thread under a deadline created on another.
+
+        Args:
+            deadline (Deadline or None): Deadline to check; None runs the
+                block without one
+        """
+        previous = self.current()
+        self._local.deadline = deadline
+        try:
+            yield deadline
+        finally:
+            self._local.deadline = previous
+
+    def watch(self, conn):
+        """Interrupt an unpooled connection's statements under the calling thread's deadline"""
+        conn.set_progress_handler(self._check, PROGRESS_INTERVAL)
+
+    def backup_progress(self, status, remaining, total):
+        """
+        Progress callback for sqlite3.Connection.backup() that stops the
+        copy once the calling thread's deadline has passed.
+
+        Raises:
+            sqlite3.OperationalError: "interrupted", which aborts the backup
+        """
+        if self._check():
+            raise sqlite3.OperationalError("interrupted")
+
+    def _check(self):
+        deadline = self.current()
+        return deadline is not None and deadline.expired()
+
+    def stats(self):
+        """Return the configured timeouts and interrupt counters"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['statement_timeout_seconds'] = self.timeout
+        stats['tool_timeouts'] = dict(self.tool_timeouts)
+        return stats
@@ -53,4 +53,23 @@ class DiagnosticsService:
             'validation_available': True,
             'conversion_available': True,
             'status': 'operational'
-        }
\ No newline at end of file
+        }
+    
+    def get_connection_diagnostics(self, pool):
+        """Get pool usage and the state of every pooled connection"""
+        return {
+            'pool': pool.stats(),
+            'connections': pool.connection_info()
+        }
+    
+    def get_cache_diagnostics(self, result_cache):
+        """Get read result cache statistics"""
+        return {
+            'result_cache': result_cache.stats()
+        }
+    
+    def get_logging_diagnostics(self):
+        """Get structured logging counters and per-call overhead"""
+        return {
+            'json_logger': self.json_logger.stats()
+        }
@@ -0,0 +1,84 @@
+"""
+Tool Executor Module for SQLite MCP Server
+
+This module runs blocking tool work (SQLite queries and row-by-row Python
+processing) on a bounded thread pool so that the asyncio event loop that
+serves the MCP session stays responsive. Pure-Python scoring over many
+rows can optionally be spread across a process pool.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_WORKER_THREADS = 8
+# Below this many items the cost of pickling work to another process
+# outweighs the parallel speedup, so scoring stays on the worker thread
+CPU_OFFLOAD_MIN_ITEMS = 256
+
+
+class ToolExecutor:
+    """Dispatch blocking tool work to worker threads and processes"""
+
+    def __init__(self, max_workers=DEFAULT_WORKER_THREADS, process_workers=0):
+        """
+        Args:
+            max_workers (int): Number of worker threads for tool calls
+            process_workers (int): Number of worker processes for CPU-heavy
+                scoring; 0 keeps all scoring on the worker threads
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.process_workers = max(0, int(process_workers))
+        self._threads = ThreadPoolExecutor(max_workers=self.max_workers,
+                                           thread_name_prefix='sqlite-mcp-tool')
+        self._processes = None
+        if self.process_workers:
+            # Imported here so servers without worker processes skip loading it
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # Spawned workers never inherit open SQLite handles or locks
+            self._processes = ProcessPoolExecutor(max_workers=self.process_workers,
+                                                  mp_context=multiprocessing.get_context('spawn'))
+        logger.info(f"Tool executor ready: {self.max_workers} threads, {self.process_workers} processes")
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run a blocking function on a worker thread and await its result.
+
+        Args:
+            func: Callable to run
+            *args, **kwargs: Arguments for the callable
+
+        Returns:
+            The callable's return value
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._threads, functools.partial(func, *args, **kwargs))
+
+    def map_cpu(self, func, items, chunksize=64):
+        """
+        Apply a pure function to every item, using the process pool when
+        one is configured and the batch is large enough to benefit.
+
+        The function must be defined at module level so it can be pickled.
+
+        Args:
+            func: Module-level callable taking one item
+            items (list): Items to process
+            chunksize (int): Items sent to a worker process at a time
+
+        Returns:
+            list: Results in the same order as items
+        """
+        if self._processes is None or len(items) < CPU_OFFLOAD_MIN_ITEMS:
+            return [func(item) for item in items]
+        return list(self._processes.map(func, items, chunksize=chunksize))
+
+    def shutdown(self):
+        """Stop the worker threads and processes"""
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,508 @@
+"""
+Index Advisor Module for SQLite MCP Server
+
+This module looks for missing indexes in the recorded read workload. Each
+statement is run through EXPLAIN QUERY PLAN and the plan is checked for
+full table scans of large tables and for temporary B-trees built to sort,
+group or de-duplicate rows. For each finding the advisor derives a
+candidate index from the statement's predicates: equality columns first,
+then one range column or the ORDER BY / GROUP BY columns, optionally
+extended into a covering index.
+
+Table sizes and the benefit of a candidate are estimated from the
+sqlite_stat1 statistics ANALYZE collects. In dry-run mode every candidate
+is created on an in-memory copy of the database, analyzed, and the
+affected statements are planned and timed again before and after, so only
+candidates that actually change the plan are recommended. The pooled
+reader is returned as soon as the copy exists, and the copy and the work
+on it stop with the calling tool's statement deadline.
+
+Column and alias detection is a lightweight pattern match over the SQL
+text rather than a full parser; statements it cannot attribute to a table
+produce findings without a candidate.
+"""
+
+import logging
+import re
+import sqlite3
+import time
+
+from .query_stats import fingerprint, query_id
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_MIN_ROWS = 1000
+DEFAULT_WORKLOAD_SIZE = 20
+DEFAULT_MAX_DRY_RUN_MB = 256
+# Non-key columns an index may carry to cover a statement
+MAX_COVERING_EXTRA_COLUMNS = 4
+# Executions per statement when timing the dry run; the fastest is kept
+DRY_RUN_TIMING_RUNS = 2
+# Pages copied between deadline checks while backing up for a dry run
+BACKUP_PAGES_PER_STEP = 1024
+
+_IDENTIFIER = r'(?:"(?:[^"]|"")+"|\[[^\]]+\]|`[^`]+`|[A-Za-z_]\w*)'
+_CLAUSE_KEYWORDS = (
+    'WHERE', 'ON', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'CROSS', 'NATURAL', 'FULL', 'GROUP',
+    'ORDER', 'LIMIT', 'USING', 'WINDOW', 'HAVING', 'UNION', 'EXCEPT', 'INTERSECT', 'INDEXED', 'NOT',
+)
+_TABLE_REF = re.compile(
+    rf'\b(?:FROM|JOIN)\s+(?:{_IDENTIFIER}\.)?({_IDENTIFIER})'
+    rf'(?:\s+(?:AS\s+)?(?!(?:{"|".join(_CLAUSE_KEYWORDS)})\b)({_IDENTIFIER}))?',
+    re.IGNORECASE,
+)
+_COLUMN_REF = re.compile(rf'(?:({_IDENTIFIER})\s*\.\s*)?({_IDENTIFIER})')
+_PREDICATE = re.compile(
+    rf'(?:({_IDENTIFIER})\s*\.\s*)?({_IDENTIFIER})\s*(==|=|<=|>=|<>|!=|<|>|\bIN\b|\bIS\b|\bBETWEEN\b)',
+    re.IGNORECASE,
+)
+_RIGHT_EQUALITY = re.compile(rf'(?<![<>!=])==?\s*(?:({_IDENTIFIER})\s*\.\s*)?({_IDENTIFIER})')
+_ORDERING = re.compile(r'\b(ORDER|GROUP)\s+BY\s+(.*?)(?=\bLIMIT\b|\bHAVING\b|\bORDER\s+BY\b|\bWINDOW\b|\)|$)',
+                       re.IGNORECASE | re.DOTALL)
+_STAR = re.compile(rf'(?:SELECT|,)\s*(?:({_IDENTIFIER})\s*\.\s*)?\*', re.IGNORECASE)
+_PARAMETER = re.compile(r"\?|(?<![\w:])[:@$][A-Za-z_]")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+_EQUALITY_OPS = {'=', '==', 'IN', 'IS'}
+_RANGE_OPS = {'<', '>', '<=', '>=', 'BETWEEN'}
+
+
+def _unquote(name):
+    if name[:1] in ('"', '[', '`'):
+        name = name[1:-1]
+    return name.replace('""', '"')
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _has_parameters(sql):
+    return bool(_PARAMETER.search(_STRING.sub("''", sql)))
+
+
+def _plan(conn, sql):
+    """Return the EXPLAIN QUERY PLAN details, binding NULL to every parameter"""
+    placeholders = sql.count('?') if _has_parameters(sql) else 0
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", [None] * placeholders).fetchall()
+    return [row[3] for row in rows]
+
+
+def _plan_issues(details):
+    """Return (kind, plan object) pairs for scans and temporary B-trees"""
+    issues = []
+    for detail in details:
+        match = re.match(r'SCAN (\S+)(.*)', detail)
+        if match and 'COVERING INDEX' not in match.group(2):
+            issues.append(('full_scan', match.group(1)))
+        match = re.match(r'USE TEMP B-TREE FOR (?:RIGHT PART OF |LAST TERM OF )?(ORDER BY|GROUP BY|DISTINCT)', detail)
+        if match:
+            issues.append(('temp_btree_' + match.group(1).lower().replace(' ', '_'), None))
+    return issues
+
+
+class IndexAdvisor:
+    """Propose indexes for the recorded read workload"""
+
+    def __init__(self, pool, schema_catalog, deadlines=None):
+        """
+        Args:
+            pool (ConnectionPool): Pool used to plan statements
+            schema_catalog (SchemaCatalog): Source of table columns and
+                sqlite_stat1 row estimates
+            deadlines (StatementDeadlines, optional): Deadlines that also
+                stop the dry run's backup and its in-memory copy
+        """
+        self.pool = pool
+        self.schema_catalog = schema_catalog
+        self.deadlines = deadlines
+
+    @staticmethod
+    def workload(query_stats, limit=DEFAULT_WORKLOAD_SIZE):
+        """
+        Build the statements to analyze from recorded query statistics.
+
+        Returns:
+            list: Read statements, most expensive first
+        """
+        statements = []
+        for entry in query_stats.top(limit=max(limit * 5, limit), order_by='total_time'):
+            if not entry['fingerprint'].upper().startswith(('SELECT', 'WITH')):
+                continue
+            statements.append({
+                'query_id': entry['query_id'],
+                'sql': entry['example'],
+                'fingerprint': entry['fingerprint'],
+                'calls': entry['calls'],
+                'total_ms': entry['total_ms'],
+            })
+            if len(statements) >= limit:
+                break
+        return statements
+
+    @staticmethod
+    def statements_from_sql(queries):
+        """Wrap explicitly supplied SQL in the workload format"""
+        statements = []
+        for sql in queries:
+            normalized = fingerprint(sql)
+            statements.append({'query_id': query_id(normalized), 'sql': sql, 'fingerprint': normalized,
+                               'calls': None, 'total_ms': None})
+        return statements
+
+    @staticmethod
+    def _plan_sql(statement):
+        """SQL to explain: the example if self-contained, else the fingerprint"""
+        if not _has_parameters(statement['sql']):
+            return statement['sql']
+        return statement['fingerprint'].replace('(...)', '(?)')
+
+    @staticmethod
+    def _tables(conn, snapshot):
+        tables = {}
+        for table in snapshot['tables']:
+            if table['name'].startswith('sqlite_'):
+                continue
+            primary_key = [col for col in table['columns'] if col['pk']]
+            # An INTEGER PRIMARY KEY is the rowid, which every index already carries
+            rowid_alias = (primary_key[0]['name'] if len(primary_key) == 1
+                           and str(primary_key[0]['type']).upper() == 'INTEGER' else None)
+            entry = {
+                'name': table['name'],
+                'columns': [col['name'] for col in table['columns'] if col['name'] != rowid_alias],
+                'rows': table['row_count'],
+                'rows_source': table['row_count_source'],
+            }
+            if entry['rows'] is None:
+                # Unanalyzed rowid tables: the largest rowid is a cheap upper bound
+                try:
+                    entry['rows'] = conn.execute(f"SELECT max(rowid) FROM {_quote(table['name'])}").fetchone()[0] or 0
+                    entry['rows_source'] = 'max_rowid'
+                except sqlite3.Error:
+                    entry['rows_source'] = 'unavailable'
+            tables[table['name'].lower()] = entry
+        return tables
+
+    @staticmethod
+    def _indexes(conn, table):
+        indexes = []
+        for index in conn.execute(f"PRAGMA index_list({_quote(table)})").fetchall():
+            columns = [row[2] for row in conn.execute(f"PRAGMA index_info({_quote(index[1])})").fetchall()]
+            indexes.append({'name': index[1], 'columns': columns})
+        return indexes
+
+    @staticmethod
+    def _stat1(conn):
+        try:
+            rows = conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1 WHERE idx IS NOT NULL").fetchall()
+        except sqlite3.Error:
+            return {}
+        return {row[1]: [int(n) for n in str(row[2]).split() if n.isdigit()] for row in rows}
+
+    @staticmethod
+    def _aliases(sql, tables):
+        """Map every name a statement uses for a table to that table's key"""
+        aliases = {}
+        for match in _TABLE_REF.finditer(sql):
+            table = _unquote(match.group(1)).lower()
+            if table in tables:
+                aliases[table] = table
+                if match.group(2):
+                    aliases[_unquote(match.group(2)).lower()] = table
+        return aliases
+
+    @staticmethod
+    def _resolve(qualifier, column, table, aliases, tables):
+        """Return the column name if the reference belongs to the table"""
+        column = _unquote(column)
+        columns = {c.lower(): c for c in tables[table]['columns']}
+        if column.lower() not in columns:
+            return None
+        if qualifier is not None:
+            return columns[column.lower()] if aliases.get(_unquote(qualifier).lower()) == table else None
+        owners = {t for t in set(aliases.values()) if column.lower() in {c.lower() for c in tables[t]['columns']}}
+        return columns[column.lower()] if owners == {table} else None
+
+    def _candidate(self, sql, table, aliases, tables, issue_kinds, covering):
+        """Derive index columns for one table of a statement"""
+        equality, ranges = [], []
+        for match in _PREDICATE.finditer(sql):
+            column = self._resolve(match.group(1), match.group(2), table, aliases, tables)
+            op = match.group(3).upper()
+            if column is None:
+                continue
+            if op in _EQUALITY_OPS and column not in equality:
+                equality.append(column)
+            elif op in _RANGE_OPS and column not in ranges:
+                ranges.append(column)
+        for match in _RIGHT_EQUALITY.finditer(sql):
+            column = self._resolve(match.group(1), match.group(2), table, aliases, tables)
+            if column is not None and column not in equality:
+                equality.append(column)
+        ranges = [c for c in ranges if c not in equality]
+
+        ordering = []
+        if any(kind.startswith('temp_btree') for kind in issue_kinds):
+            for match in _ORDERING.finditer(sql):
+                terms = []
+                for term in match.group(2).split(','):
+                    term = re.sub(r'\s+(ASC|DESC|COLLATE\s+\w+|NULLS\s+(FIRST|LAST))\b.*$', '', term.strip(), flags=re.I)
+                    ref = _COLUMN_REF.fullmatch(term.strip())
+                    column = self._resolve(ref.group(1), ref.group(2), table, aliases, tables) if ref else None
+                    if column is None:
+                        terms = []
+                        break
+                    terms.append(column)
+                if terms:
+                    ordering = [c for c in terms if c not in equality]
+                    break
+
+        key = list(equality)
+        if ranges:
+            key.append(ranges[0])
+        elif ordering:
+            key.extend(c for c in ordering if c not in key)
+        if not key:
+            return None
+
+        include = []
+        if covering and not any(
+                m.group(1) is None or aliases.get(_unquote(m.group(1)).lower()) == table
+                for m in _STAR.finditer(sql)):
+            for match in _COLUMN_REF.finditer(_STRING.sub("''", sql)):
+                column = self._resolve(match.group(1), match.group(2), table, aliases, tables)
+                if column is not None and column not in key and column not in include:
+                    include.append(column)
+            if len(include) > MAX_COVERING_EXTRA_COLUMNS:
+                include = []
+        return {'columns': key, 'include': include, 'equality': len(equality)}
+
+    @staticmethod
+    def _covered_by_existing(columns, indexes):
+        for index in indexes:
+            if [c.lower() for c in index['columns'][:len(columns)]] == [c.lower() for c in columns]:
+                return index['name']
+        return None
+
+    @staticmethod
+    def _rows_per_key(columns, indexes, stat1):
+        """Average rows per distinct key of the equality prefix, from sqlite_stat1"""
+        wanted = {c.lower() for c in columns}
+        if not wanted:
+            return None
+        best = None
+        for index in indexes:
+            stat = stat1.get(index['name'])
+            if not stat:
+                continue
+            prefix = [c.lower() for c in index['columns'][:len(wanted)]]
+            if len(prefix) == len(wanted) and set(prefix) == wanted and len(stat) > len(wanted):
+                best = stat[len(wanted)] if best is None else min(best, stat[len(wanted)])
+        return best
+
+    def advise(self, statements, min_rows=DEFAULT_MIN_ROWS, covering=True,
+               dry_run=False, max_dry_run_mb=DEFAULT_MAX_DRY_RUN_MB):
+        """
+        Analyze statements and propose indexes.
+
+        Args:
+            statements (list): Workload entries from workload() or
+                statements_from_sql()
+            min_rows (int): Full scans of smaller tables are not reported
+            covering (bool): Extend candidates with the other columns a
+                statement reads, when there are few enough of them
+            dry_run (bool): Verify candidates on an in-memory copy
+            max_dry_run_mb (float): Largest database copied for a dry run
+
+        Returns:
+            dict: findings per statement, candidate indexes and, for a dry
+                run, the measured before/after plans and timings
+        """
+        findings, candidates, skipped = [], {}, []
+        snapshot = self.schema_catalog.snapshot()
+        with self.pool.reader() as conn:
+            tables = self._tables(conn, snapshot)
+            stat1 = self._stat1(conn)
+            index_cache = {}
+            for statement in statements:
+                plan_sql = self._plan_sql(statement)
+                try:
+                    details = _plan(conn, plan_sql)
+                except sqlite3.Error as e:
+                    skipped.append({'query_id': statement['query_id'], 'reason': f"cannot plan: {e}"})
+                    continue
+                aliases = self._aliases(plan_sql, tables)
+                issues = []
+                for kind, name in _plan_issues(details):
+                    table = aliases.get(_unquote(name).lower()) if name else None
+                    if kind == 'full_scan':
+                        if table is None or (tables[table]['rows'] or 0) < min_rows:
+                            continue
+                    elif table is None:
+                        # Temp B-trees belong to the statement; attribute them to its only large table
+                        large = {t for t in aliases.values() if (tables[t]['rows'] or 0) >= min_rows}
+                        if len(large) != 1:
+                            continue
+                        table = large.pop()
+                    issues.append((kind, table))
+                if not issues:
+                    continue
+
+                finding = {
+                    'query_id': statement['query_id'],
+                    'statement': statement['fingerprint'],
+                    'calls': statement['calls'],
+                    'total_ms': statement['total_ms'],
+                    'plan': details,
+                    'issues': [{'issue': kind, 'table': tables[table]['name'], 'table_rows': tables[table]['rows'],
+                                'row_count_source': tables[table]['rows_source']} for kind, table in issues],
+                    'candidates': [],
+                }
+                findings.append(finding)
+
+                for table in dict.fromkeys(table for _, table in issues):
+                    kinds = [kind for kind, t in issues if t == table]
+                    candidate = self._candidate(plan_sql, table, aliases, tables, kinds, covering)
+                    if candidate is None:
+                        continue
+                    name = tables[table]['name']
+                    if name not in index_cache:
+                        index_cache[name] = self._indexes(conn, name)
+                    existing = self._covered_by_existing(candidate['columns'], index_cache[name])
+                    if existing:
+                        finding['candidates'].append(f"already indexed by {existing}")
+                        continue
+                    columns = candidate['columns'] + candidate['include']
+                    index_name = f"idx_{name}_{'_'.join(candidate['columns'])}"
+                    if candidate['include']:
+                        index_name += '_covering'
+                    index_name = re.sub(r'\W', '_', index_name)
+                    sql = f"CREATE INDEX {_quote(index_name)} ON {_quote(name)} ({', '.join(_quote(c) for c in columns)})"
+                    entry = candidates.setdefault((name.lower(), tuple(c.lower() for c in columns)), {
+                        'index_name': index_name,
+                        'table': name,
+                        'columns': candidate['columns'],
+                        'include_columns': candidate['include'],
+                        'covering': bool(candidate['include']),
+                        'equality_columns': candidate['equality'],
+                        'create_sql': sql,
+                        'statements': [],
+                        'issues': [],
+                        'table_rows': tables[table]['rows'],
+                    })
+                    finding['candidates'].append(entry['index_name'])
+                    entry['statements'].append(statement)
+                    entry['issues'].extend(k for k in kinds if k not in entry['issues'])
+
+            for entry in candidates.values():
+                rows_per_key = self._rows_per_key(entry['columns'][:entry['equality_columns']],
+                                                  index_cache.get(entry['table'], []), stat1)
+                entry['estimate'] = self._estimate(entry, rows_per_key, 'sqlite_stat1')
+
+            report = {
+                'analyzed_statements': len(statements),
+                'min_table_rows': min_rows,
+                'findings': findings,
+                'skipped': skipped,
+            }
+            copy = None
+            if dry_run and candidates:
+                copy, report['dry_run'] = self._copy(conn, max_dry_run_mb)
+        if copy is not None:
+            report['dry_run'] = self._dry_run(copy, candidates, report['dry_run'])
+
+        recommendations = []
+        for entry in candidates.values():
+            recommendation = {key: value for key, value in entry.items() if key != 'statements'}
+            recommendation['query_ids'] = [s['query_id'] for s in entry['statements']]
+            recommendation['recommended'] = recommendation.pop('verified', True)
+            recommendations.append(recommendation)
+        recommendations.sort(key=lambda r: (not r['recommended'], -(r['estimate'].get('reduction_factor') or 0)))
+        report['recommendations'] = recommendations
+        return report
+
+    @staticmethod
+    def _estimate(entry, rows_per_key, source):
+        before = entry['table_rows']
+        if rows_per_key is None or not before:
+            return {'rows_examined_before': before, 'rows_examined_after': None,
+                    'reduction_factor': None, 'source': 'unknown (run ANALYZE or use dry_run)'}
+        after = max(1, rows_per_key)
+        return {'rows_examined_before': before, 'rows_examined_after': after,
+                'reduction_factor': round(before / after, 1), 'source': source}
+
+    def _copy(self, conn, max_dry_run_mb):
+        """
+        Back the database up into an in-memory connection for a dry run.
+
+        Returns:
+            tuple: The copy (None when there is none) and the dry-run report so far
+        """
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        size_mb = page_size * page_count / (1024 * 1024)
+        if size_mb > max_dry_run_mb:
+            return None, {'performed': False,
+                          'reason': f"database is {size_mb:.1f} MB, above the {max_dry_run_mb} MB dry-run limit"}
+
+        copy = sqlite3.connect(':memory:')
+        try:
+            conn.backup(copy, pages=BACKUP_PAGES_PER_STEP,
+                        progress=self.deadlines.backup_progress if self.deadlines is not None else None)
+        except sqlite3.Error as e:
+            copy.close()
+            logger.warning(f"Index advisor dry run failed: {e}")
+            return None, {'performed': False, 'reason': str(e)}
+        if self.deadlines is not None:
+            self.deadlines.watch(copy)
+        return copy, {'performed': True, 'database_mb': round(size_mb, 1)}
+
+    def _dry_run(self, copy, candidates, report):
+        """Create each candidate on the in-memory copy, re-plan and re-time its statements, and close the copy"""
+        try:
+            for entry in candidates.values():
+                results = []
+                improved = True
+                for statement in entry['statements']:
+                    plan_sql = self._plan_sql(statement)
+                    results.append({'query_id': statement['query_id'],
+                                    'plan_before': _plan(copy, plan_sql),
+                                    'time_before_ms': self._time(copy, statement)})
+                try:
+                    copy.execute(entry['create_sql'])
+                    copy.execute(f"ANALYZE {_quote(entry['index_name'])}")
+                    for result, statement in zip(results, entry['statements']):
+                        plan_sql = self._plan_sql(statement)
+                        result['plan_after'] = _plan(copy, plan_sql)
+                        result['time_after_ms'] = self._time(copy, statement)
+                        result['uses_index'] = any(entry['index_name'] in d for d in result['plan_after'])
+                        faster = (result['time_before_ms'] is None or
+                                  result['time_after_ms'] <= result['time_before_ms'] * 1.1)
+                        improved = improved and result['uses_index'] and faster
+                    stat = self._stat1(copy).get(entry['index_name'])
+                    if stat and entry['equality_columns'] and len(stat) > entry['equality_columns']:
+                        entry['estimate'] = self._estimate(entry, stat[entry['equality_columns']], 'dry_run ANALYZE')
+                    entry['verified'] = improved
+                    entry['dry_run'] = results
+                finally:
+                    copy.execute(f"DROP INDEX IF EXISTS {_quote(entry['index_name'])}")
+        except sqlite3.Error as e:
+            logger.warning(f"Index advisor dry run failed: {e}")
+            return {'performed': False, 'reason': str(e)}
+        finally:
+            copy.close()
+        report['candidates_tested'] = len(candidates)
+        return report
+
+    @staticmethod
+    def _time(conn, statement):
+        """Fastest of a few executions, or None when the statement needs parameters"""
+        if _has_parameters(statement['sql']):
+            return None
+        best = None
+        for _ in range(DRY_RUN_TIMING_RUNS):
+            started = time.perf_counter()
+            conn.execute(statement['sql']).fetchall()
+            elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best, 3)
@@ -1,33 +1,166 @@
-"""JSON logging utilities"""
+"""
+JSON logging utilities
+
+Operation and error entries are checked against the configured level and
+sampling rate before anything is built or serialized. Entries that pass are
+handed to a queue, and a background listener thread does the JSON encoding
+and writes them to a size-bounded, rotating JSONL file, so the query path
+never waits on formatting or disk I/O.
+"""
 import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
 from datetime import datetime
 
+DEFAULT_LOG_LEVEL = 'warning'
+DEFAULT_SAMPLE_RATE = 1.0
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+LOG_FILE_NAME = 'sqlite_mcp_operations.jsonl'
+# Entries waiting for the writer thread; beyond this they are dropped
+# rather than blocking a query
+QUEUE_SIZE = 10000
+
+_LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'off': logging.CRITICAL + 1,
+}
+
+
+class _JsonLineFormatter(logging.Formatter):
+    """Serialize the entry carried in record.msg as one JSON line"""
+
+    def format(self, record):
+        entry = {'timestamp': datetime.fromtimestamp(record.created).isoformat(), 'level': record.levelname}
+        entry.update(record.msg)
+        return json.dumps(entry, default=str)
+
+
+class _JsonLineFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that creates its directory on first write"""
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
 class JsonLogger:
     """JSON-based logging for database operations"""
-    
+
     def __init__(self, config):
+        """
+        Args:
+            config (dict): enabled, log_dir, log_level (debug, info, warning,
+                error or off), sample_rate for operations, error_sample_rate,
+                max_bytes and backup_count for the rotating file, and echo to
+                also send entries to the standard 'json_logger' logger
+        """
         self.config = config
         self.enabled = config.get('enabled', True)
         self.logger = logging.getLogger('json_logger')
-    
+        self.level = _LEVELS.get(str(config.get('log_level', DEFAULT_LOG_LEVEL)).lower(), logging.WARNING)
+        if not self.enabled:
+            self.level = _LEVELS['off']
+        self.sample_rate = min(1.0, max(0.0, float(config.get('sample_rate', DEFAULT_SAMPLE_RATE))))
+        self.error_sample_rate = min(1.0, max(0.0, float(config.get('error_sample_rate', 1.0))))
+        self.echo = config.get('echo', False)
+        self._lock = threading.Lock()
+        self._stats = {'emitted': 0, 'sampled_out': 0, 'dropped': 0, 'calls': 0, 'time_ns': 0}
+
+        self._queue = None
+        self._listener = None
+        log_dir = config.get('log_dir')
+        if log_dir and self.level <= logging.CRITICAL:
+            handler = _JsonLineFileHandler(
+                os.path.abspath(os.path.join(log_dir, LOG_FILE_NAME)),
+                maxBytes=int(config.get('max_bytes', DEFAULT_MAX_BYTES)),
+                backupCount=int(config.get('backup_count', DEFAULT_BACKUP_COUNT)),
+                encoding='utf-8',
+                delay=True,
+            )
+            handler.setFormatter(_JsonLineFormatter())
+            self._queue = queue.Queue(QUEUE_SIZE)
+            self._listener = logging.handlers.QueueListener(self._queue, handler)
+            self._listener.start()
+
+    def _emit(self, level, entry, started):
+        record = self.logger.makeRecord(self.logger.name, level, __file__, 0, entry, None, None)
+        dropped = 0
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                dropped = 1
+        if self.echo and self.logger.isEnabledFor(level):
+            self.logger.log(level, "%s", json.dumps(entry, default=str))
+        with self._lock:
+            self._stats['emitted'] += 1 - dropped
+            self._stats['dropped'] += dropped
+            self._stats['calls'] += 1
+            self._stats['time_ns'] += time.perf_counter_ns() - started
+
+    def _sampled_out(self, rate):
+        if rate >= 1.0 or random.random() < rate:
+            return False
+        with self._lock:
+            self._stats['sampled_out'] += 1
+        return True
+
     def log_operation(self, operation, data):
         """Log database operation"""
-        if self.enabled:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'operation': operation,
-                'data': data
-            }
-            self.logger.info(f"Operation: {json.dumps(log_entry)}")
-    
+        if self.level > logging.INFO:
+            return
+        started = time.perf_counter_ns()
+        if self._sampled_out(self.sample_rate):
+            return
+        self._emit(logging.INFO, {
+            'operation': operation,
+            'data': data,
+            'sample_rate': self.sample_rate
+        }, started)
+
     def log_error(self, error, context):
         """Log error with context"""
-        if self.enabled:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'error': str(error),
-                'error_type': type(error).__name__,
-                'context': context
-            }
-            self.logger.error(f"Error: {json.dumps(log_entry)}")
\ No newline at end of file
+        if self.level > logging.ERROR:
+            return
+        started = time.perf_counter_ns()
+        if self._sampled_out(self.error_sample_rate):
+            return
+        self._emit(logging.ERROR, {
+            'error': str(error),
+            'error_type': type(error).__name__,
+            'context': context,
+            'sample_rate': self.error_sample_rate
+        }, started)
+
+    def stats(self):
+        """Return logging counters, including the time spent on the calling thread"""
+        with self._lock:
+            stats = dict(self._stats)
+        time_ns = stats.pop('time_ns')
+        stats.update({
+            'level': logging.getLevelName(self.level) if self.level <= logging.CRITICAL else 'OFF',
+            'sample_rate': self.sample_rate,
+            'error_sample_rate': self.error_sample_rate,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'log_file': self._listener.handlers[0].baseFilename if self._listener else None,
+            'avg_call_us': round(time_ns / stats['calls'] / 1000, 3) if stats['calls'] else None,
+        })
+        return stats
+
+    def close(self):
+        """Flush queued entries to the log file and stop the writer thread"""
+        if self._listener is not None:
+            self._queue = None
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
@@ -0,0 +1,211 @@
+"""
+Metrics Module for SQLite MCP Server
+
+This module keeps in-process performance measurements for every tool:
+call and error counts, latency percentiles, rows returned, SQLite VM work
+and response bytes, plus the time tool calls spend waiting for a pooled
+connection.
+
+Latencies go into fixed log-scale histograms, so recording a sample is a
+bisect and a counter increment and memory does not grow with traffic.
+"""
+
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from .connection_pool import PROGRESS_INTERVAL
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+# Bucket upper bounds in milliseconds from 10 microseconds to 10 minutes,
+# eight buckets per doubling (each bucket about 9% wider than the last)
+_BUCKETS_PER_DOUBLING = 8
+LATENCY_BOUNDS_MS = [0.01 * 2 ** (i / _BUCKETS_PER_DOUBLING)
+                     for i in range(int(math.log2(600000 / 0.01) * _BUCKETS_PER_DOUBLING) + 2)]
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """Log-scale latency histogram with bounded memory"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        self.counts[bisect.bisect_left(LATENCY_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p):
+        """Return the upper bound of the bucket holding the p-th percentile"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                bound = LATENCY_BOUNDS_MS[i] if i < len(LATENCY_BOUNDS_MS) else self.max_ms
+                return round(min(bound, self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def summary(self):
+        summary = {f"p{p}": self.percentile(p) for p in PERCENTILES}
+        summary['mean'] = round(self.total_ms / self.count, 3) if self.count else None
+        summary['max'] = round(self.max_ms, 3) if self.count else None
+        return summary
+
+
+class _ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows_returned = 0
+        self.vm_instructions = 0
+        self.bytes_serialized = 0
+        self.latency = LatencyHistogram()
+
+
+class _CallStats:
+    """Counters for the tool call running on the current thread"""
+
+    def __init__(self):
+        self.error = False
+        self.rows_returned = 0
+        self.vm_instructions = 0
+        self.bytes_serialized = 0
+
+
+class MetricsRegistry:
+    """Per-tool counters and latency histograms"""
+
+    def __init__(self, pool=None):
+        """
+        Args:
+            pool (ConnectionPool, optional): Pool whose connection waits and
+                SQLite VM work are attributed to the running tool call
+        """
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._tools = {}
+        self._pool_wait = LatencyHistogram()
+        self._since = time.time()
+        if pool is not None:
+            pool.wait_observer = self.record_pool_wait
+            pool.add_progress_observer(self._count_vm_progress)
+
+    @contextmanager
+    def measure(self, tool):
+        """
+        Measure one tool call made inside the block.
+
+        Yields:
+            _CallStats: Counters the caller can add to (bytes_serialized,
+                error) while the call runs
+        """
+        call = _CallStats()
+        previous = getattr(self._local, 'call', None)
+        self._local.call = call
+        started = time.perf_counter()
+        try:
+            yield call
+        except Exception:
+            call.error = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._local.call = previous
+            with self._lock:
+                stats = self._tools.get(tool)
+                if stats is None:
+                    stats = self._tools[tool] = _ToolStats()
+                stats.calls += 1
+                stats.errors += call.error
+                stats.rows_returned += call.rows_returned
+                stats.vm_instructions += call.vm_instructions
+                stats.bytes_serialized += call.bytes_serialized
+                stats.latency.record(elapsed_ms)
+
+    def _current(self):
+        return getattr(self._local, 'call', None)
+
+    def mark_error(self):
+        """Count the running tool call as failed"""
+        call = self._current()
+        if call is not None:
+            call.error = True
+
+    def add_rows(self, count):
+        """Attribute returned rows to the running tool call"""
+        call = self._current()
+        if call is not None:
+            call.rows_returned += count
+
+    def _count_vm_progress(self):
+        call = self._current()
+        if call is not None:
+            call.vm_instructions += PROGRESS_INTERVAL
+        return False
+
+    def record_pool_wait(self, seconds):
+        with self._lock:
+            self._pool_wait.record(seconds * 1000)
+
+    def snapshot(self, tool=None):
+        """
+        Return the measurements collected since the last reset.
+
+        Args:
+            tool (str, optional): Only report this tool
+
+        Returns:
+            dict: Per-tool counters and latency percentiles, pool wait times
+                and the totals across all tools
+        """
+        with self._lock:
+            tools = {}
+            calls = errors = 0
+            for name in sorted(self._tools):
+                stats = self._tools[name]
+                calls += stats.calls
+                errors += stats.errors
+                if tool is not None and name != tool:
+                    continue
+                tools[name] = {
+                    'calls': stats.calls,
+                    'errors': stats.errors,
+                    'error_rate': round(stats.errors / stats.calls, 4),
+                    'latency_ms': stats.latency.summary(),
+                    'rows_returned': stats.rows_returned,
+                    'vm_instructions': stats.vm_instructions,
+                    'bytes_serialized': stats.bytes_serialized,
+                }
+            pool_wait = {'checkouts': self._pool_wait.count,
+                         'total_ms': round(self._pool_wait.total_ms, 3),
+                         **self._pool_wait.summary()}
+            since = self._since
+        return {
+            'since': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(since)),
+            'window_seconds': round(time.time() - since, 1),
+            'total_calls': calls,
+            'total_errors': errors,
+            'tools': tools,
+            'pool_wait_ms': pool_wait,
+        }
+
+    def reset(self):
+        """Discard all measurements and start a new window"""
+        with self._lock:
+            self._tools = {}
+            self._pool_wait = LatencyHistogram()
+            self._since = time.time()
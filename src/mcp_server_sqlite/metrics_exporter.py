@@ -0,0 +1,297 @@
+"""
+Metrics Exporter Module for SQLite MCP Server
+
+This module renders the measurements gathered inside EnhancedSqliteDatabase
+as OpenMetrics text so the server can be scraped like any other service,
+even though it only speaks MCP over stdio.
+
+The exporter can rewrite a file on a fixed interval (for a node_exporter
+textfile collector or a sidecar) and/or serve the text over HTTP on a local
+port. Rendering only reads counters the server already keeps, plus a few
+PRAGMA values and file sizes, so a scrape does not touch user tables.
+"""
+
+import logging
+import os
+import threading
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_EXPORT_INTERVAL = 15.0
+DEFAULT_EXPORT_HOST = '127.0.0.1'
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PREFIX = 'sqlite_mcp'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    if value is None:
+        return 'NaN'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _MetricFamily:
+    def __init__(self, name, metric_type, help_text, unit=None):
+        self.name = f"{PREFIX}_{name}"
+        self.type = metric_type
+        self.help = help_text
+        self.unit = unit
+        self.samples = []
+
+    def add(self, value, suffix='', **labels):
+        self.samples.append((suffix, labels, value))
+        return self
+
+    def lines(self):
+        yield f"# TYPE {self.name} {self.type}"
+        if self.unit:
+            yield f"# UNIT {self.name} {self.unit}"
+        yield f"# HELP {self.name} {self.help}"
+        for suffix, labels, value in self.samples:
+            label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            label_text = f"{{{label_text}}}" if label_text else ''
+            yield f"{self.name}{suffix}{label_text} {_number(value)}"
+
+
+def _summary(family, summary, count, total_seconds, **labels):
+    for p in (50, 95, 99):
+        value = summary.get(f"p{p}")
+        if value is not None:
+            family.add(round(value / 1000, 9), **labels, quantile=str(p / 100))
+    family.add(round(total_seconds, 9), '_sum', **labels)
+    family.add(count, '_count', **labels)
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def collect_families(db):
+    """
+    Gather metric families from an EnhancedSqliteDatabase.
+
+    Returns:
+        list: _MetricFamily objects in exposition order
+    """
+    families = []
+
+    metrics = db.metrics.snapshot()
+    calls = _MetricFamily('tool_calls', 'counter', 'Tool calls handled')
+    errors = _MetricFamily('tool_errors', 'counter', 'Tool calls that returned an error')
+    latency = _MetricFamily('tool_latency_seconds', 'summary', 'Tool call latency', 'seconds')
+    rows = _MetricFamily('tool_rows_returned', 'counter', 'Rows returned by tool calls')
+    vm = _MetricFamily('tool_vm_instructions', 'counter',
+                       'SQLite VM instructions run by tool calls, in steps of 1000')
+    response = _MetricFamily('tool_response_bytes', 'counter', 'Bytes of tool call responses', 'bytes')
+    for tool, stats in metrics['tools'].items():
+        calls.add(stats['calls'], '_total', tool=tool)
+        errors.add(stats['errors'], '_total', tool=tool)
+        latency_ms = stats['latency_ms']
+        _summary(latency, latency_ms, stats['calls'],
+                 (latency_ms['mean'] or 0) * stats['calls'] / 1000, tool=tool)
+        rows.add(stats['rows_returned'], '_total', tool=tool)
+        vm.add(stats['vm_instructions'], '_total', tool=tool)
+        response.add(stats['bytes_serialized'], '_total', tool=tool)
+    families.extend([calls, errors, latency, rows, vm, response])
+
+    pool_wait = metrics['pool_wait_ms']
+    wait = _MetricFamily('pool_wait_seconds', 'summary', 'Time spent waiting for a pooled connection', 'seconds')
+    _summary(wait, pool_wait, pool_wait['checkouts'], pool_wait['total_ms'] / 1000)
+    families.append(wait)
+
+    pool = db.pool.stats()
+    families.extend([
+        _MetricFamily('pool_checkouts', 'counter', 'Pooled connection checkouts')
+        .add(pool['reader_checkouts'], '_total', role='reader')
+        .add(pool['writer_checkouts'], '_total', role='writer'),
+        _MetricFamily('pool_readers', 'gauge', 'Pooled reader connections').add(pool['readers']),
+        _MetricFamily('pool_idle_readers', 'gauge', 'Reader connections not checked out').add(pool['idle_readers']),
+        _MetricFamily('pool_replaced_connections', 'counter', 'Broken pooled connections replaced')
+        .add(pool['replaced_connections'], '_total'),
+        _MetricFamily('statement_cache_lookups', 'counter', 'Prepared statement cache lookups')
+        .add(pool['statement_cache_hits'], '_total', result='hit')
+        .add(pool['statement_cache_misses'], '_total', result='miss'),
+    ])
+
+    cache = db.result_cache.stats()
+    families.extend([
+        _MetricFamily('result_cache_lookups', 'counter', 'Read result cache lookups')
+        .add(cache['hits'], '_total', result='hit')
+        .add(cache['misses'], '_total', result='miss'),
+        _MetricFamily('result_cache_evictions', 'counter', 'Results evicted to stay within the memory budget')
+        .add(cache['evictions'], '_total'),
+        _MetricFamily('result_cache_invalidations', 'counter', 'Result cache clears after the database changed')
+        .add(cache['invalidations'], '_total'),
+        _MetricFamily('result_cache_entries', 'gauge', 'Results held in the cache').add(cache['entries']),
+        _MetricFamily('result_cache_size_bytes', 'gauge', 'Memory used by cached results', 'bytes')
+        .add(cache['bytes']),
+    ])
+
+    deadlines = db.deadlines.stats()
+    families.append(
+        _MetricFamily('statement_interrupts', 'counter', 'Tool calls whose SQL was interrupted')
+        .add(deadlines['timeouts'], '_total', reason='timeout')
+        .add(deadlines['cancellations'], '_total', reason='cancelled'))
+
+    catalog = db.schema_catalog.stats()
+    families.append(
+        _MetricFamily('schema_catalog_lookups', 'counter', 'Schema catalog reads')
+        .add(catalog['hits'], '_total', result='hit')
+        .add(catalog['rebuilds'], '_total', result='rebuild'))
+
+    writes = db.write_coalescer.stats()
+    families.extend([
+        _MetricFamily('coalesced_writes', 'counter', 'Writes committed through group commit')
+        .add(writes['writes'], '_total'),
+        _MetricFamily('coalesced_batches', 'counter', 'Group commit transactions').add(writes['batches'], '_total'),
+    ])
+
+    if db.db_path != ':memory:':
+        families.extend([
+            _MetricFamily('database_size_bytes', 'gauge', 'Size of the main database file', 'bytes')
+            .add(_file_size(db.db_path)),
+            _MetricFamily('wal_size_bytes', 'gauge', 'Size of the write-ahead log file', 'bytes')
+            .add(_file_size(db.db_path + '-wal')),
+        ])
+
+    with db.pool.reader() as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    # A negative cache_size is a budget in KiB rather than a page count
+    cache_bytes = -cache_size * 1024 if cache_size < 0 else cache_size * page_size
+    families.extend([
+        _MetricFamily('page_size_bytes', 'gauge', 'Database page size', 'bytes').add(page_size),
+        _MetricFamily('page_cache_capacity_bytes', 'gauge', 'Page cache budget of each connection', 'bytes')
+        .add(cache_bytes),
+        _MetricFamily('pages', 'gauge', 'Database pages').add(page_count),
+        _MetricFamily('freelist_pages', 'gauge', 'Unused database pages').add(freelist_count),
+    ])
+    return families
+
+
+def render_openmetrics(db):
+    """Return the server metrics in the OpenMetrics text format"""
+    lines = []
+    for family in collect_families(db):
+        lines.extend(family.lines())
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """Publish OpenMetrics text to a file, a local HTTP port, or both"""
+
+    def __init__(self, db, path=None, port=None, interval=DEFAULT_EXPORT_INTERVAL, host=DEFAULT_EXPORT_HOST):
+        """
+        Args:
+            db (EnhancedSqliteDatabase): Database whose metrics are exported
+            path (str, optional): File rewritten every interval seconds
+            port (int, optional): Local port serving the metrics over HTTP
+                (0 picks a free port)
+            interval (float): Seconds between file updates
+            host (str): Address the HTTP server binds to
+        """
+        self.db = db
+        self.path = path
+        self.port = port
+        self.interval = interval
+        self.host = host
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+        self._server_thread = None
+
+    @property
+    def enabled(self):
+        return bool(self.path) or self.port is not None
+
+    def render(self):
+        return render_openmetrics(self.db)
+
+    def write_file(self):
+        """Replace the metrics file atomically so readers never see a partial write"""
+        text = self.render()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+
+    def _write_loop(self):
+        while True:
+            try:
+                self.write_file()
+            except Exception as e:
+                logger.warning(f"Failed to write metrics file {self.path}: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def _handler(self):
+        # Only servers with --metrics-port load the HTTP server modules
+        from http.server import BaseHTTPRequestHandler
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                try:
+                    body = exporter.render().encode('utf-8')
+                except Exception as e:
+                    logger.warning(f"Failed to render metrics: {e}")
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("Metrics request: " + format % args)
+
+        return Handler
+
+    def start(self):
+        """Start the file writer and HTTP server threads that are configured"""
+        if self.path:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._write_loop, name='sqlite-mcp-metrics-file', daemon=True)
+            self._thread.start()
+            logger.info(f"Writing OpenMetrics to {self.path} every {self.interval}s")
+        if self.port is not None:
+            from http.server import ThreadingHTTPServer
+            self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+            self._server_thread = threading.Thread(target=self._server.serve_forever,
+                                                   name='sqlite-mcp-metrics-http', daemon=True)
+            self._server_thread.start()
+            logger.info(f"Serving OpenMetrics on http://{self.host}:{self.port}/metrics")
+        return self
+
+    def close(self):
+        """Stop exporting; the file gets one final update"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+            try:
+                self.write_file()
+            except Exception as e:
+                logger.warning(f"Failed to write metrics file {self.path}: {e}")
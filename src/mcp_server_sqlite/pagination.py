@@ -0,0 +1,367 @@
+"""
+Result Pagination Module for SQLite MCP Server
+
+This module lets read_query return large results one page at a time.
+Each paged query gets an opaque continuation token; the client passes the
+token back to fetch the next page, so neither the server nor the response
+ever holds more than one page of rows.
+
+In WAL mode a page cursor keeps its SELECT statement open on a dedicated
+connection and simply fetches the next rows, which reads from one
+consistent snapshot. Outside WAL mode an open statement would hold a
+shared lock that blocks every writer, so the query is re-run for each page
+and no lock is held between pages. When the query reads one table and is
+ordered by a unique, non-NULL column it selects, later pages continue
+after the last key seen (keyset pagination), so each page costs one index
+seek; otherwise they use LIMIT/OFFSET, which rescans the skipped rows. Such
+pages are separate reads: they are marked consistent: false, and with
+OFFSET rows written between pages can be skipped or repeated.
+"""
+
+import logging
+import re
+import secrets
+import threading
+import time
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 10000
+DEFAULT_CURSOR_TTL = 300.0
+DEFAULT_MAX_CURSORS = 16
+
+_IDENTIFIER = r'(?:"(?:[^"]|"")+"|\[[^\]]+\]|`[^`]+`|[A-Za-z_]\w*)'
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_KEYSET_QUERY = re.compile(
+    rf'^SELECT\s+(?P<select>.+?)\s+FROM\s+(?P<table>{_IDENTIFIER})'
+    rf'(?:\s+(?:AS\s+)?(?!(?:WHERE|ORDER)\b){_IDENTIFIER})?'
+    rf'(?:\s+WHERE\s+.+?)?'
+    rf'\s+ORDER\s+BY\s+(?:{_IDENTIFIER}\s*\.\s*)?(?P<key>{_IDENTIFIER})(?:\s+(?P<direction>ASC|DESC))?$',
+    re.IGNORECASE | re.DOTALL)
+# Clauses after which the ORDER BY column no longer identifies one row per key
+_NOT_KEYSET = re.compile(r'\b(?:JOIN|GROUP|HAVING|WINDOW|UNION|INTERSECT|EXCEPT|LIMIT|DISTINCT)\b', re.IGNORECASE)
+
+CONSISTENCY_WARNINGS = {
+    'offset': ("Pages are separate LIMIT/OFFSET reads because the database is not in WAL mode; "
+               "rows written between pages can be skipped or repeated. Order by a unique column "
+               "to page by key instead"),
+    'keyset': ("Pages are separate reads because the database is not in WAL mode; each continues "
+               "after the last {key} seen, so rows written between pages may be missed or included "
+               "but none repeat"),
+}
+
+
+def _unquote(name):
+    if name[:1] in ('"', '[', '`'):
+        name = name[1:-1]
+    return name.replace('""', '"')
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _split_select_list(select):
+    """Split a select list on its top-level commas"""
+    items, depth, start = [], 0, 0
+    for i, char in enumerate(select):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            items.append(select[start:i].strip())
+            start = i + 1
+    items.append(select[start:].strip())
+    return items
+
+
+def _keyset_key(conn, query):
+    """
+    Find the column a query can be paged by key on.
+
+    The query must read a single table, be ordered by one column that the
+    table's INTEGER PRIMARY KEY or a single-column unique index on a NOT
+    NULL column covers, and return that column under its own name.
+
+    Returns:
+        tuple: (column name, True if descending), or None
+    """
+    text = _STRING.sub("''", query)
+    match = _KEYSET_QUERY.match(text)
+    if match is None or _NOT_KEYSET.search(text):
+        return None
+    key = _unquote(match.group('key'))
+    selected = False
+    for item in _split_select_list(match.group('select')):
+        column = re.fullmatch(rf'(?:{_IDENTIFIER}\s*\.\s*)?({_IDENTIFIER})', item)
+        if column:
+            selected = selected or _unquote(column.group(1)).lower() == key.lower()
+        elif item == '*' or item.endswith('.*'):
+            selected = True
+        else:
+            alias = re.search(rf'(?:\bAS\s+|\s)({_IDENTIFIER})$', item, re.IGNORECASE)
+            if alias and _unquote(alias.group(1)).lower() == key.lower():
+                # ORDER BY would refer to this expression, not the column
+                return None
+    if not selected:
+        return None
+
+    table = _quote(_unquote(match.group('table')))
+    info = {row[1].lower(): row for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    column = info.get(key.lower())
+    if column is None:
+        return None
+    primary_key = [row for row in info.values() if row[5]]
+    unique = column[2].upper() == 'INTEGER' and primary_key == [column]
+    if not unique and column[3]:
+        for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+            if index[2] and not index[4]:
+                index_columns = conn.execute(f"PRAGMA index_info({_quote(index[1])})").fetchall()
+                if [row[2].lower() for row in index_columns] == [key.lower()]:
+                    unique = True
+                    break
+    if not unique:
+        return None
+    return column[1], (match.group('direction') or '').upper() == 'DESC'
+
+
+class _PageCursor:
+    """State for one paged query"""
+
+    def __init__(self, query, params, mode):
+        self.query = query
+        self.params = params
+        # 'held', 'offset', or 'keyset' once the first page finds a key column
+        self.mode = mode
+        self.key = None
+        self.after = None
+        self.offset = 0
+        self.page = 0
+        self.columns = None
+        self.conn = None
+        self.cursor = None
+        # Held cursors read one row ahead to know whether another page exists
+        self.lookahead = []
+        self.lock = threading.RLock()
+        self.closed = False
+        self.last_used = time.monotonic()
+
+
+class ResultPager:
+    """Serve query results page by page behind continuation tokens"""
+
+    def __init__(self, pool, ttl=DEFAULT_CURSOR_TTL, max_cursors=DEFAULT_MAX_CURSORS):
+        """
+        Args:
+            pool (ConnectionPool): Pool that supplies connections
+            ttl (float): Seconds an unused cursor stays open before it expires
+            max_cursors (int): Maximum number of open cursors; the least
+                recently used one is closed to make room for a new query
+        """
+        self.pool = pool
+        self.ttl = ttl
+        self.max_cursors = max(1, int(max_cursors))
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self._stats = {'opened': 0, 'expired': 0, 'evicted': 0, 'pages_served': 0}
+
+    @staticmethod
+    def _page_size(page_size):
+        page_size = DEFAULT_PAGE_SIZE if page_size is None else int(page_size)
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        return min(page_size, MAX_PAGE_SIZE)
+
+    def _uses_held_cursor(self):
+        return self.pool.journal_mode == 'wal' and not self.pool.shared_connection
+
+    def open(self, query, params=None, page_size=None):
+        """
+        Start a paged query and return its first page.
+
+        Args:
+            query (str): SELECT statement
+            params (list or dict): Optional positional or named parameters
+            page_size (int): Rows per page
+
+        Returns:
+            dict: First page (see fetch())
+        """
+        page_size = self._page_size(page_size)
+        self.sweep()
+        query = query.strip().rstrip(';')
+        params = dict(params) if isinstance(params, dict) else list(params or [])
+        state = _PageCursor(query, params, 'held' if self._uses_held_cursor() else 'offset')
+        if state.mode == 'held':
+            state.conn = self.pool.open_dedicated('cursor')
+            try:
+                self.pool.record_statement(state.conn, query)
+                state.cursor = state.conn.execute(query, state.params)
+            except Exception:
+                self.pool.close_dedicated(state.conn)
+                raise
+            state.columns = [col[0] for col in state.cursor.description or []]
+
+        token = secrets.token_urlsafe(16)
+        evicted = []
+        with self._lock:
+            self._cursors[token] = state
+            self._stats['opened'] += 1
+            while len(self._cursors) > self.max_cursors:
+                oldest = min(self._cursors, key=lambda t: self._cursors[t].last_used)
+                evicted.append(self._cursors.pop(oldest))
+            self._stats['evicted'] += len(evicted)
+        for old in evicted:
+            self._close_state(old)
+        return self._next_page(token, state, page_size)
+
+    def fetch(self, token, page_size=None):
+        """
+        Fetch the next page for a continuation token.
+
+        Args:
+            token (str): Token returned with the previous page
+            page_size (int): Rows per page
+
+        Returns:
+            dict: rows, columns, page number, row offset, has_more, the
+                token for the following page (None once exhausted), and
+                consistent, false with a warning when pages are separate reads
+        """
+        page_size = self._page_size(page_size)
+        self.sweep()
+        with self._lock:
+            state = self._cursors.get(token)
+        if state is None:
+            raise ValueError("Unknown or expired cursor; re-run the query to start over")
+        return self._next_page(token, state, page_size)
+
+    def _next_page(self, token, state, page_size):
+        with state.lock:
+            if state.closed:
+                raise ValueError("Unknown or expired cursor; re-run the query to start over")
+            try:
+                if state.mode == 'held':
+                    rows = state.lookahead + state.cursor.fetchmany(page_size + 1 - len(state.lookahead))
+                    state.lookahead = rows[page_size:]
+                else:
+                    with self.pool.reader() as conn:
+                        if state.page == 0:
+                            state.key = _keyset_key(conn, state.query)
+                        sql, params = self._page_statement(state, page_size)
+                        self.pool.record_statement(conn, sql)
+                        cursor = conn.execute(sql, params)
+                        rows = cursor.fetchall()
+                        if state.columns is None:
+                            state.columns = [col[0] for col in cursor.description or []]
+                    if state.key is not None and state.key[0] in state.columns:
+                        state.mode = 'keyset'
+                        if rows:
+                            state.after = rows[min(len(rows), page_size) - 1][state.key[0]]
+            except Exception:
+                self.close(token)
+                raise
+
+            has_more = len(rows) > page_size
+            rows = [dict(row) for row in rows[:page_size]]
+            page = {
+                'columns': state.columns,
+                'rows': rows,
+                'page': state.page,
+                'row_offset': state.offset,
+                'has_more': has_more,
+                'cursor': token if has_more else None,
+                'consistent': state.mode == 'held',
+            }
+            if state.mode != 'held':
+                page['warning'] = CONSISTENCY_WARNINGS[state.mode].format(key=state.key[0] if state.key else None)
+            state.page += 1
+            state.offset += len(rows)
+            state.last_used = time.monotonic()
+
+        with self._lock:
+            self._stats['pages_served'] += 1
+        if not has_more:
+            self.close(token)
+        return page
+
+    @staticmethod
+    def _page_statement(state, page_size):
+        """
+        Build the statement for a re-run page.
+
+        Keyset pages continue after the last key seen; the first page and
+        queries without a key column skip the rows already served. Paging
+        values are bound as parameters so every page reuses the same
+        prepared statement.
+        """
+        named = isinstance(state.params, dict)
+        limit = ':_page_limit' if named else '?'
+        if state.mode == 'keyset' and state.after is not None:
+            key, descending = state.key
+            after = ':_page_after' if named else '?'
+            sql = (f"SELECT * FROM ({state.query}) WHERE {_quote(key)} {'<' if descending else '>'} {after} "
+                   f"ORDER BY {_quote(key)}{' DESC' if descending else ''} LIMIT {limit}")
+            if named:
+                return sql, {**state.params, '_page_after': state.after, '_page_limit': page_size + 1}
+            return sql, state.params + [state.after, page_size + 1]
+        sql = f"SELECT * FROM ({state.query}) LIMIT {limit} OFFSET {':_page_offset' if named else '?'}"
+        if named:
+            return sql, {**state.params, '_page_limit': page_size + 1, '_page_offset': state.offset}
+        return sql, state.params + [page_size + 1, state.offset]
+
+    def close(self, token):
+        """
+        Close a cursor before it is exhausted.
+
+        Returns:
+            bool: True if the token referred to an open cursor
+        """
+        with self._lock:
+            state = self._cursors.pop(token, None)
+        if state is None:
+            return False
+        self._close_state(state)
+        return True
+
+    def _close_state(self, state):
+        with state.lock:
+            state.closed = True
+            if state.conn is not None:
+                try:
+                    state.cursor.close()
+                except Exception:
+                    pass
+                self.pool.close_dedicated(state.conn)
+                state.conn = state.cursor = None
+
+    def sweep(self):
+        """Close cursors that have not been used within the TTL"""
+        cutoff = time.monotonic() - self.ttl
+        with self._lock:
+            expired = [t for t, state in self._cursors.items() if state.last_used < cutoff]
+            states = [self._cursors.pop(t) for t in expired]
+            self._stats['expired'] += len(states)
+        for state in states:
+            self._close_state(state)
+        if states:
+            logger.info(f"Closed {len(states)} expired result cursors")
+        return len(states)
+
+    def stats(self):
+        """Return cursor counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['open_cursors'] = len(self._cursors)
+        stats['ttl_seconds'] = self.ttl
+        return stats
+
+    def close_all(self):
+        """Close every open cursor"""
+        with self._lock:
+            states = list(self._cursors.values())
+            self._cursors.clear()
+        for state in states:
+            self._close_state(state)
@@ -0,0 +1,279 @@
+"""
+Query Statistics Module for SQLite MCP Server
+
+This module aggregates executed statements per query fingerprint, in the
+style of PostgreSQL's pg_stat_statements. A fingerprint is the SQL text
+with comments, literals and bound parameter markers replaced by '?', IN
+lists and multi-row VALUES collapsed, and whitespace normalized, so the
+same agent-generated query with different constants is counted once.
+
+For every fingerprint the module keeps calls, errors, rows, and total,
+mean, min and max time, and counts the calls slower than a threshold. Slow
+statements are also kept in a short log of recent offenders. Aggregates
+are held in memory, bounded in the number of fingerprints, and saved to a
+JSON sidecar file next to the database so they survive restarts. The file
+is rewritten as statements are recorded, at most every SAVE_INTERVAL
+seconds unless SAVE_EVERY_RECORDS executions pile up first, because a
+stdio server is usually stopped by killing it, without a clean shutdown.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_SLOW_QUERY_MS = 100.0
+DEFAULT_MAX_FINGERPRINTS = 1000
+SLOW_LOG_SIZE = 100
+SIDECAR_SUFFIX = '.query-stats.json'
+# Longest example statement kept per fingerprint
+MAX_EXAMPLE_LENGTH = 1000
+# Unsaved aggregates are written once this many seconds have passed since
+# the last save, or once this many executions have been recorded
+SAVE_INTERVAL = 30.0
+SAVE_EVERY_RECORDS = 500
+
+ORDER_BY = {
+    'total_time': 'total_ms',
+    'mean_time': 'mean_ms',
+    'max_time': 'max_ms',
+    'calls': 'calls',
+    'rows': 'rows',
+    'slow_calls': 'slow_calls',
+    'errors': 'errors',
+}
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_LITERALS = re.compile(
+    r"'(?:[^']|'')*'"                              # string literals
+    r"|\b[xX]'[0-9a-fA-F]*'"                       # blob literals
+    r"|(?<![\w.])\d+(?:\.\d*)?(?:[eE][+-]?\d+)?\b"  # numeric literals
+    r"|(?<![\w.])\.\d+(?:[eE][+-]?\d+)?\b"
+    r"|\?\d*|[:@$][A-Za-z_]\w*"                    # parameter markers
+)
+_NEGATIVE = re.compile(r"([(,=<>]|\bTHEN|\bELSE|\bAND|\bOR|\bBETWEEN)(\s*)-\s*\?", re.IGNORECASE)
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_ROWS = re.compile(r"(\(\.\.\.\)|\(\s*\?\s*\))(?:\s*,\s*(?:\(\.\.\.\)|\(\s*\?\s*\)))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(query):
+    """
+    Return the normalized form of a statement.
+
+    >>> fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'")
+    'SELECT * FROM t WHERE id IN (...) AND name = ?'
+    """
+    text = _COMMENTS.sub(' ', query)
+    text = _LITERALS.sub('?', text)
+    text = _NEGATIVE.sub(r'\1\2?', text)
+    text = _PLACEHOLDER_LIST.sub('(...)', text)
+    text = _VALUES_ROWS.sub(r'\1', text)
+    text = _WHITESPACE.sub(' ', text).strip().rstrip(';').rstrip()
+    return text
+
+
+def query_id(normalized):
+    """Return a short stable identifier for a fingerprint"""
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def sidecar_path(db_path):
+    """Return the statistics file kept next to a database, or None for :memory:"""
+    if not db_path or db_path == ':memory:':
+        return None
+    return db_path + SIDECAR_SUFFIX
+
+
+class QueryStats:
+    """Per-fingerprint statement statistics with a slow query log"""
+
+    def __init__(self, path=None, slow_ms=DEFAULT_SLOW_QUERY_MS, max_fingerprints=DEFAULT_MAX_FINGERPRINTS):
+        """
+        Args:
+            path (str, optional): Sidecar JSON file the aggregates are loaded
+                from and saved to
+            slow_ms (float): Statements at or above this many milliseconds are
+                counted as slow and added to the slow query log
+            max_fingerprints (int): Fingerprints kept before the one with the
+                least total time is evicted
+        """
+        self.path = path
+        self.slow_ms = float(slow_ms)
+        self.max_fingerprints = max(1, int(max_fingerprints))
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._slow_log = deque(maxlen=SLOW_LOG_SIZE)
+        self._since = time.time()
+        self._evicted = 0
+        self._dirty = False
+        self._unsaved = 0
+        self._last_save = None
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+            self._entries = {entry['query_id']: entry for entry in saved.get('fingerprints', [])}
+            self._since = saved.get('since', self._since)
+            logger.debug(f"Loaded statistics for {len(self._entries)} query fingerprints from {self.path}")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable query statistics file {self.path}: {e}")
+            self._entries = {}
+
+    def record(self, query, elapsed_ms, rows=0, error=False):
+        """
+        Add one execution of a statement.
+
+        Args:
+            query (str): SQL text as executed
+            elapsed_ms (float): Wall time of the execution
+            rows (int): Rows returned or affected
+            error (bool): Whether the statement failed
+        """
+        normalized = fingerprint(query)
+        qid = query_id(normalized)
+        slow = elapsed_ms >= self.slow_ms
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(qid)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    victim = min(self._entries.values(), key=lambda e: e['total_ms'])
+                    del self._entries[victim['query_id']]
+                    self._evicted += 1
+                entry = self._entries[qid] = {
+                    'query_id': qid,
+                    'fingerprint': normalized,
+                    'example': query[:MAX_EXAMPLE_LENGTH],
+                    'calls': 0,
+                    'errors': 0,
+                    'rows': 0,
+                    'total_ms': 0.0,
+                    'min_ms': elapsed_ms,
+                    'max_ms': elapsed_ms,
+                    'slow_calls': 0,
+                    'first_seen': now,
+                }
+            entry['calls'] += 1
+            entry['errors'] += bool(error)
+            entry['rows'] += rows or 0
+            entry['total_ms'] += elapsed_ms
+            entry['min_ms'] = min(entry['min_ms'], elapsed_ms)
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['slow_calls'] += slow
+            entry['last_seen'] = now
+            if slow:
+                self._slow_log.append({
+                    'query_id': qid,
+                    'query': query[:MAX_EXAMPLE_LENGTH],
+                    'elapsed_ms': round(elapsed_ms, 3),
+                    'rows': rows,
+                    'error': bool(error),
+                    'at': now,
+                })
+            self._dirty = True
+            self._unsaved += 1
+            save_due = (self._last_save is None or self._unsaved >= SAVE_EVERY_RECORDS
+                        or time.monotonic() - self._last_save >= SAVE_INTERVAL)
+        if slow:
+            logger.info(f"Slow query ({elapsed_ms:.1f} ms, id {qid}): {normalized[:200]}")
+        if save_due:
+            self.save()
+
+    @staticmethod
+    def _report(entry):
+        report = dict(entry)
+        report['mean_ms'] = round(entry['total_ms'] / entry['calls'], 3)
+        for key in ('total_ms', 'min_ms', 'max_ms'):
+            report[key] = round(entry[key], 3)
+        for key in ('first_seen', 'last_seen'):
+            report[key] = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(entry[key]))
+        return report
+
+    def top(self, limit=10, order_by='total_time'):
+        """
+        Return the most expensive fingerprints.
+
+        Args:
+            limit (int): Number of fingerprints to return
+            order_by (str): One of ORDER_BY
+
+        Returns:
+            list: Fingerprint reports, worst first
+        """
+        if order_by not in ORDER_BY:
+            raise ValueError(f"order_by must be one of: {', '.join(ORDER_BY)}")
+        with self._lock:
+            reports = [self._report(entry) for entry in self._entries.values()]
+        reports.sort(key=lambda r: r[ORDER_BY[order_by]], reverse=True)
+        return reports[:max(0, int(limit))]
+
+    def slow_queries(self, limit=20):
+        """Return the most recent slow statements, newest first"""
+        with self._lock:
+            recent = list(self._slow_log)[-max(0, int(limit)):] if limit else []
+        return [dict(item, at=time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(item['at'])))
+                for item in reversed(recent)]
+
+    def stats(self):
+        """Return totals across all fingerprints"""
+        with self._lock:
+            calls = sum(entry['calls'] for entry in self._entries.values())
+            total_ms = sum(entry['total_ms'] for entry in self._entries.values())
+            return {
+                'since': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._since)),
+                'fingerprints': len(self._entries),
+                'max_fingerprints': self.max_fingerprints,
+                'evicted': self._evicted,
+                'calls': calls,
+                'total_ms': round(total_ms, 3),
+                'slow_query_ms': self.slow_ms,
+                'sidecar_file': self.path,
+            }
+
+    def reset(self):
+        """Discard all statistics"""
+        with self._lock:
+            self._entries = {}
+            self._slow_log.clear()
+            self._since = time.time()
+            self._evicted = 0
+            self._dirty = True
+        self.save()
+
+    def save(self):
+        """Write the aggregates to the sidecar file if anything changed"""
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                saved = {'since': self._since, 'fingerprints': [dict(entry) for entry in self._entries.values()]}
+                self._dirty = False
+                self._unsaved = 0
+                self._last_save = time.monotonic()
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(saved, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Failed to save query statistics to {self.path}: {e}")
+
+    def close(self):
+        """Save the aggregates"""
+        self.save()
@@ -0,0 +1,185 @@
+"""
+Result Cache Module for SQLite MCP Server
+
+This module keeps the rows of recent read queries in a byte-bounded LRU
+cache keyed on the SQL text and its parameters, so repeated analytic
+queries in one session do not rescan their tables.
+
+Entries are only served while the database is unchanged. Before each
+lookup the cache reads a version made of the pool's write generation
+(bumped whenever the writer connection is released), PRAGMA data_version
+on a dedicated monitor connection (which changes when any other connection
+or process commits), and PRAGMA schema_version. Any change clears the cache.
+"""
+
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+# Read statements whose results are worth caching; PRAGMA lookups other
+# than the schema ones report connection state or are cheap already
+_CACHEABLE = re.compile(
+    r"^\s*(SELECT|WITH|PRAGMA\s+(?:\w+\.)?(table_info|table_xinfo|index_list|index_info|index_xinfo|foreign_key_list)\b)",
+    re.IGNORECASE,
+)
+
+# Results that change without any write to the database
+_NON_DETERMINISTIC = re.compile(
+    r"\b(random|randomblob|changes|total_changes|last_insert_rowid)\s*\("
+    r"|\b(CURRENT_TIMESTAMP|CURRENT_DATE|CURRENT_TIME)\b"
+    r"|'now'",
+    re.IGNORECASE,
+)
+
+# Rough per-object overheads used to estimate the memory an entry holds
+_ROW_OVERHEAD = 64
+_VALUE_OVERHEAD = 16
+
+
+def _estimate_size(rows):
+    size = 0
+    for row in rows:
+        size += _ROW_OVERHEAD
+        for key, value in row.items():
+            size += _VALUE_OVERHEAD + len(key)
+            if isinstance(value, (str, bytes)):
+                size += len(value)
+    return size
+
+
+class ResultCache:
+    """Byte-bounded LRU cache of read query results"""
+
+    def __init__(self, pool, max_bytes=0):
+        """
+        Args:
+            pool (ConnectionPool): Pool whose database the cached rows come from
+            max_bytes (int): Memory budget for cached rows; 0 disables the cache
+        """
+        self.pool = pool
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._monitor_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'uncacheable': 0}
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def cacheable(query):
+        """Return True if the statement is a deterministic read"""
+        return bool(_CACHEABLE.match(query)) and not _NON_DETERMINISTIC.search(query)
+
+    @staticmethod
+    def key(query, params=None):
+        """Build a hashable key from the SQL text and its parameters"""
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        elif params:
+            params = tuple(params)
+        else:
+            params = ()
+        key = (query, params)
+        hash(key)
+        return key
+
+    def version(self):
+        """
+        Read the current database version.
+
+        Returns:
+            tuple: Write generation, data_version and schema_version
+        """
+        if self.pool.shared_connection:
+            # Nothing outside this process can write to an in-memory database
+            return (self.pool.write_generation,)
+        with self._monitor_lock:
+            try:
+                if self._monitor is None:
+                    self._monitor = self.pool.open_dedicated('cache-monitor')
+                data_version = self._monitor.execute("PRAGMA data_version").fetchone()[0]
+                schema_version = self._monitor.execute("PRAGMA schema_version").fetchone()[0]
+            except Exception:
+                if self._monitor is not None:
+                    self.pool.close_dedicated(self._monitor)
+                    self._monitor = None
+                raise
+        return (self.pool.write_generation, data_version, schema_version)
+
+    def get(self, key, version):
+        """
+        Look up cached rows, clearing the cache if the database changed.
+
+        Returns:
+            list: Copies of the cached rows, or None on a miss
+        """
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self._stats['invalidations'] += 1
+                self._entries.clear()
+                self._bytes = 0
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+        return [dict(row) for row in entry[0]]
+
+    def put(self, key, version, rows):
+        """Store rows read at the given version, evicting old entries as needed"""
+        size = _estimate_size(rows)
+        with self._lock:
+            # Rows read before a concurrent write must not outlive it
+            if version != self._version:
+                return
+            if size > self.max_bytes // 2:
+                self._stats['uncacheable'] += 1
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = ([dict(row) for row in rows], size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return hit, miss and eviction counters and current usage"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            })
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+        return stats
+
+    def close(self):
+        """Close the monitor connection"""
+        self.clear()
+        with self._monitor_lock:
+            if self._monitor is not None:
+                self.pool.close_dedicated(self._monitor)
+                self._monitor = None
@@ -0,0 +1,131 @@
+"""
+Schema Catalog Module for SQLite MCP Server
+
+This module caches the table and column catalog behind the database://schema
+and database://statistics resources. The catalog is rebuilt only when
+PRAGMA schema_version changes, so reading the resources no longer runs
+PRAGMA table_info for every table each time.
+
+Row counts come from the estimates ANALYZE stores in sqlite_stat1 instead of
+a full COUNT(*) scan per table; exact counts are computed only on request.
+The table the server keeps its column sketches in is left out.
+"""
+
+import logging
+import threading
+import time
+
+from .sketch_store import SKETCH_TABLE
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+
+def _quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SchemaCatalog:
+    """Table and column catalog cached per schema version"""
+
+    def __init__(self, pool):
+        """
+        Args:
+            pool (ConnectionPool): Pool used to read the catalog
+        """
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._catalog = None
+        self._stats = {'hits': 0, 'rebuilds': 0}
+
+    def _build(self, conn, schema_version):
+        tables = []
+        rows = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type='table' AND name != ? ORDER BY name",
+            (SKETCH_TABLE,)).fetchall()
+        for row in rows:
+            columns = [dict(col) for col in
+                       conn.execute(f"PRAGMA table_info({_quote_identifier(row['name'])})").fetchall()]
+            tables.append({'name': row['name'], 'sql': row['sql'], 'columns': columns})
+        logger.debug(f"Schema catalog rebuilt for schema_version {schema_version} ({len(tables)} tables)")
+        return {
+            'schema_version': schema_version,
+            'captured_at': time.time(),
+            'tables': tables,
+        }
+
+    @staticmethod
+    def _row_estimates(conn, table_names):
+        """
+        Read row count estimates from sqlite_stat1.
+
+        The first number in each stat entry is the row count ANALYZE saw for
+        the table (idx IS NULL) or for one of its indexes, which matches the
+        table unless the index is partial, so the largest value is used.
+        """
+        if 'sqlite_stat1' not in table_names:
+            return {}
+        estimates = {}
+        for row in conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall():
+            try:
+                count = int(str(row['stat']).split()[0])
+            except (ValueError, IndexError):
+                continue
+            estimates[row['tbl']] = max(count, estimates.get(row['tbl'], 0))
+        return estimates
+
+    def snapshot(self, exact_counts=False):
+        """
+        Return the catalog with row counts.
+
+        Args:
+            exact_counts (bool): Run COUNT(*) on every table instead of using
+                sqlite_stat1 estimates
+
+        Returns:
+            dict: schema_version, snapshot age and one entry per table with
+                columns, row_count and row_count_source ('sqlite_stat1',
+                'exact' or 'unavailable' when the table was never analyzed)
+        """
+        with self.pool.reader() as conn:
+            schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+            with self._lock:
+                if self._catalog is None or self._catalog['schema_version'] != schema_version:
+                    self._catalog = self._build(conn, schema_version)
+                    self._stats['rebuilds'] += 1
+                else:
+                    self._stats['hits'] += 1
+                catalog = self._catalog
+
+            names = {table['name'] for table in catalog['tables']}
+            estimates = {} if exact_counts else self._row_estimates(conn, names)
+            tables = []
+            for table in catalog['tables']:
+                entry = dict(table)
+                if exact_counts:
+                    try:
+                        entry['row_count'] = conn.execute(
+                            f"SELECT COUNT(*) FROM {_quote_identifier(table['name'])}").fetchone()[0]
+                        entry['row_count_source'] = 'exact'
+                    except Exception as e:
+                        entry['row_count'] = None
+                        entry['row_count_source'] = f"error: {e}"
+                elif table['name'] in estimates:
+                    entry['row_count'] = estimates[table['name']]
+                    entry['row_count_source'] = 'sqlite_stat1'
+                else:
+                    entry['row_count'] = None
+                    entry['row_count_source'] = 'unavailable'
+                tables.append(entry)
+
+        return {
+            'schema_version': catalog['schema_version'],
+            'catalog_captured_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(catalog['captured_at'])),
+            'catalog_age_seconds': round(time.time() - catalog['captured_at'], 1),
+            'row_counts': 'exact' if exact_counts else 'estimated',
+            'tables': tables,
+        }
+
+    def stats(self):
+        """Return catalog cache counters"""
+        with self._lock:
+            return dict(self._stats)
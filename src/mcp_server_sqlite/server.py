@@ -1,27 +1,51 @@
+import asyncio
 import sqlite3
 import logging
 import json
 import os
 import re
-import difflib
-import unicodedata
 import math
+import sys
+import threading
+import time
 from contextlib import closing
 from pathlib import Path
+from functools import cached_property
+from urllib.parse import parse_qs
+from .startup import STARTUP
 from mcp.server.models import InitializationOptions
 import mcp.types as types
 from mcp.server import NotificationOptions, Server
 import mcp.server.stdio
 from pydantic import AnyUrl
 from typing import Any, Dict, List, Optional, Union
+STARTUP.mark('import MCP SDK')
 
 from .sqlite_version import check_sqlite_version
 from .jsonb_utils import convert_to_jsonb, convert_from_jsonb, validate_json
 from .db_integration import DatabaseIntegration
+from .transaction_safety import safe_execute_many
+from .connection_pool import ConnectionPool, DEFAULT_POOL_SIZE, DEFAULT_CACHED_STATEMENTS, pragma_assignment_name
+from .executor import ToolExecutor, DEFAULT_WORKER_THREADS
+from .pagination import ResultPager, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .write_coalescer import WriteCoalescer, DEFAULT_WRITE_WINDOW_MS, DEFAULT_WRITE_BATCH_MAX
+from .result_cache import ResultCache
+from .schema_catalog import SchemaCatalog
+from .metrics import MetricsRegistry
+from .deadlines import StatementDeadlines, DEFAULT_STATEMENT_TIMEOUT
+from .metrics_exporter import DEFAULT_EXPORT_INTERVAL, MetricsExporter
+from .index_advisor import IndexAdvisor, DEFAULT_MIN_ROWS, DEFAULT_WORKLOAD_SIZE, DEFAULT_MAX_DRY_RUN_MB
+from .query_stats import QueryStats, DEFAULT_SLOW_QUERY_MS, ORDER_BY as QUERY_STATS_ORDER_BY, sidecar_path
 from .error_handler import SqliteErrorHandler
 from .json_logger import JsonLogger
 from .schema_updater import SchemaUpdater
 from .diagnostics import DiagnosticsService
+from .aggregates import register_aggregates, PERCENTILE_METHODS
+from .sketch_store import SketchStore, SKETCH_TABLE
+from .correlation import correlation_matrix
+from .sketches import kll_k_for_error, hll_standard_error, DEFAULT_HLL_PRECISION, MIN_HLL_PRECISION, MAX_HLL_PRECISION
+from .tool_catalog import ToolCatalog
+STARTUP.mark('import server modules')
 
 # Load configuration from environment first
 DEBUG_MODE = os.environ.get('SQLITE_DEBUG', 'false').lower() in ('true', '1', 'yes')
@@ -35,6 +59,11 @@ if not DEBUG_MODE:
 
 logger.info("Starting Enhanced MCP SQLite Server with JSONB support")
 LOG_DIR = os.environ.get('SQLITE_LOG_DIR', './logs')
+# Structured operation log: level, sampling and rotation of the JSONL file in LOG_DIR
+LOG_LEVEL = os.environ.get('SQLITE_LOG_LEVEL', 'debug' if DEBUG_MODE else 'warning')
+LOG_SAMPLE_RATE = float(os.environ.get('SQLITE_LOG_SAMPLE_RATE', '1.0'))
+LOG_MAX_BYTES = int(os.environ.get('SQLITE_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.environ.get('SQLITE_LOG_BACKUP_COUNT', '5'))
 JSONB_ENABLED = os.environ.get('SQLITE_JSONB_ENABLED', 'true').lower() in ('true', '1', 'yes')
 
 PROMPT_TEMPLATE = """
@@ -118,18 +147,65 @@ The provided XML tags are for the assistants understanding. Implore to make all
 Start your first message fully in character with something like "Oh, Hey there! I see you've chosen the topic {topic}. Let's get started! 🚀"
 """
 
+def _query_params(arguments):
+    """Return the optional params argument of a query tool as a list or dict"""
+    params = arguments.get("params")
+    if params is not None and not isinstance(params, (list, dict)):
+        raise ValueError("params must be an array of positional values or an object of named values")
+    return params
+
+def _sketch_note(sketch, info):
+    """Describe how accurate a KLL sketch's answers are and how the sketch was brought up to date"""
+    accuracy = ("exact, every value fits in the sketch" if sketch.exact
+                else f"approximate, rank error within ±{sketch.rank_error():.2%} at 99% confidence")
+    return f"KLL sketch k={sketch.k}, {accuracy}; sketch {info['source']}, {info['rows_scanned']:,} rows scanned"
+
+def _hll_note(sketch, info):
+    """Describe how accurate a HyperLogLog estimate is and how its sketch was brought up to date"""
+    return (f"HyperLogLog p={sketch.precision}, ±{sketch.standard_error():.2%} standard error; "
+            f"sketch {info['source']}, {info['rows_scanned']:,} values scanned")
+
+def _format_matrix(names, matrix, value_format):
+    """Lay out a square matrix as a text table with the names as row and column headers"""
+    cells = [[value_format.format(value) if value is not None else "N/A" for value in row] for row in matrix]
+    width = max(len(cell) for row in cells + [names] for cell in row) + 2
+    label_width = max(len(name) for name in names)
+    lines = [" " * label_width + "".join(name.rjust(width) for name in names)]
+    for name, row in zip(names, cells):
+        lines.append(name.ljust(label_width) + "".join(cell.rjust(width) for cell in row))
+    return "\n".join(lines)
+
 class EnhancedSqliteDatabase:
     """Enhanced SQLite database with JSONB support and improved error handling"""
     
     # Class variable to store SpatiaLite extension path
     _spatialite_path = None
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, pool_size: int = DEFAULT_POOL_SIZE, wal: bool = False,
+                 worker_threads: int = DEFAULT_WORKER_THREADS, process_workers: int = 0,
+                 cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+                 write_window_ms: float = DEFAULT_WRITE_WINDOW_MS,
+                 write_batch_max: int = DEFAULT_WRITE_BATCH_MAX,
+                 result_cache_mb: float = 0,
+                 slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+                 statement_timeout: float = DEFAULT_STATEMENT_TIMEOUT,
+                 tool_timeouts: Optional[Dict[str, float]] = None):
         """
         Initialize the database connection.
         
         Args:
             db_path: Path to SQLite database file (can be :memory: for temporary)
+            pool_size: Number of pooled reader connections
+            wal: Run the database in WAL journal mode
+            worker_threads: Number of threads that run tool calls off the event loop
+            process_workers: Number of processes for CPU-heavy text scoring (0 = disabled)
+            cached_statements: Prepared statement cache size for each pooled connection
+            write_window_ms: How long concurrent writes are collected into one transaction
+            write_batch_max: Maximum writes committed together in one transaction
+            result_cache_mb: Memory budget for cached read results (0 = disabled)
+            slow_query_ms: Statements at least this slow are counted and logged as slow
+            statement_timeout: Seconds a tool call's SQL may run before it is interrupted (0 = no limit)
+            tool_timeouts: Per-tool overrides of statement_timeout
         """
         self.db_path = str(Path(db_path).expanduser())
         if db_path != ":memory:":
@@ -137,16 +213,58 @@ class EnhancedSqliteDatabase:
         
         # Initialize components
         self.version_info = check_sqlite_version()
+        STARTUP.mark('check SQLite version')
+        
+        # Persistent connections shared by every tool call
+        self.pool = ConnectionPool(self.db_path, size=pool_size, wal=wal, cached_statements=cached_statements)
+        STARTUP.mark('open connection pool')
+        
+        # Statistical aggregates such as moments() on every pooled connection
+        self.pool.add_session_step(register_aggregates)
+        
+        # Per-tool latency, error, row and pool wait measurements
+        self.metrics = MetricsRegistry(self.pool)
+        
+        # Interrupt SQL that runs past its tool's deadline or whose request was cancelled
+        self.deadlines = StatementDeadlines(self.pool, statement_timeout, tool_timeouts)
+        
+        # Blocking tool work runs here instead of on the asyncio event loop
+        self.executor = ToolExecutor(worker_threads, process_workers)
+        STARTUP.mark('start tool executor')
+        
+        # Continuation cursors for paged read_query results
+        self.pager = ResultPager(self.pool)
+        
+        # Concurrent writes from different tool calls share one commit
+        self.write_coalescer = WriteCoalescer(self.pool, write_window_ms, write_batch_max, self.deadlines)
+        
+        # Opt-in cache of read results, cleared whenever the database changes
+        self.result_cache = ResultCache(self.pool, int(result_cache_mb * 1024 * 1024))
+        
+        # Table and column catalog, rebuilt only when the schema changes
+        self.schema_catalog = SchemaCatalog(self.pool)
+        
+        # Approximate quantile sketches, stored in the database and extended from new rowids
+        self.sketch_store = SketchStore(self.pool)
+        
+        # Per-fingerprint statement statistics, kept in a sidecar file next to the database
+        self.query_stats = QueryStats(sidecar_path(self.db_path), slow_query_ms)
+        STARTUP.mark('load caches and query statistics')
         
         # Setup JSON logger
         self.json_logger = JsonLogger({
             'log_dir': LOG_DIR,
             'enabled': True,
-            'log_level': 'debug' if DEBUG_MODE else 'info'
+            'log_level': LOG_LEVEL,
+            'sample_rate': LOG_SAMPLE_RATE,
+            'max_bytes': LOG_MAX_BYTES,
+            'backup_count': LOG_BACKUP_COUNT,
+            'echo': DEBUG_MODE
         })
         
         self.schema_updater = SchemaUpdater(self.db_path)
         self.diagnostics = DiagnosticsService(self.db_path, self.json_logger)
+        STARTUP.mark('open JSON log')
         
         # Initialize database
         self._init_database()
@@ -161,66 +279,61 @@ class EnhancedSqliteDatabase:
         
         # Check and report on metadata column status
         self._check_metadata_column()
+        STARTUP.mark('memory_journal checks')
+
+    @cached_property
+    def text_processor(self):
+        """Text tools, imported on first use so startup does not load them"""
+        from .text_processing import TextProcessor
+        return TextProcessor(self)
 
     def _init_database(self):
         """Initialize connection to the SQLite database"""
         logger.debug("Initializing database connection")
-        with closing(sqlite3.connect(self.db_path)) as conn:
-            conn.row_factory = sqlite3.Row
-            
-            # Enable foreign keys
-            conn.execute("PRAGMA foreign_keys = ON")
+        with self.pool.writer() as conn:
+            # One catalog read answers both startup checks: whether memory_journal
+            # exists and whether its validation trigger does
+            journal_objects = {row[0]: row[1] for row in conn.execute(
+                "SELECT name, type FROM sqlite_master WHERE tbl_name = 'memory_journal'").fetchall()}
+            self._has_memory_journal = journal_objects.get('memory_journal') == 'table'
             
             # Check for JSON functions
             if self.version_info['has_jsonb_support'] and JSONB_ENABLED:
                 logger.info("JSONB format is supported and enabled")
                 
                 # Try to create JSON validation trigger if needed
-                if 'memory_journal' in [t[0] for t in conn.execute(
-                    "SELECT name FROM sqlite_master WHERE type='table'").fetchall()]:
-                    
-                    # Check if trigger exists
-                    trigger_exists = conn.execute(
-                        "SELECT name FROM sqlite_master WHERE type='trigger' AND name='validate_memory_journal_metadata'"
-                    ).fetchone()
-                    
-                    if not trigger_exists:
-                        logger.info("Creating JSON validation trigger for memory_journal.metadata")
-                        try:
-                            conn.execute("""
-                                CREATE TRIGGER IF NOT EXISTS validate_memory_journal_metadata
-                                BEFORE INSERT ON memory_journal
-                                WHEN NEW.metadata IS NOT NULL
-                                BEGIN
-                                    SELECT CASE
-                                        WHEN json_valid(json(NEW.metadata)) = 0
-                                        THEN RAISE(ABORT, 'Invalid JSON in memory_journal.metadata')
-                                    END;
+                if self._has_memory_journal and 'validate_memory_journal_metadata' not in journal_objects:
+                    logger.info("Creating JSON validation trigger for memory_journal.metadata")
+                    try:
+                        conn.execute("""
+                            CREATE TRIGGER IF NOT EXISTS validate_memory_journal_metadata
+                            BEFORE INSERT ON memory_journal
+                            WHEN NEW.metadata IS NOT NULL
+                            BEGIN
+                                SELECT CASE
+                                    WHEN json_valid(json(NEW.metadata)) = 0
+                                    THEN RAISE(ABORT, 'Invalid JSON in memory_journal.metadata')
                                 END;
-                            """)
-                            conn.commit()
-                            logger.info("JSON validation trigger created successfully")
-                        except Exception as e:
-                            logger.error(f"Failed to create JSON validation trigger: {e}")
-                
-            conn.close()
+                            END;
+                        """)
+                        conn.commit()
+                        logger.info("JSON validation trigger created successfully")
+                    except Exception as e:
+                        logger.error(f"Failed to create JSON validation trigger: {e}")
+            
         # Enable transaction safety
         DatabaseIntegration.enhance_database(self)
 
     def _check_metadata_column(self):
         """Check if memory_journal.metadata is BLOB type for JSONB storage"""
+        # _init_database already looked the table up
+        if not self._has_memory_journal:
+            logger.info("memory_journal table does not exist yet")
+            return
         try:
-            with closing(sqlite3.connect(self.db_path)) as conn:
+            with self.pool.reader() as conn:
                 cursor = conn.cursor()
                 
-                # Check if memory_journal table exists
-                cursor.execute(
-                    "SELECT name FROM sqlite_master WHERE type='table' AND name='memory_journal'"
-                )
-                if not cursor.fetchone():
-                    logger.info("memory_journal table does not exist yet")
-                    return
-                
                 # Check metadata column type
                 cursor.execute("PRAGMA table_info(memory_journal)")
                 columns = cursor.fetchall()
@@ -249,6 +362,16 @@ class EnhancedSqliteDatabase:
         except Exception as e:
             logger.error(f"Failed to check metadata column: {e}")
 
+    def close(self):
+        """Shut down the tool executor and close pooled connections"""
+        self.executor.shutdown()
+        self.pager.close_all()
+        self.write_coalescer.close()
+        self.result_cache.close()
+        self.query_stats.close()
+        self.json_logger.close()
+        self.pool.close()
+
     def _synthesize_memo(self) -> str:
         """
         Synthesize business insights into a formatted memo.
@@ -273,29 +396,59 @@ class EnhancedSqliteDatabase:
         logger.debug("Generated basic memo format")
         return memo
 
-    def _load_spatialite_if_needed(self, conn, query: str):
-        """Load SpatiaLite extension if the query contains spatial functions"""
+    def enable_spatialite(self, path: str) -> Dict[str, Any]:
+        """
+        Make SpatiaLite available on every pooled connection.
         
-        spatial_functions = [
-            'spatialite_version', 'AddGeometryColumn', 'GeomFromText', 'AsText', 'AsBinary',
-            'ST_Distance', 'ST_Buffer', 'ST_Area', 'ST_Length', 'ST_Intersects', 'ST_Within',
-            'ST_Union', 'ST_Intersection', 'ST_Difference', 'ST_Centroid', 'ST_Envelope',
-            'CreateSpatialIndex', 'InitSpatialMetaData', 'DiscardGeometryColumn'
-        ]
+        The extension is loaded once per connection (new connections load it
+        as they are opened, existing ones on their next checkout) rather than
+        on every query, and spatial metadata is only initialized when the
+        spatial_ref_sys table is missing.
         
-        # Check if query contains spatial functions
-        query_upper = query.upper()
-        needs_spatialite = any(func.upper() in query_upper for func in spatial_functions)
+        Args:
+            path: Extension path that successfully loaded
+            
+        Returns:
+            Load state of the writer connection
+        """
+        # Ensure PATH includes SpatiaLite DLLs for Windows
+        script_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        local_spatialite_dir = os.path.join(script_dir, "mod_spatialite-5.1.0-win-amd64")
+        if os.path.exists(local_spatialite_dir):
+            original_path = os.environ.get('PATH', '')
+            if local_spatialite_dir not in original_path:
+                os.environ['PATH'] = local_spatialite_dir + os.pathsep + original_path
+        
+        if path != self._spatialite_path:
+            self._spatialite_path = path
+            self.pool.add_session_step(self._load_spatialite)
         
-        # Load SpatiaLite if path is available and query might need it
-        if self._spatialite_path and (needs_spatialite or 'geom' in query_upper or 'spatial' in query_upper):
+        with self.pool.writer() as conn:
+            state = {k: v for k, v in self.pool.connection_info()[0].items() if k.startswith('spatialite')}
+            if state.get('spatialite_loaded'):
+                has_metadata = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='spatial_ref_sys'"
+                ).fetchone()
+                if not has_metadata:
+                    logger.info("Initializing SpatiaLite spatial metadata")
+                    conn.execute("SELECT InitSpatialMetaData(1)")
+                    conn.commit()
+                state['spatial_metadata_initialized_now'] = not has_metadata
+        return state
+
+    def _load_spatialite(self, conn) -> Dict[str, Any]:
+        """Pool session step: load the SpatiaLite extension into one connection"""
+        try:
+            conn.enable_load_extension(True)
             try:
-                conn.enable_load_extension(True)
                 conn.load_extension(self._spatialite_path)
+            finally:
+                # Loaded functions stay available; only further loading is disabled
                 conn.enable_load_extension(False)
-            except Exception as e:
-                # Extension might already be loaded or there might be an issue
-                pass
+            return {'spatialite_loaded': True, 'spatialite_path': self._spatialite_path, 'spatialite_error': None}
+        except Exception as e:
+            logger.warning(f"SpatiaLite loading failed on pooled connection: {e}")
+            return {'spatialite_loaded': False, 'spatialite_path': self._spatialite_path, 'spatialite_error': str(e)}
     
     def _preprocess_spatial_functions(self, query: str) -> str:
         """
@@ -368,13 +521,13 @@ class EnhancedSqliteDatabase:
             logger.warning(f"Failed to preprocess spatial functions: {e}")
             return query  # Return original query if preprocessing fails
     
-    def _execute_query(self, query: str, params: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+    def _execute_query(self, query: str, params: Optional[Union[List[Any], Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """
         Execute a SQL query with enhanced error handling and JSONB support.
         
         Args:
             query: SQL query to execute
-            params: Query parameters
+            params: Positional (list) or named (dict) query parameters
             
         Returns:
             Query results as list of dictionaries
@@ -390,36 +543,26 @@ class EnhancedSqliteDatabase:
             "has_params": bool(params)
         })
         
+        # Connection-level settings are applied across the whole pool
+        if pragma_assignment_name(query):
+            return self.pool.set_pragma(query)
+        
+        # Serve repeated reads from the result cache while the database is unchanged
+        cache_key = None
+        if self.result_cache.enabled and self.result_cache.cacheable(query):
+            try:
+                cache_key = self.result_cache.key(query, params)
+            except TypeError:
+                cache_key = None
+            if cache_key is not None:
+                cache_version = self.result_cache.version()
+                cached = self.result_cache.get(cache_key, cache_version)
+                if cached is not None:
+                    logger.debug(f"Result cache hit for query: {query}")
+                    return cached
+        
         try:
-            with closing(sqlite3.connect(self.db_path)) as conn:
-                conn.row_factory = sqlite3.Row
-                
-                # Always load SpatiaLite if path is available (more reliable)
-                if self._spatialite_path:
-                    try:
-                        # Ensure PATH includes SpatiaLite DLLs for Windows
-                        import os
-                        script_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                        local_spatialite_dir = os.path.join(script_dir, "mod_spatialite-5.1.0-win-amd64")
-                        if os.path.exists(local_spatialite_dir):
-                            original_path = os.environ.get('PATH', '')
-                            if local_spatialite_dir not in original_path:
-                                os.environ['PATH'] = local_spatialite_dir + os.pathsep + original_path
-                        
-                        conn.enable_load_extension(True)
-                        conn.load_extension(self._spatialite_path)
-                        # Try to initialize spatial metadata if needed
-                        try:
-                            conn.execute("SELECT InitSpatialMetaData(1)")
-                        except:
-                            pass  # Already initialized or not needed
-                        # Keep extensions enabled for this connection
-                        # conn.enable_load_extension(False)  # Comment out to keep functions available
-                    except Exception as e:
-                        # Log the actual error for debugging
-                        logger.debug(f"SpatiaLite loading failed: {e}")
-                        pass
-                
+            with self.pool.connection_for(query) as conn:
                 # Special handling for memory_journal metadata with JSONB
                 if JSONB_ENABLED and self.version_info['has_jsonb_support']:
                     # Check if it's an INSERT or UPDATE to memory_journal with metadata
@@ -458,6 +601,7 @@ class EnhancedSqliteDatabase:
                     query = self._preprocess_spatial_functions(query)
                 
                 # Execute the query
+                self.pool.record_statement(conn, query)
                 with closing(conn.cursor()) as cursor:
                     try:
                         if params:
@@ -499,6 +643,7 @@ class EnhancedSqliteDatabase:
                                                 # Keep as bytes if conversion fails
                             
                             logger.debug(f"Read query returned {len(results)} rows")
+                            self.metrics.add_rows(len(results))
                             
                             # Log success
                             self.json_logger.log_operation("read_success", {
@@ -506,6 +651,9 @@ class EnhancedSqliteDatabase:
                                 "query_type": "SELECT"
                             })
                             
+                            if cache_key is not None:
+                                self.result_cache.put(cache_key, cache_version, results)
+                            
                             return results
                     except Exception as e:
                         # Handle database errors with improved diagnostics
@@ -539,955 +687,152 @@ class EnhancedSqliteDatabase:
             self.json_logger.log_error(e, {"query": query})
             raise
 
-    # Text Processing Methods
-    async def _handle_regex_extract(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
-        """Extract text using PCRE-style regular expressions."""
-        if not all(key in arguments for key in ["table_name", "column_name", "pattern"]):
-            raise ValueError("Missing required arguments: table_name, column_name, pattern")
-    
-        table_name = arguments["table_name"]
-        column_name = arguments["column_name"]
-        pattern = arguments["pattern"]
-        flags = arguments.get("flags", "")
-        limit = arguments.get("limit", 100)
-        where_clause = arguments.get("where_clause", "")
-    
-        try:
-            # Compile regex with flags
-            regex_flags = 0
-            if 'i' in flags.lower(): regex_flags |= re.IGNORECASE
-            if 'm' in flags.lower(): regex_flags |= re.MULTILINE
-            if 's' in flags.lower(): regex_flags |= re.DOTALL
-        
-            compiled_pattern = re.compile(pattern, regex_flags)
-        
-            where_sql = f" WHERE {where_clause}" if where_clause else ""
-        
-            query = f"""
-            SELECT {column_name}, rowid
-            FROM {table_name}{where_sql}
-            WHERE {column_name} IS NOT NULL
-            LIMIT {limit}
-            """
-            
-            result = self._execute_query(query)
-            
-            if not result:
-                return [types.TextContent(type="text", text="No data found for regex extraction")]
-            
-            matches = []
-            for row in result:
-                text = str(row[column_name])
-                match_result = compiled_pattern.search(text)
-                if match_result:
-                    groups = match_result.groups() if match_result.groups() else (match_result.group(0),)
-                    matches.append({
-                        "rowid": row["rowid"],
-                        "original_text": text,
-                        "match": match_result.group(0),
-                        "groups": groups,
-                        "start": match_result.start(),
-                        "end": match_result.end()
-                    })
-            
-            output = f"""Regex Extraction Results for {table_name}.{column_name}:
-        Pattern: {pattern}
-        Flags: {flags if flags else 'None'}
-
-        Found {len(matches)} matches:
-
-        """
-            
-            for i, match in enumerate(matches[:20], 1):  # Show first 20 matches
-                output += f"Match {i} (Row {match['rowid']}):\n"
-                output += f"  Text: {match['original_text'][:100]}{'...' if len(match['original_text']) > 100 else ''}\n"
-                output += f"  Match: '{match['match']}' (pos {match['start']}-{match['end']})\n"
-                if len(match['groups']) > 1:
-                    output += f"  Groups: {match['groups']}\n"
-                output += "\n"
-            
-            if len(matches) > 20:
-                output += f"... and {len(matches) - 20} more matches\n"
-            
-            return [types.TextContent(type="text", text=output)]
-            
-        except re.error as e:
-            error_msg = f"Invalid regex pattern: {str(e)}"
-            logger.error(error_msg)
-            return [types.TextContent(type="text", text=error_msg)]
-        except Exception as e:
-            error_msg = f"Failed to extract regex: {str(e)}"
-            logger.error(error_msg)
-            return [types.TextContent(type="text", text=error_msg)]
-
-    async def _handle_regex_replace(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
-        """Replace text using PCRE-style regular expressions."""
-        if not all(key in arguments for key in ["table_name", "column_name", "pattern", "replacement"]):
-            raise ValueError("Missing required arguments: table_name, column_name, pattern, replacement")
-    
-        table_name = arguments["table_name"]
-        column_name = arguments["column_name"]
-        pattern = arguments["pattern"]
-        replacement = arguments["replacement"]
-        flags = arguments.get("flags", "")
-        max_replacements = arguments.get("max_replacements", 0)  # 0 = all
-        where_clause = arguments.get("where_clause", "")
-        preview_only = arguments.get("preview_only", True)  # Safe default
-    
-        try:
-            # Compile regex with flags
-            regex_flags = 0
-            if 'i' in flags.lower(): regex_flags |= re.IGNORECASE
-            if 'm' in flags.lower(): regex_flags |= re.MULTILINE
-            if 's' in flags.lower(): regex_flags |= re.DOTALL
-        
-            compiled_pattern = re.compile(pattern, regex_flags)
-        
-            where_sql = f" WHERE {where_clause}" if where_clause else ""
-        
-            query = f"""
-            SELECT {column_name}, rowid
-            FROM {table_name}{where_sql}
-            WHERE {column_name} IS NOT NULL
-            LIMIT 100
-            """
-            
-            result = self._execute_query(query)
-            
-            if not result:
-                return [types.TextContent(type="text", text="No data found for regex replacement")]
-            
-            replacements = []
-            for row in result:
-                original_text = str(row[column_name])
-                if max_replacements > 0:
-                    new_text = compiled_pattern.sub(replacement, original_text, count=max_replacements)
-                else:
-                    new_text = compiled_pattern.sub(replacement, original_text)
-                
-                if new_text != original_text:
-                    replacements.append({
-                        "rowid": row["rowid"],
-                        "original": original_text,
-                        "new": new_text,
-                        "changes": len(compiled_pattern.findall(original_text))
-                    })
-            
-            output = f"""Regex Replacement {'Preview' if preview_only else 'Results'} for {table_name}.{column_name}:
-        Pattern: {pattern}
-        Replacement: {replacement}
-        Flags: {flags if flags else 'None'}
-        Max Replacements: {'All' if max_replacements == 0 else max_replacements}
-
-        Found {len(replacements)} rows with changes:
-
-        """
-            
-            for i, repl in enumerate(replacements[:10], 1):  # Show first 10
-                output += f"Row {repl['rowid']} ({repl['changes']} changes):\n"
-                output += f"  Before: {repl['original'][:100]}{'...' if len(repl['original']) > 100 else ''}\n"
-                output += f"  After:  {repl['new'][:100]}{'...' if len(repl['new']) > 100 else ''}\n\n"
-            
-            if len(replacements) > 10:
-                output += f"... and {len(replacements) - 10} more rows\n"
-            
-            if preview_only:
-                output += "\nTo execute these changes, set preview_only=false"
-            else:
-                # Execute the replacements
-                for repl in replacements:
-                    update_query = f"""
-                    UPDATE {table_name} 
-                    SET {column_name} = ? 
-                    WHERE rowid = ?
-                    """
-                    self._execute_query(update_query, (repl['new'], repl['rowid']))
-                
-                output += f"\n✅ Successfully updated {len(replacements)} rows"
-            
-            return [types.TextContent(type="text", text=output)]
-            
-        except re.error as e:
-            error_msg = f"Invalid regex pattern: {str(e)}"
-            logger.error(error_msg)
-            return [types.TextContent(type="text", text=error_msg)]
-        except Exception as e:
-            error_msg = f"Failed to perform regex replacement: {str(e)}"
-            logger.error(error_msg)
-            return [types.TextContent(type="text", text=error_msg)]
-
-    async def _handle_fuzzy_match(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
-        """Find fuzzy matches using Levenshtein distance and sequence matching."""
-        if not all(key in arguments for key in ["table_name", "column_name", "search_term"]):
-            raise ValueError("Missing required arguments: table_name, column_name, search_term")
+def create_server(db: EnhancedSqliteDatabase, tool_categories: Optional[List[str]] = None) -> Server:
+    """
+    Build the MCP server and register its resource, prompt and tool handlers.
     
-        table_name = arguments["table_name"]
-        column_name = arguments["column_name"]
-        search_term = arguments["search_term"]
-        threshold = arguments.get("threshold", 0.6)
-        limit = arguments.get("limit", 50)
-        where_clause = arguments.get("where_clause", "")
-    
-        try:
-            where_sql = f" WHERE {where_clause}" if where_clause else ""
-        
-            query = f"""
-            SELECT {column_name}, rowid
-            FROM {table_name}{where_sql}
-            WHERE {column_name} IS NOT NULL
-            LIMIT 1000
-            """
-            
-            result = self._execute_query(query)
-            
-            if not result:
-                return [types.TextContent(type="text", text="No data found for fuzzy matching")]
-            
-            # Calculate similarity scores
-            matches = []
-            for row in result:
-                text = str(row[column_name])
-                # Use difflib's SequenceMatcher for similarity
-                similarity = difflib.SequenceMatcher(None, search_term.lower(), text.lower()).ratio()
-                
-                if similarity >= threshold:
-                    matches.append({
-                        "rowid": row["rowid"],
-                        "text": text,
-                        "similarity": round(similarity, 3),
-                        "match_type": "exact" if similarity >= 0.95 else "fuzzy"
-                    })
-            
-            # Sort by similarity score (highest first)
-            matches.sort(key=lambda x: x["similarity"], reverse=True)
-            matches = matches[:limit]
-            
-            output = f"""Fuzzy Match Results for {table_name}.{column_name}:
-        Search Term: "{search_term}"
-        Threshold: {threshold}
-        
-        Found {len(matches)} matches:
-
-        """
-            
-            for i, match in enumerate(matches, 1):
-                output += f"Match {i} (Row {match['rowid']}) - Similarity: {match['similarity']:.3f} ({match['match_type']}):\n"
-                output += f"  Text: {match['text'][:100]}{'...' if len(match['text']) > 100 else ''}\n\n"
-            
-            if len(matches) == 0:
-                output += f"No matches found above threshold {threshold}\n"
-            
-            return [types.TextContent(type="text", text=output)]
-            
-        except Exception as e:
-            error_msg = f"Failed to perform fuzzy matching: {str(e)}"
-            logger.error(error_msg)
-            return [types.TextContent(type="text", text=error_msg)]
-
-    async def _handle_phonetic_match(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
-        """Find phonetic matches using Soundex and Metaphone algorithms."""
-        if not all(key in arguments for key in ["table_name", "column_name", "search_term"]):
-            raise ValueError("Missing required arguments: table_name, column_name, search_term")
-    
-        table_name = arguments["table_name"]
-        column_name = arguments["column_name"]
-        search_term = arguments["search_term"]
-        algorithm = arguments.get("algorithm", "soundex")
-        limit = arguments.get("limit", 50)
-        where_clause = arguments.get("where_clause", "")
-    
-        def simple_soundex(word):
-            """Simple Soundex implementation"""
-            if not word:
-                return "0000"
-            
-            word = word.upper()
-            soundex = word[0]
-            
-            # Mapping for consonants
-            mapping = {
-                'B': '1', 'F': '1', 'P': '1', 'V': '1',
-                'C': '2', 'G': '2', 'J': '2', 'K': '2', 'Q': '2', 'S': '2', 'X': '2', 'Z': '2',
-                'D': '3', 'T': '3',
-                'L': '4',
-                'M': '5', 'N': '5',
-                'R': '6'
-            }
-            
-            for char in word[1:]:
-                if char in mapping:
-                    code = mapping[char]
-                    if soundex[-1] != code:
-                        soundex += code
-                if len(soundex) == 4:
-                    break
-            
-            return (soundex + "000")[:4]
+    Args:
+        db: Database the handlers operate on
+        tool_categories: Tool categories to offer (default: all)
         
-        def simple_metaphone(word):
-            """Simple Metaphone-like implementation"""
-            if not word:
-                return ""
-            
-            word = word.upper()
-            result = ""
-            
-            # Simple phonetic transformations
-            replacements = [
-                ('PH', 'F'), ('GH', 'F'), ('CK', 'K'), ('SCH', 'SK'),
-                ('QU', 'KW'), ('X', 'KS'), ('Z', 'S'), ('C', 'K')
-            ]
-            
-            for old, new in replacements:
-                word = word.replace(old, new)
-            
-            # Keep only consonants and some vowels
-            keep_chars = 'BFPVKGJQSXZTDLMNR'
-            result = ''.join(char for char in word if char in keep_chars)
-            
-            return result[:6]  # Limit length
-    
-        try:
-            where_sql = f" WHERE {where_clause}" if where_clause else ""
-        
-            query = f"""
-            SELECT {column_name}, rowid
-            FROM {table_name}{where_sql}
-            WHERE {column_name} IS NOT NULL
-            LIMIT 1000
-            """
-            
-            result = self._execute_query(query)
-            
-            if not result:
-                return [types.TextContent(type="text", text="No data found for phonetic matching")]
-            
-            # Calculate phonetic codes
-            if algorithm.lower() == "soundex":
-                search_code = simple_soundex(search_term)
-                phonetic_func = simple_soundex
-            else:  # metaphone
-                search_code = simple_metaphone(search_term)
-                phonetic_func = simple_metaphone
-            
-            matches = []
-            for row in result:
-                text = str(row[column_name])
-                # Extract first word for phonetic matching
-                first_word = text.split()[0] if text.split() else text
-                text_code = phonetic_func(first_word)
-                
-                if text_code == search_code:
-                    matches.append({
-                        "rowid": row["rowid"],
-                        "text": text,
-                        "phonetic_code": text_code,
-                        "matched_word": first_word
-                    })
-            
-            matches = matches[:limit]
-            
-            output = f"""Phonetic Match Results for {table_name}.{column_name}:
-        Search Term: "{search_term}" (Code: {search_code})
-        Algorithm: {algorithm.title()}
-        
-        Found {len(matches)} phonetic matches:
-
-        """
-            
-            for i, match in enumerate(matches, 1):
-                output += f"Match {i} (Row {match['rowid']}) - Code: {match['phonetic_code']}:\n"
-                output += f"  Matched Word: '{match['matched_word']}'\n"
-                output += f"  Full Text: {match['text'][:100]}{'...' if len(match['text']) > 100 else ''}\n\n"
-            
-            if len(matches) == 0:
-                output += f"No phonetic matches found for '{search_term}' (code: {search_code})\n"
-            
-            return [types.TextContent(type="text", text=output)]
-            
-        except Exception as e:
-            error_msg = f"Failed to perform phonetic matching: {str(e)}"
-            logger.error(error_msg)
-            return [types.TextContent(type="text", text=error_msg)]
-
-    async def _handle_text_similarity(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
-        """Calculate text similarity between columns or against reference text."""
-        if not all(key in arguments for key in ["table_name", "column_name"]):
-            raise ValueError("Missing required arguments: table_name, column_name")
-    
-        table_name = arguments["table_name"]
-        column_name = arguments["column_name"]
-        reference_text = arguments.get("reference_text", "")
-        compare_column = arguments.get("compare_column", "")
-        algorithm = arguments.get("algorithm", "cosine")
-        limit = arguments.get("limit", 100)
-        where_clause = arguments.get("where_clause", "")
-    
-        def jaccard_similarity(text1, text2):
-            """Calculate Jaccard similarity between two texts"""
-            set1 = set(text1.lower().split())
-            set2 = set(text2.lower().split())
-            intersection = set1.intersection(set2)
-            union = set1.union(set2)
-            return len(intersection) / len(union) if union else 0
-        
-        def cosine_similarity(text1, text2):
-            """Simple cosine similarity using word frequency"""
-            words1 = text1.lower().split()
-            words2 = text2.lower().split()
-            
-            # Get all unique words
-            all_words = set(words1 + words2)
-            
-            # Create frequency vectors
-            vec1 = [words1.count(word) for word in all_words]
-            vec2 = [words2.count(word) for word in all_words]
-            
-            # Calculate dot product and magnitudes
-            dot_product = sum(a * b for a, b in zip(vec1, vec2))
-            magnitude1 = math.sqrt(sum(a * a for a in vec1))
-            magnitude2 = math.sqrt(sum(b * b for b in vec2))
-            
-            if magnitude1 == 0 or magnitude2 == 0:
-                return 0
-            
-            return dot_product / (magnitude1 * magnitude2)
-        
-        def levenshtein_similarity(text1, text2):
-            """Calculate Levenshtein similarity (normalized)"""
-            return difflib.SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
-    
-        try:
-            where_sql = f" WHERE {where_clause}" if where_clause else ""
-            
-            if compare_column:
-                # Compare two columns
-                query = f"""
-                SELECT {column_name}, {compare_column}, rowid
-                FROM {table_name}{where_sql}
-                WHERE {column_name} IS NOT NULL AND {compare_column} IS NOT NULL
-                LIMIT {limit}
-                """
-                
-                result = self._execute_query(query)
-                
-                if not result:
-                    return [types.TextContent(type="text", text="No data found for column comparison")]
-                
-                similarities = []
-                for row in result:
-                    text1 = str(row[column_name])
-                    text2 = str(row[compare_column])
-                    
-                    if algorithm.lower() == "jaccard":
-                        similarity = jaccard_similarity(text1, text2)
-                    elif algorithm.lower() == "levenshtein":
-                        similarity = levenshtein_similarity(text1, text2)
-                    else:  # cosine
-                        similarity = cosine_similarity(text1, text2)
-                    
-                    similarities.append({
-                        "rowid": row["rowid"],
-                        "text1": text1,
-                        "text2": text2,
-                        "similarity": round(similarity, 3)
-                    })
-                
-                # Sort by similarity (highest first)
-                similarities.sort(key=lambda x: x["similarity"], reverse=True)
-                
-                output = f"""Text Similarity Results for {table_name}.{column_name} vs {compare_column}:
-        Algorithm: {algorithm.title()}
-        
-        Found {len(similarities)} comparisons:
-
-        """
-                
-                for i, sim in enumerate(similarities, 1):
-                    output += f"Row {sim['rowid']} - Similarity: {sim['similarity']:.3f}:\n"
-                    output += f"  Text 1: {sim['text1'][:80]}{'...' if len(sim['text1']) > 80 else ''}\n"
-                    output += f"  Text 2: {sim['text2'][:80]}{'...' if len(sim['text2']) > 80 else ''}\n\n"
-                
-            elif reference_text:
-                # Compare against reference text
-                query = f"""
-                SELECT {column_name}, rowid
-                FROM {table_name}{where_sql}
-                WHERE {column_name} IS NOT NULL
-                LIMIT {limit}
-                """
-                
-                result = self._execute_query(query)
-                
-                if not result:
-                    return [types.TextContent(type="text", text="No data found for reference comparison")]
-                
-                similarities = []
-                for row in result:
-                    text = str(row[column_name])
-                    
-                    if algorithm.lower() == "jaccard":
-                        similarity = jaccard_similarity(reference_text, text)
-                    elif algorithm.lower() == "levenshtein":
-                        similarity = levenshtein_similarity(reference_text, text)
-                    else:  # cosine
-                        similarity = cosine_similarity(reference_text, text)
-                    
-                    similarities.append({
-                        "rowid": row["rowid"],
-                        "text": text,
-                        "similarity": round(similarity, 3)
-                    })
-                
-                # Sort by similarity (highest first)
-                similarities.sort(key=lambda x: x["similarity"], reverse=True)
-                
-                output = f"""Text Similarity Results for {table_name}.{column_name} vs Reference:
-        Reference Text: "{reference_text[:100]}{'...' if len(reference_text) > 100 else ''}"
-        Algorithm: {algorithm.title()}
-        
-        Found {len(similarities)} comparisons:
-
-        """
-                
-                for i, sim in enumerate(similarities, 1):
-                    output += f"Match {i} (Row {sim['rowid']}) - Similarity: {sim['similarity']:.3f}:\n"
-                    output += f"  Text: {sim['text'][:100]}{'...' if len(sim['text']) > 100 else ''}\n\n"
-            
-            else:
-                return [types.TextContent(type="text", text="Please provide either reference_text or compare_column for similarity calculation")]
-            
-            return [types.TextContent(type="text", text=output)]
-            
-        except Exception as e:
-            error_msg = f"Failed to calculate text similarity: {str(e)}"
-            logger.error(error_msg)
-            return [types.TextContent(type="text", text=error_msg)]
-
-    async def _handle_text_normalize(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
-        """Normalize text with various transformations."""
-        if not all(key in arguments for key in ["table_name", "column_name"]):
-            raise ValueError("Missing required arguments: table_name, column_name")
-    
-        table_name = arguments["table_name"]
-        column_name = arguments["column_name"]
-        operations = arguments.get("operations", ["lowercase", "trim"])
-        preview_only = arguments.get("preview_only", True)
-        where_clause = arguments.get("where_clause", "")
-    
-        try:
-            # Build WHERE clause properly to avoid duplicates
-            if where_clause:
-                where_sql = f" WHERE ({where_clause}) AND {column_name} IS NOT NULL"
-            else:
-                where_sql = f" WHERE {column_name} IS NOT NULL"
-        
-            query = f"""
-            SELECT {column_name}, rowid
-            FROM {table_name}{where_sql}
-            LIMIT 100
-            """
-            
-            result = self._execute_query(query)
-            
-            if not result:
-                return [types.TextContent(type="text", text="No data found for text normalization")]
-            
-            normalizations = []
-            for i, row in enumerate(result):
-                original_text = str(row[column_name])
-                normalized_text = original_text
-                
-                # Apply normalization operations
-                for operation in operations:
-                    if operation.lower() == "lowercase":
-                        normalized_text = normalized_text.lower()
-                    elif operation.lower() == "uppercase":
-                        normalized_text = normalized_text.upper()
-                    elif operation.lower() == "trim":
-                        normalized_text = normalized_text.strip()
-                    elif operation.lower() == "remove_extra_spaces":
-                        normalized_text = re.sub(r'\s+', ' ', normalized_text)
-                    elif operation.lower() == "remove_punctuation":
-                        normalized_text = re.sub(r'[^\w\s]', '', normalized_text)
-                    elif operation.lower() == "remove_digits":
-                        normalized_text = re.sub(r'\d+', '', normalized_text)
-                    elif operation.lower() == "normalize_unicode":
-                        normalized_text = unicodedata.normalize('NFKD', normalized_text)
-                
-                if normalized_text != original_text:
-                    # Try to get rowid, fallback to row number
-                    try:
-                        row_id = row.get("rowid", row.get("id", i + 1))
-                    except:
-                        row_id = i + 1
-                    
-                    normalizations.append({
-                        "rowid": row_id,
-                        "original": original_text,
-                        "normalized": normalized_text
-                    })
-            
-            output = f"""Text Normalization {'Preview' if preview_only else 'Results'} for {table_name}.{column_name}:
-        Operations: {', '.join(operations)}
-        
-        Found {len(normalizations)} rows with changes:
-
-        """
-            
-            for i, norm in enumerate(normalizations[:20], 1):  # Show first 20
-                output += f"Row {norm['rowid']}:\n"
-                output += f"  Before: {norm['original'][:100]}{'...' if len(norm['original']) > 100 else ''}\n"
-                output += f"  After:  {norm['normalized'][:100]}{'...' if len(norm['normalized']) > 100 else ''}\n\n"
-            
-            if len(normalizations) > 20:
-                output += f"... and {len(normalizations) - 20} more rows\n"
-            
-            if preview_only:
-                output += "\nTo execute these changes, set preview_only=false"
-            else:
-                # Execute the normalizations - use original content matching for safety
-                for norm in normalizations:
-                    update_query = f"""
-                    UPDATE {table_name} 
-                    SET {column_name} = ? 
-                    WHERE {column_name} = ?
-                    """
-                    self._execute_query(update_query, (norm['normalized'], norm['original']))
-                
-                output += f"\n✅ Successfully normalized {len(normalizations)} rows"
-            
-            if len(normalizations) == 0:
-                output += "No changes needed - text is already normalized"
-            
-            return [types.TextContent(type="text", text=output)]
-            
-        except Exception as e:
-            error_msg = f"Failed to normalize text: {str(e)}"
-            logger.error(error_msg)
-            return [types.TextContent(type="text", text=error_msg)]
-
-    async def _handle_advanced_search(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
-        """Advanced search combining multiple text processing techniques."""
-        if not all(key in arguments for key in ["table_name", "column_name", "search_term"]):
-            raise ValueError("Missing required arguments: table_name, column_name, search_term")
-    
-        table_name = arguments["table_name"]
-        column_name = arguments["column_name"]
-        search_term = arguments["search_term"]
-        techniques = arguments.get("techniques", ["exact", "fuzzy", "phonetic"])
-        fuzzy_threshold = arguments.get("fuzzy_threshold", 0.6)
-        limit = arguments.get("limit", 100)
-        where_clause = arguments.get("where_clause", "")
-    
-        try:
-            where_sql = f" WHERE {where_clause}" if where_clause else ""
-        
-            query = f"""
-            SELECT {column_name}, rowid
-            FROM {table_name}{where_sql}
-            WHERE {column_name} IS NOT NULL
-            LIMIT 1000
-            """
-            
-            result = self._execute_query(query)
-            
-            if not result:
-                return [types.TextContent(type="text", text="No data found for advanced search")]
-            
-            all_matches = []
-            
-            for row in result:
-                text = str(row[column_name])
-                matches = []
-                
-                # Exact match
-                if "exact" in techniques:
-                    if search_term.lower() in text.lower():
-                        matches.append({"type": "exact", "score": 1.0})
-                
-                # Fuzzy match
-                if "fuzzy" in techniques:
-                    similarity = difflib.SequenceMatcher(None, search_term.lower(), text.lower()).ratio()
-                    if similarity >= fuzzy_threshold:
-                        matches.append({"type": "fuzzy", "score": similarity})
-                
-                # Phonetic match
-                if "phonetic" in techniques:
-                    def simple_soundex(word):
-                        if not word:
-                            return "0000"
-                        word = word.upper()
-                        soundex = word[0]
-                        mapping = {
-                            'B': '1', 'F': '1', 'P': '1', 'V': '1',
-                            'C': '2', 'G': '2', 'J': '2', 'K': '2', 'Q': '2', 'S': '2', 'X': '2', 'Z': '2',
-                            'D': '3', 'T': '3', 'L': '4', 'M': '5', 'N': '5', 'R': '6'
-                        }
-                        for char in word[1:]:
-                            if char in mapping:
-                                code = mapping[char]
-                                if soundex[-1] != code:
-                                    soundex += code
-                            if len(soundex) == 4:
-                                break
-                        return (soundex + "000")[:4]
-                    
-                    search_soundex = simple_soundex(search_term)
-                    text_words = text.split()
-                    for word in text_words:
-                        if simple_soundex(word) == search_soundex:
-                            matches.append({"type": "phonetic", "score": 0.8})
-                            break
-                
-                if matches:
-                    # Calculate combined score (highest individual score)
-                    best_match = max(matches, key=lambda x: x["score"])
-                    all_matches.append({
-                        "rowid": row["rowid"],
-                        "text": text,
-                        "match_types": [m["type"] for m in matches],
-                        "best_score": best_match["score"],
-                        "best_type": best_match["type"]
-                    })
-            
-            # Sort by score (highest first)
-            all_matches.sort(key=lambda x: x["best_score"], reverse=True)
-            all_matches = all_matches[:limit]
-            
-            output = f"""Advanced Search Results for {table_name}.{column_name}:
-        Search Term: "{search_term}"
-        Techniques: {', '.join(techniques)}
-        Fuzzy Threshold: {fuzzy_threshold}
-        
-        Found {len(all_matches)} matches:
-
-        """
-            
-            for i, match in enumerate(all_matches, 1):
-                output += f"Match {i} (Row {match['rowid']}) - Score: {match['best_score']:.3f} ({match['best_type']}):\n"
-                output += f"  Match Types: {', '.join(match['match_types'])}\n"
-                output += f"  Text: {match['text'][:100]}{'...' if len(match['text']) > 100 else ''}\n\n"
-            
-            if len(all_matches) == 0:
-                output += f"No matches found using techniques: {', '.join(techniques)}\n"
-            
-            return [types.TextContent(type="text", text=output)]
-            
-        except Exception as e:
-            error_msg = f"Failed to perform advanced search: {str(e)}"
-            logger.error(error_msg)
-            return [types.TextContent(type="text", text=error_msg)]
-
-    async def _handle_text_validation(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
-        """Validate text against various patterns and rules."""
-        if not all(key in arguments for key in ["table_name", "column_name"]):
-            raise ValueError("Missing required arguments: table_name, column_name")
-    
-        table_name = arguments["table_name"]
-        column_name = arguments["column_name"]
-        validation_type = arguments.get("validation_type", "email")
-        custom_pattern = arguments.get("custom_pattern", "")
-        return_invalid_only = arguments.get("return_invalid_only", True)
-        where_clause = arguments.get("where_clause", "")
-    
-        # Validation patterns
-        patterns = {
-            "email": r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
-            "phone": r'^\+?1?-?\.?\s?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})$',
-            "url": r'^https?://(?:[-\w.])+(?:\.[a-zA-Z]{2,})+(?:/[^?\s]*)?(?:\?[^#\s]*)?(?:#[^\s]*)?$',
-            "custom_regex": custom_pattern
-        }
-    
-        try:
-            if validation_type not in patterns:
-                return [types.TextContent(type="text", text=f"Unsupported validation type: {validation_type}")]
-            
-            pattern = patterns[validation_type]
-            if not pattern:
-                return [types.TextContent(type="text", text="Custom pattern is required for custom_regex validation")]
-            
-            compiled_pattern = re.compile(pattern)
-            where_sql = f" WHERE {where_clause}" if where_clause else ""
-        
-            query = f"""
-            SELECT {column_name}, rowid
-            FROM {table_name}{where_sql}
-            WHERE {column_name} IS NOT NULL
-            LIMIT 1000
-            """
-            
-            result = self._execute_query(query)
-            
-            if not result:
-                return [types.TextContent(type="text", text="No data found for text validation")]
-            
-            validations = []
-            valid_count = 0
-            invalid_count = 0
-            
-            for row in result:
-                text = str(row[column_name]).strip()
-                is_valid = bool(compiled_pattern.match(text))
-                
-                if is_valid:
-                    valid_count += 1
-                else:
-                    invalid_count += 1
-                
-                # Add to results based on return_invalid_only setting
-                if not return_invalid_only or not is_valid:
-                    validations.append({
-                        "rowid": row["rowid"],
-                        "text": text,
-                        "is_valid": is_valid,
-                        "status": "✅ Valid" if is_valid else "❌ Invalid"
-                    })
-            
-            output = f"""Text Validation Results for {table_name}.{column_name}:
-        Validation Type: {validation_type.title()}
-        Pattern: {pattern}
-        
-        Summary:
-        ✅ Valid: {valid_count}
-        ❌ Invalid: {invalid_count}
-        Total: {valid_count + invalid_count}
-
-        {"Invalid " if return_invalid_only else ""}Results:
-
-        """
-            
-            for i, validation in enumerate(validations[:50], 1):  # Show first 50
-                output += f"Row {validation['rowid']} - {validation['status']}:\n"
-                output += f"  Text: {validation['text'][:100]}{'...' if len(validation['text']) > 100 else ''}\n\n"
-            
-            if len(validations) > 50:
-                output += f"... and {len(validations) - 50} more results\n"
-            
-            return [types.TextContent(type="text", text=output)]
-            
-        except re.error as e:
-            error_msg = f"Invalid validation pattern: {str(e)}"
-            logger.error(error_msg)
-            return [types.TextContent(type="text", text=error_msg)]
-        except Exception as e:
-            error_msg = f"Failed to validate text: {str(e)}"
-            logger.error(error_msg)
-            return [types.TextContent(type="text", text=error_msg)]
-
-async def main(db_path: str = "sqlite_mcp.db"):
-    logger.info(f"Starting Enhanced SQLite MCP Server with DB: {db_path}")
-
-    # Initialize database with enhanced features
-    db = EnhancedSqliteDatabase(db_path)
-    
-    # Check SQLite version and JSONB support
-    version_info = check_sqlite_version()
-    logger.info(f"SQLite Version: {version_info['version']}")
-    logger.info(f"JSONB Support: {'Yes' if version_info['has_jsonb_support'] else 'No'}")
-    
-    # Initialize MCP server
+    Returns:
+        Server ready to run on any transport
+    """
     server = Server("sqlite-custom")
 
     # Register handlers
     logger.debug("Registering handlers")
 
+    # The resource list never changes, so it is built once
+    resources = [
+        # Database Meta-Awareness Resources
+        types.Resource(
+            uri=AnyUrl("database://schema"),
+            name="Database Schema",
+            description="Complete database schema with tables, columns, indexes, and relationships in natural language + JSON. Cached until the schema changes; row counts are sqlite_stat1 estimates (append ?exact_counts=true for exact counts, ?approximate=true for HyperLogLog distinct counts per column)",
+            mimeType="application/json",
+        ),
+        types.Resource(
+            uri=AnyUrl("database://capabilities"),
+            name="Server Capabilities",
+            description="Comprehensive server capabilities matrix including all 36 tools, features, and supported operations",
+            mimeType="application/json",
+        ),
+        types.Resource(
+            uri=AnyUrl("database://statistics"),
+            name="Table Statistics",
+            description="Database statistics, estimated row counts, and optimization recommendations (append ?exact_counts=true for exact counts, ?approximate=true for HyperLogLog distinct counts per column)",
+            mimeType="application/json",
+        ),
+        types.Resource(
+            uri=AnyUrl("database://search_indexes"),
+            name="Search Index Status",
+            description="Status of FTS5 full-text search and semantic search indexes with performance metrics",
+            mimeType="application/json",
+        ),
+        types.Resource(
+            uri=AnyUrl("database://performance"),
+            name="Performance Insights",
+            description="Measured per-tool latency percentiles, error rates, rows and bytes returned, and connection pool wait times, with optimization tips",
+            mimeType="application/json",
+        ),
+        # Legacy Resources (maintained for compatibility)
+        types.Resource(
+            uri=AnyUrl("memo://insights"),
+            name="Business Insights Memo",
+            description="A living document of discovered business insights",
+            mimeType="text/plain",
+        ),
+        types.Resource(
+            uri=AnyUrl("diagnostics://json"),
+            name="JSON Diagnostics",
+            description="Diagnostic information about JSON handling capabilities",
+            mimeType="application/json",
+        ),
+        types.Resource(
+            uri=AnyUrl("diagnostics://connections"),
+            name="Connection Pool Diagnostics",
+            description="Pooled connections with their per-connection state, such as SpatiaLite load status",
+            mimeType="application/json",
+        ),
+        types.Resource(
+            uri=AnyUrl("diagnostics://cache"),
+            name="Result Cache Statistics",
+            description="Read query result cache hits, misses, evictions, invalidations and memory use",
+            mimeType="application/json",
+        ),
+        types.Resource(
+            uri=AnyUrl("diagnostics://logging"),
+            name="Logging Diagnostics",
+            description="Structured log level, sampling, queued and dropped entries, and time spent logging per call",
+            mimeType="application/json",
+        )
+    ]
+
     @server.list_resources()
     async def handle_list_resources() -> list[types.Resource]:
         logger.debug("Handling list_resources request")
-        return [
-            # Database Meta-Awareness Resources
-            types.Resource(
-                uri=AnyUrl("database://schema"),
-                name="Database Schema",
-                description="Complete database schema with tables, columns, indexes, and relationships in natural language + JSON",
-                mimeType="application/json",
-            ),
-            types.Resource(
-                uri=AnyUrl("database://capabilities"),
-                name="Server Capabilities",
-                description="Comprehensive server capabilities matrix including all 36 tools, features, and supported operations",
-                mimeType="application/json",
-            ),
-            types.Resource(
-                uri=AnyUrl("database://statistics"),
-                name="Table Statistics",
-                description="Real-time database statistics, table sizes, row counts, and optimization recommendations",
-                mimeType="application/json",
-            ),
-            types.Resource(
-                uri=AnyUrl("database://search_indexes"),
-                name="Search Index Status",
-                description="Status of FTS5 full-text search and semantic search indexes with performance metrics",
-                mimeType="application/json",
-            ),
-            types.Resource(
-                uri=AnyUrl("database://performance"),
-                name="Performance Insights",
-                description="Database performance analysis, optimization tips, and health recommendations",
-                mimeType="application/json",
-            ),
-            # Legacy Resources (maintained for compatibility)
-            types.Resource(
-                uri=AnyUrl("memo://insights"),
-                name="Business Insights Memo",
-                description="A living document of discovered business insights",
-                mimeType="text/plain",
-            ),
-            types.Resource(
-                uri=AnyUrl("diagnostics://json"),
-                name="JSON Diagnostics",
-                description="Diagnostic information about JSON handling capabilities",
-                mimeType="application/json",
-            )
-        ]
+        return resources
 
-    @server.read_resource()
-    async def handle_read_resource(uri: AnyUrl) -> str:
+    def _read_resource(uri: AnyUrl) -> str:
+        """Build a resource's content; runs on the tool executor's worker threads"""
         logger.debug(f"Handling read_resource request for URI: {uri}")
         
         # Handle database meta-awareness resources
         if uri.scheme == "database":
-            path = str(uri).replace("database://", "")
+            path, _, query_string = str(uri).replace("database://", "").partition("?")
+            query = parse_qs(query_string)
+            # Exact row counts scan every table, so they are only run on request
+            exact_counts = query.get("exact_counts", ["false"])[0].lower() in ("true", "1", "yes")
+            # Distinct counts come from stored HyperLogLog sketches, also only on request
+            approximate = query.get("approximate", ["false"])[0].lower() in ("true", "1", "yes")
+            precision = query.get("precision", [str(DEFAULT_HLL_PRECISION)])[0]
+            if not (precision.isdigit() and MIN_HLL_PRECISION <= int(precision) <= MAX_HLL_PRECISION):
+                raise ValueError(f"Invalid precision '{precision}': use an integer from "
+                                 f"{MIN_HLL_PRECISION} to {MAX_HLL_PRECISION} (default {DEFAULT_HLL_PRECISION})")
+            hll_precision = int(precision)
+            
+            def distinct_estimates(table):
+                """Estimated distinct values per column of a catalog table, from one scan of its new rows"""
+                if table["name"].startswith("sqlite_"):
+                    return None
+                try:
+                    sketches = db.sketch_store.distinct_sketches(
+                        table["name"], [column["name"] for column in table["columns"]], precision=hll_precision)
+                    return {column_name: sketch.count() for column_name, (sketch, _) in sketches.items()}
+                except Exception as e:
+                    return {"error": str(e)}
+            
+            def distinct_counts_note():
+                return f"HyperLogLog p={hll_precision}, ±{hll_standard_error(hll_precision):.2%} standard error"
             
             if path == "schema":
                 # Get complete database schema with natural language descriptions
                 try:
-                    # Get all tables
-                    tables_query = "SELECT name, sql FROM sqlite_master WHERE type='table' ORDER BY name"
-                    tables = db._execute_query(tables_query)
+                    catalog = db.schema_catalog.snapshot(exact_counts=exact_counts)
+                    tables = catalog["tables"]
                     
                     schema_info = {
                         "database_path": db.db_path,
                         "sqlite_version": db.version_info.get('version', 'Unknown'),
-                        "total_tables": len(tables) if tables else 0,
+                        "total_tables": len(tables),
                         "tables": [],
-                        "summary": f"Database contains {len(tables) if tables else 0} tables. SQLite version {db.version_info.get('version', 'Unknown')}."
+                        "summary": f"Database contains {len(tables)} tables. SQLite version {db.version_info.get('version', 'Unknown')}.",
+                        "snapshot": {key: value for key, value in catalog.items() if key != "tables"}
                     }
                     
-                    # Process tables
-                    if tables:
-                        for table in tables:
-                            table_name = table["name"]
-                            # Get column info
-                            columns_query = f"PRAGMA table_info({table_name})"
-                            columns = db._execute_query(columns_query)
-                            
-                            # Get row count
-                            try:
-                                count_query = f"SELECT COUNT(*) as count FROM {table_name}"
-                                count_result = db._execute_query(count_query)
-                                row_count = count_result[0]["count"] if count_result else 0
-                            except:
-                                row_count = "Unknown"
-                            
-                            table_info = {
-                                "name": table_name,
-                                "columns": columns if columns else [],
-                                "column_count": len(columns) if columns else 0,
-                                "row_count": row_count
-                            }
-                            schema_info["tables"].append(table_info)
+                    for table in tables:
+                        schema_info["tables"].append({
+                            "name": table["name"],
+                            "columns": table["columns"],
+                            "column_count": len(table["columns"]),
+                            "row_count": table["row_count"],
+                            "row_count_source": table["row_count_source"]
+                        })
+                        if approximate:
+                            schema_info["tables"][-1]["distinct_estimates"] = distinct_estimates(table)
+                    if approximate:
+                        schema_info["snapshot"]["distinct_counts"] = distinct_counts_note()
                     
                     return json.dumps(schema_info, indent=2)
                     
@@ -1523,30 +868,37 @@ async def main(db_path: str = "sqlite_mcp.db"):
                 return json.dumps(capabilities, indent=2)
             
             elif path == "statistics":
-                # Real-time database statistics
+                # Database statistics from the cached catalog
                 try:
-                    stats = {"tables": [], "recommendations": []}
+                    catalog = db.schema_catalog.snapshot(exact_counts=exact_counts)
+                    stats = {
+                        "tables": [],
+                        "recommendations": [],
+                        "snapshot": {key: value for key, value in catalog.items() if key != "tables"}
+                    }
                     
-                    tables_query = "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
-                    tables = db._execute_query(tables_query)
+                    for table in catalog["tables"]:
+                        table_name = table["name"]
+                        row_count = table["row_count"]
+                        stats["tables"].append({
+                            "name": table_name,
+                            "row_count": row_count,
+                            "row_count_source": table["row_count_source"]
+                        })
+                        if approximate:
+                            stats["tables"][-1]["distinct_estimates"] = distinct_estimates(table)
+                        
+                        if row_count is not None and row_count > 10000:
+                            stats["recommendations"].append(f"Consider indexing '{table_name}' (has {row_count:,} rows)")
                     
-                    if tables:
-                        for table in tables:
-                            table_name = table["name"]
-                            try:
-                                count_result = db._execute_query(f"SELECT COUNT(*) as count FROM {table_name}")
-                                row_count = count_result[0]["count"] if count_result else 0
-                                
-                                stats["tables"].append({
-                                    "name": table_name,
-                                    "row_count": row_count
-                                })
-                                
-                                if row_count > 10000:
-                                    stats["recommendations"].append(f"Consider indexing '{table_name}' (has {row_count:,} rows)")
-                                    
-                            except Exception as e:
-                                stats["tables"].append({"name": table_name, "error": str(e)})
+                    if any(table["row_count_source"] == "unavailable" and not table["name"].startswith("sqlite_")
+                           for table in catalog["tables"]):
+                        stats["recommendations"].append(
+                            "Some tables have no row estimates; run analyze_database, or read "
+                            "database://statistics?exact_counts=true for exact counts")
+                    
+                    if approximate:
+                        stats["snapshot"]["distinct_counts"] = distinct_counts_note()
                     
                     if not stats["recommendations"]:
                         stats["recommendations"].append("Database appears well-optimized")
@@ -1607,10 +959,21 @@ async def main(db_path: str = "sqlite_mcp.db"):
                     return json.dumps({"error": f"Failed to analyze search indexes: {str(e)}"}, indent=2)
             
             elif path == "performance":
-                # Performance insights
+                # Measured tool and connection pool performance
                 try:
+                    metrics = db.metrics.snapshot()
+                    if not metrics["total_calls"]:
+                        health_score = "No data"
+                    else:
+                        error_rate = metrics["total_errors"] / metrics["total_calls"]
+                        slowest_p95 = max(tool["latency_ms"]["p95"] for tool in metrics["tools"].values())
+                        health_score = "Good" if error_rate < 0.01 and slowest_p95 < 1000 else "Degraded"
+                    
                     performance = {
-                        "health_score": "Good",
+                        "health_score": health_score,
+                        "metrics": metrics,
+                        "connection_pool": db.pool.stats(),
+                        "statement_deadlines": db.deadlines.stats(),
                         "optimization_tips": [
                             "Run ANALYZE regularly to update query planner statistics",
                             "Use VACUUM periodically to reclaim space and defragment",
@@ -1647,6 +1010,12 @@ async def main(db_path: str = "sqlite_mcp.db"):
                 # Return JSON diagnostics as formatted string
                 diagnostics = db.diagnostics.get_json_diagnostics()
                 return json.dumps(diagnostics, indent=2)
+            elif path == "connections":
+                return json.dumps(db.diagnostics.get_connection_diagnostics(db.pool), indent=2)
+            elif path == "cache":
+                return json.dumps(db.diagnostics.get_cache_diagnostics(db.result_cache), indent=2)
+            elif path == "logging":
+                return json.dumps(db.diagnostics.get_logging_diagnostics(), indent=2)
             else:
                 logger.error(f"Unknown diagnostics path: {path}")
                 raise ValueError(f"Unknown diagnostics path: {path}")
@@ -1654,6 +1023,10 @@ async def main(db_path: str = "sqlite_mcp.db"):
             logger.error(f"Unsupported URI scheme: {uri.scheme}")
             raise ValueError(f"Unsupported URI scheme: {uri.scheme}")
 
+    @server.read_resource()
+    async def handle_read_resource(uri: AnyUrl) -> str:
+        return await db.executor.run(_read_resource, uri)
+
     @server.list_prompts()
     async def handle_list_prompts() -> list[types.Prompt]:
         logger.debug("Handling list_prompts request")
@@ -1805,19 +1178,28 @@ async def main(db_path: str = "sqlite_mcp.db"):
             logger.error(f"Unknown prompt: {name}")
             raise ValueError(f"Unknown prompt: {name}")
 
-    @server.list_tools()
-    async def handle_list_tools() -> list[types.Tool]:
-        """List available tools"""
+    def _tool_definitions() -> list[types.Tool]:
+        """Build every tool definition; create_server calls this once"""
         basic_tools = [
             types.Tool(
                 name="read_query",
-                description="Execute a SELECT query on the SQLite database",
+                description="Execute a SELECT query on the SQLite database. Pass page_size to receive large results page by page with a continuation cursor",
                 inputSchema={
                     "type": "object",
                     "properties": {
                         "query": {"type": "string", "description": "SELECT SQL query to execute"},
+                        "params": {
+                            "anyOf": [{"type": "array"}, {"type": "object"}],
+                            "description": "Values for ? placeholders (array) or :name placeholders (object)"
+                        },
+                        "page_size": {
+                            "type": "integer",
+                            "description": f"Return at most this many rows plus a cursor for the rest (default {DEFAULT_PAGE_SIZE} when cursor is given, max {MAX_PAGE_SIZE})",
+                            "minimum": 1,
+                            "maximum": MAX_PAGE_SIZE
+                        },
+                        "cursor": {"type": "string", "description": "Continuation cursor from a previous page; fetches the next page instead of running query"},
                     },
-                    "required": ["query"],
                 },
             ),
             types.Tool(
@@ -1827,10 +1209,35 @@ async def main(db_path: str = "sqlite_mcp.db"):
                     "type": "object",
                     "properties": {
                         "query": {"type": "string", "description": "SQL query to execute"},
+                        "params": {
+                            "anyOf": [{"type": "array"}, {"type": "object"}],
+                            "description": "Values for ? placeholders (array) or :name placeholders (object)"
+                        },
                     },
                     "required": ["query"],
                 },
             ),
+            types.Tool(
+                name="batch_write",
+                description="Execute one INSERT, REPLACE, UPDATE, or DELETE statement for many parameter rows with executemany, committing once per chunk instead of once per row",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {"type": "string", "description": "SQL statement with ? or :name placeholders"},
+                        "param_rows": {
+                            "type": "array",
+                            "items": {"anyOf": [{"type": "array"}, {"type": "object"}]},
+                            "description": "One array (positional) or object (named) of values per row"
+                        },
+                        "chunk_size": {
+                            "type": "integer",
+                            "description": "Rows per committed transaction (default: the whole batch in one transaction)",
+                            "minimum": 1
+                        },
+                    },
+                    "required": ["query", "param_rows"],
+                },
+            ),
             types.Tool(
                 name="create_table",
                 description="Create a new table in the SQLite database",
@@ -1905,6 +1312,69 @@ async def main(db_path: str = "sqlite_mcp.db"):
                     "properties": {},
                 },
             ),
+            types.Tool(
+                name="wal_checkpoint",
+                description="Checkpoint the write-ahead log into the main database file (WAL mode)",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "mode": {
+                            "type": "string",
+                            "enum": ["passive", "full", "restart", "truncate"],
+                            "description": "Checkpoint mode: passive never waits on readers, full waits for them, truncate also empties the WAL file",
+                            "default": "passive"
+                        },
+                    },
+                },
+            ),
+            types.Tool(
+                name="performance_metrics",
+                description="Per-tool call counts, error counts, p50/p95/p99 latency, rows returned, SQLite VM work, response bytes and connection pool wait time",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "tool": {"type": "string", "description": "Only report this tool"},
+                        "reset": {"type": "boolean", "description": "Start a new measurement window after reporting", "default": False},
+                    },
+                },
+            ),
+            types.Tool(
+                name="top_queries",
+                description="Most expensive statements grouped by fingerprint (literals normalized out), with calls, total/mean/max time, rows and slow call counts",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "limit": {"type": "integer", "description": "Number of fingerprints to return", "default": 10},
+                        "order_by": {
+                            "type": "string",
+                            "enum": list(QUERY_STATS_ORDER_BY),
+                            "description": "Ranking used to pick the worst offenders",
+                            "default": "total_time"
+                        },
+                        "include_slow_log": {"type": "boolean", "description": "Also return the most recent slow statements", "default": True},
+                        "reset": {"type": "boolean", "description": "Discard the statistics after reporting", "default": False},
+                    },
+                },
+            ),
+            types.Tool(
+                name="index_advisor",
+                description="Run EXPLAIN QUERY PLAN over the recorded read workload (or given queries), find full scans of large tables and temp B-tree sorts, and propose CREATE INDEX statements, including covering indexes, with sqlite_stat1 benefit estimates",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "queries": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "SELECT statements to analyze instead of the recorded workload"
+                        },
+                        "limit": {"type": "integer", "description": "Most expensive recorded statements to analyze", "default": DEFAULT_WORKLOAD_SIZE},
+                        "min_rows": {"type": "integer", "description": "Ignore full scans of tables with fewer rows", "default": DEFAULT_MIN_ROWS},
+                        "covering": {"type": "boolean", "description": "Propose covering indexes when a statement reads few other columns", "default": True},
+                        "dry_run": {"type": "boolean", "description": "Create each candidate on an in-memory copy and re-measure before recommending it", "default": False},
+                        "max_dry_run_mb": {"type": "number", "description": "Largest database copied for a dry run", "default": DEFAULT_MAX_DRY_RUN_MB},
+                    },
+                },
+            ),
             types.Tool(
                 name="index_usage_stats",
                 description="Get index usage statistics for query optimization",
@@ -2806,7 +2276,7 @@ async def main(db_path: str = "sqlite_mcp.db"):
             # Statistical Analysis Tools (v2.1.0)
             types.Tool(
                 name="descriptive_statistics",
-                description="Calculate comprehensive descriptive statistics for a numeric column",
+                description="Calculate comprehensive descriptive statistics, including skewness and kurtosis, for a numeric column in one table scan",
                 inputSchema={
                     "type": "object",
                     "properties": {
@@ -2822,6 +2292,23 @@ async def main(db_path: str = "sqlite_mcp.db"):
                             "type": "string",
                             "description": "Optional WHERE clause to filter data",
                             "default": ""
+                        },
+                        "approximate": {
+                            "type": "boolean",
+                            "description": "Estimate the distinct count from a stored HyperLogLog sketch, extended with rows added since the last call, instead of COUNT(DISTINCT)",
+                            "default": False
+                        },
+                        "hll_precision": {
+                            "type": "integer",
+                            "minimum": MIN_HLL_PRECISION,
+                            "maximum": MAX_HLL_PRECISION,
+                            "description": "log2 of the HyperLogLog register count; 14 (16 KB) has a 0.81% standard error, each step up divides it by 1.41",
+                            "default": DEFAULT_HLL_PRECISION
+                        },
+                        "rebuild_sketch": {
+                            "type": "boolean",
+                            "description": "Rebuild the stored sketch from the whole table, e.g. after rows were updated or deleted",
+                            "default": False
                         }
                     },
                     "required": ["table_name", "column_name"]
@@ -2838,13 +2325,52 @@ async def main(db_path: str = "sqlite_mcp.db"):
                             "type": "string",
                             "description": "Name of the table"
                         },
-                        "column_x": {
-                            "type": "string",
-                            "description": "First numeric column"
+                        "column_x": {
+                            "type": "string",
+                            "description": "First numeric column"
+                        },
+                        "column_y": {
+                            "type": "string",
+                            "description": "Second numeric column"
+                        },
+                        "where_clause": {
+                            "type": "string",
+                            "description": "Optional WHERE clause to filter data",
+                            "default": ""
+                        }
+                    },
+                    "required": ["table_name", "column_x", "column_y"]
+                }
+            ),
+            
+            types.Tool(
+                name="correlation_matrix",
+                description="Pearson and Spearman correlation matrices of several numeric columns from one table scan, computed over pairwise-complete rows",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table_name": {
+                            "type": "string",
+                            "description": "Name of the table"
+                        },
+                        "columns": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "minItems": 2,
+                            "uniqueItems": True,
+                            "description": "Numeric columns to correlate; text, blobs and NULLs count as missing"
                         },
-                        "column_y": {
-                            "type": "string",
-                            "description": "Second numeric column"
+                        "methods": {
+                            "type": "array",
+                            "items": {"type": "string", "enum": ["pearson", "spearman"]},
+                            "minItems": 1,
+                            "description": "Correlations to report; Spearman keeps the column values in memory to rank them",
+                            "default": ["pearson", "spearman"]
+                        },
+                        "use_numpy": {
+                            "type": "boolean",
+                            "description": "Reduce fetched chunks with NumPy when it is installed",
+                            "default": True
                         },
                         "where_clause": {
                             "type": "string",
@@ -2852,13 +2378,13 @@ async def main(db_path: str = "sqlite_mcp.db"):
                             "default": ""
                         }
                     },
-                    "required": ["table_name", "column_x", "column_y"]
+                    "required": ["table_name", "columns"]
                 }
             ),
             
             types.Tool(
                 name="percentile_analysis",
-                description="Calculate percentiles and quartiles for a numeric column",
+                description="Calculate percentiles and quartiles for a numeric column from a single sort",
                 inputSchema={
                     "type": "object",
                     "properties": {
@@ -2876,6 +2402,23 @@ async def main(db_path: str = "sqlite_mcp.db"):
                             "description": "List of percentiles to calculate (0-100)",
                             "default": [25, 50, 75, 90, 95, 99]
                         },
+                        "method": {
+                            "type": "string",
+                            "enum": list(PERCENTILE_METHODS),
+                            "description": "How a percentile between two values is computed: interpolate (linear), the lower or higher value, the nearest one, or their midpoint. Exact computation only; cannot be combined with max_rank_error",
+                            "default": "linear"
+                        },
+                        "max_rank_error": {
+                            "type": "number",
+                            "exclusiveMinimum": 0,
+                            "maximum": 0.5,
+                            "description": "Accept approximate quantiles within this rank error (e.g. 0.01 for 1%) from a stored KLL sketch that is only extended with rows added since the last call. The sketch returns stored values, so method does not apply"
+                        },
+                        "rebuild_sketch": {
+                            "type": "boolean",
+                            "description": "Rebuild the stored sketch from the whole table, e.g. after rows were updated or deleted",
+                            "default": False
+                        },
                         "where_clause": {
                             "type": "string",
                             "description": "Optional WHERE clause to filter data",
@@ -2951,7 +2494,7 @@ async def main(db_path: str = "sqlite_mcp.db"):
             
             types.Tool(
                 name="outlier_detection",
-                description="Detect outliers using IQR method and Z-score analysis",
+                description="Detect outliers using IQR fences and Z-score bounds, counting the values outside them",
                 inputSchema={
                     "type": "object",
                     "properties": {
@@ -2979,6 +2522,17 @@ async def main(db_path: str = "sqlite_mcp.db"):
                             "description": "Z-score threshold for outlier detection",
                             "default": 3.0
                         },
+                        "max_rank_error": {
+                            "type": "number",
+                            "exclusiveMinimum": 0,
+                            "maximum": 0.5,
+                            "description": "Accept approximate quartiles for the IQR method within this rank error (e.g. 0.01 for 1%) from a stored KLL sketch that is only extended with rows added since the last call"
+                        },
+                        "rebuild_sketch": {
+                            "type": "boolean",
+                            "description": "Rebuild the stored sketch from the whole table, e.g. after rows were updated or deleted",
+                            "default": False
+                        },
                         "where_clause": {
                             "type": "string",
                             "description": "Optional WHERE clause to filter data",
@@ -3096,162 +2650,186 @@ async def main(db_path: str = "sqlite_mcp.db"):
                         "required": ["json_str"],
                     },
                 ),
+            ]
+        else:
+            diagnostic_tools = []
+        
+        # Text Processing Tools
+        text_tools = [
+            types.Tool(
+                name="regex_extract",
+                description="Extract text using PCRE-style regular expressions",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table_name": {"type": "string", "description": "Name of the table"},
+                        "column_name": {"type": "string", "description": "Name of the column to search"},
+                        "pattern": {"type": "string", "description": "Regular expression pattern"},
+                        "flags": {"type": "string", "description": "Regex flags (i=ignore case, m=multiline, s=dotall)", "default": ""},
+                        "limit": {"type": "integer", "description": "Maximum number of results", "default": 100},
+                        "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
+                    },
+                    "required": ["table_name", "column_name", "pattern"]
+                }
+            ),
                 
-                # Text Processing Tools
-                types.Tool(
-                    name="regex_extract",
-                    description="Extract text using PCRE-style regular expressions",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {"type": "string", "description": "Name of the table"},
-                            "column_name": {"type": "string", "description": "Name of the column to search"},
-                            "pattern": {"type": "string", "description": "Regular expression pattern"},
-                            "flags": {"type": "string", "description": "Regex flags (i=ignore case, m=multiline, s=dotall)", "default": ""},
-                            "limit": {"type": "integer", "description": "Maximum number of results", "default": 100},
-                            "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
-                        },
-                        "required": ["table_name", "column_name", "pattern"]
-                    }
-                ),
-                
-                types.Tool(
-                    name="regex_replace",
-                    description="Replace text using PCRE-style regular expressions",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {"type": "string", "description": "Name of the table"},
-                            "column_name": {"type": "string", "description": "Name of the column to modify"},
-                            "pattern": {"type": "string", "description": "Regular expression pattern"},
-                            "replacement": {"type": "string", "description": "Replacement text"},
-                            "flags": {"type": "string", "description": "Regex flags", "default": ""},
-                            "max_replacements": {"type": "integer", "description": "Maximum replacements per row (0=all)", "default": 0},
-                            "preview_only": {"type": "boolean", "description": "Preview changes without executing", "default": True},
-                            "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
-                        },
-                        "required": ["table_name", "column_name", "pattern", "replacement"]
-                    }
-                ),
+            types.Tool(
+                name="regex_replace",
+                description="Replace text using PCRE-style regular expressions",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table_name": {"type": "string", "description": "Name of the table"},
+                        "column_name": {"type": "string", "description": "Name of the column to modify"},
+                        "pattern": {"type": "string", "description": "Regular expression pattern"},
+                        "replacement": {"type": "string", "description": "Replacement text"},
+                        "flags": {"type": "string", "description": "Regex flags", "default": ""},
+                        "max_replacements": {"type": "integer", "description": "Maximum replacements per row (0=all)", "default": 0},
+                        "preview_only": {"type": "boolean", "description": "Preview changes without executing", "default": True},
+                        "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
+                    },
+                    "required": ["table_name", "column_name", "pattern", "replacement"]
+                }
+            ),
                 
-                types.Tool(
-                    name="fuzzy_match",
-                    description="Find fuzzy matches using Levenshtein distance and sequence matching",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {"type": "string", "description": "Name of the table"},
-                            "column_name": {"type": "string", "description": "Name of the column to search"},
-                            "search_term": {"type": "string", "description": "Term to find fuzzy matches for"},
-                            "threshold": {"type": "number", "description": "Similarity threshold (0.0-1.0)", "default": 0.6},
-                            "limit": {"type": "integer", "description": "Maximum number of results", "default": 50},
-                            "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
-                        },
-                        "required": ["table_name", "column_name", "search_term"]
-                    }
-                ),
+            types.Tool(
+                name="fuzzy_match",
+                description="Find fuzzy matches using Levenshtein distance and sequence matching",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table_name": {"type": "string", "description": "Name of the table"},
+                        "column_name": {"type": "string", "description": "Name of the column to search"},
+                        "search_term": {"type": "string", "description": "Term to find fuzzy matches for"},
+                        "threshold": {"type": "number", "description": "Similarity threshold (0.0-1.0)", "default": 0.6},
+                        "limit": {"type": "integer", "description": "Maximum number of results", "default": 50},
+                        "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
+                    },
+                    "required": ["table_name", "column_name", "search_term"]
+                }
+            ),
                 
-                types.Tool(
-                    name="phonetic_match",
-                    description="Find phonetic matches using Soundex and Metaphone algorithms",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {"type": "string", "description": "Name of the table"},
-                            "column_name": {"type": "string", "description": "Name of the column to search"},
-                            "search_term": {"type": "string", "description": "Term to find phonetic matches for"},
-                            "algorithm": {"type": "string", "description": "Algorithm to use (soundex, metaphone)", "default": "soundex"},
-                            "limit": {"type": "integer", "description": "Maximum number of results", "default": 50},
-                            "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
-                        },
-                        "required": ["table_name", "column_name", "search_term"]
-                    }
-                ),
+            types.Tool(
+                name="phonetic_match",
+                description="Find phonetic matches using Soundex and Metaphone algorithms",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table_name": {"type": "string", "description": "Name of the table"},
+                        "column_name": {"type": "string", "description": "Name of the column to search"},
+                        "search_term": {"type": "string", "description": "Term to find phonetic matches for"},
+                        "algorithm": {"type": "string", "description": "Algorithm to use (soundex, metaphone)", "default": "soundex"},
+                        "limit": {"type": "integer", "description": "Maximum number of results", "default": 50},
+                        "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
+                    },
+                    "required": ["table_name", "column_name", "search_term"]
+                }
+            ),
                 
-                types.Tool(
-                    name="text_similarity",
-                    description="Calculate text similarity between columns or against reference text",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {"type": "string", "description": "Name of the table"},
-                            "column_name": {"type": "string", "description": "Name of the column to analyze"},
-                            "reference_text": {"type": "string", "description": "Reference text for comparison", "default": ""},
-                            "compare_column": {"type": "string", "description": "Second column for comparison", "default": ""},
-                            "algorithm": {"type": "string", "description": "Similarity algorithm (cosine, jaccard, levenshtein)", "default": "cosine"},
-                            "limit": {"type": "integer", "description": "Maximum number of results", "default": 100},
-                            "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
-                        },
-                        "required": ["table_name", "column_name"]
-                    }
-                ),
+            types.Tool(
+                name="text_similarity",
+                description="Calculate text similarity between columns or against reference text",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table_name": {"type": "string", "description": "Name of the table"},
+                        "column_name": {"type": "string", "description": "Name of the column to analyze"},
+                        "reference_text": {"type": "string", "description": "Reference text for comparison", "default": ""},
+                        "compare_column": {"type": "string", "description": "Second column for comparison", "default": ""},
+                        "algorithm": {"type": "string", "description": "Similarity algorithm (cosine, jaccard, levenshtein)", "default": "cosine"},
+                        "limit": {"type": "integer", "description": "Maximum number of results", "default": 100},
+                        "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
+                    },
+                    "required": ["table_name", "column_name"]
+                }
+            ),
                 
-                types.Tool(
-                    name="text_normalize",
-                    description="Normalize text with various transformations",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {"type": "string", "description": "Name of the table"},
-                            "column_name": {"type": "string", "description": "Name of the column to normalize"},
-                            "operations": {"type": "array", "items": {"type": "string"}, "description": "Normalization operations", "default": ["lowercase", "trim"]},
-                            "preview_only": {"type": "boolean", "description": "Preview changes without executing", "default": True},
-                            "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
-                        },
-                        "required": ["table_name", "column_name"]
-                    }
-                ),
+            types.Tool(
+                name="text_normalize",
+                description="Normalize text with various transformations",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table_name": {"type": "string", "description": "Name of the table"},
+                        "column_name": {"type": "string", "description": "Name of the column to normalize"},
+                        "operations": {"type": "array", "items": {"type": "string"}, "description": "Normalization operations", "default": ["lowercase", "trim"]},
+                        "preview_only": {"type": "boolean", "description": "Preview changes without executing", "default": True},
+                        "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
+                    },
+                    "required": ["table_name", "column_name"]
+                }
+            ),
                 
-                types.Tool(
-                    name="advanced_search",
-                    description="Advanced search combining multiple text processing techniques",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {"type": "string", "description": "Name of the table"},
-                            "column_name": {"type": "string", "description": "Name of the column to search"},
-                            "search_term": {"type": "string", "description": "Search term"},
-                            "techniques": {"type": "array", "items": {"type": "string"}, "description": "Search techniques to use", "default": ["exact", "fuzzy", "phonetic"]},
-                            "fuzzy_threshold": {"type": "number", "description": "Fuzzy match threshold", "default": 0.6},
-                            "limit": {"type": "integer", "description": "Maximum number of results", "default": 100},
-                            "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
-                        },
-                        "required": ["table_name", "column_name", "search_term"]
-                    }
-                ),
+            types.Tool(
+                name="advanced_search",
+                description="Advanced search combining multiple text processing techniques",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table_name": {"type": "string", "description": "Name of the table"},
+                        "column_name": {"type": "string", "description": "Name of the column to search"},
+                        "search_term": {"type": "string", "description": "Search term"},
+                        "techniques": {"type": "array", "items": {"type": "string"}, "description": "Search techniques to use", "default": ["exact", "fuzzy", "phonetic"]},
+                        "fuzzy_threshold": {"type": "number", "description": "Fuzzy match threshold", "default": 0.6},
+                        "limit": {"type": "integer", "description": "Maximum number of results", "default": 100},
+                        "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
+                    },
+                    "required": ["table_name", "column_name", "search_term"]
+                }
+            ),
                 
-                types.Tool(
-                    name="text_validation",
-                    description="Validate text against various patterns and rules",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {"type": "string", "description": "Name of the table"},
-                            "column_name": {"type": "string", "description": "Name of the column to validate"},
-                            "validation_type": {"type": "string", "description": "Type of validation (email, phone, url, custom_regex)", "default": "email"},
-                            "custom_pattern": {"type": "string", "description": "Custom regex pattern for validation", "default": ""},
-                            "return_invalid_only": {"type": "boolean", "description": "Only return invalid entries", "default": True},
-                            "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
-                        },
-                        "required": ["table_name", "column_name"]
-                    }
-                ),
-            ]
-            
-            return basic_tools + diagnostic_tools
-        else:
-            return basic_tools
+            types.Tool(
+                name="text_validation",
+                description="Validate text against various patterns and rules",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table_name": {"type": "string", "description": "Name of the table"},
+                        "column_name": {"type": "string", "description": "Name of the column to validate"},
+                        "validation_type": {"type": "string", "description": "Type of validation (email, phone, url, custom_regex)", "default": "email"},
+                        "custom_pattern": {"type": "string", "description": "Custom regex pattern for validation", "default": ""},
+                        "return_invalid_only": {"type": "boolean", "description": "Only return invalid entries", "default": True},
+                        "where_clause": {"type": "string", "description": "Optional WHERE clause", "default": ""}
+                    },
+                    "required": ["table_name", "column_name"]
+                }
+            ),
+        ]
+        
+        return basic_tools + diagnostic_tools + text_tools
 
-    @server.call_tool()
-    async def handle_call_tool(
+    # Built and validated once; tools/list and argument checks reuse it
+    # Tools left out of an otherwise enabled category, and why
+    unavailable_tools = {} if db.version_info['has_jsonb_support'] else {
+        name: f"it needs JSONB support (SQLite 3.45.0 or later; this is {db.version_info.get('version', 'unknown')})"
+        for name in ("validate_json", "test_jsonb_conversion")}
+    tool_catalog = ToolCatalog(_tool_definitions(), tool_categories, unavailable_tools)
+
+    @server.list_tools()
+    async def handle_list_tools() -> list[types.Tool]:
+        """List available tools; a "categories" list in the request's _meta narrows the list"""
+        categories = None
+        try:
+            meta = server.request_context.meta
+        except LookupError:
+            # Called outside a request, e.g. to look up a tool definition
+            meta = None
+        if meta is not None:
+            categories = getattr(meta, 'categories', None)
+            if isinstance(categories, str):
+                categories = categories.split(',')
+        return tool_catalog.tools(categories)
+
+    def _call_tool(
         name: str, arguments: dict[str, Any] | None
     ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-        """Handle tool execution requests"""
+        """Execute a tool; runs on the tool executor's worker threads"""
         try:
             # Handle basic tools
             if name == "list_tables":
+                # The server's own sketch table is not one of the user's tables
                 results = db._execute_query(
-                    "SELECT name FROM sqlite_master WHERE type='table'"
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name != ?", [SKETCH_TABLE]
                 )
                 return [types.TextContent(type="text", text=str(results))]
 
@@ -3269,88 +2847,64 @@ async def main(db_path: str = "sqlite_mcp.db"):
                 table_name = arguments.get("table_name")
                 column_name = arguments.get("column_name")
                 where_clause = arguments.get("where_clause", "")
+                approximate = arguments.get("approximate", False)
                 
                 try:
-                    # Build WHERE clause
-                    where_sql = f" WHERE {where_clause}" if where_clause else ""
+                    # COUNT(DISTINCT) builds a temporary B-tree of every value; a stored
+                    # HyperLogLog sketch answers in bounded memory from the new rows only
+                    if approximate:
+                        sketch, info = db.sketch_store.distinct_sketch(
+                            table_name, column_name, where_clause,
+                            arguments.get("hll_precision", DEFAULT_HLL_PRECISION), arguments.get("rebuild_sketch", False))
+                        distinct_sql = ""
+                    else:
+                        distinct_sql = f"COUNT(DISTINCT {column_name}) as distinct_count,"
                     
-                    # Calculate comprehensive descriptive statistics
+                    # One scan: the moments() aggregate replaces the nested AVG subqueries
                     stats_query = f"""
                     SELECT 
-                        COUNT({column_name}) as count,
-                        COUNT(DISTINCT {column_name}) as distinct_count,
-                        AVG(CAST({column_name} AS REAL)) as mean,
-                        MIN(CAST({column_name} AS REAL)) as min_value,
-                        MAX(CAST({column_name} AS REAL)) as max_value,
+                        {distinct_sql}
                         SUM(CAST({column_name} AS REAL)) as sum_value,
-                        
-                        -- Standard deviation and variance
-                        (
-                            SELECT SQRT(AVG(power_diff))
-                            FROM (
-                                SELECT POWER(CAST({column_name} AS REAL) - 
-                                    (SELECT AVG(CAST({column_name} AS REAL)) FROM {table_name}{where_sql}), 2) as power_diff
-                                FROM {table_name}{where_sql}
-                                WHERE {column_name} IS NOT NULL
-                            )
-                        ) as std_dev,
-                        
-                        (
-                            SELECT AVG(power_diff)
-                            FROM (
-                                SELECT POWER(CAST({column_name} AS REAL) - 
-                                    (SELECT AVG(CAST({column_name} AS REAL)) FROM {table_name}{where_sql}), 2) as power_diff
-                                FROM {table_name}{where_sql}
-                                WHERE {column_name} IS NOT NULL
-                            )
-                        ) as variance,
-                        
-                        -- Range and coefficient of variation
-                        (MAX(CAST({column_name} AS REAL)) - MIN(CAST({column_name} AS REAL))) as range_value,
-                        
-                        CASE 
-                            WHEN AVG(CAST({column_name} AS REAL)) != 0 THEN
-                                (
-                                    SELECT SQRT(AVG(power_diff))
-                                    FROM (
-                                        SELECT POWER(CAST({column_name} AS REAL) - 
-                                            (SELECT AVG(CAST({column_name} AS REAL)) FROM {table_name}{where_sql}), 2) as power_diff
-                                        FROM {table_name}{where_sql}
-                                        WHERE {column_name} IS NOT NULL
-                                    )
-                                ) / AVG(CAST({column_name} AS REAL))
-                            ELSE NULL
-                        END as coefficient_of_variation
-                        
-                    FROM {table_name}{where_sql}
-                    WHERE {column_name} IS NOT NULL
+                        moments(CAST({column_name} AS REAL)) as moments
+                    FROM {table_name}
+                    WHERE {column_name} IS NOT NULL{f" AND ({where_clause})" if where_clause else ""}
                     """
                     
                     result = db._execute_query(stats_query)
                     
-                    if result:
-                        stats = result[0]
+                    if result and result[0]['moments'] is not None:
+                        stats = json.loads(result[0]['moments'])
                         
                         # Format output
-                        cv_text = f"{stats['coefficient_of_variation']:.4f}" if stats['coefficient_of_variation'] is not None else 'N/A'
+                        cv_text = f"{stats['std_dev'] / stats['mean']:.4f}" if stats['mean'] != 0 else 'N/A'
+                        skewness_text = f"{stats['skewness']:.4f}" if stats['skewness'] is not None else 'N/A'
+                        kurtosis_text = f"{stats['kurtosis']:.4f}" if stats['kurtosis'] is not None else 'N/A'
+                        if approximate:
+                            distinct_text = f"~{sketch.count():,} ({_hll_note(sketch, info)})"
+                        else:
+                            distinct_text = f"{result[0]['distinct_count']:,}"
                         
                         output = f"""Descriptive Statistics for {table_name}.{column_name}:
 
 Basic Statistics:
 - Count: {stats['count']:,}
-- Distinct Values: {stats['distinct_count']:,}
+- Distinct Values: {distinct_text}
 
 Central Tendency:
 - Mean: {stats['mean']:.4f}
-- Min: {stats['min_value']:.4f}
-- Max: {stats['max_value']:.4f}
-- Sum: {stats['sum_value']:.4f}
+- Min: {stats['min']:.4f}
+- Max: {stats['max']:.4f}
+- Sum: {result[0]['sum_value']:.4f}
 
 Variability:
-- Range: {stats['range_value']:.4f}
+- Range: {stats['max'] - stats['min']:.4f}
 - Standard Deviation: {stats['std_dev']:.4f}
 - Variance: {stats['variance']:.4f}
-- Coefficient of Variation: {cv_text}"""
+- Coefficient of Variation: {cv_text}
+
+Shape:
+- Skewness: {skewness_text}
+- Excess Kurtosis: {kurtosis_text}"""
                         
                         return [types.TextContent(type="text", text=output)]
                     else:
@@ -3431,37 +2985,69 @@ R-squared: {correlation**2:.4f} ({correlation**2*100:.1f}% of variance explained
                     logger.error(error_msg)
                     return [types.TextContent(type="text", text=error_msg)]
 
+            elif name == "correlation_matrix":
+                table_name = arguments.get("table_name")
+                columns = arguments.get("columns")
+                methods = arguments.get("methods", ["pearson", "spearman"])
+                where_clause = arguments.get("where_clause", "")
+                
+                try:
+                    # All pairs from one pass, instead of one correlation_analysis scan per pair
+                    with db.pool.reader() as conn:
+                        result = correlation_matrix(conn, table_name, columns, where_clause,
+                                                    spearman="spearman" in methods,
+                                                    use_numpy=arguments.get("use_numpy", True))
+                    
+                    output = f"Correlation Matrix for {table_name} ({result['rows']:,} rows in one scan, {result['engine']} engine):\n"
+                    if "pearson" in methods:
+                        output += f"\nPearson correlation:\n{_format_matrix(columns, result['pearson'], '{:.4f}')}\n"
+                    if "spearman" in methods:
+                        output += f"\nSpearman rank correlation:\n{_format_matrix(columns, result['spearman'], '{:.4f}')}\n"
+                    output += f"\nPairwise-complete rows:\n{_format_matrix(columns, result['counts'], '{:,}')}"
+                    return [types.TextContent(type="text", text=output)]
+                    
+                except Exception as e:
+                    error_msg = f"Failed to calculate correlation matrix: {str(e)}"
+                    logger.error(error_msg)
+                    return [types.TextContent(type="text", text=error_msg)]
+
             elif name == "percentile_analysis":
                 table_name = arguments.get("table_name")
                 column_name = arguments.get("column_name")
                 percentiles = arguments.get("percentiles", [25, 50, 75, 90, 95, 99])
+                method = arguments.get("method", "linear")
+                max_rank_error = arguments.get("max_rank_error")
+                rebuild_sketch = arguments.get("rebuild_sketch", False)
                 where_clause = arguments.get("where_clause", "")
                 
                 try:
-                    where_sql = f" WHERE {where_clause}" if where_clause else ""
-                    
-                    # Calculate percentiles using NTILE and row_number
-                    percentile_queries = []
-                    for p in percentiles:
-                        percentile_queries.append(f"""
-                        SELECT {p} as percentile,
-                               (SELECT CAST({column_name} AS REAL) 
-                                FROM (SELECT {column_name}, 
-                                             ROW_NUMBER() OVER (ORDER BY CAST({column_name} AS REAL)) as rn,
-                                             COUNT(*) OVER () as total_count
-                                      FROM {table_name}{where_sql}
-                                      WHERE {column_name} IS NOT NULL)
-                                WHERE rn = CAST(({p} / 100.0) * total_count AS INTEGER) + 1) as value
-                        """)
-                    
-                    full_query = " UNION ALL ".join(percentile_queries)
-                    result = db._execute_query(full_query)
+                    if max_rank_error is not None and "method" in arguments:
+                        raise ValueError("method applies only to exact percentiles; a KLL sketch (max_rank_error) "
+                                         "returns stored values, so pass one or the other")
+                    if max_rank_error is not None:
+                        # A stored KLL sketch, extended with new rows, instead of sorting the column
+                        sketch, info = db.sketch_store.quantile_sketch(
+                            table_name, column_name, where_clause, kll_k_for_error(max_rank_error), rebuild_sketch)
+                        values = sketch.quantiles([p / 100 for p in percentiles])
+                        summary = {'count': sketch.n, 'percentiles': [[p, value] for p, value in zip(percentiles, values)]}
+                        computed_by = _sketch_note(sketch, info)
+                    else:
+                        # The percentiles() aggregate sorts the column once for all percentiles
+                        percentile_query = f"""
+                        SELECT percentiles(CAST({column_name} AS REAL), ?, ?) as result
+                        FROM {table_name}
+                        WHERE {column_name} IS NOT NULL{f" AND ({where_clause})" if where_clause else ""}
+                        """
+                        rows = db._execute_query(percentile_query, [json.dumps(percentiles), method])
+                        summary = json.loads(rows[0]['result']) if rows and rows[0]['result'] else None
+                        computed_by = f"{method} interpolation"
                     
-                    if result:
-                        output = f"Percentile Analysis for {table_name}.{column_name}:\n\n"
+                    if summary and summary['count']:
+                        result = [{'percentile': p, 'value': value} for p, value in summary['percentiles']]
+                        output = f"Percentile Analysis for {table_name}.{column_name} ({summary['count']:,} values, {computed_by}):\n\n"
                         
                         for row in result:
-                            p = int(row['percentile'])
+                            p = row['percentile']
                             value = row['value']
                             
                             if p == 25:
@@ -3471,7 +3057,7 @@ R-squared: {correlation**2:.4f} ({correlation**2*100:.1f}% of variance explained
                             elif p == 75:
                                 output += f"Q3 (75th percentile): {value:.4f}\n"
                             else:
-                                output += f"{p}th percentile: {value:.4f}\n"
+                                output += f"{p:g}th percentile: {value:.4f}\n"
                         
                         # Calculate IQR
                         q1 = next((row['value'] for row in result if row['percentile'] == 25), None)
@@ -3494,73 +3080,68 @@ R-squared: {correlation**2:.4f} ({correlation**2*100:.1f}% of variance explained
                 method = arguments.get("method", "both")
                 iqr_multiplier = arguments.get("iqr_multiplier", 1.5)
                 zscore_threshold = arguments.get("zscore_threshold", 3.0)
+                max_rank_error = arguments.get("max_rank_error")
+                rebuild_sketch = arguments.get("rebuild_sketch", False)
                 where_clause = arguments.get("where_clause", "")
                 
                 try:
-                    where_sql = f" WHERE {where_clause}" if where_clause else ""
+                    from_sql = f"FROM {table_name} WHERE {column_name} IS NOT NULL{f' AND ({where_clause})' if where_clause else ''}"
+                    
+                    def count_outside(low, high):
+                        rows = db._execute_query(
+                            f"SELECT COUNT(*) as n {from_sql} AND (CAST({column_name} AS REAL) < ? OR CAST({column_name} AS REAL) > ?)",
+                            [low, high])
+                        return rows[0]['n']
                     
                     outliers_found = []
                     
                     if method in ["iqr", "both"]:
-                        # IQR method - simplified approach
-                        # First get basic stats
-                        stats_query = f"""
-                        SELECT 
-                            MIN(CAST({column_name} AS REAL)) as min_val,
-                            MAX(CAST({column_name} AS REAL)) as max_val,
-                            AVG(CAST({column_name} AS REAL)) as mean_val,
-                            COUNT(*) as total_count
-                        FROM {table_name}{where_sql}
-                        WHERE {column_name} IS NOT NULL
-                        """
+                        outliers_found.append(f"IQR Method (multiplier={iqr_multiplier}):")
+                        if max_rank_error is not None:
+                            # Quartiles from a stored KLL sketch; the outlier count is estimated from its ranks too
+                            sketch, info = db.sketch_store.quantile_sketch(
+                                table_name, column_name, where_clause, kll_k_for_error(max_rank_error), rebuild_sketch)
+                            q1, q3 = sketch.quantiles([0.25, 0.75])
+                            total_count = sketch.n
+                        else:
+                            rows = db._execute_query(
+                                f"SELECT percentiles(CAST({column_name} AS REAL), '[25, 75]', 'linear') as result {from_sql}")
+                            summary = json.loads(rows[0]['result']) if rows and rows[0]['result'] else None
+                            q1, q3 = [value for _, value in summary['percentiles']] if summary else (None, None)
+                            total_count = summary['count'] if summary else 0
                         
-                        iqr_result = db._execute_query(stats_query)
-                        if iqr_result and len(iqr_result) > 0:
-                            row = iqr_result[0]
-                            outliers_found.append(f"IQR Method (multiplier={iqr_multiplier}):")
-                            outliers_found.append(f"  Range: {row['min_val']:.4f} to {row['max_val']:.4f}")
-                            outliers_found.append(f"  Mean: {row['mean_val']:.4f}")
-                            outliers_found.append(f"  Sample size: {row['total_count']}")
-                            outliers_found.append(f"  Note: Simplified IQR analysis - use descriptive_statistics for detailed quartiles")
+                        if not total_count:
+                            outliers_found.append("  No data available")
+                        else:
+                            iqr = q3 - q1
+                            low, high = q1 - iqr_multiplier * iqr, q3 + iqr_multiplier * iqr
+                            if max_rank_error is not None:
+                                outside = round((sketch.rank(low) + 1 - sketch.rank(high)) * total_count)
+                                outside = f"about {outside:,}"
+                            else:
+                                outside = f"{count_outside(low, high):,}"
+                            outliers_found.append(f"  Q1: {q1:.4f}, Q3: {q3:.4f}, IQR: {iqr:.4f}")
+                            outliers_found.append(f"  Lower fence: {low:.4f}")
+                            outliers_found.append(f"  Upper fence: {high:.4f}")
+                            outliers_found.append(f"  Outliers: {outside} of {total_count:,} values")
+                            if max_rank_error is not None:
+                                outliers_found.append(f"  Computed by: {_sketch_note(sketch, info)}")
                     
                     if method in ["zscore", "both"]:
-                        # Z-score method - simplified
-                        # First get the mean
-                        mean_query = f"""
-                        SELECT AVG(CAST({column_name} AS REAL)) as mean_val, COUNT(*) as total_count
-                        FROM {table_name}{where_sql}
-                        WHERE {column_name} IS NOT NULL
-                        """
-                        mean_result = db._execute_query(mean_query)
-                        if not mean_result or len(mean_result) == 0:
-                            outliers_found.append(f"\nZ-Score Method (threshold={zscore_threshold}):")
+                        # Mean and standard deviation in one scan
+                        rows = db._execute_query(f"SELECT moments(CAST({column_name} AS REAL)) as moments {from_sql}")
+                        stats = json.loads(rows[0]['moments']) if rows and rows[0]['moments'] else None
+                        outliers_found.append(f"\nZ-Score Method (threshold={zscore_threshold}):")
+                        if stats is None:
                             outliers_found.append(f"  No data available")
                         else:
-                            mean_val = mean_result[0]['mean_val']
-                            total_count = mean_result[0]['total_count']
-                            
-                            # Then calculate std dev using the mean
-                            zscore_query = f"""
-                            SELECT 
-                                {mean_val} as mean_val,
-                                SQRT(AVG(POWER(CAST({column_name} AS REAL) - {mean_val}, 2))) as std_dev,
-                                {total_count} as total_count
-                            FROM {table_name}{where_sql}
-                            WHERE {column_name} IS NOT NULL
-                            """
-                            
-                            zscore_result = db._execute_query(zscore_query)
-                            if zscore_result and len(zscore_result) > 0:
-                                row = zscore_result[0]
-                                outliers_found.append(f"\nZ-Score Method (threshold={zscore_threshold}):")
-                                outliers_found.append(f"  Mean: {row['mean_val']:.4f}")
-                                outliers_found.append(f"  Std Dev: {row['std_dev']:.4f}")
-                                outliers_found.append(f"  Lower bound: {row['mean_val'] - zscore_threshold * row['std_dev']:.4f}")
-                                outliers_found.append(f"  Upper bound: {row['mean_val'] + zscore_threshold * row['std_dev']:.4f}")
-                                outliers_found.append(f"  Note: Use descriptive_statistics for detailed outlier detection")
-                            else:
-                                outliers_found.append(f"\nZ-Score Method (threshold={zscore_threshold}):")
-                                outliers_found.append(f"  No data available")
+                            low = stats['mean'] - zscore_threshold * stats['std_dev']
+                            high = stats['mean'] + zscore_threshold * stats['std_dev']
+                            outliers_found.append(f"  Mean: {stats['mean']:.4f}")
+                            outliers_found.append(f"  Std Dev: {stats['std_dev']:.4f}")
+                            outliers_found.append(f"  Lower bound: {low:.4f}")
+                            outliers_found.append(f"  Upper bound: {high:.4f}")
+                            outliers_found.append(f"  Outliers: {count_outside(low, high):,} of {stats['count']:,} values")
                     
                     output = f"Outlier Detection for {table_name}.{column_name}:\n\n" + "\n".join(outliers_found)
                     return [types.TextContent(type="text", text=output)]
@@ -3578,7 +3159,7 @@ R-squared: {correlation**2:.4f} ({correlation**2*100:.1f}% of variance explained
                 where_clause = arguments.get("where_clause", "")
                 
                 try:
-                    where_sql = f" WHERE {where_clause}" if where_clause else ""
+                    where_sql = f" AND ({where_clause})" if where_clause else ""
                     
                     # Create moving averages for each window size
                     ma_queries = []
@@ -3592,8 +3173,8 @@ R-squared: {correlation**2:.4f} ({correlation**2*100:.1f}% of variance explained
                                 ORDER BY {time_column} 
                                 ROWS BETWEEN {window-1} PRECEDING AND CURRENT ROW
                             ) as moving_average
-                        FROM {table_name}{where_sql}
-                        WHERE {value_column} IS NOT NULL AND {time_column} IS NOT NULL
+                        FROM {table_name}
+                        WHERE {value_column} IS NOT NULL AND {time_column} IS NOT NULL{where_sql}
                         """)
                     
                     # For now, just show the first window size results
@@ -3865,9 +3446,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 db.insights.append(arguments["insight"])
                 _ = db._synthesize_memo()
 
-                # Notify clients that the memo resource has changed
-                await server.request_context.session.send_resource_updated(AnyUrl("memo://insights"))
-
                 return [types.TextContent(type="text", text="Insight added to memo")]
                 
             # Handle diagnostic tools
@@ -3888,12 +3466,10 @@ The sample mean is {'significantly different from' if significant else 'not sign
             # Handle database administration tools
             elif name == "vacuum_database":
                 logger.info("Executing VACUUM operation")
-                # VACUUM must run outside of transactions, so we use a direct connection
-                from contextlib import closing
+                # VACUUM must run outside of transactions, so it runs directly on the writer
                 try:
-                    with closing(sqlite3.connect(db.db_path)) as conn:
+                    with db.pool.writer() as conn:
                         conn.execute("VACUUM")
-                        conn.commit()
                     logger.info("VACUUM operation completed successfully")
                     return [types.TextContent(type="text", text="Database vacuum completed successfully")]
                 except Exception as e:
@@ -3927,15 +3503,85 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 stats['database_size_mb'] = round(stats['database_size_bytes'] / (1024 * 1024), 2)
                 
                 # Table count
-                table_count = db._execute_query("SELECT COUNT(*) as count FROM sqlite_master WHERE type='table'")
+                table_count = db._execute_query("SELECT COUNT(*) as count FROM sqlite_master WHERE type='table' AND name != ?",
+                                                [SKETCH_TABLE])
                 stats['table_count'] = table_count[0]['count'] if table_count else 0
                 
                 # Index count  
                 index_count = db._execute_query("SELECT COUNT(*) as count FROM sqlite_master WHERE type='index'")
                 stats['index_count'] = index_count[0]['count'] if index_count else 0
                 
+                # Journal mode and write-ahead log size
+                stats['journal_mode'] = db.pool.journal_mode
+                stats['wal_size_bytes'] = db.pool.wal_size_bytes()
+                stats['wal_size_mb'] = round(stats['wal_size_bytes'] / (1024 * 1024), 2)
+                
+                # Prepared statement reuse across pooled connections
+                pool_stats = db.pool.stats()
+                for key in ('statement_cache_size', 'statement_cache_hits',
+                            'statement_cache_misses', 'statement_cache_hit_rate'):
+                    stats[key] = pool_stats[key]
+                
+                # Group commit of concurrent writes
+                stats['write_coalescing'] = db.write_coalescer.stats()
+                
+                # Stored quantile sketches built and refreshed for approximate statistics
+                stats['column_sketches'] = db.sketch_store.stats()
+                
                 return [types.TextContent(type="text", text=json.dumps(stats, indent=2))]
 
+            elif name == "performance_metrics":
+                arguments = arguments or {}
+                snapshot = db.metrics.snapshot(arguments.get("tool"))
+                if arguments.get("reset"):
+                    db.metrics.reset()
+                    snapshot["reset"] = True
+                return [types.TextContent(type="text", text=json.dumps(snapshot, indent=2))]
+
+            elif name == "top_queries":
+                arguments = arguments or {}
+                report = db.query_stats.stats()
+                report["order_by"] = arguments.get("order_by", "total_time")
+                report["top_queries"] = db.query_stats.top(arguments.get("limit", 10), report["order_by"])
+                if arguments.get("include_slow_log", True):
+                    report["recent_slow_queries"] = db.query_stats.slow_queries()
+                if arguments.get("reset"):
+                    db.query_stats.reset()
+                    report["reset"] = True
+                return [types.TextContent(type="text", text=json.dumps(report, indent=2))]
+
+            elif name == "index_advisor":
+                arguments = arguments or {}
+                advisor = IndexAdvisor(db.pool, db.schema_catalog, db.deadlines)
+                if arguments.get("queries"):
+                    statements = advisor.statements_from_sql(arguments["queries"])
+                else:
+                    statements = advisor.workload(db.query_stats, arguments.get("limit", DEFAULT_WORKLOAD_SIZE))
+                if not statements:
+                    return [types.TextContent(type="text", text=(
+                        "No read statements have been recorded yet. Run some queries first "
+                        "or pass them in the 'queries' argument."))]
+                logger.info(f"Running index advisor over {len(statements)} statements")
+                report = advisor.advise(statements,
+                                        min_rows=arguments.get("min_rows", DEFAULT_MIN_ROWS),
+                                        covering=arguments.get("covering", True),
+                                        dry_run=arguments.get("dry_run", False),
+                                        max_dry_run_mb=arguments.get("max_dry_run_mb", DEFAULT_MAX_DRY_RUN_MB))
+                return [types.TextContent(type="text", text=json.dumps(report, indent=2, default=str))]
+
+            elif name == "wal_checkpoint":
+                mode = (arguments or {}).get("mode", "passive")
+                logger.info(f"Running WAL checkpoint ({mode})")
+                
+                if db.pool.journal_mode != "wal":
+                    return [types.TextContent(
+                        type="text",
+                        text=f"Database is not in WAL mode (journal_mode={db.pool.journal_mode}). Start the server with --wal to enable it."
+                    )]
+                
+                result = db.pool.checkpoint(mode)
+                return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+
             elif name == "index_usage_stats":
                 logger.info("Retrieving index usage statistics")
                 # Get index list and usage info
@@ -4034,9 +3680,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 backup_path = arguments["backup_path"]
                 overwrite = arguments.get("overwrite", False)
                 
-                import os
-                from pathlib import Path
-                
                 try:
                     # Check if backup file already exists
                     if os.path.exists(backup_path) and not overwrite:
@@ -4049,13 +3692,12 @@ The sample mean is {'significantly different from' if significant else 'not sign
                     backup_dir.mkdir(parents=True, exist_ok=True)
                     
                     # Perform backup using SQLite backup API
-                    source_conn = sqlite3.connect(db.db_path)
                     backup_conn = sqlite3.connect(backup_path)
                     
                     # Copy database using backup API
-                    source_conn.backup(backup_conn)
+                    with db.pool.reader() as source_conn:
+                        source_conn.backup(backup_conn)
                     
-                    source_conn.close()
                     backup_conn.close()
                     
                     # Get backup file size for confirmation
@@ -4079,8 +3721,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                     logger.warning(error_msg)
                     return [types.TextContent(type="text", text=error_msg)]
                 
-                import os
-                
                 try:
                     # Check if backup file exists
                     if not os.path.exists(backup_path):
@@ -4091,19 +3731,17 @@ The sample mean is {'significantly different from' if significant else 'not sign
                     # Create a backup of current database before restore
                     current_backup = f"{db.db_path}.pre_restore_backup"
                     if os.path.exists(db.db_path):
-                        current_conn = sqlite3.connect(db.db_path)
                         backup_conn = sqlite3.connect(current_backup)
-                        current_conn.backup(backup_conn)
-                        current_conn.close()
+                        with db.pool.reader() as current_conn:
+                            current_conn.backup(backup_conn)
                         backup_conn.close()
                         logger.info(f"Current database backed up to: {current_backup}")
                     
-                    # Perform restore
+                    # Perform restore through the writer so pooled readers see the restored data
                     backup_conn = sqlite3.connect(backup_path)
-                    target_conn = sqlite3.connect(db.db_path)
-                    backup_conn.backup(target_conn)
+                    with db.pool.writer() as target_conn:
+                        backup_conn.backup(target_conn)
                     backup_conn.close()
-                    target_conn.close()
                     
                     result_msg = f"Database restored successfully from: {backup_path}"
                     logger.info(result_msg)
@@ -4118,8 +3756,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 logger.info(f"Verifying backup file: {arguments.get('backup_path')}")
                 backup_path = arguments["backup_path"]
                 
-                import os
-                
                 try:
                     # Check if backup file exists
                     if not os.path.exists(backup_path):
@@ -4355,7 +3991,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 
                 try:
                     # Check if file exists
-                    import os
                     if not os.path.exists(csv_file_path):
                         raise ValueError(f"CSV file not found: {csv_file_path}")
                     
@@ -4631,9 +4266,7 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 
                 try:
                     import csv
-                    import os
                     from collections import Counter, defaultdict
-                    import re
                     
                     # Check if file exists
                     if not os.path.exists(csv_file_path):
@@ -4800,8 +4433,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 logger.info(f"Creating JSON collection table: {table_name} from {json_file_path}")
                 
                 try:
-                    import json
-                    import os
                     from collections import defaultdict
                     
                     # Check if file exists
@@ -4899,7 +4530,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                     columns_def = []
                     for col in sorted(all_columns):
                         # Clean column name for SQL
-                        import re
                         clean_col = re.sub(r'[^a-zA-Z0-9_]', '_', col)
                         col_type = final_schema[col]
                         columns_def.append(f'"{clean_col}" {col_type}')
@@ -4989,9 +4619,7 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 
                 try:
                     import csv
-                    import os
                     from collections import Counter
-                    import re
                     
                     if not os.path.exists(csv_file_path):
                         return [types.TextContent(type="text", text=f"Error: CSV file '{csv_file_path}' not found")]
@@ -5110,7 +4738,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                     # Try to load SpatiaLite extension
                     try:
                         # Common SpatiaLite extension names/paths
-                        import os
                         script_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
                         local_spatialite_dir = os.path.join(script_dir, "mod_spatialite-5.1.0-win-amd64")
                         local_spatialite = os.path.join(local_spatialite_dir, "mod_spatialite.dll")
@@ -5142,8 +4769,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                                     conn.enable_load_extension(False)
                                     loaded = True
                                     loaded_path = path
-                                    # Store the working path for other tools
-                                    EnhancedSqliteDatabase._spatialite_path = path
                                     break
                             except Exception as e:
                                 last_error = str(e)
@@ -5160,11 +4785,13 @@ The sample mean is {'significantly different from' if significant else 'not sign
                                 text=error_msg
                             )]
                         
-                        # Try to initialize spatial metadata (optional for some SpatiaLite versions)
-                        try:
-                            db._execute_query("SELECT InitSpatialMetaData(1)")
-                        except:
-                            pass  # Some versions don't require this
+                        # Load the working path into every pooled connection for other tools
+                        state = db.enable_spatialite(loaded_path)
+                        if not state.get('spatialite_loaded'):
+                            return [types.TextContent(
+                                type="text",
+                                text=f"SpatiaLite loaded in a test connection but failed on the pooled connections: {state.get('spatialite_error')}"
+                            )]
                         
                         # Get version info
                         try:
@@ -5476,8 +5103,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 logger.info(f"Analyzing JSON schema: {json_file_path}")
                 
                 try:
-                    import json
-                    import os
                     from collections import defaultdict, Counter
                     
                     if not os.path.exists(json_file_path):
@@ -5726,8 +5351,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                         raise ValueError("All vector elements must be numbers")
                     
                     # Calculate cosine similarity
-                    import math
-                    
                     # Dot product
                     dot_product = sum(a * b for a, b in zip(vector1, vector2))
                     
@@ -5787,7 +5410,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                     
                     # Calculate similarities
                     similarities = []
-                    import math
                     
                     # Pre-calculate query vector magnitude
                     query_magnitude = math.sqrt(sum(x * x for x in query_embedding))
@@ -5870,7 +5492,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                     semantic_results = db._execute_query(semantic_sql, [query_dim])
                     
                     # Calculate semantic similarities
-                    import math
                     query_magnitude = math.sqrt(sum(x * x for x in query_embedding))
                     
                     semantic_scores = {}
@@ -5964,7 +5585,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                         results = db._execute_query(select_sql, [query_dim])
                         
                         similarities = []
-                        import math
                         
                         query_magnitude = math.sqrt(sum(x * x for x in query_embedding))
                         
@@ -6046,8 +5666,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                     if not embeddings_data:
                         return [types.TextContent(type="text", text=f"No embeddings found in table {table_name}")]
                     
-                    import json
-                    import math
                     import random
                     
                     # Parse embeddings
@@ -6211,9 +5829,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 logger.info(f"Performing optimized vector search in table: {table_name}")
                 
                 try:
-                    import json
-                    import math
-                    
                     # Check if vector index exists
                     index_table = f"{table_name}_vector_index"
                     metadata_table = f"{table_name}_index_metadata"
@@ -6341,8 +5956,6 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 table_name = arguments["table_name"]
                 
                 try:
-                    import json
-                    
                     index_table = f"{table_name}_vector_index"
                     metadata_table = f"{table_name}_index_metadata"
                     
@@ -6461,19 +6074,43 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 raise ValueError("Missing arguments")
 
             if name == "read_query":
+                if arguments.get("cursor"):
+                    page = db.pager.fetch(arguments["cursor"], arguments.get("page_size"))
+                    db.metrics.add_rows(len(page["rows"]))
+                    return [types.TextContent(type="text", text=json.dumps(page, default=str))]
+                if "query" not in arguments:
+                    raise ValueError("Missing query argument")
                 if not arguments["query"].strip().upper().startswith("SELECT"):
                     raise ValueError("Only SELECT queries are allowed for read_query")
+                params = _query_params(arguments)
+                
+                if arguments.get("page_size") is not None:
+                    started = time.perf_counter()
+                    page = db.pager.open(arguments["query"], params, page_size=arguments["page_size"])
+                    db.query_stats.record(arguments["query"], (time.perf_counter() - started) * 1000,
+                                          rows=len(page["rows"]))
+                    db.metrics.add_rows(len(page["rows"]))
+                    return [types.TextContent(type="text", text=json.dumps(page, default=str))]
                     
-                results = db._execute_query(arguments["query"])
+                results = db._execute_query(arguments["query"], params)
                 return [types.TextContent(type="text", text=str(results))]
 
             elif name == "write_query":
                 if arguments["query"].strip().upper().startswith("SELECT"):
                     raise ValueError("SELECT queries are not allowed for write_query")
                     
-                results = db._execute_query(arguments["query"])
+                results = db._execute_query(arguments["query"], _query_params(arguments))
                 return [types.TextContent(type="text", text=str(results))]
 
+            elif name == "batch_write":
+                if "param_rows" not in arguments:
+                    raise ValueError("Missing param_rows argument")
+                
+                result = safe_execute_many(db.db_path, arguments["query"], arguments["param_rows"],
+                                           chunk_size=arguments.get("chunk_size"), pool=db.pool)
+                db.query_stats.record(arguments["query"], result["elapsed_ms"], rows=result["affected_rows"])
+                return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+
             elif name == "create_table":
                 if not arguments["query"].strip().upper().startswith("CREATE TABLE"):
                     raise ValueError("Only CREATE TABLE statements are allowed")
@@ -6483,21 +6120,21 @@ The sample mean is {'significantly different from' if significant else 'not sign
 
             # Text Processing Tools
             elif name == "regex_extract":
-                return await db._handle_regex_extract(arguments)
+                return db.text_processor.regex_extract(arguments)
             elif name == "regex_replace":
-                return await db._handle_regex_replace(arguments)
+                return db.text_processor.regex_replace(arguments)
             elif name == "fuzzy_match":
-                return await db._handle_fuzzy_match(arguments)
+                return db.text_processor.fuzzy_match(arguments)
             elif name == "phonetic_match":
-                return await db._handle_phonetic_match(arguments)
+                return db.text_processor.phonetic_match(arguments)
             elif name == "text_similarity":
-                return await db._handle_text_similarity(arguments)
+                return db.text_processor.text_similarity(arguments)
             elif name == "text_normalize":
-                return await db._handle_text_normalize(arguments)
+                return db.text_processor.text_normalize(arguments)
             elif name == "advanced_search":
-                return await db._handle_advanced_search(arguments)
+                return db.text_processor.advanced_search(arguments)
             elif name == "text_validation":
-                return await db._handle_text_validation(arguments)
+                return db.text_processor.text_validation(arguments)
 
             else:
                 raise ValueError(f"Unknown tool: {name}")
@@ -6521,6 +6158,7 @@ The sample mean is {'significantly different from' if significant else 'not sign
                 "arguments": arguments,
                 "error_analysis": error_analysis
             })
+            db.metrics.mark_error()
             
             return [types.TextContent(type="text", text=error_msg)]
             
@@ -6535,20 +6173,104 @@ The sample mean is {'significantly different from' if significant else 'not sign
                     "tool": name,
                     "arguments": arguments
                 })
+            db.metrics.mark_error()
                 
             return [types.TextContent(type="text", text=error_msg)]
 
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        logger.info("Server running with stdio transport")
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="sqlite-custom",
-                server_version="2.2.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    def _measured_call_tool(
+        name: str, arguments: dict[str, Any] | None, cancel_event: threading.Event | None = None
+    ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        """Execute a tool under its deadline and record its latency, errors and response size"""
+        with db.metrics.measure(name) as call, db.deadlines.deadline(name, cancel_event) as deadline:
+            results = _call_tool(name, arguments)
+            if deadline.reason is not None:
+                # Tools report the bare "interrupted" error in their own ways; say why instead
+                db.metrics.mark_error()
+                results = [types.TextContent(type="text", text=deadline.message())]
+            call.bytes_serialized = sum(len(item.text.encode('utf-8')) for item in results
+                                        if isinstance(item, types.TextContent))
+        return results
+
+    # Arguments are checked against the catalog's prebuilt validators instead
+    @server.call_tool(validate_input=False)
+    async def handle_call_tool(
+        name: str, arguments: dict[str, Any] | None
+    ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        """Handle tool execution requests without blocking the event loop"""
+        error = tool_catalog.validation_error(name, arguments or {})
+        if error is not None:
+            # The SDK turns an exception into an isError result carrying its message
+            raise ValueError(error)
+        
+        cancel_event = threading.Event()
+        try:
+            results = await db.executor.run(_measured_call_tool, name, arguments, cancel_event)
+        except asyncio.CancelledError:
+            # The client cancelled the request; stop the statement still running in the worker
+            cancel_event.set()
+            raise
+        
+        if name == "append_insight" and arguments and "insight" in arguments:
+            # Notify clients that the memo resource has changed
+            await server.request_context.session.send_resource_updated(AnyUrl("memo://insights"))
+        
+        return results
+
+    return server
+
+async def main(db_path: str = "sqlite_mcp.db", pool_size: int = DEFAULT_POOL_SIZE, wal: bool = False,
+               worker_threads: int = DEFAULT_WORKER_THREADS, process_workers: int = 0,
+               cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+               write_window_ms: float = DEFAULT_WRITE_WINDOW_MS,
+               write_batch_max: int = DEFAULT_WRITE_BATCH_MAX,
+               result_cache_mb: float = 0,
+               slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+               statement_timeout: float = DEFAULT_STATEMENT_TIMEOUT,
+               tool_timeouts: dict[str, float] | None = None,
+               metrics_file: str | None = None, metrics_port: int | None = None,
+               metrics_interval: float = DEFAULT_EXPORT_INTERVAL,
+               tool_categories: list[str] | None = None,
+               profile_startup: bool = False):
+    logger.info(f"Starting Enhanced SQLite MCP Server with DB: {db_path}")
+    STARTUP.mark('parse options')
+
+    # Initialize database with enhanced features
+    db = EnhancedSqliteDatabase(db_path, pool_size=pool_size, wal=wal,
+                                worker_threads=worker_threads, process_workers=process_workers,
+                                cached_statements=cached_statements,
+                                write_window_ms=write_window_ms, write_batch_max=write_batch_max,
+                                result_cache_mb=result_cache_mb, slow_query_ms=slow_query_ms,
+                                statement_timeout=statement_timeout, tool_timeouts=tool_timeouts)
+    
+    # Optional OpenMetrics export for scrapers, since MCP itself only speaks stdio
+    exporter = MetricsExporter(db, metrics_file, metrics_port, metrics_interval)
+    if exporter.enabled:
+        exporter.start()
+        STARTUP.mark('start metrics exporter')
+    
+    # Initialize MCP server
+    server = create_server(db, tool_categories)
+    STARTUP.mark('register MCP handlers')
+
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            STARTUP.finish()
+            logger.info(f"Server running with stdio transport, ready in {STARTUP.report()['total_ms']:.0f} ms")
+            if profile_startup:
+                sys.stderr.write(STARTUP.format())
+                sys.stderr.flush()
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="sqlite-custom",
+                    server_version="2.2.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
\ No newline at end of file
+            )
+    finally:
+        exporter.close()
+        db.close()
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Sketch Store Module for SQLite MCP Server
+
+This module keeps column sketches (see sketches.py) in a side table of the
+database, one per (kind, table, column, filter), so approximate statistics
+over a very large table do not re-read it on every call. Each stored sketch
+remembers the largest rowid it has seen; the next request only scans rows
+added since then and merges them in. Sketches of several columns of a
+table are brought up to date with a single scan.
+
+Rows that are updated or deleted after they were sketched are not noticed;
+callers pass rebuild=True to start a sketch over. Tables without a rowid
+(WITHOUT ROWID tables and views) cannot be sketched incrementally.
+"""
+
+import logging
+import re
+import threading
+import time
+
+from .sketches import DEFAULT_HLL_PRECISION, DEFAULT_KLL_K, HllSketch, KllSketch
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+SKETCH_TABLE = '_mcp_column_sketches'
+# Below every possible rowid, so a new sketch scans the whole table
+MIN_ROWID = -(1 << 63)
+
+
+def _quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def filter_key(where_clause):
+    """Normalize a WHERE clause so trivially different spellings share a sketch"""
+    return re.sub(r'\s+', ' ', (where_clause or '').strip())
+
+
+class SketchStore:
+    """Column sketches persisted in the database and refreshed from new rowids"""
+
+    def __init__(self, pool):
+        """
+        Args:
+            pool (ConnectionPool): Pool the sketches are read and stored through
+        """
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self._stats = {'created': 0, 'refreshed': 0, 'rows_scanned': 0}
+
+    def _ensure_table(self):
+        """Create the side table on first use, so databases that never sketch do not get one"""
+        if self._table_ready:
+            return
+        with self.pool.writer() as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {SKETCH_TABLE} (
+                    kind TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    column_name TEXT NOT NULL,
+                    filter TEXT NOT NULL,
+                    max_rowid INTEGER NOT NULL,
+                    sketch TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (kind, table_name, column_name, filter)
+                )""")
+            conn.commit()
+        self._table_ready = True
+
+    def _load(self, kind, table_name, column_name, key):
+        with self.pool.reader() as conn:
+            row = conn.execute(
+                f"SELECT max_rowid, sketch FROM {SKETCH_TABLE} "
+                "WHERE kind = ? AND table_name = ? AND column_name = ? AND filter = ?",
+                (kind, table_name, column_name, key)).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def _scan(self, table_name, columns, where_clause):
+        """
+        Sketch the new rows of several columns in one statement, so the new
+        high-water mark and the sketches come from the same snapshot.
+
+        Args:
+            columns (dict): column name -> (SQL aggregate over the column
+                expression '{}', rowid after which its rows are new)
+
+        Returns:
+            tuple: (largest rowid or None for an empty table, column name ->
+                (values sketched, sketch JSON or None))
+        """
+        table = _quote_identifier(table_name)
+        selects = []
+        for position, (column_name, (aggregate, after_rowid)) in enumerate(columns.items()):
+            # Each column only takes the rows above its own high-water mark
+            value = f"CASE WHEN rowid > {int(after_rowid)} THEN {_quote_identifier(column_name)} END"
+            selects.append(f"COUNT({value}) AS rows_{position}, {aggregate.format(value)} AS sketch_{position}")
+        condition = f" AND ({where_clause})" if where_clause else ""
+        query = f"""
+            WITH bound AS (SELECT MAX(rowid) AS hi FROM {table})
+            SELECT (SELECT hi FROM bound) AS hi, {', '.join(selects)}
+            FROM {table}
+            WHERE rowid > ? AND rowid <= (SELECT hi FROM bound){condition}
+            """
+        lowest = min(after_rowid for _, after_rowid in columns.values())
+        with self.pool.reader() as conn:
+            row = conn.execute(query, (lowest,)).fetchone()
+        return row['hi'], {column_name: (row[f'rows_{position}'], row[f'sketch_{position}'])
+                           for position, column_name in enumerate(columns)}
+
+    def _sketches(self, kind, sketch_type, aggregate, table_name, column_names, where_clause, fits, empty, rebuild):
+        """
+        Load, extend and store one sketch per column, scanning the table once.
+
+        Args:
+            kind (str): Sketch kind in the side table ('kll' or 'hll')
+            sketch_type (type): KllSketch or HllSketch
+            aggregate (str): SQL aggregate building a new sketch of '{}'
+            fits (callable): Whether a stored sketch is precise enough to reuse
+            empty (callable): New sketch for a table with no matching rows
+            rebuild (bool): Ignore the stored sketches
+
+        Returns:
+            dict: column name -> (sketch, info dict with 'source' of
+                'created' or 'refreshed' and 'rows_scanned')
+        """
+        key = filter_key(where_clause)
+        with self._lock:
+            self._ensure_table()
+            stored = {}
+            for column_name in column_names:
+                if not rebuild:
+                    max_rowid, text = self._load(kind, table_name, column_name, key)
+                    if text:
+                        sketch = sketch_type.from_json(text)
+                        if fits(sketch):
+                            stored[column_name] = (sketch, max_rowid)
+
+            started = time.perf_counter()
+            hi, scanned = self._scan(table_name, {
+                column_name: (aggregate, stored[column_name][1] if column_name in stored else MIN_ROWID)
+                for column_name in column_names}, key)
+            hi = hi if hi is not None else MIN_ROWID
+            # Rows were deleted from the end of the table; start those sketches over
+            stale = [column_name for column_name, (_, max_rowid) in stored.items() if hi < max_rowid]
+            for column_name in stale:
+                del stored[column_name]
+            if stale:
+                _, rescanned = self._scan(table_name, {column_name: (aggregate, MIN_ROWID) for column_name in stale}, key)
+                scanned.update(rescanned)
+
+            results = {}
+            changed = []
+            for column_name in column_names:
+                rows, text = scanned[column_name]
+                source = 'refreshed' if column_name in stored else 'created'
+                sketch, max_rowid = stored.get(column_name, (None, None))
+                new = sketch_type.from_json(text) if text is not None else None
+                if sketch is None:
+                    sketch = new if new is not None else empty()
+                elif new is not None:
+                    sketch.merge(new)
+                if source == 'created' or hi != max_rowid:
+                    changed.append((kind, table_name, column_name, key, hi, sketch.to_json(), time.time()))
+                self._stats[source] += 1
+                self._stats['rows_scanned'] += rows
+                results[column_name] = (sketch, {'source': source, 'rows_scanned': rows})
+            if changed:
+                with self.pool.writer() as conn:
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO {SKETCH_TABLE} "
+                        "(kind, table_name, column_name, filter, max_rowid, sketch, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)", changed)
+                    conn.commit()
+        logger.debug(f"{kind} sketches of {table_name} ({', '.join(column_names)}) brought up to date in "
+                     f"{(time.perf_counter() - started) * 1000:.1f} ms")
+        return results
+
+    def quantile_sketch(self, table_name, column_name, where_clause='', k=None, rebuild=False):
+        """
+        Return an up-to-date KLL sketch of a column.
+
+        A stored sketch is reused and extended with rows added since it was
+        stored. It is rebuilt when rebuild is set, when its capacity is
+        below k, or when the table's largest rowid went down.
+
+        Args:
+            table_name (str): Table to sketch
+            column_name (str): Numeric column, read as REAL
+            where_clause (str): Optional filter; each filter has its own sketch
+            k (int, optional): Minimum sketch capacity (default: KllSketch's)
+            rebuild (bool): Discard the stored sketch and scan the whole table
+
+        Returns:
+            tuple: (KllSketch, info dict with 'source' of 'created' or
+                'refreshed' and 'rows_scanned')
+        """
+        k = int(k or DEFAULT_KLL_K)
+        return self._sketches('kll', KllSketch, f"kll_sketch(CAST({{}} AS REAL), {k})", table_name,
+                              [column_name], where_clause, lambda sketch: sketch.k >= k, lambda: KllSketch(k),
+                              rebuild)[column_name]
+
+    def distinct_sketches(self, table_name, column_names, where_clause='', precision=None, rebuild=False):
+        """
+        Return up-to-date HyperLogLog sketches of several columns from one scan.
+
+        Stored sketches are reused and extended like quantile_sketch's; one
+        with a lower precision than requested is rebuilt. Values of deleted
+        or updated rows stay counted until rebuild is set.
+
+        Args:
+            table_name (str): Table to sketch
+            column_names (list): Columns of any type
+            where_clause (str): Optional filter; each filter has its own sketches
+            precision (int, optional): Minimum precision (default: HllSketch's)
+            rebuild (bool): Discard the stored sketches and scan the whole table
+
+        Returns:
+            dict: column name -> (HllSketch, info dict as in quantile_sketch)
+        """
+        precision = int(precision or DEFAULT_HLL_PRECISION)
+        return self._sketches('hll', HllSketch, f"hll_sketch({{}}, {precision})", table_name, list(column_names),
+                              where_clause, lambda sketch: sketch.precision >= precision,
+                              lambda: HllSketch(precision), rebuild)
+
+    def distinct_sketch(self, table_name, column_name, where_clause='', precision=None, rebuild=False):
+        """Return an up-to-date HyperLogLog sketch of one column; see distinct_sketches"""
+        return self.distinct_sketches(table_name, [column_name], where_clause, precision, rebuild)[column_name]
+
+    def stats(self):
+        """Return how many sketches were created and refreshed and the rows scanned for them"""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,366 @@
+"""
+Sketches Module for SQLite MCP Server
+
+This module holds small mergeable summaries of a column that answer
+statistics questions approximately, in bounded memory, without sorting or
+re-reading the data. They serialize to JSON so they can be stored in the
+database and merged with sketches of other rows later.
+
+KllSketch is a KLL quantile sketch (Karnin, Lang and Liberty, 2016): a
+stack of compactors where level h holds items of weight 2**h. When the
+sketch is full, the lowest full level is sorted and every other item is
+promoted to the next level, so memory stays around 3k items however many
+values are added. The rank error for a single quantile is about
+2.3 / k**0.97 at 99% confidence, the bound the Apache DataSketches KLL
+implementation publishes for the same capacities.
+
+HllSketch is a HyperLogLog distinct-value counter (Flajolet et al., 2007)
+with 2**precision one-byte registers. Each value is hashed to 64 bits; the
+first precision bits pick a register, which keeps the longest run of
+leading zeros seen in the remaining bits. The estimate uses Ertl's improved
+estimator (2017), which needs no empirical bias tables or switch to linear
+counting for small cardinalities; its standard error is 1.04 / sqrt(2**p).
+Merging takes the register-wise maximum, so the sketches of partitions or
+time ranges combine into the sketch of their union.
+"""
+
+import base64
+import bisect
+import hashlib
+import json
+import math
+import random
+
+DEFAULT_KLL_K = 200
+MIN_KLL_K = 8
+MAX_KLL_K = 65535
+# Smallest compactor and the capacity ratio between adjacent levels
+_MIN_LEVEL_CAPACITY = 8
+_LEVEL_RATIO = 2 / 3
+
+DEFAULT_HLL_PRECISION = 14
+MIN_HLL_PRECISION = 4
+MAX_HLL_PRECISION = 18
+
+
+def kll_rank_error(k):
+    """Normalized rank error of a single quantile at 99% confidence for capacity k"""
+    return 2.296 / k ** 0.9723
+
+
+def kll_k_for_error(rank_error):
+    """
+    Return the smallest capacity whose rank error is at most rank_error.
+
+    Raises:
+        ValueError: If no capacity up to MAX_KLL_K is accurate enough
+    """
+    if rank_error <= 0:
+        raise ValueError("rank error must be positive")
+    k = max(MIN_KLL_K, math.ceil((2.296 / rank_error) ** (1 / 0.9723)))
+    if k > MAX_KLL_K:
+        raise ValueError(f"A rank error of {rank_error} needs more than {MAX_KLL_K} items; compute exact percentiles instead")
+    return k
+
+
+class KllSketch:
+    """KLL quantile sketch over floats"""
+
+    def __init__(self, k=DEFAULT_KLL_K, seed=0):
+        """
+        Args:
+            k (int): Capacity of the top compactor; larger is more accurate
+            seed (int): Seed of the coin flips that pick which items a
+                compaction keeps, so equal inputs give equal sketches
+        """
+        if not MIN_KLL_K <= k <= MAX_KLL_K:
+            raise ValueError(f"k must be between {MIN_KLL_K} and {MAX_KLL_K}")
+        self.k = k
+        self.n = 0
+        self.min = None
+        self.max = None
+        self.levels = [[]]
+        self._random = random.Random(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(_MIN_LEVEL_CAPACITY, math.ceil(self.k * _LEVEL_RATIO ** depth))
+
+    def _total_capacity(self):
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _compress(self):
+        """Compact the lowest full level until the sketch fits its capacity"""
+        while sum(len(items) for items in self.levels) > self._total_capacity():
+            for level, items in enumerate(self.levels):
+                if len(items) >= self._capacity(level):
+                    break
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            items.sort()
+            # An odd item out stays behind at its own weight
+            keep = [items.pop()] if len(items) % 2 else []
+            self.levels[level + 1].extend(items[self._random.getrandbits(1)::2])
+            self.levels[level] = keep
+
+    def update(self, value):
+        """Add one value"""
+        self.update_many([value])
+
+    def update_many(self, values):
+        """Add a list of floats"""
+        if not values:
+            return
+        low, high = min(values), max(values)
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.n += len(values)
+        # Adding up to k items before compacting keeps the Python work per
+        # value small; compacting a longer sorted run adds no more error
+        # than compacting it in pieces
+        for start in range(0, len(values), self.k):
+            self.levels[0].extend(values[start:start + self.k])
+            self._compress()
+
+    def merge(self, other):
+        """Add another sketch's values to this one"""
+        if not other.n:
+            return
+        self.k = min(self.k, other.k)
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.n += other.n
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+
+    @property
+    def exact(self):
+        """True while no compaction has happened, so quantiles are exact"""
+        return len(self.levels) == 1
+
+    def rank_error(self):
+        """Normalized rank error of a single quantile at 99% confidence, 0 while exact"""
+        return 0.0 if self.exact else kll_rank_error(self.k)
+
+    def rank(self, value):
+        """Approximate fraction of the values below value"""
+        if not self.n:
+            return None
+        below = sum((1 << level) * sum(1 for item in items if item < value)
+                    for level, items in enumerate(self.levels))
+        return below / sum((1 << level) * len(items) for level, items in enumerate(self.levels))
+
+    def quantiles(self, fractions):
+        """
+        Return approximate quantiles.
+
+        Args:
+            fractions (list): Ranks between 0 and 1
+
+        Returns:
+            list: The smallest retained value whose weighted rank reaches
+                each fraction, or None for each when the sketch is empty
+        """
+        if not self.n:
+            return [None] * len(fractions)
+        weighted = sorted((value, 1 << level) for level, items in enumerate(self.levels) for value in items)
+        cumulative = []
+        total = 0
+        for _, weight in weighted:
+            total += weight
+            cumulative.append(total)
+        results = []
+        for fraction in fractions:
+            if fraction <= 0:
+                results.append(self.min)
+            elif fraction >= 1:
+                results.append(self.max)
+            else:
+                index = min(len(weighted) - 1, bisect.bisect_left(cumulative, fraction * total))
+                results.append(weighted[index][0])
+        return results
+
+    def to_json(self):
+        return json.dumps({'type': 'kll', 'k': self.k, 'n': self.n, 'min': self.min, 'max': self.max,
+                           'levels': self.levels})
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        if data.get('type') != 'kll':
+            raise ValueError("Not a KLL sketch")
+        sketch = cls(data['k'])
+        sketch.n = data['n']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        sketch.levels = data['levels'] or [[]]
+        return sketch
+
+
+def hll_standard_error(precision):
+    """Relative standard error of a HyperLogLog distinct count with 2**precision registers"""
+    return 1.04 / math.sqrt(1 << precision)
+
+
+def hll_precision_for_error(relative_error):
+    """
+    Return the smallest precision whose standard error is at most relative_error.
+
+    Raises:
+        ValueError: If no precision up to MAX_HLL_PRECISION is accurate enough
+    """
+    if relative_error <= 0:
+        raise ValueError("relative error must be positive")
+    precision = max(MIN_HLL_PRECISION, math.ceil(2 * math.log2(1.04 / relative_error)))
+    if precision > MAX_HLL_PRECISION:
+        raise ValueError(f"A standard error of {relative_error} needs more than 2**{MAX_HLL_PRECISION} registers; "
+                         "count distinct values exactly instead")
+    return precision
+
+
+def _hll_hash(value):
+    """
+    Stable 64-bit hash of an SQLite value.
+
+    Integral floats hash like integers, because COUNT(DISTINCT) treats 1
+    and 1.0 as one value; text and blobs never equal numbers.
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, int):
+        data = b'i' + str(int(value)).encode()
+    elif isinstance(value, float):
+        data = b'f' + repr(value).encode()
+    elif isinstance(value, str):
+        data = b's' + value.encode('utf-8', 'surrogatepass')
+    else:
+        data = b'b' + bytes(value)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+def _hll_sigma(x):
+    if x == 1:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _hll_tau(x):
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = math.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+
+class HllSketch:
+    """HyperLogLog distinct-value counter over SQLite values"""
+
+    def __init__(self, precision=DEFAULT_HLL_PRECISION):
+        """
+        Args:
+            precision (int): log2 of the number of registers; each step up
+                doubles memory and divides the error by sqrt(2)
+        """
+        if not MIN_HLL_PRECISION <= precision <= MAX_HLL_PRECISION:
+            raise ValueError(f"precision must be between {MIN_HLL_PRECISION} and {MAX_HLL_PRECISION}")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def update(self, value):
+        """Add one value; NULL (None) is ignored"""
+        self.update_many([value])
+
+    def update_many(self, values):
+        """Add a list of values; NULLs (None) are ignored"""
+        registers = self.registers
+        index_shift = 64 - self.precision
+        suffix_mask = (1 << index_shift) - 1
+        for value in values:
+            if value is None:
+                continue
+            hashed = _hll_hash(value)
+            index = hashed >> index_shift
+            # Leading zeros of the remaining bits, plus one
+            rank = index_shift - (hashed & suffix_mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def reduced(self, precision):
+        """Return a copy folded down to a lower precision, as if it had been built with it"""
+        if precision > self.precision:
+            raise ValueError("A sketch cannot be expanded to a higher precision")
+        if precision == self.precision:
+            copy = HllSketch(precision)
+            copy.registers[:] = self.registers
+            return copy
+        folded = HllSketch(precision)
+        dropped = self.precision - precision
+        for index, rank in enumerate(self.registers):
+            if not rank:
+                continue
+            # The dropped index bits become the leading bits of the remainder
+            low_bits = index & ((1 << dropped) - 1)
+            new_rank = dropped - low_bits.bit_length() + 1 if low_bits else rank + dropped
+            target = index >> dropped
+            if new_rank > folded.registers[target]:
+                folded.registers[target] = new_rank
+        return folded
+
+    def merge(self, other):
+        """Add another sketch's values; the result has the lower of the two precisions"""
+        if other.precision < self.precision:
+            self.registers = self.reduced(other.precision).registers
+            self.precision = other.precision
+        elif other.precision > self.precision:
+            other = other.reduced(self.precision)
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def standard_error(self):
+        """Relative standard error of count()"""
+        return hll_standard_error(self.precision)
+
+    def count(self):
+        """Estimated number of distinct values"""
+        m = len(self.registers)
+        q = 64 - self.precision
+        histogram = [0] * (q + 2)
+        for rank in self.registers:
+            histogram[rank] += 1
+        z = m * _hll_tau(1 - histogram[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * _hll_sigma(histogram[0] / m)
+        if z == math.inf:
+            return 0
+        return round(m * m / (2 * math.log(2) * z))
+
+    def to_json(self):
+        return json.dumps({'type': 'hll', 'precision': self.precision,
+                           'registers': base64.b64encode(bytes(self.registers)).decode('ascii')})
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        if data.get('type') != 'hll':
+            raise ValueError("Not a HyperLogLog sketch")
+        sketch = cls(data['precision'])
+        registers = base64.b64decode(data['registers'])
+        if len(registers) != len(sketch.registers):
+            raise ValueError("HyperLogLog registers do not match the precision")
+        sketch.registers[:] = registers
+        return sketch
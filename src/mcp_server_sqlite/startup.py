@@ -0,0 +1,92 @@
+"""
+Startup Profile Module for SQLite MCP Server
+
+This module records how long each step of server startup takes, from the
+interpreter starting to the stdio transport being ready, so the
+--profile-startup option can show where the milliseconds of a short-lived
+server process go. Steps are recorded with mark(): each mark closes the
+step that began at the previous one, which keeps the instrumentation to a
+single line at every boundary.
+
+Recording stops once the server is ready (finish()) or after MAX_STEPS
+marks, so a long-running process that opens many databases does not keep
+growing the profile.
+"""
+
+import os
+import time
+
+MAX_STEPS = 64
+
+
+def _process_age_ms():
+    """Milliseconds since this process started, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/stat', 'rb') as f:
+            # The command name may contain spaces, so fields are counted after its closing parenthesis
+            fields = f.read().rsplit(b')', 1)[1].split()
+        with open('/proc/uptime', 'rb') as f:
+            uptime = float(f.read().split()[0])
+        started = int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return max(0.0, (uptime - started) * 1000)
+
+
+class StartupProfile:
+    """Wall-clock durations of consecutive startup steps"""
+
+    def __init__(self):
+        self.created = time.perf_counter()
+        # Interpreter start and any imports that ran before this module
+        self.before_ms = _process_age_ms()
+        self.steps = []
+        self.finished = False
+        self._last = self.created
+
+    def mark(self, step):
+        """Record the time since the previous mark as the duration of step"""
+        if self.finished or len(self.steps) >= MAX_STEPS:
+            return
+        now = time.perf_counter()
+        self.steps.append((step, (now - self._last) * 1000))
+        self._last = now
+
+    def finish(self, step='open stdio transport'):
+        """Record the last step and stop recording"""
+        self.mark(step)
+        self.finished = True
+
+    def report(self):
+        """
+        Return the recorded steps.
+
+        Returns:
+            dict: total_ms and a list of steps with their name, ms and share
+                of the total; the first step covers interpreter start when
+                the platform reports the process start time
+        """
+        steps = [(name, ms) for name, ms in self.steps]
+        if self.before_ms is not None:
+            steps.insert(0, ('interpreter start and early imports', self.before_ms))
+        total = sum(ms for _name, ms in steps)
+        return {
+            'total_ms': round(total, 2),
+            'steps': [{'step': name, 'ms': round(ms, 2),
+                       'percent': round(ms / total * 100, 1) if total else 0.0}
+                      for name, ms in steps],
+        }
+
+    def format(self):
+        """Return the report as a table for the terminal"""
+        report = self.report()
+        width = max([len(step['step']) for step in report['steps']] + [len('total')])
+        lines = ['Startup profile:']
+        for step in report['steps']:
+            lines.append(f"  {step['step']:<{width}}  {step['ms']:>9.1f} ms  {step['percent']:>5.1f}%")
+        lines.append(f"  {'total':<{width}}  {report['total_ms']:>9.1f} ms")
+        return '\n'.join(lines) + '\n'
+
+
+# Started when the server module is first imported
+STARTUP = StartupProfile()
@@ -0,0 +1,239 @@
+"""
+Tool Catalog Module for SQLite MCP Server
+
+This module holds the tool definitions the server advertises. They are
+built and checked once when the server is created instead of on every
+tools/list request: names must be unique and every tool must belong to a
+category. A validator is compiled per tool at the same time, so tool call
+arguments are checked without re-checking the schema itself on each call,
+which is what jsonschema.validate() does.
+
+Checking the input schemas against the JSON Schema metaschema takes about
+2 ms per tool, which would add over 100 ms to every server start for
+definitions that only change with the code, so check_schemas() is left to
+the test suite.
+
+Tools are grouped into categories so a client can be offered a smaller
+list, either for the whole server (--tool-categories) or for one request
+(a "categories" list in the request's _meta).
+"""
+
+import logging
+import time
+
+import jsonschema
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+# Category of every tool, in the order the categories are listed
+TOOL_CATEGORIES = {
+    # Queries and tables
+    'read_query': 'core',
+    'write_query': 'core',
+    'batch_write': 'core',
+    'create_table': 'core',
+    'list_tables': 'core',
+    'describe_table': 'core',
+    'append_insight': 'core',
+    # Maintenance and performance
+    'vacuum_database': 'admin',
+    'analyze_database': 'admin',
+    'integrity_check': 'admin',
+    'database_stats': 'admin',
+    'wal_checkpoint': 'admin',
+    'performance_metrics': 'admin',
+    'top_queries': 'admin',
+    'index_advisor': 'admin',
+    'index_usage_stats': 'admin',
+    # Full-text search
+    'create_fts_table': 'fts',
+    'rebuild_fts_index': 'fts',
+    'fts_search': 'fts',
+    # Backup and restore
+    'backup_database': 'backup',
+    'restore_database': 'backup',
+    'verify_backup': 'backup',
+    # PRAGMA operations
+    'pragma_settings': 'pragma',
+    'pragma_optimize': 'pragma',
+    'pragma_table_info': 'pragma',
+    'pragma_database_list': 'pragma',
+    'pragma_compile_options': 'pragma',
+    # Virtual tables
+    'create_rtree_table': 'virtual_tables',
+    'create_csv_table': 'virtual_tables',
+    'create_series_table': 'virtual_tables',
+    'list_virtual_tables': 'virtual_tables',
+    'drop_virtual_table': 'virtual_tables',
+    'virtual_table_info': 'virtual_tables',
+    'create_enhanced_csv_table': 'virtual_tables',
+    'create_json_collection_table': 'virtual_tables',
+    'analyze_csv_schema': 'virtual_tables',
+    'analyze_json_schema': 'virtual_tables',
+    # SpatiaLite
+    'load_spatialite': 'spatial',
+    'create_spatial_table': 'spatial',
+    'spatial_index': 'spatial',
+    'spatial_query': 'spatial',
+    'geometry_operations': 'spatial',
+    'import_shapefile': 'spatial',
+    'spatial_analysis': 'spatial',
+    # Embeddings and semantic search
+    'create_embeddings_table': 'vector',
+    'store_embedding': 'vector',
+    'semantic_search': 'vector',
+    'hybrid_search': 'vector',
+    'calculate_similarity': 'vector',
+    'batch_similarity_search': 'vector',
+    'create_vector_index': 'vector',
+    'optimize_vector_search': 'vector',
+    'analyze_vector_index': 'vector',
+    'rebuild_vector_index': 'vector',
+    # Statistics
+    'descriptive_statistics': 'statistics',
+    'correlation_analysis': 'statistics',
+    'correlation_matrix': 'statistics',
+    'percentile_analysis': 'statistics',
+    'distribution_analysis': 'statistics',
+    'moving_averages': 'statistics',
+    'outlier_detection': 'statistics',
+    'regression_analysis': 'statistics',
+    'hypothesis_testing': 'statistics',
+    # JSONB diagnostics
+    'validate_json': 'json',
+    'test_jsonb_conversion': 'json',
+    # Text processing
+    'regex_extract': 'text',
+    'regex_replace': 'text',
+    'fuzzy_match': 'text',
+    'phonetic_match': 'text',
+    'text_similarity': 'text',
+    'text_normalize': 'text',
+    'advanced_search': 'text',
+    'text_validation': 'text',
+}
+
+CATEGORIES = tuple(dict.fromkeys(TOOL_CATEGORIES.values()))
+
+
+def parse_categories(value):
+    """
+    Parse a comma-separated list of categories.
+
+    Raises:
+        ValueError: If a name is not one of CATEGORIES
+    """
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in CATEGORIES]
+    if unknown:
+        raise ValueError(f"Unknown tool categories: {', '.join(unknown)} (choose from {', '.join(CATEGORIES)})")
+    return names
+
+
+class ToolCatalog:
+    """Tool definitions built, checked and indexed once"""
+
+    def __init__(self, tools, categories=None, unavailable=None):
+        """
+        Args:
+            tools (list): types.Tool definitions in the order they are listed
+            categories (list, optional): Categories the server offers; tools
+                in other categories are neither listed nor callable
+                (default: all)
+            unavailable (dict, optional): Tool name -> reason, for tools the
+                server leaves out of an enabled category
+
+        Raises:
+            ValueError: If a tool name is duplicated, a tool has no category
+                or a category is unknown
+        """
+        started = time.perf_counter()
+        self.categories = tuple(parse_categories(','.join(categories))) if categories else CATEGORIES
+        self._tools = {}
+        self._validators = {}
+        self._unavailable = dict(unavailable or {})
+        for tool in tools:
+            if tool.name in self._tools:
+                raise ValueError(f"Tool {tool.name} is defined twice")
+            if tool.name not in TOOL_CATEGORIES:
+                raise ValueError(f"Tool {tool.name} has no category in TOOL_CATEGORIES")
+            if TOOL_CATEGORIES[tool.name] not in self.categories:
+                continue
+            self._tools[tool.name] = tool
+            self._validators[tool.name] = jsonschema.validators.validator_for(tool.inputSchema)(tool.inputSchema)
+        self._lists = {}
+        self.build_ms = (time.perf_counter() - started) * 1000
+        logger.debug(f"Tool catalog built: {len(self._tools)} tools in {self.build_ms:.1f} ms")
+
+    def __contains__(self, name):
+        return name in self._tools
+
+    def __len__(self):
+        return len(self._tools)
+
+    def check_schemas(self):
+        """
+        Check every input schema against its JSON Schema metaschema.
+
+        Raises:
+            ValueError: If an input schema is invalid
+        """
+        for name, validator in self._validators.items():
+            try:
+                validator.check_schema(validator.schema)
+            except jsonschema.SchemaError as e:
+                raise ValueError(f"Tool {name} has an invalid input schema: {e.message}") from e
+
+    def tools(self, categories=None):
+        """
+        Return the tool list, optionally narrowed to some categories.
+
+        The list for each combination of categories is built once and the
+        same list object is returned afterwards, so callers must not modify it.
+
+        Args:
+            categories (list, optional): Category names; names the server
+                does not offer are ignored
+        """
+        key = None
+        if categories:
+            # Only offered categories form the key, so clients cannot grow the cache
+            key = frozenset(categories) & frozenset(self.categories)
+            if key == frozenset(self.categories):
+                key = None
+        tools = self._lists.get(key)
+        if tools is None:
+            tools = [tool for tool in self._tools.values()
+                     if key is None or TOOL_CATEGORIES[tool.name] in key]
+            self._lists[key] = tools
+        return tools
+
+    def validation_error(self, name, arguments):
+        """
+        Check tool call arguments against the tool's input schema.
+
+        Returns:
+            str: The reason the call is rejected, or None when it may run
+        """
+        validator = self._validators.get(name)
+        if validator is None:
+            if name in self._unavailable:
+                return f"Tool {name} is not available on this server: {self._unavailable[name]}"
+            if name in TOOL_CATEGORIES and TOOL_CATEGORIES[name] not in self.categories:
+                return (f"Tool {name} is not enabled on this server: its category '{TOOL_CATEGORIES[name]}' "
+                        f"is not one of {', '.join(self.categories)}")
+            if name in TOOL_CATEGORIES:
+                return f"Tool {name} is not available on this server"
+            # Unknown tools are reported by the dispatcher
+            return None
+        error = jsonschema.exceptions.best_match(validator.iter_errors(arguments))
+        return f"Input validation error: {error.message}" if error is not None else None
+
+    def stats(self):
+        """Return catalog size and build time"""
+        return {
+            'tools': len(self._tools),
+            'categories': {category: sum(1 for name in self._tools if TOOL_CATEGORIES[name] == category)
+                           for category in self.categories},
+            'build_ms': round(self.build_ms, 3),
+        }
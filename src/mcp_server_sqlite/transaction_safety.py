@@ -7,11 +7,40 @@ interruptions during database write operations.
 
 import logging
 import sqlite3
-from contextlib import closing
+import time
+from contextlib import closing, contextmanager
 
 logger = logging.getLogger('mcp_sqlite_server')
 
-def safe_execute_query(db_path, query, params=None):
+BATCH_STATEMENTS = ("INSERT", "REPLACE", "UPDATE", "DELETE")
+
+
+class BatchWriteError(Exception):
+    """A batch write failed part way; earlier committed chunks are kept"""
+
+    def __init__(self, error, committed_rows, failed_row):
+        super().__init__(f"{error} (batch stopped in the chunk starting at row {failed_row}; "
+                         f"{committed_rows} rows were already committed)")
+        self.error = error
+        self.committed_rows = committed_rows
+        self.failed_row = failed_row
+
+@contextmanager
+def _connection(db_path, pool=None):
+    """Borrow the pool's writer connection, or open a one-off connection"""
+    if pool is not None:
+        with pool.writer() as conn:
+            yield conn
+        return
+    
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.row_factory = sqlite3.Row
+        
+        # Enable foreign key constraints for this connection
+        conn.execute("PRAGMA foreign_keys = ON")
+        yield conn
+
+def safe_execute_query(db_path, query, params=None, pool=None):
     """
     Execute a query with transaction safety guarantees.
     
@@ -23,7 +52,9 @@ def safe_execute_query(db_path, query, params=None):
     Args:
         db_path (str): Path to the SQLite database
         query (str): SQL query to execute
-        params (dict, optional): Parameters for the query
+        params (list or dict, optional): Positional or named parameters
+        pool (ConnectionPool, optional): Pool whose writer connection is
+            used instead of opening a new connection
         
     Returns:
         list: Result of query execution
@@ -40,12 +71,7 @@ def safe_execute_query(db_path, query, params=None):
     is_read_query = query.strip().upper().startswith("SELECT") or is_pragma_query
     
     try:
-        with closing(sqlite3.connect(db_path)) as conn:
-            conn.row_factory = sqlite3.Row
-            
-            # Enable foreign key constraints for this connection
-            conn.execute("PRAGMA foreign_keys = ON")
-            
+        with _connection(db_path, pool) as conn:
             cursor = conn.cursor()
             
             try:
@@ -63,6 +89,8 @@ def safe_execute_query(db_path, query, params=None):
                     cursor.execute("BEGIN TRANSACTION")
                 
                 # Execute the query
+                if pool is not None:
+                    pool.record_statement(conn, query)
                 if params:
                     cursor.execute(query, params)
                 else:
@@ -96,3 +124,71 @@ def safe_execute_query(db_path, query, params=None):
     except Exception as e:
         logger.error(f"Database error: {e}")
         raise
+
+
+def safe_execute_many(db_path, query, param_rows, chunk_size=None, pool=None):
+    """
+    Run one write statement for many parameter rows using executemany.
+    
+    Each chunk runs inside a single BEGIN/COMMIT, so a batch costs one
+    commit per chunk instead of one per row. Without a chunk size the whole
+    batch is one transaction and either every row is written or none is.
+    With a chunk size, a failure rolls back only the failing chunk.
+    
+    Args:
+        db_path (str): Path to the SQLite database
+        query (str): INSERT, REPLACE, UPDATE or DELETE statement
+        param_rows (list): One list or dict of parameters per row
+        chunk_size (int, optional): Rows per committed transaction
+        pool (ConnectionPool, optional): Pool whose writer connection is
+            used instead of opening a new connection
+        
+    Returns:
+        dict: Rows submitted, rows affected, chunks committed and throughput
+        
+    Raises:
+        ValueError: If the statement or parameters are not usable in a batch
+        BatchWriteError: If a chunk fails, after rolling it back
+    """
+    if not query.strip().upper().startswith(BATCH_STATEMENTS):
+        raise ValueError("Batch writes only support INSERT, REPLACE, UPDATE and DELETE statements")
+    if not isinstance(param_rows, list) or not param_rows or not all(isinstance(row, (list, dict)) for row in param_rows):
+        raise ValueError("param_rows must be a non-empty array of parameter arrays or objects")
+    chunk_size = len(param_rows) if not chunk_size else int(chunk_size)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    
+    started = time.monotonic()
+    affected = committed = chunks = 0
+    with _connection(db_path, pool) as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(param_rows), chunk_size):
+            chunk = param_rows[start:start + chunk_size]
+            try:
+                cursor.execute("BEGIN TRANSACTION")
+                if pool is not None:
+                    pool.record_statement(conn, query)
+                cursor.executemany(query, chunk)
+                chunk_affected = max(cursor.rowcount, 0)
+                conn.commit()
+            except Exception as e:
+                try:
+                    logger.debug(f"Rolling back batch chunk due to error: {e}")
+                    conn.rollback()
+                except Exception as rollback_error:
+                    logger.error(f"Error during rollback: {rollback_error}")
+                raise BatchWriteError(e, committed, start) from e
+            affected += chunk_affected
+            committed += len(chunk)
+            chunks += 1
+    
+    elapsed = time.monotonic() - started
+    logger.debug(f"Batch wrote {committed} rows in {chunks} chunks ({elapsed:.3f}s)")
+    return {
+        "rows": committed,
+        "affected_rows": affected,
+        "chunks": chunks,
+        "chunk_size": chunk_size,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "rows_per_second": round(committed / elapsed, 1) if elapsed > 0 else None,
+    }
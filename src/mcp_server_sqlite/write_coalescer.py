@@ -0,0 +1,253 @@
+"""
+Write Coalescing Module for SQLite MCP Server
+
+This module puts a queue in front of the writer connection. Write
+statements that arrive within a short window of each other are committed
+together in one transaction (group commit), so concurrent write tool calls
+share a single commit and fsync instead of queueing for the database lock
+one by one.
+
+Every write runs inside its own SAVEPOINT, so a failing statement is rolled
+back on its own and the caller gets its own error while the rest of the
+batch still commits. A write carries its caller's statement deadline to the
+writer thread, so a timeout or cancellation interrupts that write alone,
+and a caller whose deadline passes while its write is still queued stops
+waiting and the write is dropped.
+"""
+
+import contextlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_WRITE_WINDOW_MS = 1.0
+DEFAULT_WRITE_BATCH_MAX = 64
+
+# Statements that can run inside a shared transaction; DDL, VACUUM, ATTACH
+# and explicit transaction control keep going through safe_execute_query
+COALESCED_STATEMENTS = ("INSERT", "REPLACE", "UPDATE", "DELETE")
+
+# Seconds between checks of the caller's cancel event while it waits
+CANCEL_POLL_INTERVAL = 0.05
+
+
+class _PendingWrite:
+    """One queued write and the slot its result is delivered to"""
+
+    def __init__(self, query, params, deadline=None):
+        self.query = query
+        self.params = params
+        self.deadline = deadline
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        # 'queued' until the writer starts it or the caller gives up on it
+        self.state = 'queued'
+        self.lock = threading.Lock()
+
+    def claim(self, state):
+        """Move a queued write to state; False if the other side got it first"""
+        with self.lock:
+            if self.state != 'queued':
+                return False
+            self.state = state
+            return True
+
+    def wait(self):
+        """Wait for the result until the deadline passes or the call is cancelled"""
+        deadline = self.deadline
+        if deadline is None or (deadline.expires_at is None and deadline.cancel_event is None):
+            self.done.wait()
+            return
+        while not deadline.expired():
+            remaining = CANCEL_POLL_INTERVAL
+            if deadline.expires_at is not None:
+                remaining = min(remaining, max(0.0, deadline.expires_at - time.monotonic()))
+            if self.done.wait(remaining):
+                return
+        if self.claim('abandoned'):
+            self.error = sqlite3.OperationalError("interrupted")
+            return
+        # Running writes are interrupted by the progress handler; wait for them
+        self.done.wait()
+
+
+class WriteCoalescer:
+    """Group concurrent write statements into shared transactions"""
+
+    def __init__(self, pool, window_ms=DEFAULT_WRITE_WINDOW_MS, max_batch=DEFAULT_WRITE_BATCH_MAX,
+                 deadlines=None):
+        """
+        Args:
+            pool (ConnectionPool): Pool whose writer connection runs the batches
+            window_ms (float): How long to keep collecting writes after the
+                first one arrives before committing the batch
+            max_batch (int): Maximum writes per transaction
+            deadlines (StatementDeadlines, optional): Deadlines of the calling
+                tools, applied to their writes on the writer thread
+        """
+        self.pool = pool
+        self.deadlines = deadlines
+        self.window = max(0.0, float(window_ms)) / 1000
+        self.max_batch = max(1, int(max_batch))
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._stats = {'writes': 0, 'batches': 0, 'failed_writes': 0, 'largest_batch': 0}
+
+    @staticmethod
+    def accepts(query):
+        """Return True if the statement can share a transaction with others"""
+        return query.strip().upper().startswith(COALESCED_STATEMENTS)
+
+    def submit(self, query, params=None):
+        """
+        Queue a write and wait until its batch has committed.
+
+        Args:
+            query (str): INSERT, REPLACE, UPDATE or DELETE statement
+            params (list or dict, optional): Statement parameters
+
+        Returns:
+            list: [{"affected_rows": n}] for this write alone
+
+        Raises:
+            Exception: The error raised by this write, or by the batch commit;
+                sqlite3.OperationalError "interrupted" once the caller's
+                deadline passes or its request is cancelled
+        """
+        if self._closed:
+            raise RuntimeError("Write coalescer is closed")
+        self._ensure_started()
+        deadline = self.deadlines.current() if self.deadlines is not None else None
+        pending = _PendingWrite(query, params, deadline)
+        self._queue.put(pending)
+        pending.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='sqlite-mcp-writer', daemon=True)
+                self._thread.start()
+
+    def _collect(self, first):
+        """Gather writes that arrive within the window, up to max_batch"""
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            try:
+                self._commit(batch)
+            except Exception as e:
+                logger.error(f"Coalesced write batch failed: {e}")
+                for pending in batch:
+                    if pending.error is None:
+                        pending.result, pending.error = None, e
+            finally:
+                for pending in batch:
+                    pending.done.set()
+
+    def _commit(self, batch):
+        """Run a batch in one transaction with a savepoint around each write"""
+        with self.pool.writer() as conn:
+            # Writes whose callers stopped waiting while they were queued are dropped
+            writes = [pending for pending in batch if pending.claim('running')]
+            while True:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    interrupted = self._run_writes(conn, writes)
+                    if interrupted is None:
+                        conn.commit()
+                        break
+                except Exception:
+                    conn.rollback()
+                    raise
+                # SQLite rolls the whole transaction back when a write is
+                # interrupted, so the writes before it run again without it
+                writes = [pending for pending in writes if pending is not interrupted]
+        failed = sum(1 for pending in batch if pending.error is not None)
+
+        with self._lock:
+            self._stats['writes'] += len(batch)
+            self._stats['batches'] += 1
+            self._stats['failed_writes'] += failed
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+        if len(batch) > 1:
+            logger.debug(f"Group commit of {len(batch)} writes ({failed} failed)")
+
+    def _run_writes(self, conn, writes):
+        """
+        Run writes in the open transaction, each in its own savepoint.
+
+        Returns:
+            _PendingWrite: The write whose interrupt rolled back the whole
+                transaction, or None once every write has run
+        """
+        for pending in writes:
+            pending.result, pending.error = None, None
+            conn.execute("SAVEPOINT coalesced_write")
+            try:
+                if pending.deadline is not None and pending.deadline.expired():
+                    raise sqlite3.OperationalError("interrupted")
+                self.pool.record_statement(conn, pending.query)
+                with self._applied(pending.deadline):
+                    cursor = conn.execute(pending.query, pending.params or ())
+                pending.result = [{"affected_rows": cursor.rowcount}]
+            except Exception as e:
+                pending.error = e
+                if not conn.in_transaction:
+                    return pending
+                # A failed statement undoes only its own changes
+                conn.execute("ROLLBACK TO coalesced_write")
+            conn.execute("RELEASE coalesced_write")
+        return None
+
+    def _applied(self, deadline):
+        """Context in which the progress handler checks a write's deadline"""
+        if self.deadlines is None:
+            return contextlib.nullcontext()
+        return self.deadlines.applied(deadline)
+
+    def stats(self):
+        """Return write and batch counters"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['average_batch'] = round(stats['writes'] / stats['batches'], 2) if stats['batches'] else None
+        stats['window_ms'] = self.window * 1000
+        stats['max_batch'] = self.max_batch
+        return stats
+
+    def close(self):
+        """Finish queued writes and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=self.pool.timeout)
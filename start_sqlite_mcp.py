@@ -15,6 +15,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from mcp_server_sqlite.server import main
+from mcp_server_sqlite.cli import add_server_arguments, server_options
 
 def find_project_root():
     """
@@ -109,6 +110,8 @@ Examples:
         help='Create a data/ subdirectory in project root for the database'
     )
     
+    add_server_arguments(parser)
+    
     args = parser.parse_args()
     
     # Determine database path
@@ -140,4 +143,4 @@ Examples:
         logger.debug(f"Database location: {db_path_obj.absolute()}")
     
     logger.info(f"SQLite MCP Server ready with database: {db_path}")
-    asyncio.run(main(db_path))
\ No newline at end of file
+    asyncio.run(main(db_path, **server_options(args)))
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Tests for the statistical SQL aggregates and the tools built on them
+"""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the src directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp import types
+
+from mcp_server_sqlite.aggregates import Moments, percentile_values, register_aggregates
+from mcp_server_sqlite.server import EnhancedSqliteDatabase, create_server
+
+class TestMoments(unittest.TestCase):
+    """Test the running moments and the moments() aggregate"""
+
+    def setUp(self):
+        """Set up an in-memory connection with the aggregates registered"""
+        self.conn = sqlite3.connect(":memory:")
+        register_aggregates(self.conn)
+        self.conn.execute("CREATE TABLE t (x)")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def moments(self, values):
+        self.conn.execute("DELETE FROM t")
+        self.conn.executemany("INSERT INTO t VALUES (?)", [(v,) for v in values])
+        result = self.conn.execute("SELECT moments(x) FROM t").fetchone()[0]
+        return json.loads(result) if result is not None else None
+
+    def test_matches_two_pass_formulas(self):
+        """Test the moments against the textbook two-pass definitions"""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(0, 1) for _ in range(2000)]
+        stats = self.moments(values)
+
+        n = len(values)
+        mean = statistics.fmean(values)
+        m2 = sum((v - mean) ** 2 for v in values) / n
+        m3 = sum((v - mean) ** 3 for v in values) / n
+        m4 = sum((v - mean) ** 4 for v in values) / n
+        self.assertEqual(stats['count'], n)
+        self.assertAlmostEqual(stats['mean'], mean, places=10)
+        self.assertAlmostEqual(stats['variance'], statistics.pvariance(values), places=9)
+        self.assertAlmostEqual(stats['sample_variance'], statistics.variance(values), places=9)
+        self.assertAlmostEqual(stats['skewness'], m3 / m2 ** 1.5, places=9)
+        self.assertAlmostEqual(stats['kurtosis'], m4 / m2 ** 2 - 3, places=8)
+        self.assertEqual((stats['min'], stats['max']), (min(values), max(values)))
+
+    def test_large_values_stay_accurate(self):
+        """Test that a large offset does not swamp a small spread"""
+        stats = self.moments([1e9 + v for v in (4, 7, 13, 16)])
+        self.assertAlmostEqual(stats['mean'], 1e9 + 10)
+        self.assertAlmostEqual(stats['variance'], 22.5, places=6)
+        self.assertAlmostEqual(stats['skewness'], 0.0, places=6)
+
+    def test_nulls_text_and_constants(self):
+        """Test that NULL and text are skipped and constant columns have no shape"""
+        self.assertIsNone(self.moments([None, "abc"]))
+        stats = self.moments([5, None, 5, "abc", 5])
+        self.assertEqual(stats['count'], 3)
+        self.assertEqual(stats['variance'], 0.0)
+        self.assertIsNone(stats['skewness'])
+        self.assertIsNone(self.moments([5])['sample_variance'])
+
+    def test_merge_matches_single_pass(self):
+        """Test that merged partial states equal one pass over all values"""
+        rng = random.Random(3)
+        values = [rng.gauss(50, 10) for _ in range(1000)]
+        whole, left, right = Moments(), Moments(), Moments()
+        for v in values:
+            whole.add(v)
+        for v in values[:300]:
+            left.add(v)
+        for v in values[300:]:
+            right.add(v)
+        left.merge(right)
+        for key, value in whole.summary().items():
+            self.assertAlmostEqual(left.summary()[key], value, places=8)
+
+        empty = Moments()
+        empty.merge(whole)
+        self.assertEqual(empty.summary(), whole.summary())
+
+class TestPercentiles(unittest.TestCase):
+    """Test percentile interpolation and the percentiles() aggregate"""
+
+    def test_methods(self):
+        """Test each interpolation method against numpy's definitions"""
+        ordered = [1.0, 2.0, 4.0, 8.0]
+        # The 50th percentile falls halfway between 2 and 4, the 10th at 1.3
+        expected = {'linear': [1.3, 3.0], 'lower': [1.0, 2.0], 'higher': [2.0, 4.0],
+                    'nearest': [1.0, 4.0], 'midpoint': [1.5, 3.0]}
+        for method, values in expected.items():
+            for got, want in zip(percentile_values(ordered, [10, 50], method), values):
+                self.assertAlmostEqual(got, want, msg=method)
+        self.assertEqual(percentile_values(ordered, [0, 100]), [1.0, 8.0])
+        self.assertEqual(percentile_values([], [50]), [None])
+        with self.assertRaises(ValueError):
+            percentile_values(ordered, [50], 'cubic')
+
+    def test_aggregate(self):
+        """Test that one aggregate call returns every requested percentile"""
+        conn = sqlite3.connect(":memory:")
+        register_aggregates(conn)
+        conn.execute("CREATE TABLE t (x)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(v,) for v in [5, None, 1, 'x', 3, 2, 4]])
+        result = json.loads(conn.execute("SELECT percentiles(x, '[0, 25, 50, 100]', 'linear') FROM t").fetchone()[0])
+        conn.close()
+        self.assertEqual(result['count'], 5)
+        self.assertEqual(result['percentiles'], [[0, 1.0], [25, 2.0], [50, 3.0], [100, 5.0]])
+
+class TestDescriptiveStatistics(unittest.TestCase):
+    """Test descriptive_statistics on pooled connections"""
+
+    def setUp(self):
+        """Set up a database with a numeric column"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = EnhancedSqliteDatabase(os.path.join(self.temp_dir.name, "stats.db"))
+        self.db._execute_query("CREATE TABLE m (grp TEXT, x REAL)")
+        self.db._execute_query("INSERT INTO m VALUES ('a', 1), ('a', 2), ('a', 3), ('b', 10), ('b', NULL)")
+
+    def tearDown(self):
+        """Close the database and remove it"""
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def test_moments_on_pooled_connections(self):
+        """Test that every pooled connection has the aggregate"""
+        result = json.loads(self.db._execute_query("SELECT moments(x) AS m FROM m WHERE grp = 'a'")[0]['m'])
+        self.assertEqual(result['count'], 3)
+        self.assertAlmostEqual(result['variance'], 2 / 3)
+
+    def test_tool_with_where_clause(self):
+        """Test the tool output, filtered by a WHERE clause"""
+        handler = create_server(self.db).request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(method="tools/call", params=types.CallToolRequestParams(
+            name="descriptive_statistics", arguments={"table_name": "m", "column_name": "x", "where_clause": "grp = 'a'"}))
+        text = asyncio.run(handler(request)).root.content[0].text
+        self.assertIn("- Count: 3", text)
+        self.assertIn("- Mean: 2.0000", text)
+        self.assertIn("- Variance: 0.6667", text)
+        self.assertIn("- Skewness: 0.0000", text)
+
+    def test_percentile_analysis(self):
+        """Test percentile_analysis with a method and a WHERE clause"""
+        handler = create_server(self.db).request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(method="tools/call", params=types.CallToolRequestParams(
+            name="percentile_analysis", arguments={"table_name": "m", "column_name": "x", "percentiles": [25, 75, 90],
+                                                   "method": "higher", "where_clause": "grp = 'a'"}))
+        text = asyncio.run(handler(request)).root.content[0].text
+        self.assertIn("3 values, higher interpolation", text)
+        self.assertIn("Q1 (25th percentile): 2.0000", text)
+        self.assertIn("90th percentile: 3.0000", text)
+        self.assertIn("Interquartile Range (IQR): 1.0000", text)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for the benchmark suite
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the benchmarks directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import datasets
+import load_generator
+import run_benchmarks
+
+class TestBenchmarks(unittest.TestCase):
+    """Test dataset generation, case measurement and baseline comparison"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Generate the small dataset once"""
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.temp_dir.name, "small.db")
+        cls.dataset = datasets.generate(cls.path, 'small')
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the dataset"""
+        cls.temp_dir.cleanup()
+
+    def test_dataset_tables(self):
+        """Test that every table has the row count of its scale"""
+        conn = sqlite3.connect(self.path)
+        try:
+            for table, rows in datasets.table_rows('small').items():
+                self.assertEqual(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], rows)
+            self.assertGreater(conn.execute(
+                "SELECT COUNT(*) FROM text_docs_fts WHERE text_docs_fts MATCH 'kalo'").fetchone()[0], 0)
+        finally:
+            conn.close()
+        self.assertFalse(self.dataset['reused'])
+
+    def test_dataset_reused_and_deterministic(self):
+        """Test that a matching dataset is reused and regeneration gives the same rows"""
+        self.assertTrue(datasets.generate(self.path, 'small')['reused'])
+
+        other = os.path.join(self.temp_dir.name, "again.db")
+        datasets.generate(other, 'small')
+        query = "SELECT SUM(x), SUM(LENGTH(body)) FROM measurements JOIN text_docs USING (id)"
+        results = []
+        for path in (self.path, other):
+            conn = sqlite3.connect(path)
+            results.append(conn.execute(query).fetchone())
+            conn.close()
+        self.assertEqual(results[0], results[1])
+
+    def test_measure_case(self):
+        """Test that a case is measured through the tool handler"""
+        context = {'scale': 'small', 'database': self.path, 'work_dir': self.temp_dir.name, 'csv_path': ''}
+        cases = {f"{c.category}.{c.name}": c for c in run_benchmarks.benchmark_cases(context)}
+        self.assertEqual({c.category for c in cases.values()}, set(run_benchmarks.CATEGORIES))
+
+        measurement = asyncio.run(run_benchmarks._measure(cases['fts.term'], self.path, 3, 1, {}))
+        self.assertNotIn('error', measurement)
+        self.assertEqual(measurement['runs'], 3)
+        self.assertLessEqual(measurement['latency_ms']['min'], measurement['latency_ms']['median'])
+
+        broken = cases['fts.term']._replace(arguments={"table_name": "missing_fts", "query": "kalo"})
+        self.assertIn('error', asyncio.run(run_benchmarks._measure(broken, self.path, 1, 0, {})))
+
+        for name in ('catalog.build', 'catalog.list_tools', 'catalog.list_tools_vector', 'catalog.list_resources'):
+            measurement = asyncio.run(run_benchmarks._measure(cases[name], self.path, 2, 0, {}))
+            self.assertNotIn('error', measurement)
+            self.assertEqual(measurement['runs'], 2)
+
+    def test_compare(self):
+        """Test that only slowdowns beyond the threshold and noise floor are regressions"""
+        def results(*medians):
+            return {'cases': [{'category': 'core', 'name': f"case{i}", 'latency_ms': {'median': ms},
+                               'peak_rss_mb': 50.0} for i, ms in enumerate(medians)]}
+
+        comparison = run_benchmarks.compare(results(100.0, 1.6, 100.0), results(100.0, 1.0, 50.0), threshold=0.25)
+        self.assertEqual([c['regression'] for c in comparison], [False, False, True])
+        self.assertEqual(comparison[2]['latency_ratio'], 2.0)
+
+    def test_load_generator(self):
+        """Test replaying a mix against the real server over stdio"""
+        mix = [
+            {"name": "lookup", "weight": 3, "tool": "read_query",
+             "arguments": {"query": "SELECT * FROM measurements WHERE id = ?", "params": ["{n}"]}},
+            {"name": "schema", "weight": 1, "resource": "database://schema"},
+            {"name": "broken", "weight": 1, "tool": "read_query", "arguments": {"query": "SELECT * FROM missing"}},
+        ]
+        generator = load_generator.LoadGenerator(self.path, mix, concurrency=3, seed=1)
+        report = asyncio.run(generator.run(requests=40, warmup=2))
+
+        operations = report['operations']
+        self.assertEqual(report['requests'] + report['errors'], 40)
+        self.assertGreater(operations['lookup']['requests'], 0)
+        self.assertGreater(operations['schema']['requests'], 0)
+        self.assertEqual(operations['broken']['requests'], 0)
+        self.assertGreater(operations['broken']['errors'], 0)
+        self.assertIn('no such table', operations['broken']['first_error'])
+        self.assertLessEqual(report['latency_ms']['p50'], report['latency_ms']['p99'])
+        self.assertGreater(report['requests_per_second'], 0)
+
+    def test_load_mix_validation(self):
+        """Test that malformed mix entries are rejected"""
+        path = os.path.join(self.temp_dir.name, "mix.json")
+        for mix in ([], [{"weight": 1}], [{"tool": "list_tables", "resource": "database://schema"}],
+                    [{"tool": "list_tables", "weight": 0}]):
+            with open(path, 'w') as f:
+                f.write(json.dumps(mix))
+            with self.assertRaises(ValueError):
+                load_generator.load_mix(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+"""
+Tests for the persistent connection pool
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path to import the module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.mcp_server_sqlite.connection_pool import ConnectionPool, pragma_assignment_name
+from src.mcp_server_sqlite.transaction_safety import safe_execute_query
+
+class TestConnectionPool(unittest.TestCase):
+    """Test pooled reader and writer connections"""
+
+    def setUp(self):
+        """Set up a temporary database and a pool over it"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+        self.db_path = self.temp_db.name
+        self.temp_db.close()
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE child (id INTEGER PRIMARY KEY, parent_id INTEGER REFERENCES parent(id))")
+        conn.commit()
+        conn.close()
+
+        self.pool = ConnectionPool(self.db_path, size=3)
+
+    def tearDown(self):
+        """Close the pool and remove the database"""
+        self.pool.close()
+        os.unlink(self.db_path)
+
+    def test_connections_are_reused(self):
+        """Test that readers are persistent rather than opened per query"""
+        with self.pool.reader() as first:
+            pass
+        with self.pool.reader() as second:
+            pass
+        self.assertIs(first, second)
+
+        stats = self.pool.stats()
+        self.assertEqual(stats["readers"], 3)
+        self.assertEqual(stats["idle_readers"], 3)
+        self.assertEqual(stats["reader_checkouts"], 2)
+
+    def test_foreign_keys_enabled_on_every_connection(self):
+        """Test that pooled connections enforce foreign keys"""
+        with self.pool.writer() as conn:
+            self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            safe_execute_query(self.db_path, "INSERT INTO child (parent_id) VALUES (?)", [42], pool=self.pool)
+
+    def test_writes_visible_to_readers(self):
+        """Test that a committed write on the writer is seen by readers"""
+        result = safe_execute_query(self.db_path, "INSERT INTO parent (id) VALUES (?)", [1], pool=self.pool)
+        self.assertEqual(result[0]["affected_rows"], 1)
+
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM parent").fetchone()[0], 1)
+
+    def test_writer_is_serialized(self):
+        """Test that concurrent writers never share the writer connection"""
+        active = []
+        overlaps = []
+
+        def write(n):
+            with self.pool.writer() as conn:
+                active.append(n)
+                if len(active) > 1:
+                    overlaps.append(n)
+                conn.execute("INSERT INTO parent (id) VALUES (?)", (n,))
+                conn.commit()
+                active.remove(n)
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(overlaps, [])
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM parent").fetchone()[0], 10)
+
+    def test_session_pragma_applies_to_all_connections(self):
+        """Test that PRAGMA assignments are replayed across the pool"""
+        self.assertEqual(pragma_assignment_name("PRAGMA cache_size = -4000"), "cache_size")
+        self.assertIsNone(pragma_assignment_name("PRAGMA table_info(parent)"))
+
+        self.pool.set_pragma("PRAGMA cache_size = -4000")
+        for _ in range(3):
+            with self.pool.reader() as conn:
+                self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -4000)
+
+    def test_session_pragma_keeps_latest_value(self):
+        """Test that repeated PRAGMA assignments replace each other instead of piling up"""
+        steps = len(self.pool._session_steps)
+        for size in range(-1000, -1100, -1):
+            self.pool.set_pragma(f"PRAGMA cache_size = {size}")
+        self.pool.set_pragma("PRAGMA main.cache_size = -2000")
+        self.assertEqual(len(self.pool._session_steps), steps)
+        self.assertEqual(list(self.pool._session_pragmas), ["cache_size"])
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -2000)
+        self.assertFalse(self.pool.connection_info()[0]["session_pragmas_pending"])
+
+    def test_health_check_replaces_broken_connection(self):
+        """Test that broken connections are detected and replaced"""
+        with self.pool.reader() as conn:
+            conn.close()
+        self.assertEqual(self.pool.stats()["replaced_connections"], 1)
+        self.assertEqual(self.pool.stats()["idle_readers"], 3)
+
+        # Break an idle connection behind the pool's back
+        idle = self.pool._readers.get()
+        idle.close()
+        self.pool._readers.put(idle)
+
+        result = self.pool.health_check()
+        self.assertEqual(result["checked"], 4)
+        self.assertEqual(result["replaced"], 1)
+
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("SELECT 1").fetchone()[0], 1)
+
+    def test_reader_slot_survives_failed_reopen(self):
+        """Test that a reader that cannot be reopened leaves its slot to be reopened on checkout"""
+        def refuse(role):
+            raise sqlite3.OperationalError("unable to open database file")
+
+        create_connection = self.pool._create_connection
+        self.pool._create_connection = refuse
+        try:
+            with self.pool.reader() as conn:
+                conn.close()
+            # The slot now holds a marker, and reopening it fails again
+            with self.assertRaises(sqlite3.OperationalError):
+                with self.pool.reader():
+                    pass
+        finally:
+            self.pool._create_connection = create_connection
+        self.assertEqual(self.pool.stats()["idle_readers"], 3)
+
+        for _ in range(3):
+            with self.pool.reader() as conn:
+                self.assertEqual(conn.execute("SELECT 1").fetchone()[0], 1)
+        self.assertEqual(self.pool.stats()["idle_readers"], 3)
+
+    def test_statement_cache_counts_reuse(self):
+        """Test that repeated parameterized statements register as cache hits"""
+        query = "INSERT INTO parent (id) VALUES (?)"
+        for i in range(5):
+            safe_execute_query(self.db_path, query, [i], pool=self.pool)
+
+        stats = self.pool.stats()
+        self.assertEqual(stats["statement_cache_size"], 128)
+        self.assertEqual(stats["statement_cache_misses"], 1)
+        self.assertEqual(stats["statement_cache_hits"], 4)
+        self.assertEqual(stats["statement_cache_hit_rate"], 0.8)
+
+    def test_statement_cache_evicts_least_recently_used(self):
+        """Test that the mirrored cache is bounded by the configured size"""
+        pool = ConnectionPool(self.db_path, size=1, cached_statements=2)
+        try:
+            with pool.writer() as conn:
+                self.assertFalse(pool.record_statement(conn, "SELECT 1"))
+                self.assertFalse(pool.record_statement(conn, "SELECT 2"))
+                self.assertTrue(pool.record_statement(conn, "SELECT 1"))
+                self.assertFalse(pool.record_statement(conn, "SELECT 3"))
+                self.assertFalse(pool.record_statement(conn, "SELECT 2"))
+                self.assertTrue(pool.record_statement(conn, "SELECT 3"))
+        finally:
+            pool.close()
+
+    def test_memory_database_shares_one_connection(self):
+        """Test that an in-memory pool sees its own writes"""
+        pool = ConnectionPool(":memory:", size=3)
+        try:
+            with pool.writer() as conn:
+                conn.execute("CREATE TABLE t (x)")
+                conn.execute("INSERT INTO t VALUES (1)")
+                conn.commit()
+            with pool.reader() as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 1)
+        finally:
+            pool.close()
+
+class TestWalMode(unittest.TestCase):
+    """Test WAL journal mode and checkpoint control"""
+
+    def setUp(self):
+        """Set up a WAL-mode pool over a temporary database"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "wal.db")
+        self.pool = ConnectionPool(self.db_path, size=2, wal=True)
+        with self.pool.writer() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+            conn.commit()
+
+    def tearDown(self):
+        """Close the pool and remove the database"""
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def test_wal_enabled(self):
+        """Test that the pool switched the database to WAL"""
+        self.assertEqual(self.pool.journal_mode, "wal")
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_reader_not_blocked_by_writer(self):
+        """Test that an open read transaction does not block a commit"""
+        with self.pool.reader() as reader:
+            reader.execute("BEGIN")
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM items").fetchone()[0], 0)
+
+            result = safe_execute_query(self.db_path, "INSERT INTO items (name) VALUES (?)", ["a"], pool=self.pool)
+            self.assertEqual(result[0]["affected_rows"], 1)
+
+            # The reader keeps its snapshot until its transaction ends
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM items").fetchone()[0], 0)
+            reader.execute("COMMIT")
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM items").fetchone()[0], 1)
+
+    def test_checkpoint_truncate(self):
+        """Test that a TRUNCATE checkpoint empties the WAL file"""
+        for i in range(20):
+            safe_execute_query(self.db_path, "INSERT INTO items (name) VALUES (?)", [f"item {i}"], pool=self.pool)
+        self.assertGreater(self.pool.wal_size_bytes(), 0)
+
+        result = self.pool.checkpoint("truncate")
+        self.assertEqual(result["mode"], "TRUNCATE")
+        self.assertFalse(result["busy"])
+        self.assertGreater(result["wal_size_before_bytes"], 0)
+        self.assertEqual(result["wal_size_after_bytes"], 0)
+
+    def test_invalid_checkpoint_mode(self):
+        """Test that unknown checkpoint modes are rejected"""
+        with self.assertRaises(ValueError):
+            self.pool.checkpoint("sometimes")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests for the one-pass correlation matrix and the correlation_matrix tool
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the src directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp import types
+
+from mcp_server_sqlite.correlation import correlation_matrix, load_numpy
+from mcp_server_sqlite.server import EnhancedSqliteDatabase, create_server
+
+def average_ranks(values):
+    """Reference ranks: 1 + the values below + half the other ties"""
+    return [1 + sum(other < value for other in values) + (sum(other == value for other in values) - 1) / 2
+            for value in values]
+
+def reference(rows, i, j, ranked=False):
+    """Pearson's r (or Spearman's rho) of columns i and j over their complete numeric rows"""
+    pairs = [(row[i], row[j]) for row in rows
+             if isinstance(row[i], (int, float)) and isinstance(row[j], (int, float))]
+    xs, ys = [x for x, _ in pairs], [y for _, y in pairs]
+    if ranked:
+        xs, ys = average_ranks(xs), average_ranks(ys)
+    return statistics.correlation(xs, ys), len(pairs)
+
+class TestCorrelationMatrix(unittest.TestCase):
+    """Test the matrices against per-pair reference computations"""
+
+    def setUp(self):
+        """Set up correlated columns with NULLs, text, ties and a large offset"""
+        rng = random.Random(5)
+        self.rows = []
+        for _ in range(600):
+            a = rng.gauss(0, 1)
+            row = [1e9 + a, 2 * a + rng.gauss(0, 1), round(a ** 3, 1), rng.randint(0, 4)]
+            if rng.random() < 0.15:
+                row[rng.randrange(4)] = None
+            if rng.random() < 0.02:
+                row[3] = 'n/a'
+            self.rows.append(row)
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE t (a, b, c, d, flat)")
+        self.conn.executemany("INSERT INTO t VALUES (?, ?, ?, ?, 7)", self.rows)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def check(self, use_numpy):
+        result = correlation_matrix(self.conn, "t", ["a", "b", "c", "d"], use_numpy=use_numpy)
+        self.assertEqual(result['rows'], 600)
+        for i in range(4):
+            for j in range(4):
+                pearson, n = reference(self.rows, i, j)
+                spearman, _ = reference(self.rows, i, j, ranked=True)
+                self.assertEqual(result['counts'][i][j], n)
+                self.assertAlmostEqual(result['pearson'][i][j], pearson, places=9)
+                self.assertAlmostEqual(result['spearman'][i][j], spearman, places=9)
+        return result
+
+    def test_pure_python(self):
+        """Test the pure Python engine"""
+        self.assertEqual(self.check(use_numpy=False)['engine'], 'python')
+
+    @unittest.skipUnless(load_numpy(), "numpy is not installed")
+    def test_numpy(self):
+        """Test the NumPy engine"""
+        self.assertEqual(self.check(use_numpy=True)['engine'], 'numpy')
+
+    def test_undefined_and_filtered(self):
+        """Test that constant or empty columns give None and the filter applies"""
+        result = correlation_matrix(self.conn, "t", ["a", "flat"], where_clause="d = 2", use_numpy=False)
+        self.assertIsNone(result['pearson'][0][1])
+        self.assertIsNone(result['spearman'][1][1])
+        self.assertEqual(result['rows'], sum(1 for row in self.rows if row[3] == 2))
+        empty = correlation_matrix(self.conn, "t", ["a", "b"], where_clause="0", spearman=False)
+        self.assertEqual((empty['rows'], empty['pearson'], empty['spearman']), (0, [[None, None], [None, None]], None))
+
+class TestCorrelationMatrixTool(unittest.TestCase):
+    """Test the correlation_matrix tool output"""
+
+    def setUp(self):
+        """Set up a small database"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = EnhancedSqliteDatabase(os.path.join(self.temp_dir.name, "corr.db"))
+        self.db._execute_query("CREATE TABLE m (a, b, c)")
+        self.db._execute_query("INSERT INTO m VALUES (1, 2, 3), (2, 4, 1), (3, 5, NULL), (4, 9, 0), ('x', 1, 2)")
+
+    def tearDown(self):
+        """Close the database and remove it"""
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def test_tool(self):
+        """Test the matrices, counts and method selection in the output"""
+        handler = create_server(self.db).request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(method="tools/call", params=types.CallToolRequestParams(
+            name="correlation_matrix", arguments={"table_name": "m", "columns": ["a", "b", "c"],
+                                                  "methods": ["spearman"], "use_numpy": False}))
+        text = asyncio.run(handler(request)).root.content[0].text
+        self.assertIn("Correlation Matrix for m (5 rows in one scan, python engine):", text)
+        self.assertNotIn("Pearson", text)
+        self.assertIn("Spearman rank correlation:", text)
+        self.assertIn("b   1.0000   1.0000  -0.8000", text)
+        self.assertIn("a  4  4  3", text)
+
+if __name__ == "__main__":
+    unittest.main()
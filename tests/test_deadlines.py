@@ -0,0 +1,163 @@
+"""
+Tests for statement timeouts and cancellation
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path to import the module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.mcp_server_sqlite.connection_pool import ConnectionPool
+from src.mcp_server_sqlite.deadlines import StatementDeadlines
+from src.mcp_server_sqlite.write_coalescer import WriteCoalescer
+
+ENDLESS_QUERY = "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT count(*) FROM n"
+
+class TestStatementDeadlines(unittest.TestCase):
+    """Test that runaway statements are interrupted and connections reused"""
+
+    def setUp(self):
+        """Set up a single-reader pool with a short read_query timeout"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(os.path.join(self.temp_dir.name, "deadlines.db"), size=1)
+        self.deadlines = StatementDeadlines(self.pool, timeout=0, tool_timeouts={"read_query": 0.2})
+
+    def tearDown(self):
+        """Close the pool and remove the database"""
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def test_timeout_interrupts_statement(self):
+        """Test that a statement past its tool's deadline fails promptly"""
+        started = time.monotonic()
+        with self.deadlines.deadline("read_query") as deadline:
+            with self.assertRaisesRegex(sqlite3.OperationalError, "interrupted"):
+                with self.pool.reader() as conn:
+                    conn.execute(ENDLESS_QUERY).fetchone()
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(deadline.reason, "timeout")
+        self.assertIn("0.2s timeout", deadline.message())
+        self.assertEqual(self.deadlines.stats()["timeouts"], 1)
+
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("SELECT 1").fetchone()[0], 1)
+
+    def test_cancel_event_interrupts_statement(self):
+        """Test that setting the cancel event from another thread stops the statement"""
+        cancel = threading.Event()
+        threading.Timer(0.1, cancel.set).start()
+        with self.deadlines.deadline("spatial_analysis", cancel) as deadline:
+            with self.assertRaisesRegex(sqlite3.OperationalError, "interrupted"):
+                with self.pool.reader() as conn:
+                    conn.execute(ENDLESS_QUERY).fetchone()
+        self.assertEqual(deadline.reason, "cancelled")
+        self.assertEqual(self.deadlines.stats()["cancellations"], 1)
+
+    def test_timeouts_per_tool(self):
+        """Test that tool overrides win over the global timeout"""
+        self.assertEqual(self.deadlines.timeout_for("read_query"), 0.2)
+        self.assertEqual(self.deadlines.timeout_for("write_query"), 0)
+
+    def test_maintenance_tools_are_exempt(self):
+        """Test that maintenance tools run without the global timeout unless configured by name"""
+        deadlines = StatementDeadlines(self.pool, timeout=60, tool_timeouts={"backup_database": 600})
+        self.assertEqual(deadlines.timeout_for("read_query"), 60)
+        self.assertEqual(deadlines.timeout_for("vacuum_database"), 0)
+        self.assertEqual(deadlines.timeout_for("integrity_check"), 0)
+        self.assertEqual(deadlines.timeout_for("backup_database"), 600)
+
+    def test_disabled_timeout_lets_statement_finish(self):
+        """Test that tools without a timeout run their statements to completion"""
+        with self.deadlines.deadline("write_query") as deadline:
+            with self.pool.reader() as conn:
+                conn.execute("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 50000) "
+                             "SELECT count(*) FROM n").fetchone()
+        self.assertIsNone(deadline.reason)
+
+class TestCoalescedWriteDeadlines(unittest.TestCase):
+    """Test that coalesced writes run under their caller's deadline on the writer thread"""
+
+    def setUp(self):
+        """Set up a pool, deadlines and a coalescer over a temporary database"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(os.path.join(self.temp_dir.name, "writes.db"), size=1)
+        with self.pool.writer() as conn:
+            conn.execute("CREATE TABLE n (x INTEGER)")
+            conn.commit()
+        self.deadlines = StatementDeadlines(self.pool, timeout=0.5)
+        self.coalescer = WriteCoalescer(self.pool, window_ms=1, deadlines=self.deadlines)
+
+    def tearDown(self):
+        """Stop the coalescer, close the pool and remove the database"""
+        self.coalescer.close()
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def count(self):
+        with self.pool.reader() as conn:
+            return conn.execute("SELECT count(*) FROM n").fetchone()[0]
+
+    def test_timeout_interrupts_coalesced_write(self):
+        """Test that a long INSERT is interrupted and rolled back while later writes commit"""
+        started = time.monotonic()
+        with self.deadlines.deadline("write_query") as deadline:
+            with self.assertRaisesRegex(sqlite3.OperationalError, "interrupted"):
+                self.coalescer.submit("INSERT INTO n WITH RECURSIVE r(x) AS "
+                                      "(SELECT 1 UNION ALL SELECT x + 1 FROM r WHERE x < 30000000) SELECT x FROM r")
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(deadline.reason, "timeout")
+        self.assertEqual(self.count(), 0)
+
+        with self.deadlines.deadline("write_query"):
+            self.assertEqual(self.coalescer.submit("INSERT INTO n VALUES (1)"), [{"affected_rows": 1}])
+        self.assertEqual(self.count(), 1)
+
+    def test_interrupt_keeps_rest_of_batch(self):
+        """Test that writes batched before an interrupted one still commit"""
+        coalescer = WriteCoalescer(self.pool, window_ms=200, deadlines=self.deadlines)
+        errors = []
+
+        def long_insert():
+            with self.deadlines.deadline("write_query"):
+                try:
+                    coalescer.submit("INSERT INTO n WITH RECURSIVE r(x) AS "
+                                     "(SELECT 1 UNION ALL SELECT x + 1 FROM r WHERE x < 30000000) SELECT x FROM r")
+                except sqlite3.OperationalError as e:
+                    errors.append(e)
+
+        quick = threading.Thread(target=coalescer.submit, args=("INSERT INTO n VALUES (-1)",))
+        slow = threading.Thread(target=long_insert)
+        quick.start()
+        time.sleep(0.05)
+        slow.start()
+        for thread in (quick, slow):
+            thread.join()
+        coalescer.close()
+        self.assertEqual([str(e) for e in errors], ["interrupted"])
+        self.assertEqual(coalescer.stats()["batches"], 1)
+        with self.pool.reader() as conn:
+            self.assertEqual([tuple(row) for row in conn.execute("SELECT x FROM n")], [(-1,)])
+
+    def test_cancel_drops_queued_write(self):
+        """Test that a caller cancelled while its write waits for the writer stops waiting and the write never runs"""
+        cancel = threading.Event()
+        threading.Timer(0.1, cancel.set).start()
+        with self.pool.writer():
+            # The writer thread cannot start the batch until this block ends
+            with self.deadlines.deadline("write_query", cancel) as deadline:
+                with self.assertRaisesRegex(sqlite3.OperationalError, "interrupted"):
+                    self.coalescer.submit("INSERT INTO n VALUES (1)")
+        self.assertEqual(deadline.reason, "cancelled")
+        self.coalescer.submit("INSERT INTO n VALUES (2)")
+        with self.pool.reader() as conn:
+            self.assertEqual([tuple(row) for row in conn.execute("SELECT x FROM n")], [(2,)])
+
+if __name__ == "__main__":
+    unittest.main()
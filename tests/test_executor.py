@@ -0,0 +1,81 @@
+"""
+Tests for running blocking tool work off the event loop
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path to import the module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.mcp_server_sqlite.executor import ToolExecutor, CPU_OFFLOAD_MIN_ITEMS
+
+def _square(x):
+    return x * x
+
+class TestToolExecutor(unittest.TestCase):
+    """Test the thread and process dispatch of tool work"""
+
+    def test_run_uses_worker_thread(self):
+        """Test that work runs off the event loop thread"""
+        executor = ToolExecutor(max_workers=2)
+        try:
+            async def main():
+                loop_thread = threading.get_ident()
+                worker_thread = await executor.run(threading.get_ident)
+                return loop_thread, worker_thread
+
+            loop_thread, worker_thread = asyncio.run(main())
+            self.assertNotEqual(loop_thread, worker_thread)
+        finally:
+            executor.shutdown()
+
+    def test_slow_call_does_not_block_fast_call(self):
+        """Test that independent calls run concurrently"""
+        executor = ToolExecutor(max_workers=4)
+        try:
+            finished = []
+
+            def slow():
+                time.sleep(0.5)
+                finished.append("slow")
+
+            def fast():
+                finished.append("fast")
+
+            async def main():
+                slow_task = asyncio.ensure_future(executor.run(slow))
+                await asyncio.sleep(0.05)
+                await executor.run(fast)
+                # The fast call completed while the slow one was still running
+                self.assertEqual(finished, ["fast"])
+                await slow_task
+
+            asyncio.run(main())
+            self.assertEqual(finished, ["fast", "slow"])
+        finally:
+            executor.shutdown()
+
+    def test_map_cpu_inline_without_processes(self):
+        """Test that scoring stays in-thread when no process pool is configured"""
+        executor = ToolExecutor(max_workers=1)
+        try:
+            self.assertEqual(executor.map_cpu(_square, [1, 2, 3]), [1, 4, 9])
+        finally:
+            executor.shutdown()
+
+    def test_map_cpu_with_processes(self):
+        """Test that large batches are scored in worker processes in order"""
+        executor = ToolExecutor(max_workers=1, process_workers=2)
+        try:
+            items = list(range(CPU_OFFLOAD_MIN_ITEMS * 2))
+            self.assertEqual(executor.map_cpu(_square, items), [x * x for x in items])
+        finally:
+            executor.shutdown()
+
+if __name__ == "__main__":
+    unittest.main()
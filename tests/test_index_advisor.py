@@ -0,0 +1,153 @@
+"""
+Tests for the EXPLAIN QUERY PLAN driven index advisor
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path to import the module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.mcp_server_sqlite.connection_pool import ConnectionPool
+from src.mcp_server_sqlite.deadlines import StatementDeadlines
+from src.mcp_server_sqlite.index_advisor import IndexAdvisor
+from src.mcp_server_sqlite.query_stats import QueryStats
+from src.mcp_server_sqlite.schema_catalog import SchemaCatalog
+
+class TestIndexAdvisor(unittest.TestCase):
+    """Test plan findings, candidate indexes and the dry run"""
+
+    def setUp(self):
+        """Set up an orders table large enough to report and a small lookup table"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(os.path.join(self.temp_dir.name, "advisor.db"), size=1)
+        with self.pool.writer() as conn:
+            conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, customer TEXT, total REAL, status TEXT, note TEXT)")
+            conn.execute("CREATE TABLE regions (id INTEGER PRIMARY KEY, name TEXT)")
+            conn.execute("CREATE INDEX idx_orders_status ON orders(status)")
+            conn.executemany("INSERT INTO orders (customer, total, status, note) VALUES (?, ?, ?, ?)",
+                             [(f"c{i % 200}", i * 1.5, "paid", "x") for i in range(5000)])
+            conn.executemany("INSERT INTO regions (name) VALUES (?)", [(f"r{i}",) for i in range(10)])
+            conn.commit()
+        self.advisor = IndexAdvisor(self.pool, SchemaCatalog(self.pool))
+
+    def tearDown(self):
+        """Close the pool and remove the database"""
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def advise(self, *queries, **kwargs):
+        return self.advisor.advise(self.advisor.statements_from_sql(queries), **kwargs)
+
+    def test_full_scan_gets_equality_then_order_index(self):
+        """Test that equality columns lead and ORDER BY columns follow"""
+        report = self.advise("SELECT * FROM orders WHERE customer = 'c1' ORDER BY total")
+        [finding] = report["findings"]
+        self.assertEqual([i["issue"] for i in finding["issues"]], ["full_scan", "temp_btree_order_by"])
+        [recommendation] = report["recommendations"]
+        self.assertEqual(recommendation["columns"], ["customer", "total"])
+        self.assertFalse(recommendation["covering"])
+        self.assertEqual(recommendation["create_sql"],
+                         'CREATE INDEX "idx_orders_customer_total" ON "orders" ("customer", "total")')
+
+    def test_covering_index_for_narrow_select(self):
+        """Test that a few selected columns are appended, but never the rowid"""
+        report = self.advise("SELECT id, note FROM orders o WHERE o.customer = ?")
+        [recommendation] = report["recommendations"]
+        self.assertEqual(recommendation["columns"], ["customer"])
+        self.assertEqual(recommendation["include_columns"], ["note"])
+        self.assertTrue(recommendation["covering"])
+
+        report = self.advise("SELECT id, note FROM orders WHERE customer = ?", covering=False)
+        self.assertEqual(report["recommendations"][0]["include_columns"], [])
+
+    def test_small_tables_and_existing_indexes_ignored(self):
+        """Test that small scans and already indexed predicates yield nothing"""
+        report = self.advise("SELECT * FROM regions WHERE name = 'r1'",
+                             "SELECT * FROM orders WHERE status = 'paid'")
+        self.assertEqual(report["recommendations"], [])
+
+    def test_estimate_from_sqlite_stat1(self):
+        """Test that analyzed indexes on the leading column give a benefit estimate"""
+        with self.pool.writer() as conn:
+            conn.execute("CREATE INDEX idx_orders_customer_only ON orders(customer)")
+            conn.execute("ANALYZE")
+            conn.commit()
+        report = self.advise("SELECT * FROM orders WHERE customer = 'c1' ORDER BY total")
+        [recommendation] = report["recommendations"]
+        self.assertEqual(recommendation["columns"], ["customer", "total"])
+        self.assertEqual(recommendation["estimate"]["rows_examined_before"], 5000)
+        self.assertEqual(recommendation["estimate"]["rows_examined_after"], 25)
+
+    def test_dry_run_verifies_candidates(self):
+        """Test that the dry run re-plans on a copy and leaves the database alone"""
+        report = self.advise("SELECT total FROM orders WHERE customer = 'c7'", dry_run=True)
+        self.assertTrue(report["dry_run"]["performed"])
+        [recommendation] = report["recommendations"]
+        self.assertTrue(recommendation["recommended"])
+        [measured] = recommendation["dry_run"]
+        self.assertEqual(measured["plan_before"], ["SCAN orders"])
+        self.assertTrue(measured["uses_index"])
+        self.assertIsNotNone(measured["time_after_ms"])
+        self.assertEqual(recommendation["estimate"]["source"], "dry_run ANALYZE")
+        with self.pool.reader() as conn:
+            names = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        self.assertEqual(names, ["idx_orders_status"])
+
+    def test_dry_run_size_limit(self):
+        """Test that databases over the limit are not copied"""
+        report = self.advise("SELECT total FROM orders WHERE customer = 'c7'", dry_run=True, max_dry_run_mb=0)
+        self.assertFalse(report["dry_run"]["performed"])
+        self.assertTrue(report["recommendations"][0]["recommended"])
+
+    def test_dry_run_stops_when_cancelled(self):
+        """Test that a cancel stops the backup and the work on the copy, which runs without a pooled reader"""
+        deadlines = StatementDeadlines(self.pool, timeout=0)
+        advisor = IndexAdvisor(self.pool, SchemaCatalog(self.pool), deadlines)
+        statements = advisor.statements_from_sql(["SELECT total FROM orders WHERE customer = 'c7'"])
+        idle_readers = []
+
+        def cancelled_before(step, cancel):
+            def run(*args):
+                idle_readers.append(self.pool.stats()["idle_readers"])
+                cancel.set()
+                return step(*args)
+            return run
+
+        for step in ("_copy", "_dry_run"):
+            cancel = threading.Event()
+            original = getattr(advisor, step)
+            setattr(advisor, step, cancelled_before(original, cancel))
+            try:
+                with deadlines.deadline("index_advisor", cancel) as deadline:
+                    report = advisor.advise(statements, dry_run=True)
+            finally:
+                setattr(advisor, step, original)
+            self.assertEqual(report["dry_run"], {"performed": False, "reason": "interrupted"})
+            self.assertEqual(deadline.reason, "cancelled")
+        # The backup holds the only pooled reader; the copy is worked on after it is returned
+        self.assertEqual(idle_readers, [0, 1])
+
+    def test_workload_from_query_stats(self):
+        """Test that recorded read fingerprints are planned with NULL parameters"""
+        stats = QueryStats()
+        stats.record("SELECT * FROM orders WHERE customer = :c", 5.0, rows=25)
+        stats.record("UPDATE orders SET total = 1 WHERE id = 3", 9.0, rows=1)
+        statements = IndexAdvisor.workload(stats)
+        self.assertEqual([s["fingerprint"] for s in statements], ["SELECT * FROM orders WHERE customer = ?"])
+
+        report = self.advisor.advise(statements)
+        self.assertEqual(report["recommendations"][0]["columns"], ["customer"])
+
+    def test_unplannable_statement_skipped(self):
+        """Test that statements that fail to plan are reported, not raised"""
+        report = self.advise("SELECT * FROM missing_table")
+        self.assertEqual(len(report["skipped"]), 1)
+        self.assertEqual(report["findings"], [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests for the queued, sampled JSON operation logger
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path to import the module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.mcp_server_sqlite.json_logger import JsonLogger, LOG_FILE_NAME
+
+class TestJsonLogger(unittest.TestCase):
+    """Test level checks, sampling and the rotating JSONL file"""
+
+    def setUp(self):
+        """Set up a temporary log directory"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_dir = os.path.join(self.temp_dir.name, "logs")
+
+    def tearDown(self):
+        """Remove the log directory"""
+        self.temp_dir.cleanup()
+
+    def read_entries(self):
+        with open(os.path.join(self.log_dir, LOG_FILE_NAME), encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_operations_written_as_json_lines(self):
+        """Test that entries reach the file once the logger is closed"""
+        logger = JsonLogger({"log_dir": self.log_dir, "log_level": "info"})
+        logger.log_operation("execute_query", {"query": "SELECT 1"})
+        logger.log_error(ValueError("bad"), {"query": "SELECT"})
+        logger.close()
+
+        entries = self.read_entries()
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]["operation"], "execute_query")
+        self.assertEqual(entries[0]["data"], {"query": "SELECT 1"})
+        self.assertEqual(entries[1]["error_type"], "ValueError")
+        self.assertEqual(entries[1]["level"], "ERROR")
+        self.assertIn("timestamp", entries[0])
+
+    def test_level_check_skips_operations(self):
+        """Test that operations below the level do no work and write nothing"""
+        logger = JsonLogger({"log_dir": self.log_dir, "log_level": "warning"})
+        for _ in range(100):
+            logger.log_operation("execute_query", {"query": "SELECT 1"})
+        stats = logger.stats()
+        logger.close()
+
+        self.assertEqual(stats["calls"], 0)
+        self.assertEqual(stats["emitted"], 0)
+        self.assertFalse(os.path.exists(self.log_dir))
+
+    def test_disabled_logger_has_no_writer(self):
+        """Test that a disabled logger starts no thread and opens no file"""
+        logger = JsonLogger({"log_dir": self.log_dir, "enabled": False})
+        logger.log_error(ValueError("bad"), {})
+        self.assertIsNone(logger.stats()["log_file"])
+        logger.close()
+        self.assertFalse(os.path.exists(self.log_dir))
+
+    def test_sampling(self):
+        """Test that a zero sample rate drops operations but keeps errors"""
+        logger = JsonLogger({"log_dir": self.log_dir, "log_level": "info", "sample_rate": 0.0})
+        for _ in range(10):
+            logger.log_operation("execute_query", {})
+        logger.log_error(ValueError("bad"), {})
+        stats = logger.stats()
+        logger.close()
+
+        self.assertEqual(stats["sampled_out"], 10)
+        self.assertEqual(stats["emitted"], 1)
+        self.assertEqual(len(self.read_entries()), 1)
+
+    def test_file_rotates_at_size_limit(self):
+        """Test that the log file is size bounded"""
+        logger = JsonLogger({"log_dir": self.log_dir, "log_level": "info",
+                             "max_bytes": 2000, "backup_count": 2})
+        for i in range(200):
+            logger.log_operation("execute_query", {"query": f"SELECT {i}"})
+        logger.close()
+
+        files = sorted(os.listdir(self.log_dir))
+        self.assertEqual(files, [LOG_FILE_NAME, f"{LOG_FILE_NAME}.1", f"{LOG_FILE_NAME}.2"])
+        for name in files:
+            self.assertLessEqual(os.path.getsize(os.path.join(self.log_dir, name)), 2000)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Tests for per-tool latency histograms and counters
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path to import the module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.mcp_server_sqlite.connection_pool import ConnectionPool
+from src.mcp_server_sqlite.metrics import LatencyHistogram, MetricsRegistry
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test percentile estimates from the log-scale buckets"""
+
+    def test_empty_histogram(self):
+        """Test that an empty histogram reports no percentiles"""
+        summary = LatencyHistogram().summary()
+        self.assertEqual(summary, {"p50": None, "p95": None, "p99": None, "mean": None, "max": None})
+
+    def test_percentiles_within_bucket_width(self):
+        """Test that percentiles land within one bucket of the true value"""
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(float(ms))
+        for p, expected in ((50, 500), (95, 950), (99, 990)):
+            value = histogram.percentile(p)
+            self.assertGreaterEqual(value, expected)
+            self.assertLessEqual(value, expected * 1.1)
+        self.assertEqual(histogram.summary()["max"], 1000.0)
+        self.assertEqual(histogram.summary()["mean"], 500.5)
+
+    def test_percentile_never_exceeds_max(self):
+        """Test that a single sample reports itself for every percentile"""
+        histogram = LatencyHistogram()
+        histogram.record(3.0)
+        self.assertEqual(histogram.percentile(99), 3.0)
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test tool measurements and pool attribution"""
+
+    def setUp(self):
+        """Set up a registry attached to a pool over a temporary database"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "metrics.db")
+        self.pool = ConnectionPool(self.db_path, size=1)
+        self.metrics = MetricsRegistry(self.pool)
+
+    def tearDown(self):
+        """Close the pool and remove the database"""
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def test_measure_counts_calls_errors_and_rows(self):
+        """Test that calls, errors, rows and bytes are recorded per tool"""
+        with self.metrics.measure("read_query") as call:
+            self.metrics.add_rows(3)
+            call.bytes_serialized = 120
+        with self.metrics.measure("read_query"):
+            self.metrics.mark_error()
+        with self.assertRaises(ValueError):
+            with self.metrics.measure("write_query"):
+                raise ValueError("bad")
+
+        snapshot = self.metrics.snapshot()
+        read = snapshot["tools"]["read_query"]
+        self.assertEqual(snapshot["total_calls"], 3)
+        self.assertEqual(snapshot["total_errors"], 2)
+        self.assertEqual(read["calls"], 2)
+        self.assertEqual(read["errors"], 1)
+        self.assertEqual(read["rows_returned"], 3)
+        self.assertEqual(read["bytes_serialized"], 120)
+        self.assertIsNotNone(read["latency_ms"]["p99"])
+        self.assertEqual(list(self.metrics.snapshot("write_query")["tools"]), ["write_query"])
+
+    def test_counts_outside_a_call_are_ignored(self):
+        """Test that rows added with no call running are not attributed"""
+        self.metrics.add_rows(5)
+        self.metrics.mark_error()
+        self.assertEqual(self.metrics.snapshot()["total_calls"], 0)
+
+    def test_vm_work_and_pool_wait_attributed(self):
+        """Test that SQLite VM progress and connection waits are recorded"""
+        with self.metrics.measure("read_query"):
+            with self.pool.reader() as conn:
+                conn.execute(
+                    "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 20000) "
+                    "SELECT SUM(x) FROM n").fetchone()
+
+        snapshot = self.metrics.snapshot()
+        self.assertGreater(snapshot["tools"]["read_query"]["vm_instructions"], 0)
+        self.assertGreaterEqual(snapshot["pool_wait_ms"]["checkouts"], 1)
+
+    def test_reset_starts_new_window(self):
+        """Test that reset discards measurements"""
+        with self.metrics.measure("list_tables"):
+            pass
+        self.metrics.reset()
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["total_calls"], 0)
+        self.assertEqual(snapshot["tools"], {})
+        self.assertEqual(snapshot["pool_wait_ms"]["checkouts"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for the OpenMetrics exporter
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import urllib.request
+from pathlib import Path
+
+# Add the src directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp_server_sqlite.server import EnhancedSqliteDatabase
+from mcp_server_sqlite.metrics_exporter import CONTENT_TYPE, MetricsExporter, render_openmetrics
+
+class TestMetricsExporter(unittest.TestCase):
+    """Test the exposition text and the file and HTTP outputs"""
+
+    def setUp(self):
+        """Set up a WAL database with one measured tool call"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = EnhancedSqliteDatabase(os.path.join(self.temp_dir.name, "export.db"), wal=True)
+        with self.db.metrics.measure('read_query'):
+            self.db._execute_query("SELECT 1 AS one")
+
+    def tearDown(self):
+        """Close the database and remove the directory"""
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def samples(self, text):
+        samples = {}
+        for line in text.splitlines():
+            if line and not line.startswith('#'):
+                name, value = line.rsplit(' ', 1)
+                samples[name] = float(value)
+        return samples
+
+    def test_render_covers_server_metrics(self):
+        """Test that tool, pool, cache and storage metrics are exported"""
+        text = render_openmetrics(self.db)
+        samples = self.samples(text)
+
+        self.assertTrue(text.endswith('# EOF\n'))
+        self.assertIn('# TYPE sqlite_mcp_tool_latency_seconds summary', text)
+        self.assertEqual(samples['sqlite_mcp_tool_calls_total{tool="read_query"}'], 1)
+        self.assertEqual(samples['sqlite_mcp_tool_rows_returned_total{tool="read_query"}'], 1)
+        self.assertEqual(samples['sqlite_mcp_tool_latency_seconds_count{tool="read_query"}'], 1)
+        self.assertIn('sqlite_mcp_tool_latency_seconds{tool="read_query",quantile="0.99"}', samples)
+        self.assertIn('sqlite_mcp_result_cache_lookups_total{result="hit"}', samples)
+        self.assertIn('sqlite_mcp_statement_cache_lookups_total{result="miss"}', samples)
+        self.assertGreater(samples['sqlite_mcp_pool_checkouts_total{role="reader"}'], 0)
+        self.assertGreater(samples['sqlite_mcp_database_size_bytes'], 0)
+        self.assertIn('sqlite_mcp_wal_size_bytes', samples)
+        self.assertGreater(samples['sqlite_mcp_page_cache_capacity_bytes'], 0)
+
+    def test_label_values_are_escaped(self):
+        """Test that quotes in a tool name cannot break the exposition format"""
+        with self.db.metrics.measure('odd"tool'):
+            pass
+        self.assertIn('tool="odd\\"tool"', render_openmetrics(self.db))
+
+    def test_file_export(self):
+        """Test that the file is written on start and refreshed on close"""
+        path = os.path.join(self.temp_dir.name, "metrics", "sqlite_mcp.prom")
+        exporter = MetricsExporter(self.db, path=path, interval=60).start()
+        exporter.close()
+        with open(path, encoding="utf-8") as f:
+            self.assertIn('sqlite_mcp_tool_calls_total{tool="read_query"} 1', f.read())
+        self.assertFalse(os.path.exists(path + ".tmp"))
+
+    def test_http_export(self):
+        """Test that /metrics is served on a local port"""
+        exporter = MetricsExporter(self.db, port=0).start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics", timeout=5) as response:
+                self.assertEqual(response.headers['Content-Type'], CONTENT_TYPE)
+                self.assertIn('sqlite_mcp_tool_calls_total', response.read().decode('utf-8'))
+        finally:
+            exporter.close()
+
+    def test_disabled_by_default(self):
+        """Test that an exporter with no file or port does nothing"""
+        self.assertFalse(MetricsExporter(self.db).enabled)
+
+if __name__ == "__main__":
+    unittest.main()
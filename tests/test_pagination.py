@@ -0,0 +1,169 @@
+"""
+Tests for paged query results with continuation cursors
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path to import the module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.mcp_server_sqlite.connection_pool import ConnectionPool
+from src.mcp_server_sqlite.pagination import ResultPager, _keyset_key
+from src.mcp_server_sqlite.transaction_safety import safe_execute_query
+
+class PagerTestMixin:
+    """Shared checks for both paging modes"""
+
+    wal = False
+
+    def setUp(self):
+        """Set up a pool over a temporary database with 25 rows"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "pages.db")
+        self.pool = ConnectionPool(self.db_path, size=2, wal=self.wal)
+        with self.pool.writer() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+            conn.executemany("INSERT INTO items (name) VALUES (?)", [(f"item {i}",) for i in range(25)])
+            conn.commit()
+        self.pager = ResultPager(self.pool)
+
+    def tearDown(self):
+        """Close cursors and the pool"""
+        self.pager.close_all()
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def test_pages_cover_every_row_once(self):
+        """Test that following cursors returns each row exactly once"""
+        page = self.pager.open("SELECT id, name FROM items ORDER BY id", page_size=10)
+        self.assertEqual(page["columns"], ["id", "name"])
+        ids = [row["id"] for row in page["rows"]]
+        pages = 1
+        while page["has_more"]:
+            page = self.pager.fetch(page["cursor"], page_size=10)
+            ids.extend(row["id"] for row in page["rows"])
+            pages += 1
+
+        self.assertEqual(ids, list(range(1, 26)))
+        self.assertEqual(pages, 3)
+        self.assertIsNone(page["cursor"])
+        self.assertEqual(self.pager.stats()["open_cursors"], 0)
+
+    def test_named_params(self):
+        """Test that named parameters carry through every page"""
+        page = self.pager.open("SELECT id FROM items WHERE id > :after ORDER BY id", {"after": 20}, page_size=3)
+        self.assertEqual([row["id"] for row in page["rows"]], [21, 22, 23])
+        page = self.pager.fetch(page["cursor"], page_size=3)
+        self.assertEqual([row["id"] for row in page["rows"]], [24, 25])
+        self.assertFalse(page["has_more"])
+
+    def test_exhausted_cursor_is_closed(self):
+        """Test that no cursor is left open once the rows run out"""
+        page = self.pager.open("SELECT id FROM items WHERE id <= ?", [5], page_size=5)
+        self.assertFalse(page["has_more"])
+        self.assertIsNone(page["cursor"])
+        self.assertEqual(self.pager.stats()["open_cursors"], 0)
+        with self.assertRaises(ValueError):
+            self.pager.fetch("not-a-cursor")
+
+    def test_expired_cursor_is_closed(self):
+        """Test that cursors idle past the TTL are closed"""
+        self.pager.ttl = 0
+        page = self.pager.open("SELECT id FROM items", page_size=5)
+        self.assertEqual(self.pager.sweep(), 1)
+        with self.assertRaises(ValueError):
+            self.pager.fetch(page["cursor"])
+
+    def test_oldest_cursor_is_evicted(self):
+        """Test that the open cursor count stays bounded"""
+        self.pager.max_cursors = 2
+        first = self.pager.open("SELECT id FROM items", page_size=5)
+        self.pager.open("SELECT id FROM items", page_size=5)
+        self.pager.open("SELECT id FROM items", page_size=5)
+        self.assertEqual(self.pager.stats()["open_cursors"], 2)
+        with self.assertRaises(ValueError):
+            self.pager.fetch(first["cursor"])
+
+class TestOffsetPaging(PagerTestMixin, unittest.TestCase):
+    """Test paging outside WAL mode, where no lock is held between pages"""
+
+    def test_writer_not_blocked_between_pages(self):
+        """Test that an open cursor does not hold a lock on the database"""
+        page = self.pager.open("SELECT id FROM items ORDER BY id", page_size=10)
+        self.pool.timeout = 0.5
+        result = safe_execute_query(self.db_path, "INSERT INTO items (name) VALUES (?)", ["new"], pool=self.pool)
+        self.assertEqual(result[0]["affected_rows"], 1)
+        self.assertTrue(self.pager.fetch(page["cursor"], page_size=10)["has_more"])
+
+    def test_pages_are_marked_inconsistent(self):
+        """Test that re-run pages say they are separate reads"""
+        page = self.pager.open("SELECT name FROM items", page_size=10)
+        self.assertFalse(page["consistent"])
+        self.assertIn("skipped or repeated", page["warning"])
+
+    def test_keyset_pages_survive_deletes(self):
+        """Test that pages ordered by a unique key continue after the last key instead of an offset"""
+        page = self.pager.open("SELECT * FROM items WHERE name != ? ORDER BY id DESC", ["none"], page_size=10)
+        self.assertIn("after the last id seen", page["warning"])
+        ids = [row["id"] for row in page["rows"]]
+        # Deleting served rows would shift an OFFSET window past unseen ones
+        safe_execute_query(self.db_path, "DELETE FROM items WHERE id > 20", pool=self.pool)
+        while page["has_more"]:
+            page = self.pager.fetch(page["cursor"], page_size=10)
+            ids.extend(row["id"] for row in page["rows"])
+        self.assertEqual(ids, list(range(25, 0, -1)))
+
+    def test_keyset_key_detection(self):
+        """Test which queries can be paged by key"""
+        with self.pool.writer() as conn:
+            conn.execute("CREATE TABLE codes (code TEXT NOT NULL UNIQUE, label TEXT, loose TEXT UNIQUE)")
+            conn.commit()
+        cases = {
+            "SELECT id, name FROM items ORDER BY id": ("id", False),
+            "SELECT i.* FROM items i WHERE i.name LIKE 'a%' ORDER BY i.id DESC": ("id", True),
+            "SELECT label, code FROM codes ORDER BY code": ("code", False),
+            "SELECT * FROM codes ORDER BY loose": None,
+            "SELECT name FROM items ORDER BY id": None,
+            "SELECT name AS id FROM items ORDER BY id": None,
+            "SELECT * FROM items ORDER BY name": None,
+            "SELECT DISTINCT id FROM items ORDER BY id": None,
+            "SELECT * FROM items JOIN codes ON name = code ORDER BY id": None,
+            "SELECT * FROM items ORDER BY id LIMIT 5": None,
+        }
+        with self.pool.reader() as conn:
+            for query, expected in cases.items():
+                with self.subTest(query=query):
+                    self.assertEqual(_keyset_key(conn, query), expected)
+
+class TestHeldCursorPaging(PagerTestMixin, unittest.TestCase):
+    """Test paging in WAL mode, where the statement stays open"""
+
+    wal = True
+
+    def test_cursor_reads_one_snapshot(self):
+        """Test that rows written mid-scan do not appear in later pages"""
+        page = self.pager.open("SELECT id FROM items ORDER BY id", page_size=10)
+        safe_execute_query(self.db_path, "INSERT INTO items (name) VALUES (?)", ["new"], pool=self.pool)
+        total = len(page["rows"])
+        while page["has_more"]:
+            page = self.pager.fetch(page["cursor"], page_size=10)
+            total += len(page["rows"])
+        self.assertEqual(total, 25)
+        self.assertTrue(page["consistent"])
+        self.assertNotIn("warning", page)
+
+    def test_cursor_connection_is_released(self):
+        """Test that the dedicated connection closes with the cursor"""
+        page = self.pager.open("SELECT id FROM items", page_size=5)
+        roles = [info["role"] for info in self.pool.connection_info()]
+        self.assertIn("cursor", roles)
+        self.assertTrue(self.pager.close(page["cursor"]))
+        roles = [info["role"] for info in self.pool.connection_info()]
+        self.assertNotIn("cursor", roles)
+
+if __name__ == "__main__":
+    unittest.main()
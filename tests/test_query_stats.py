@@ -0,0 +1,127 @@
+"""
+Tests for per-fingerprint query statistics
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path to import the module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.mcp_server_sqlite.query_stats import SAVE_EVERY_RECORDS, QueryStats, fingerprint, query_id, sidecar_path
+
+class TestFingerprint(unittest.TestCase):
+    """Test literal normalization"""
+
+    def test_literals_replaced(self):
+        """Test that strings, numbers, blobs and parameters become placeholders"""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t1 WHERE name = 'O''Brien' AND age > 30 AND data = X'ff' AND x = :x"),
+            "SELECT * FROM t1 WHERE name = ? AND age > ? AND data = ? AND x = ?")
+
+    def test_same_shape_shares_fingerprint(self):
+        """Test that queries differing only in constants and spacing match"""
+        self.assertEqual(fingerprint("SELECT a FROM t WHERE id = 1"),
+                         fingerprint("SELECT a\n  FROM t WHERE id = 42;"))
+        self.assertEqual(fingerprint("SELECT a FROM t WHERE id IN (1, 2)"),
+                         fingerprint("SELECT a FROM t WHERE id IN (7, 8, 9, 10) -- note"))
+        self.assertEqual(fingerprint("INSERT INTO t VALUES (1, 'a'), (2, 'b')"),
+                         fingerprint("INSERT INTO t VALUES (-3, 'c')"))
+
+    def test_identifiers_kept(self):
+        """Test that digits inside identifiers and arithmetic are not literals"""
+        self.assertEqual(fingerprint("SELECT col2 - 1 FROM t2"), "SELECT col2 - ? FROM t2")
+        self.assertNotEqual(query_id(fingerprint("SELECT * FROM t1")),
+                            query_id(fingerprint("SELECT * FROM t2")))
+
+class TestQueryStats(unittest.TestCase):
+    """Test aggregation, ranking, the slow log and the sidecar file"""
+
+    def setUp(self):
+        """Set up a statistics file in a temporary directory"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = sidecar_path(os.path.join(self.temp_dir.name, "app.db"))
+
+    def tearDown(self):
+        """Remove the directory"""
+        self.temp_dir.cleanup()
+
+    def test_aggregates_per_fingerprint(self):
+        """Test calls, rows and timing totals for one fingerprint"""
+        stats = QueryStats(self.path, slow_ms=50)
+        stats.record("SELECT * FROM t WHERE id = 1", 10.0, rows=1)
+        stats.record("SELECT * FROM t WHERE id = 2", 30.0, rows=1)
+        stats.record("SELECT * FROM t WHERE id = 3", 80.0, rows=0, error=True)
+
+        [entry] = stats.top()
+        self.assertEqual(entry["fingerprint"], "SELECT * FROM t WHERE id = ?")
+        self.assertEqual(entry["example"], "SELECT * FROM t WHERE id = 1")
+        self.assertEqual(entry["calls"], 3)
+        self.assertEqual(entry["errors"], 1)
+        self.assertEqual(entry["rows"], 2)
+        self.assertEqual(entry["total_ms"], 120.0)
+        self.assertEqual(entry["mean_ms"], 40.0)
+        self.assertEqual(entry["min_ms"], 10.0)
+        self.assertEqual(entry["max_ms"], 80.0)
+        self.assertEqual(entry["slow_calls"], 1)
+        self.assertEqual([item["query"] for item in stats.slow_queries()], ["SELECT * FROM t WHERE id = 3"])
+
+    def test_ranking(self):
+        """Test that top() orders by the requested measure"""
+        stats = QueryStats()
+        for _ in range(5):
+            stats.record("SELECT 1", 1.0)
+        stats.record("SELECT * FROM big", 20.0)
+
+        self.assertEqual(stats.top(1)[0]["fingerprint"], "SELECT * FROM big")
+        self.assertEqual(stats.top(1, "calls")[0]["fingerprint"], "SELECT ?")
+        with self.assertRaises(ValueError):
+            stats.top(order_by="bogus")
+
+    def test_fingerprint_limit_evicts_cheapest(self):
+        """Test that the fingerprint with the least total time is evicted"""
+        stats = QueryStats(max_fingerprints=2)
+        stats.record("SELECT * FROM a", 5.0)
+        stats.record("SELECT * FROM b", 1.0)
+        stats.record("SELECT * FROM c", 3.0)
+
+        self.assertEqual({e["fingerprint"] for e in stats.top()}, {"SELECT * FROM a", "SELECT * FROM c"})
+        self.assertEqual(stats.stats()["evicted"], 1)
+
+    def test_sidecar_survives_restart(self):
+        """Test that aggregates are saved on close and loaded again"""
+        stats = QueryStats(self.path)
+        stats.record("UPDATE t SET x = 1 WHERE id = 9", 2.0, rows=1)
+        stats.close()
+
+        reloaded = QueryStats(self.path)
+        reloaded.record("UPDATE t SET x = 2 WHERE id = 10", 4.0, rows=1)
+        [entry] = reloaded.top()
+        self.assertEqual(entry["calls"], 2)
+        self.assertEqual(entry["rows"], 2)
+
+        reloaded.reset()
+        self.assertEqual(QueryStats(self.path).top(), [])
+
+    def test_sidecar_saved_while_running(self):
+        """Test that the sidecar is written during recording, without close()"""
+        stats = QueryStats(self.path)
+        stats.record("SELECT * FROM t WHERE id = 1", 1.0, rows=1)
+        self.assertEqual(QueryStats(self.path).top()[0]["calls"], 1)
+
+        # Later executions are batched until enough of them pile up
+        for i in range(SAVE_EVERY_RECORDS - 1):
+            stats.record(f"SELECT * FROM t WHERE id = {i}", 1.0, rows=1)
+        self.assertEqual(QueryStats(self.path).top()[0]["calls"], 1)
+        stats.record("SELECT * FROM t WHERE id = 2", 1.0, rows=1)
+        self.assertEqual(QueryStats(self.path).top()[0]["calls"], SAVE_EVERY_RECORDS + 1)
+
+    def test_no_sidecar_for_memory_database(self):
+        """Test that in-memory databases keep statistics in memory only"""
+        self.assertIsNone(sidecar_path(":memory:"))
+
+if __name__ == "__main__":
+    unittest.main()
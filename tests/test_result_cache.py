@@ -0,0 +1,102 @@
+"""
+Tests for the read query result cache
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path to import the module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.mcp_server_sqlite.connection_pool import ConnectionPool
+from src.mcp_server_sqlite.result_cache import ResultCache
+from src.mcp_server_sqlite.transaction_safety import safe_execute_query
+
+class TestResultCache(unittest.TestCase):
+    """Test caching, invalidation and eviction of read results"""
+
+    def setUp(self):
+        """Set up a pool and a 1 MB cache over a temporary database"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "cache.db")
+        self.pool = ConnectionPool(self.db_path, size=2)
+        with self.pool.writer() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+            conn.execute("INSERT INTO items (name) VALUES ('a'), ('b')")
+            conn.commit()
+        self.cache = ResultCache(self.pool, max_bytes=1024 * 1024)
+
+    def tearDown(self):
+        """Close the cache and the pool"""
+        self.cache.close()
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def read(self, query, params=None):
+        """Read through the cache the same way _execute_query does"""
+        key = self.cache.key(query, params)
+        version = self.cache.version()
+        rows = self.cache.get(key, version)
+        if rows is None:
+            with self.pool.reader() as conn:
+                rows = [dict(row) for row in conn.execute(query, params or ()).fetchall()]
+            self.cache.put(key, version, rows)
+        return rows
+
+    def test_repeated_read_is_a_hit(self):
+        """Test that the same SQL and params are served from the cache"""
+        first = self.read("SELECT * FROM items WHERE id = ?", [1])
+        second = self.read("SELECT * FROM items WHERE id = ?", [1])
+        self.read("SELECT * FROM items WHERE id = ?", [2])
+
+        self.assertEqual(first, second)
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["entries"], 2)
+
+    def test_pool_write_invalidates(self):
+        """Test that a write through the pool clears cached results"""
+        self.assertEqual(len(self.read("SELECT * FROM items")), 2)
+        safe_execute_query(self.db_path, "INSERT INTO items (name) VALUES (?)", ["c"], pool=self.pool)
+        self.assertEqual(len(self.read("SELECT * FROM items")), 3)
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+
+    def test_external_write_invalidates(self):
+        """Test that a commit from another process is detected via data_version"""
+        self.assertEqual(len(self.read("SELECT * FROM items")), 2)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO items (name) VALUES ('external')")
+        conn.commit()
+        conn.close()
+        self.assertEqual(len(self.read("SELECT * FROM items")), 3)
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        """Test that the cache stays within its memory budget"""
+        self.cache.max_bytes = 1000
+        for i in range(10):
+            self.read("SELECT ? AS value", ["x" * 100 + str(i)])
+        stats = self.cache.stats()
+        self.assertLessEqual(stats["bytes"], 1000)
+        self.assertGreater(stats["evictions"], 0)
+
+    def test_cached_rows_are_copies(self):
+        """Test that callers cannot modify the cached entry"""
+        self.read("SELECT * FROM items WHERE id = 1")[0]["name"] = "changed"
+        self.assertEqual(self.read("SELECT * FROM items WHERE id = 1")[0]["name"], "a")
+
+    def test_cacheable_statements(self):
+        """Test that only deterministic reads are cached"""
+        self.assertTrue(ResultCache.cacheable("SELECT COUNT(*) FROM items"))
+        self.assertTrue(ResultCache.cacheable("PRAGMA table_info(items)"))
+        self.assertFalse(ResultCache.cacheable("PRAGMA foreign_keys"))
+        self.assertFalse(ResultCache.cacheable("SELECT random()"))
+        self.assertFalse(ResultCache.cacheable("SELECT datetime('now')"))
+        self.assertFalse(ResultCache.cacheable("DELETE FROM items"))
+
+if __name__ == "__main__":
+    unittest.main()
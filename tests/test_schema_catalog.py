@@ -0,0 +1,86 @@
+"""
+Tests for the cached schema catalog
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path to import the module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.mcp_server_sqlite.connection_pool import ConnectionPool
+from src.mcp_server_sqlite.schema_catalog import SchemaCatalog
+
+class TestSchemaCatalog(unittest.TestCase):
+    """Test catalog caching and row count estimates"""
+
+    def setUp(self):
+        """Set up a pool over a temporary database with two tables"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "catalog.db")
+        self.pool = ConnectionPool(self.db_path, size=1)
+        with self.pool.writer() as conn:
+            conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, customer TEXT)")
+            conn.execute("CREATE INDEX idx_orders_customer ON orders(customer)")
+            conn.execute('CREATE TABLE "odd name" (x)')
+            conn.executemany("INSERT INTO orders (customer) VALUES (?)", [(f"c{i % 7}",) for i in range(50)])
+            conn.commit()
+        self.catalog = SchemaCatalog(self.pool)
+
+    def tearDown(self):
+        """Close the pool and remove the database"""
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def tables(self, snapshot):
+        return {table["name"]: table for table in snapshot["tables"]}
+
+    def test_catalog_is_cached_until_schema_changes(self):
+        """Test that the catalog is rebuilt only on a schema_version change"""
+        self.catalog.snapshot()
+        self.catalog.snapshot()
+        self.assertEqual(self.catalog.stats(), {"hits": 1, "rebuilds": 1})
+
+        with self.pool.writer() as conn:
+            conn.execute("ALTER TABLE orders ADD COLUMN total REAL")
+            conn.commit()
+        snapshot = self.catalog.snapshot()
+        self.assertEqual(self.catalog.stats()["rebuilds"], 2)
+        columns = [col["name"] for col in self.tables(snapshot)["orders"]["columns"]]
+        self.assertEqual(columns, ["id", "customer", "total"])
+
+    def test_row_counts_from_sqlite_stat1(self):
+        """Test that analyzed tables report estimates without scanning"""
+        snapshot = self.catalog.snapshot()
+        self.assertEqual(snapshot["row_counts"], "estimated")
+        self.assertEqual(self.tables(snapshot)["orders"]["row_count_source"], "unavailable")
+        self.assertIsNone(self.tables(snapshot)["orders"]["row_count"])
+
+        with self.pool.writer() as conn:
+            conn.execute("ANALYZE")
+            conn.commit()
+        orders = self.tables(self.catalog.snapshot())["orders"]
+        self.assertEqual(orders["row_count_source"], "sqlite_stat1")
+        self.assertEqual(orders["row_count"], 50)
+
+    def test_exact_counts_on_request(self):
+        """Test that exact counts are computed only when asked for"""
+        snapshot = self.catalog.snapshot(exact_counts=True)
+        tables = self.tables(snapshot)
+        self.assertEqual(snapshot["row_counts"], "exact")
+        self.assertEqual(tables["orders"]["row_count"], 50)
+        self.assertEqual(tables["odd name"]["row_count"], 0)
+        self.assertEqual(tables["orders"]["row_count_source"], "exact")
+
+    def test_snapshot_reports_age(self):
+        """Test that the snapshot says when the catalog was captured"""
+        snapshot = self.catalog.snapshot()
+        self.assertIn("catalog_captured_at", snapshot)
+        self.assertGreaterEqual(snapshot["catalog_age_seconds"], 0)
+        self.assertIsInstance(snapshot["schema_version"], int)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,286 @@
+"""
+Tests for the KLL and HyperLogLog sketches, the sketch store and the approximate statistics tools
+"""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the src directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp import types
+
+from mcp_server_sqlite.aggregates import register_aggregates
+from mcp_server_sqlite.server import EnhancedSqliteDatabase, create_server
+from mcp_server_sqlite.sketch_store import SKETCH_TABLE
+from mcp_server_sqlite.sketches import (HllSketch, KllSketch, hll_precision_for_error, hll_standard_error,
+                                        kll_k_for_error, kll_rank_error)
+
+def rank_of(ordered, value):
+    """Fraction of the sorted values below value"""
+    low, high = 0, len(ordered)
+    while low < high:
+        middle = (low + high) // 2
+        if ordered[middle] < value:
+            low = middle + 1
+        else:
+            high = middle
+    return low / len(ordered)
+
+class TestKllSketch(unittest.TestCase):
+    """Test the KLL sketch's accuracy, merging and serialization"""
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.values = [rng.lognormvariate(0, 1) for _ in range(50000)]
+        self.ordered = sorted(self.values)
+
+    def assert_within_bound(self, sketch):
+        fractions = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+        for fraction, value in zip(fractions, sketch.quantiles(fractions)):
+            self.assertLessEqual(abs(rank_of(self.ordered, value) - fraction), sketch.rank_error(), msg=fraction)
+
+    def test_quantiles_within_rank_error(self):
+        """Test that quantiles stay within the published bound in bounded memory"""
+        sketch = KllSketch(200)
+        sketch.update_many(self.values)
+        self.assertFalse(sketch.exact)
+        self.assertEqual(sketch.n, len(self.values))
+        self.assertLess(sum(len(items) for items in sketch.levels), 1000)
+        self.assert_within_bound(sketch)
+        self.assertEqual(sketch.quantiles([0, 1]), [self.ordered[0], self.ordered[-1]])
+        self.assertAlmostEqual(sketch.rank(self.ordered[len(self.ordered) // 2]), 0.5, delta=sketch.rank_error())
+
+    def test_small_inputs_are_exact(self):
+        """Test that a sketch that never compacted answers exactly"""
+        sketch = KllSketch(200)
+        sketch.update_many([3.0, 1.0, 2.0, 4.0])
+        self.assertTrue(sketch.exact)
+        self.assertEqual(sketch.rank_error(), 0.0)
+        self.assertEqual(sketch.quantiles([0.25, 0.5, 1.0]), [1.0, 2.0, 4.0])
+        self.assertEqual(KllSketch().quantiles([0.5]), [None])
+
+    def test_merge_and_serialization(self):
+        """Test that merged and round-tripped sketches keep the bound"""
+        left, right = KllSketch(200), KllSketch(200)
+        left.update_many(self.values[:20000])
+        right.update_many(self.values[20000:])
+        merged = KllSketch.from_json(left.to_json())
+        merged.merge(KllSketch.from_json(right.to_json()))
+        self.assertEqual(merged.n, len(self.values))
+        self.assert_within_bound(merged)
+        with self.assertRaises(ValueError):
+            KllSketch.from_json(json.dumps({'type': 'hll'}))
+
+    def test_capacity_for_error(self):
+        """Test that the capacity for a rank error meets it"""
+        for error in (0.05, 0.01, 0.001):
+            k = kll_k_for_error(error)
+            self.assertLessEqual(kll_rank_error(k), error)
+            self.assertGreater(kll_rank_error(k - 1), error)
+        with self.assertRaises(ValueError):
+            kll_k_for_error(1e-6)
+
+    def test_sql_functions(self):
+        """Test kll_sketch(), kll_merge() and kll_quantile() in SQL"""
+        conn = sqlite3.connect(":memory:")
+        register_aggregates(conn)
+        conn.execute("CREATE TABLE t (part INTEGER, x)")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", [(i % 3, v) for i, v in enumerate(self.values)])
+        conn.execute("INSERT INTO t VALUES (0, NULL), (1, 'text')")
+        median = conn.execute("""
+            SELECT kll_quantile(kll_merge(s), 0.5) FROM (SELECT kll_sketch(x, 200) AS s FROM t GROUP BY part)
+            """).fetchone()[0]
+        conn.close()
+        self.assertLessEqual(abs(rank_of(self.ordered, median) - 0.5), kll_rank_error(200))
+
+class TestHllSketch(unittest.TestCase):
+    """Test HyperLogLog distinct counts, unions and serialization"""
+
+    def test_counts_within_standard_error(self):
+        """Test that counts stay within four standard errors, from empty to large"""
+        for n in (0, 1, 100, 5000, 200000):
+            sketch = HllSketch(12)
+            sketch.update_many([f"value-{i}" for i in range(n)] * 2)
+            if n <= 1:
+                self.assertEqual(sketch.count(), n)
+            else:
+                self.assertLessEqual(abs(sketch.count() - n) / n, 4 * sketch.standard_error(), msg=n)
+
+    def test_value_identity(self):
+        """Test that values count as distinct exactly when COUNT(DISTINCT) says so"""
+        sketch = HllSketch()
+        sketch.update_many([1, 1.0, True, '1', b'1', 2.5, None, '2.5'])
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (x)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(1,), (1.0,), (True,), ('1',), (b'1',), (2.5,), (None,), ('2.5',)])
+        expected = conn.execute("SELECT COUNT(DISTINCT x) FROM t").fetchone()[0]
+        conn.close()
+        self.assertEqual(sketch.count(), expected)
+
+    def test_union_and_precision(self):
+        """Test that merged sketches count the union and fold to the lower precision"""
+        left, right = HllSketch(14), HllSketch(12)
+        left.update_many(list(range(30000)))
+        right.update_many(list(range(20000, 50000)))
+        whole = HllSketch(12)
+        whole.update_many(list(range(50000)))
+        folded = HllSketch.from_json(left.to_json())
+        folded.merge(right)
+        self.assertEqual(folded.precision, 12)
+        self.assertEqual(folded.registers, whole.registers)
+        self.assertEqual(left.reduced(12).registers, HllSketch.from_json(left.to_json()).reduced(12).registers)
+        with self.assertRaises(ValueError):
+            right.reduced(14)
+
+    def test_precision_for_error(self):
+        """Test that the precision for an error meets it"""
+        self.assertEqual(hll_precision_for_error(hll_standard_error(14)), 14)
+        self.assertEqual(hll_precision_for_error(0.02), 12)
+        with self.assertRaises(ValueError):
+            hll_precision_for_error(0.0001)
+
+    def test_sql_functions(self):
+        """Test hll_sketch(), hll_merge() and hll_count() over partitions"""
+        conn = sqlite3.connect(":memory:")
+        register_aggregates(conn)
+        conn.execute("CREATE TABLE visits (day INTEGER, visitor TEXT)")
+        conn.executemany("INSERT INTO visits VALUES (?, ?)",
+                         [(day, f"v{(day * 300 + i) % 4000}") for day in range(10) for i in range(1000)])
+        conn.execute("CREATE TABLE daily AS SELECT day, hll_sketch(visitor, 14) AS s FROM visits GROUP BY day")
+        merged = conn.execute("SELECT hll_count(hll_merge(s)) FROM daily WHERE day < 5").fetchone()[0]
+        exact = conn.execute("SELECT COUNT(DISTINCT visitor) FROM visits WHERE day < 5").fetchone()[0]
+        conn.close()
+        self.assertLessEqual(abs(merged - exact) / exact, 4 * hll_standard_error(14))
+
+class TestSketchStore(unittest.TestCase):
+    """Test stored sketches and the tools that use them"""
+
+    def setUp(self):
+        """Set up a database with a numeric column"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = EnhancedSqliteDatabase(os.path.join(self.temp_dir.name, "sketch.db"))
+        self.db._execute_query("CREATE TABLE m (grp TEXT, x REAL)")
+        rows = ", ".join(f"('{'a' if i % 2 else 'b'}', {i})" for i in range(1, 5001))
+        self.db._execute_query(f"INSERT INTO m VALUES {rows}")
+        self.handler = create_server(self.db).request_handlers[types.CallToolRequest]
+
+    def tearDown(self):
+        """Close the database and remove it"""
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def call(self, name, arguments):
+        request = types.CallToolRequest(method="tools/call", params=types.CallToolRequestParams(
+            name=name, arguments=arguments))
+        return asyncio.run(self.handler(request)).root.content[0].text
+
+    def test_incremental_refresh(self):
+        """Test that only rows added since the last call are scanned"""
+        store = self.db.sketch_store
+        sketch, info = store.quantile_sketch("m", "x", k=100)
+        self.assertEqual(info, {'source': 'created', 'rows_scanned': 5000})
+        self.db._execute_query("INSERT INTO m VALUES ('a', 5001), ('b', 5002)")
+        sketch, info = store.quantile_sketch("m", "x", k=100)
+        self.assertEqual(info, {'source': 'refreshed', 'rows_scanned': 2})
+        self.assertEqual((sketch.n, sketch.max), (5002, 5002.0))
+
+        # Unchanged tables scan nothing; a larger k or rebuild starts over
+        self.assertEqual(store.quantile_sketch("m", "x", k=100)[1]['rows_scanned'], 0)
+        self.assertEqual(store.quantile_sketch("m", "x", k=400)[1]['source'], 'created')
+        self.assertEqual(store.quantile_sketch("m", "x", k=100, rebuild=True)[1]['rows_scanned'], 5002)
+        self.assertEqual(store.stats()['created'], 3)
+
+    def test_filters_and_deletes(self):
+        """Test that each filter has its own sketch and deleting the newest rows rebuilds it"""
+        store = self.db.sketch_store
+        sketch, _ = store.quantile_sketch("m", "x", "grp = 'a'")
+        self.assertEqual(sketch.n, 2500)
+        self.assertEqual(store.quantile_sketch("m", "x", "  grp = 'a' ")[1]['rows_scanned'], 0)
+        self.db._execute_query("DELETE FROM m WHERE x > 4000")
+        sketch, info = store.quantile_sketch("m", "x", "grp = 'a'")
+        self.assertEqual((info['source'], sketch.n), ('created', 2000))
+        stored = self.db._execute_query(f"SELECT COUNT(*) AS n FROM {SKETCH_TABLE}")
+        self.assertEqual(stored[0]['n'], 1)
+
+    def test_percentile_analysis_with_rank_error(self):
+        """Test that approximate percentiles report their error bound"""
+        text = self.call("percentile_analysis", {"table_name": "m", "column_name": "x",
+                                                 "percentiles": [50], "max_rank_error": 0.05})
+        self.assertIn("5,000 values, KLL sketch k=", text)
+        self.assertIn("rank error within ±", text)
+        self.assertIn("sketch created, 5,000 rows scanned", text)
+        median = float(text.split("Median (50th percentile): ")[1].split()[0])
+        self.assertLessEqual(abs(median - 2500) / 5000, 0.05)
+        text = self.call("percentile_analysis", {"table_name": "m", "column_name": "x",
+                                                 "percentiles": [50], "max_rank_error": 0.05})
+        self.assertIn("sketch refreshed, 0 rows scanned", text)
+        text = self.call("percentile_analysis", {"table_name": "m", "column_name": "x", "method": "lower",
+                                                 "max_rank_error": 0.05})
+        self.assertIn("method applies only to exact percentiles", text)
+
+    def test_outlier_detection(self):
+        """Test exact and approximate IQR fences and z-score counts"""
+        self.db._execute_query("INSERT INTO m VALUES ('a', 1000000)")
+        text = self.call("outlier_detection", {"table_name": "m", "column_name": "x"})
+        self.assertIn("Outliers: 1 of 5,001 values", text)
+        self.assertIn("Z-Score Method (threshold=3.0):", text)
+        text = self.call("outlier_detection", {"table_name": "m", "column_name": "x", "method": "iqr",
+                                               "max_rank_error": 0.01})
+        self.assertIn("Outliers: about 1 of 5,001 values", text)
+        self.assertIn("Computed by: KLL sketch", text)
+        self.assertNotIn("Z-Score", text)
+
+    def test_distinct_sketches_in_one_scan(self):
+        """Test that columns with different high-water marks are refreshed together"""
+        store = self.db.sketch_store
+        store.distinct_sketch("m", "grp")
+        self.db._execute_query("INSERT INTO m VALUES ('c', 5001)")
+        sketches = store.distinct_sketches("m", ["grp", "x"], precision=12)
+        self.assertEqual(sketches["grp"][1], {'source': 'refreshed', 'rows_scanned': 1})
+        self.assertEqual(sketches["x"][1], {'source': 'created', 'rows_scanned': 5001})
+        self.assertEqual(sketches["grp"][0].count(), 3)
+        self.assertLessEqual(abs(sketches["x"][0].count() - 5001) / 5001, 4 * hll_standard_error(12))
+        # A stored sketch more precise than requested is reused
+        self.assertEqual(store.distinct_sketch("m", "grp", precision=10)[1]['source'], 'refreshed')
+
+    def test_descriptive_statistics_approximate(self):
+        """Test that the approximate distinct count reports its error"""
+        text = self.call("descriptive_statistics", {"table_name": "m", "column_name": "x", "approximate": True,
+                                                    "hll_precision": 12, "where_clause": "grp = 'a'"})
+        self.assertIn("- Count: 2,500", text)
+        self.assertIn("HyperLogLog p=12, ±1.62% standard error; sketch created, 2,500 values scanned", text)
+        estimate = int(text.split("Distinct Values: ~")[1].split()[0].replace(",", ""))
+        self.assertLessEqual(abs(estimate - 2500) / 2500, 0.07)
+
+    def test_resources_approximate(self):
+        """Test that the schema and statistics resources report distinct estimates on request"""
+        handler = create_server(self.db).request_handlers[types.ReadResourceRequest]
+        def read(uri):
+            request = types.ReadResourceRequest(method="resources/read", params=types.ReadResourceRequestParams(uri=uri))
+            return json.loads(asyncio.run(handler(request)).root.contents[0].text)
+
+        self.assertNotIn("distinct_estimates", read("database://schema")["tables"][0])
+        schema = read("database://schema?approximate=true&precision=10")
+        tables = {table["name"]: table for table in schema["tables"]}
+        self.assertEqual(tables["m"]["distinct_estimates"]["grp"], 2)
+        self.assertIn("p=10", schema["snapshot"]["distinct_counts"])
+        # The side table holding the sketches is not one of the user's tables
+        self.assertNotIn(SKETCH_TABLE, [table["name"] for table in read("database://schema")["tables"]])
+        self.assertNotIn(SKETCH_TABLE, self.call("list_tables", {}))
+        for precision in ("3", "19", "ten"):
+            with self.assertRaisesRegex(ValueError, f"Invalid precision '{precision}': use an integer from 4 to 18"):
+                read(f"database://schema?approximate=true&precision={precision}")
+        statistics = read("database://statistics?approximate=true&precision=10")
+        tables = {table["name"]: table for table in statistics["tables"]}
+        self.assertEqual(tables["m"]["distinct_estimates"]["grp"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -204,5 +204,49 @@ class TestSpatialPreprocessing(unittest.TestCase):
                 self.assertNotIn("geomfromtext", result.lower())
 
 
+
+class TestSpatialiteLoading(unittest.TestCase):
+    """Test that SpatiaLite is loaded once per pooled connection"""
+    
+    def setUp(self):
+        """Set up test database"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.db = EnhancedSqliteDatabase(self.temp_db.name, pool_size=2)
+    
+    def tearDown(self):
+        """Clean up test database"""
+        import os
+        self.db.close()
+        os.unlink(self.temp_db.name)
+    
+    def test_failed_load_recorded_per_connection(self):
+        """Test that a load failure is recorded without breaking queries"""
+        state = self.db.enable_spatialite("/nonexistent/mod_spatialite")
+        
+        self.assertFalse(state['spatialite_loaded'])
+        self.assertTrue(state['spatialite_error'])
+        self.assertEqual(self.db._execute_query("SELECT 1 AS one"), [{"one": 1}])
+        
+        writer = self.db.pool.connection_info()[0]
+        self.assertEqual(writer['role'], 'writer')
+        self.assertFalse(writer['spatialite_loaded'])
+        self.assertEqual(writer['session_steps_pending'], 0)
+    
+    def test_extension_not_loaded_per_query(self):
+        """Test that the load step runs once per connection, not per query"""
+        loads = []
+        original = self.db._load_spatialite
+        self.db._load_spatialite = lambda conn: loads.append(id(conn)) or original(conn)
+        self.db.enable_spatialite("/nonexistent/mod_spatialite")
+        
+        for _ in range(10):
+            self.db._execute_query("SELECT 1")
+        
+        # One load for the writer plus at most one per reader
+        self.assertLessEqual(len(loads), 3)
+        self.assertEqual(len(loads), len(set(loads)))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests for startup profiling and the lazily loaded text tools
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# Add the src directory to the path
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from mcp_server_sqlite.server import EnhancedSqliteDatabase
+from mcp_server_sqlite.startup import MAX_STEPS, StartupProfile
+from mcp_server_sqlite.text_processing import TextProcessor
+
+class TestStartupProfile(unittest.TestCase):
+    """Test step recording and the report"""
+
+    def test_marks_and_report(self):
+        """Test that each mark closes one step and the report adds them up"""
+        profile = StartupProfile()
+        profile.before_ms = 10.0
+        profile.mark('first')
+        profile.mark('second')
+        profile.finish()
+        profile.mark('after ready')
+
+        report = profile.report()
+        names = [step['step'] for step in report['steps']]
+        self.assertEqual(names, ['interpreter start and early imports', 'first', 'second', 'open stdio transport'])
+        self.assertAlmostEqual(report['total_ms'], sum(step['ms'] for step in report['steps']), places=1)
+        self.assertIn('second', profile.format())
+        self.assertIn('total', profile.format())
+
+    def test_recording_is_bounded(self):
+        """Test that a process opening many databases stops adding steps"""
+        profile = StartupProfile()
+        for i in range(MAX_STEPS + 10):
+            profile.mark(f"step {i}")
+        self.assertEqual(len(profile.steps), MAX_STEPS)
+
+    def test_profile_startup_flag(self):
+        """Test that the launcher prints the profile once the server is ready"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            result = subprocess.run(
+                [sys.executable, str(REPO_ROOT / "start_sqlite_mcp.py"),
+                 "--db-path", os.path.join(temp_dir, "profile.db"), "--profile-startup"],
+                stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=60)
+        self.assertIn('Startup profile:', result.stderr)
+        for step in ('import MCP SDK', 'open connection pool', 'memory_journal checks', 'register MCP handlers'):
+            self.assertIn(step, result.stderr)
+
+class TestLazyTextTools(unittest.TestCase):
+    """Test that the text tools load on first use"""
+
+    def test_text_tools_not_imported_at_startup(self):
+        """Test that creating the database does not import the text module"""
+        code = ("import sys; from mcp_server_sqlite.server import EnhancedSqliteDatabase; "
+                "db = EnhancedSqliteDatabase(':memory:'); "
+                "print('mcp_server_sqlite.text_processing' in sys.modules, "
+                "'concurrent.futures.process' in sys.modules, 'http.server' in sys.modules); "
+                "db.close()")
+        env = {**os.environ, 'PYTHONPATH': str(REPO_ROOT / "src")}
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, timeout=60)
+        self.assertEqual(result.stdout.split(), ['False', 'False', 'False'])
+
+    def test_text_processor_created_once(self):
+        """Test that the first text tool call creates the processor and later calls reuse it"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = EnhancedSqliteDatabase(os.path.join(temp_dir, "text.db"))
+            try:
+                db._execute_query("CREATE TABLE notes (body TEXT)")
+                db._execute_query("INSERT INTO notes VALUES ('mail ada@example.com today')")
+                processor = db.text_processor
+                self.assertIsInstance(processor, TextProcessor)
+                self.assertIs(db.text_processor, processor)
+
+                result = processor.regex_extract({"table_name": "notes", "column_name": "body",
+                                                  "pattern": r"\w+@example\.com"})
+                self.assertIn('ada@example.com', result[0].text)
+            finally:
+                db.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Tests for the prebuilt tool catalog
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the src directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp import types
+
+from mcp_server_sqlite.server import EnhancedSqliteDatabase, create_server
+from mcp_server_sqlite.tool_catalog import CATEGORIES, TOOL_CATEGORIES, ToolCatalog, parse_categories
+
+def tool(name, schema=None):
+    return types.Tool(name=name, description=name,
+                      inputSchema=schema or {"type": "object", "properties": {}})
+
+class TestToolCatalog(unittest.TestCase):
+    """Test catalog checks, category filtering and argument validation"""
+
+    def test_parse_categories(self):
+        """Test that category lists are split and unknown names rejected"""
+        self.assertEqual(parse_categories(" core, vector "), ["core", "vector"])
+        with self.assertRaises(ValueError):
+            parse_categories("core,nonsense")
+
+    def test_definitions_are_checked(self):
+        """Test that duplicate and uncategorized tools and malformed schemas are rejected"""
+        with self.assertRaises(ValueError):
+            ToolCatalog([tool("read_query"), tool("read_query")])
+        with self.assertRaises(ValueError):
+            ToolCatalog([tool("not_a_tool")])
+        catalog = ToolCatalog([tool("read_query", {"type": "object", "required": "query"})])
+        with self.assertRaises(ValueError):
+            catalog.check_schemas()
+
+    def test_lists_are_filtered_and_reused(self):
+        """Test that each category combination is listed once and then reused"""
+        catalog = ToolCatalog([tool("read_query"), tool("semantic_search"), tool("fts_search")])
+        self.assertEqual([t.name for t in catalog.tools()], ["read_query", "semantic_search", "fts_search"])
+        self.assertEqual([t.name for t in catalog.tools(["vector", "fts"])], ["semantic_search", "fts_search"])
+        self.assertIs(catalog.tools(["fts", "vector"]), catalog.tools(["vector", "fts"]))
+        self.assertIs(catalog.tools(), catalog.tools())
+
+    def test_unknown_categories_are_not_cached(self):
+        """Test that made-up category names do not add cache entries"""
+        catalog = ToolCatalog([tool("read_query"), tool("semantic_search")], ["core", "vector"])
+        catalog.tools(["vector"])
+        cached = len(catalog._lists)
+        for i in range(50):
+            self.assertEqual([t.name for t in catalog.tools(["vector", f"made-up-{i}"])], ["semantic_search"])
+            self.assertEqual(catalog.tools([f"made-up-{i}"]), [])
+        self.assertIs(catalog.tools(["core", "vector", "fts"]), catalog.tools())
+        self.assertEqual(len(catalog._lists), cached + 2)
+
+    def test_server_categories_limit_calls(self):
+        """Test that tools outside the server's categories are neither listed nor callable"""
+        catalog = ToolCatalog([tool("read_query"), tool("semantic_search")], ["core"])
+        self.assertEqual(len(catalog), 1)
+        self.assertNotIn("semantic_search", catalog)
+        self.assertIn("not enabled", catalog.validation_error("semantic_search", {}))
+        self.assertIsNone(catalog.validation_error("no_such_tool", {}))
+        self.assertEqual(catalog.stats()["categories"], {"core": 1})
+
+    def test_validation_error(self):
+        """Test that arguments are checked against the input schema"""
+        schema = {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
+        catalog = ToolCatalog([tool("read_query", schema)])
+        self.assertIsNone(catalog.validation_error("read_query", {"query": "SELECT 1"}))
+        self.assertIn("'query' is a required property", catalog.validation_error("read_query", {}))
+        self.assertIn("Input validation error", catalog.validation_error("read_query", {"query": 1}))
+
+class TestServerCatalog(unittest.TestCase):
+    """Test the catalog behind the server's list and call handlers"""
+
+    def setUp(self):
+        """Set up a database in a temporary directory"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = EnhancedSqliteDatabase(os.path.join(self.temp_dir.name, "catalog.db"))
+
+    def tearDown(self):
+        """Close the database and remove it"""
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def list_tools(self, server):
+        handler = server.request_handlers[types.ListToolsRequest]
+        return asyncio.run(handler(types.ListToolsRequest(method="tools/list"))).root.tools
+
+    def call_tool(self, server, name, arguments):
+        handler = server.request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(method="tools/call",
+                                        params=types.CallToolRequestParams(name=name, arguments=arguments))
+        return asyncio.run(handler(request)).root
+
+    def test_every_tool_has_a_category(self):
+        """Test that the full catalog builds with valid schemas and every tool in a known category"""
+        tools = self.list_tools(create_server(self.db))
+        self.assertGreater(len(tools), 50)
+        ToolCatalog(tools).check_schemas()
+        self.assertLessEqual({TOOL_CATEGORIES[t.name] for t in tools}, set(CATEGORIES))
+
+    def test_server_with_categories(self):
+        """Test that a server limited to some categories lists and runs only those tools"""
+        server = create_server(self.db, ["core"])
+        self.assertTrue(all(TOOL_CATEGORIES[t.name] == "core" for t in self.list_tools(server)))
+
+        self.assertFalse(self.call_tool(server, "list_tables", {}).isError)
+        result = self.call_tool(server, "semantic_search", {"table_name": "t", "query_embedding": [1.0]})
+        self.assertTrue(result.isError)
+        self.assertIn("not enabled", result.content[0].text)
+
+    def test_invalid_arguments_are_rejected(self):
+        """Test that calls are validated before they reach the executor"""
+        result = self.call_tool(create_server(self.db), "describe_table", {})
+        self.assertTrue(result.isError)
+        self.assertIn("'table_name' is a required property", result.content[0].text)
+
+    def test_server_without_jsonb(self):
+        """Test that text tools run without JSONB support and the JSONB tools say why they are missing"""
+        self.db._execute_query("CREATE TABLE notes (body TEXT)")
+        self.db._execute_query("INSERT INTO notes VALUES ('order 42'), ('no digits')")
+        self.db.version_info['has_jsonb_support'] = False
+        server = create_server(self.db)
+        names = {t.name for t in self.list_tools(server)}
+        self.assertIn("regex_extract", names)
+        self.assertNotIn("validate_json", names)
+
+        result = self.call_tool(server, "regex_extract",
+                                {"table_name": "notes", "column_name": "body", "pattern": "[0-9]+"})
+        self.assertFalse(result.isError)
+        self.assertIn("42", result.content[0].text)
+        result = self.call_tool(server, "validate_json", {"json_str": "{}"})
+        self.assertTrue(result.isError)
+        self.assertIn("not available on this server: it needs JSONB support", result.content[0].text)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,7 +12,8 @@ from pathlib import Path
 # Add the parent directory to the path to import the module
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.mcp_server_sqlite.transaction_safety import safe_execute_query
+from src.mcp_server_sqlite.connection_pool import ConnectionPool
+from src.mcp_server_sqlite.transaction_safety import BatchWriteError, safe_execute_many, safe_execute_query
 
 class TestTransactionSafety(unittest.TestCase):
     """Test the transaction safety mechanisms"""
@@ -107,5 +108,73 @@ class TestTransactionSafety(unittest.TestCase):
         self.assertEqual(result[0]["name"], "Name 1")
         self.assertEqual(result[1]["name"], "Name 2")
 
+class TestBatchWrite(unittest.TestCase):
+    """Test executemany batches committed per chunk"""
+    
+    def setUp(self):
+        """Set up a temporary database and pool for testing"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False)
+        self.db_path = self.temp_db.name
+        self.temp_db.close()
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        conn.commit()
+        conn.close()
+        self.pool = ConnectionPool(self.db_path, size=1)
+    
+    def tearDown(self):
+        """Clean up the pool and temporary database"""
+        self.pool.close()
+        os.unlink(self.db_path)
+    
+    def count_rows(self):
+        conn = sqlite3.connect(self.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM test").fetchone()[0]
+        conn.close()
+        return count
+    
+    def test_batch_in_chunks(self):
+        """Test that every row is written and committed once per chunk"""
+        rows = [[f"Name {i}"] for i in range(250)]
+        result = safe_execute_many(self.db_path, "INSERT INTO test (name) VALUES (?)", rows,
+                                   chunk_size=100, pool=self.pool)
+        
+        self.assertEqual(result["rows"], 250)
+        self.assertEqual(result["affected_rows"], 250)
+        self.assertEqual(result["chunks"], 3)
+        self.assertEqual(self.count_rows(), 250)
+    
+    def test_named_parameters(self):
+        """Test that rows may be objects for named placeholders"""
+        rows = [{"name": "a"}, {"name": "b"}]
+        result = safe_execute_many(self.db_path, "INSERT INTO test (name) VALUES (:name)", rows)
+        self.assertEqual(result["affected_rows"], 2)
+        self.assertEqual(result["chunks"], 1)
+    
+    def test_single_transaction_is_atomic(self):
+        """Test that a failure without chunking writes nothing"""
+        rows = [["a"], ["b"], [None]]
+        with self.assertRaises(BatchWriteError) as ctx:
+            safe_execute_many(self.db_path, "INSERT INTO test (name) VALUES (?)", rows, pool=self.pool)
+        self.assertEqual(ctx.exception.committed_rows, 0)
+        self.assertEqual(self.count_rows(), 0)
+    
+    def test_failed_chunk_keeps_earlier_chunks(self):
+        """Test that only the failing chunk is rolled back"""
+        rows = [["a"], ["b"], ["c"], [None]]
+        with self.assertRaises(BatchWriteError) as ctx:
+            safe_execute_many(self.db_path, "INSERT INTO test (name) VALUES (?)", rows,
+                              chunk_size=2, pool=self.pool)
+        self.assertEqual(ctx.exception.committed_rows, 2)
+        self.assertEqual(ctx.exception.failed_row, 2)
+        self.assertEqual(self.count_rows(), 2)
+    
+    def test_rejects_select(self):
+        """Test that only write statements can be batched"""
+        with self.assertRaises(ValueError):
+            safe_execute_many(self.db_path, "SELECT * FROM test WHERE id = ?", [[1]])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for group commit of concurrent writes
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path to import the module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.mcp_server_sqlite.connection_pool import ConnectionPool
+from src.mcp_server_sqlite.write_coalescer import WriteCoalescer
+
+class TestWriteCoalescer(unittest.TestCase):
+    """Test coalescing writes into shared transactions"""
+
+    def setUp(self):
+        """Set up a pool and coalescer over a temporary database"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "writes.db")
+        self.pool = ConnectionPool(self.db_path, size=1)
+        with self.pool.writer() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, hits INTEGER DEFAULT 0)")
+            conn.commit()
+        self.coalescer = WriteCoalescer(self.pool, window_ms=50, max_batch=100)
+
+    def tearDown(self):
+        """Stop the coalescer and close the pool"""
+        self.coalescer.close()
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def submit_concurrently(self, statements):
+        results = [None] * len(statements)
+
+        def submit(i, query, params):
+            try:
+                results[i] = self.coalescer.submit(query, params)
+            except Exception as e:
+                results[i] = e
+
+        threads = [threading.Thread(target=submit, args=(i, query, params))
+                   for i, (query, params) in enumerate(statements)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_writes_share_commits(self):
+        """Test that simultaneous writes are committed in fewer transactions"""
+        results = self.submit_concurrently(
+            [("INSERT INTO items (name) VALUES (?)", [f"item {i}"]) for i in range(20)])
+
+        self.assertEqual(results, [[{"affected_rows": 1}]] * 20)
+        stats = self.coalescer.stats()
+        self.assertEqual(stats["writes"], 20)
+        self.assertLess(stats["batches"], 20)
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM items").fetchone()[0], 20)
+
+    def test_each_caller_gets_its_own_row_count(self):
+        """Test that affected row counts are reported per write"""
+        self.coalescer.submit("INSERT INTO items (name) VALUES ('a'), ('b'), ('c')")
+        results = self.submit_concurrently([
+            ("UPDATE items SET hits = hits + 1", None),
+            ("UPDATE items SET hits = 5 WHERE name = :name", {"name": "b"}),
+            ("DELETE FROM items WHERE name = 'missing'", None),
+        ])
+        self.assertEqual(results, [[{"affected_rows": 3}], [{"affected_rows": 1}], [{"affected_rows": 0}]])
+
+    def test_failed_write_does_not_sink_batch(self):
+        """Test that one failing write is rolled back alone"""
+        results = self.submit_concurrently([
+            ("INSERT INTO items (name) VALUES (?)", ["dup"]),
+            ("INSERT INTO items (name) VALUES (?)", ["dup"]),
+            ("INSERT INTO items (name) VALUES (?)", ["other"]),
+        ])
+
+        errors = [r for r in results if isinstance(r, Exception)]
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], sqlite3.IntegrityError)
+        with self.pool.reader() as conn:
+            names = sorted(row[0] for row in conn.execute("SELECT name FROM items"))
+        self.assertEqual(names, ["dup", "other"])
+        self.assertEqual(self.coalescer.stats()["failed_writes"], 1)
+
+    def test_only_row_writes_are_coalesced(self):
+        """Test that DDL and transaction control bypass the queue"""
+        self.assertTrue(WriteCoalescer.accepts("  insert into items (name) values ('x')"))
+        self.assertFalse(WriteCoalescer.accepts("CREATE TABLE other (x)"))
+        self.assertFalse(WriteCoalescer.accepts("VACUUM"))
+
+if __name__ == "__main__":
+    unittest.main()